@@ -187,12 +187,13 @@ except ImportError:
     render_rewrite_section = None
 
 try:
-    from ui.results import render_results_section
+    from ui.results import render_results_section, render_html_diff
     _results_available = True
 except ImportError:
     logger.warning("No se pudo importar ui.results")
     _results_available = False
     render_results_section = None
+    render_html_diff = None
 
 try:
     from ui.sidebar import render_sidebar
@@ -230,6 +231,28 @@ except ImportError:
                 content = content[first_tag:]
         return content.strip()
 
+# Validación mientras se genera
+try:
+    from utils.html_utils import StreamingHTMLValidator
+except ImportError:
+    StreamingHTMLValidator = None
+
+# Compactación del HTML que se pasa en los prompts
+try:
+    from utils.html_utils import compact_html
+except ImportError:
+    compact_html = None
+
+# Historial de refinamientos como deltas (en vez de copias completas)
+try:
+    from utils.html_diff import apply_delta, make_delta
+    _html_diff_available = True
+except ImportError:
+    _html_diff_available = False
+
+# Segundos entre refrescos del progreso en streaming
+STREAM_PROGRESS_INTERVAL = 0.5
+
 
 # ============================================================================
 # INICIALIZACIÓN
@@ -771,6 +794,8 @@ def render_refinement_section() -> None:
     
     with col2:
         render_undo_button()
+    
+    render_last_refinement_diff()
 
 
 def execute_refinement(refine_prompt: str) -> None:
@@ -882,15 +907,19 @@ IMPORTANTE:
                 # Eliminar el comentario del HTML final
                 refined_content = re.sub(r'<!-- CAMBIOS_REALIZADOS:.*?-->', '', refined_content, flags=re.DOTALL)
             
-            # Guardar versión anterior en historial
-            st.session_state.content_history.append({
-                'content': current_content,
+            # Limpiar y actualizar contenido, guardando la versión anterior
+            # en el historial (como delta respecto a la nueva, si se puede)
+            new_content = extract_html_content(refined_content)
+            history_entry = {
                 'timestamp': datetime.now().isoformat(),
                 'word_count': current_word_count
-            })
-            
-            # Limpiar y actualizar contenido
-            st.session_state.final_html = extract_html_content(refined_content)
+            }
+            if _html_diff_available:
+                history_entry['delta'] = make_delta(new_content, current_content)
+            else:
+                history_entry['content'] = current_content
+            st.session_state.content_history.append(history_entry)
+            st.session_state.final_html = new_content
             
             # Paso 5: Completado (100%)
             progress_bar.progress(100, text="✅ Refinamiento completado")
@@ -952,15 +981,89 @@ def render_undo_button() -> None:
     if st.button("↩️ Deshacer último cambio", use_container_width=True, key="btn_undo_active"):
         # Restaurar última versión
         last_version = history.pop()
-        st.session_state.final_html = last_version['content']
+        try:
+            st.session_state.final_html = restore_history_version(
+                st.session_state.final_html, last_version
+            )
+        except ValueError:
+            # El contenido actual no es del que se guardó el delta
+            st.session_state.content_history = []
+            st.error("❌ El historial no corresponde al contenido actual y se ha descartado")
+            return
         st.success(f"✅ Restaurada versión de {last_version['timestamp']}")
         st.rerun()
 
 
+def restore_history_version(current_html: str, entry: Dict[str, Any]) -> str:
+    """
+    HTML de una entrada del historial de refinamientos.
+    
+    Las entradas guardan la versión anterior como delta respecto a la
+    siguiente ('delta') o, sin utils.html_diff, completa ('content').
+    
+    Raises:
+        ValueError: Si current_html no es la versión sobre la que se hizo el delta
+    """
+    if 'delta' in entry:
+        return apply_delta(current_html, entry['delta'])
+    return entry['content']
+
+
+def render_last_refinement_diff() -> None:
+    """Muestra qué cambió en el último refinamiento respecto a la versión anterior."""
+    history = st.session_state.get('content_history', [])
+    if not history or render_html_diff is None or not _html_diff_available:
+        return
+    
+    current_html = st.session_state.final_html
+    try:
+        previous_html = restore_history_version(current_html, history[-1])
+    except ValueError:
+        return
+    
+    with st.expander(f"🔀 Cambios del último refinamiento ({len(history)} en el historial)"):
+        render_html_diff(previous_html, current_html, before_label="Anterior", after_label="Refinada")
+
+
 # ============================================================================
 # PIPELINE DE GENERACIÓN
 # ============================================================================
 
+def start_stream_validation(target_length: int) -> Tuple[Optional[Any], Optional[Any]]:
+    """
+    Prepara la validación en streaming de una etapa de HTML.
+    
+    Muestra palabras, articles, enlaces y avisos mientras llega la
+    respuesta y corta la generación si va claramente mal (ver
+    StreamingHTMLValidator).
+    
+    Returns:
+        (validador, callback on_text para ContentGenerator.generate), o
+        (None, None) si no está disponible
+    """
+    if StreamingHTMLValidator is None:
+        return None, None
+    
+    validator = StreamingHTMLValidator(target_length=target_length)
+    placeholder = st.empty()
+    last_update = [0.0]
+    
+    def on_text(chunk: str) -> bool:
+        progress = validator.feed(chunk)
+        now = time.time()
+        if progress.should_abort or now - last_update[0] >= STREAM_PROGRESS_INTERVAL:
+            last_update[0] = now
+            status = (
+                f"✍️ {progress.word_count:,} / {target_length:,} palabras · "
+                f"{progress.article_count} articles · {len(progress.links)} enlaces"
+            )
+            notes = progress.errors + progress.warnings
+            placeholder.caption(status + ("  \n" + "  \n".join(notes) if notes else ""))
+        return not progress.should_abort
+    
+    return validator, on_text
+
+
 def execute_generation_pipeline(config: Dict[str, Any], mode: str = 'new') -> None:
     """
     Ejecuta el pipeline completo de generación en 3 etapas.
@@ -1041,6 +1144,14 @@ def execute_generation_pipeline(config: Dict[str, Any], mode: str = 'new') -> No
         st.session_state.generation_in_progress = False
         return
     
+    # El HTML pegado para reescribir va a dos prompts: solo su esqueleto
+    # semántico (sin estilos, scripts, SVGs ni atributos)
+    if mode == 'rewrite' and config.get('html_to_rewrite') and compact_html is not None:
+        compacted = compact_html(config['html_to_rewrite'])
+        config = {**config, 'html_to_rewrite': compacted.html}
+        logger.info(f"HTML a reescribir compactado: {compacted.summary()}")
+        st.caption(f"🗜️ HTML a reescribir compactado: {compacted.summary()}")
+    
     # Contenedor de progreso
     progress_container = st.container()
     
@@ -1172,10 +1283,14 @@ Usa este contenido como base, mejóralo y amplíalo según el análisis competit
                     )
                 
                 # Generar borrador
-                result = generator.generate(stage1_prompt)
+                validator, on_text = start_stream_validation(config.get('target_length', 1500))
+                result = generator.generate(stage1_prompt, on_text=on_text)
                 
                 if not result.success:
-                    st.error(f"❌ Error en Etapa 1: {result.error}")
+                    if validator is not None and validator.progress.should_abort:
+                        st.error(f"❌ Etapa 1 interrumpida: {validator.progress.abort_reason}")
+                    else:
+                        st.error(f"❌ Error en Etapa 1: {result.error}")
                     st.session_state.generation_in_progress = False
                     return
                 
@@ -1265,10 +1380,14 @@ Usa este contenido como base, mejóralo y amplíalo según el análisis competit
                     )
                 
                 # Generar versión final
-                result = generator.generate(stage3_prompt)
+                validator, on_text = start_stream_validation(config.get('target_length', 1500))
+                result = generator.generate(stage3_prompt, on_text=on_text)
                 
                 if not result.success:
-                    st.error(f"❌ Error en Etapa 3: {result.error}")
+                    if validator is not None and validator.progress.should_abort:
+                        st.error(f"❌ Etapa 3 interrumpida: {validator.progress.abort_reason}")
+                    else:
+                        st.error(f"❌ Error en Etapa 3: {result.error}")
                     st.session_state.generation_in_progress = False
                     return
                 
@@ -1280,8 +1399,10 @@ Usa este contenido como base, mejóralo y amplíalo según el análisis competit
                     st.session_state.generation_in_progress = False
                     return
                 
-                # Extraer HTML limpio
+                # Extraer HTML limpio (el historial de refinamientos era
+                # del contenido anterior)
                 st.session_state.final_html = extract_html_content(final_html)
+                st.session_state.content_history = []
                 
                 # Mostrar métricas finales
                 final_word_count = count_words_in_html(st.session_state.final_html)
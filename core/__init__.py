@@ -167,6 +167,7 @@ try:
         
         # Funciones de keywords
         get_keyword_data,
+        get_keywords_data_bulk,
         get_related_keywords,
         get_domain_keywords,
         
@@ -241,6 +242,10 @@ except ImportError as e:
         logger.warning("SEMrush no disponible: get_keyword_data")
         return None
     
+    def get_keywords_data_bulk(*args, **kwargs):
+        logger.warning("SEMrush no disponible: get_keywords_data_bulk")
+        return {}
+    
     def get_related_keywords(*args, **kwargs):
         logger.warning("SEMrush no disponible: get_related_keywords")
         return []
@@ -494,6 +499,7 @@ __all__ = [
     
     # Funciones de conveniencia
     "get_keyword_data",
+    "get_keywords_data_bulk",
     "get_related_keywords",
     "get_domain_keywords",
     
@@ -160,6 +160,11 @@ class ContentValidationError(GenerationError):
     pass
 
 
+class StreamInterruptedError(GenerationError):
+    """Error a mitad de un streaming ya entregado en parte (no se reintenta)."""
+    pass
+
+
 class RetryExhaustedError(GenerationError):
     """Error cuando se agotan los reintentos."""
     pass
@@ -258,9 +263,14 @@ def call_claude_api(
     system_prompt: Optional[str] = None,
     max_retries: int = DEFAULT_MAX_RETRIES,
     retry_delay: float = DEFAULT_RETRY_DELAY,
+    on_text: Optional[Callable[[str], bool]] = None,
 ) -> APIResponse:
     """
     Llama a la API de Claude con manejo robusto de errores y reintentos.
+    
+    Con on_text la respuesta se pide en streaming y cada trozo de texto se
+    pasa a on_text según llega; si devuelve False se corta la generación
+    (stop_reason "aborted", con el texto recibido hasta entonces).
     """
     client = get_client()
     
@@ -283,7 +293,11 @@ def call_claude_api(
             if system_prompt:
                 kwargs["system"] = system_prompt
             
-            response = client.messages.create(**kwargs)
+            aborted = False
+            if on_text is None:
+                response = client.messages.create(**kwargs)
+            else:
+                response, aborted = _stream_message(client, kwargs, on_text)
             
             content = ""
             if response.content:
@@ -297,9 +311,12 @@ def call_claude_api(
                 output_tokens=response.usage.output_tokens,
                 total_tokens=response.usage.input_tokens + response.usage.output_tokens,
                 model=response.model,
-                stop_reason=response.stop_reason or "unknown",
+                stop_reason="aborted" if aborted else (response.stop_reason or "unknown"),
             )
         
+        except StreamInterruptedError:
+            raise
+        
         except AuthenticationError as e:
             raise APIKeyError("API key inválida o expirada", {"original_error": str(e)})
         
@@ -339,6 +356,40 @@ def call_claude_api(
     )
 
 
+def _stream_message(
+    client: Any,
+    kwargs: Dict[str, Any],
+    on_text: Callable[[str], bool]
+) -> Tuple[Any, bool]:
+    """
+    Pide la respuesta en streaming pasando cada trozo a on_text.
+    
+    Returns:
+        (mensaje, abortado); si on_text devuelve False, el mensaje es el
+        recibido hasta ese momento
+    
+    Raises:
+        StreamInterruptedError: Si falla después de entregar algún trozo
+            (reintentar duplicaría el texto ya entregado)
+    """
+    delivered = False
+    try:
+        with client.messages.stream(**kwargs) as stream:
+            for text in stream.text_stream:
+                delivered = True
+                if on_text(text) is False:
+                    logger.info("Generación cortada por el consumidor del streaming")
+                    return stream.current_message_snapshot, True
+            return stream.get_final_message(), False
+    except Exception as e:
+        if not delivered:
+            raise
+        raise StreamInterruptedError(
+            f"Se cortó la respuesta en streaming: {str(e)}",
+            {"type": type(e).__name__}
+        )
+
+
 # ============================================================================
 # FUNCIONES DE GENERACIÓN
 # ============================================================================
@@ -349,8 +400,15 @@ def generate_content(
     max_tokens: int = MAX_TOKENS,
     temperature: float = DEFAULT_TEMPERATURE,
     system_prompt: Optional[str] = None,
+    on_text: Optional[Callable[[str], bool]] = None,
 ) -> GenerationResult:
-    """Genera contenido usando Claude API."""
+    """
+    Genera contenido usando Claude API.
+    
+    on_text (opcional) recibe el texto en streaming y puede cortarlo
+    devolviendo False; el resultado es entonces no exitoso, con el
+    contenido parcial.
+    """
     start_time = time.time()
     
     try:
@@ -360,17 +418,20 @@ def generate_content(
             max_tokens=max_tokens,
             temperature=temperature,
             system_prompt=system_prompt,
+            on_text=on_text,
         )
         
         generation_time = time.time() - start_time
+        aborted = response.stop_reason == "aborted"
         
         return GenerationResult(
-            success=True,
+            success=not aborted,
             content=response.content,
             stage=1,
             model=response.model,
             tokens_used=response.total_tokens,
             generation_time=generation_time,
+            error="Generación interrumpida durante el streaming" if aborted else None,
             metadata={
                 "input_tokens": response.input_tokens,
                 "output_tokens": response.output_tokens,
@@ -653,6 +714,7 @@ class ContentGenerator:
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        on_text: Optional[Callable[[str], bool]] = None,
     ) -> GenerationResult:
         """
         Genera contenido con un prompt simple.
@@ -662,6 +724,7 @@ class ContentGenerator:
             system_prompt: Prompt de sistema opcional
             temperature: Override de temperatura
             max_tokens: Override de max_tokens
+            on_text: Callback de streaming (False corta la generación)
             
         Returns:
             GenerationResult con el contenido generado
@@ -672,6 +735,7 @@ class ContentGenerator:
             max_tokens=max_tokens or self.max_tokens,
             temperature=temperature or self.temperature,
             system_prompt=system_prompt,
+            on_text=on_text,
         )
     
     def generate_with_stages(
@@ -772,6 +836,7 @@ __all__ = [
     'APIKeyError',
     'ContentValidationError',
     'RetryExhaustedError',
+    'StreamInterruptedError',
     
     # Clases de datos
     'GenerationStage',
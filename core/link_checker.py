@@ -0,0 +1,547 @@
+"""
+Link Checker - PcComponentes Content Generator
+Versión 4.6.0
+
+Comprobación de los enlaces de un artículo generado.
+
+analyze_links (utils/html_utils.py) solo clasifica los enlaces; aquí se
+comprueba que las PDPs, posts y categorías enlazados existen:
+
+- Todos los enlaces a la vez (pool de hilos y de conexiones), con un
+  límite de peticiones simultáneas por host
+- HEAD primero; GET (sin descargar el cuerpo) si el servidor no admite HEAD
+- Estado final, URL tras las redirecciones y latencia de cada enlace
+- Caché con TTL por URL (más corto para los fallos) común a todo el
+  proceso, y deduplicación de comprobaciones en vuelo (SingleFlight)
+- Las URLs pasan antes por URLValidator (nada de IPs privadas ni esquemas
+  raros aunque el modelo los haya escrito), resolviendo su dominio; las
+  redirecciones se siguen a mano y cada salto se valida igual antes de
+  pedirlo, conectando a la IP comprobada (PinnedDNSAdapter)
+
+Un artículo típico (~20 enlaces) se comprueba en lo que tarda la
+respuesta más lenta, no en la suma de todas.
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# IMPORTS CON MANEJO DE ERRORES
+# ============================================================================
+
+try:
+    import requests
+    from core.scraper import PinnedDNSAdapter
+    _requests_available = True
+except ImportError as e:
+    logger.error(f"No se pudo importar requests: {e}")
+    _requests_available = False
+
+try:
+    from utils.url_validator import URLValidator
+    _validator_available = True
+except ImportError:
+    _validator_available = False
+
+try:
+    from utils.html_utils import analyze_html
+    _html_utils_available = True
+except ImportError:
+    _html_utils_available = False
+
+try:
+    from config.settings import USER_AGENT
+except ImportError:
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Base para los enlaces relativos del contenido generado
+DEFAULT_BASE_URL = "https://www.pccomponentes.com"
+
+# Concurrencia: hilos totales y peticiones simultáneas por host
+DEFAULT_MAX_WORKERS = 32
+DEFAULT_PER_HOST_LIMIT = 20
+
+# (conexión, lectura) en segundos
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 8.0)
+
+# Caché de estados: TTL de los enlaces que funcionan y de los que no
+DEFAULT_CACHE_TTL = 3600
+DEFAULT_ERROR_TTL = 300
+DEFAULT_CACHE_SIZE = 4096
+
+MAX_REDIRECTS = 5
+
+# Enlaces que no se comprueban por HTTP (anclas internas, correo, teléfono)
+SKIPPED_PREFIXES = ('#', 'mailto:', 'tel:')
+
+# Respuestas a HEAD tras las que se repite con GET (servidores sin HEAD)
+HEAD_FALLBACK_STATUS = frozenset({400, 403, 405, 501})
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+}
+
+
+# ============================================================================
+# DATA CLASSES
+# ============================================================================
+
+@dataclass
+class LinkStatus:
+    """Resultado de comprobar un enlace."""
+    url: str
+    checked_url: str
+    status_code: Optional[int] = None
+    final_url: Optional[str] = None
+    redirects: int = 0
+    latency_ms: float = 0.0
+    method: str = ""
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Responde (tras redirecciones) con un código < 400."""
+        return self.error is None and self.status_code is not None and self.status_code < 400
+
+    @property
+    def broken(self) -> bool:
+        return not self.ok
+
+    @property
+    def redirected(self) -> bool:
+        return self.redirects > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['ok'] = self.ok
+        data['redirected'] = self.redirected
+        return data
+
+
+# ============================================================================
+# CLASE PRINCIPAL: LinkChecker
+# ============================================================================
+
+class LinkChecker:
+    """
+    Comprobador concurrente de enlaces con caché.
+
+    Example:
+        >>> checker = LinkChecker()
+        >>> for status in checker.check_many(['/portatiles', 'https://example.com']):
+        ...     print(status.url, status.status_code, status.final_url)
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        cache_ttl: int = DEFAULT_CACHE_TTL,
+        error_ttl: int = DEFAULT_ERROR_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        validator: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        resolve_dns: bool = True,
+        resolver: Optional[Any] = None
+    ):
+        """
+        Inicializa el comprobador.
+
+        Args:
+            base_url: Base para resolver enlaces relativos
+            max_workers: Comprobaciones simultáneas en total
+            per_host_limit: Comprobaciones simultáneas contra un mismo host
+            timeout: (conexión, lectura) en segundos
+            cache_ttl: Segundos que vale el estado de un enlace que funciona
+            error_ttl: Segundos que vale el de un enlace roto o con error
+            cache_size: Máximo de URLs en caché
+            validator: URLValidator a usar (None = el de por defecto)
+            headers: Headers HTTP adicionales
+            resolve_dns: Comprobar también las IPs a las que resuelve cada
+                dominio (URL inicial y saltos de redirección)
+            resolver: DNSResolver para esas comprobaciones (None = el global)
+        """
+        if not _requests_available:
+            raise ImportError("El módulo 'requests' es requerido. Instálalo con: pip install requests")
+
+        self._base_url = base_url
+        self._max_workers = max(1, max_workers)
+        self._per_host_limit = max(1, per_host_limit)
+        self._timeout = timeout
+        self._cache_ttl = cache_ttl
+        self._error_ttl = error_ttl
+        self._cache_size = max(1, cache_size)
+
+        if validator is None and _validator_available:
+            validator = URLValidator()
+        self._validator = validator
+        self._resolve_dns = resolve_dns
+        self._resolver = resolver
+
+        self._session = requests.Session()
+        self._adapter = PinnedDNSAdapter(pool_connections=16, pool_maxsize=self._max_workers, max_retries=0)
+        self._session.mount("http://", self._adapter)
+        self._session.mount("https://", self._adapter)
+        self._session.headers.update({**DEFAULT_HEADERS, **(headers or {})})
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._cache: 'OrderedDict[str, Tuple[float, LinkStatus]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight(name="link-checker")
+        self._stats = {
+            'checks': 0,
+            'cache_hits': 0,
+            'head_fallbacks': 0,
+            'rejected': 0,
+        }
+
+        logger.info(
+            f"LinkChecker inicializado: workers={self._max_workers}, "
+            f"por host={self._per_host_limit}"
+        )
+
+    # ------------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------------
+
+    def check(self, url: str) -> LinkStatus:
+        """Comprueba un enlace (o lo sirve de caché)."""
+        return self.check_many([url])[0]
+
+    def check_many(self, urls: List[str]) -> List[LinkStatus]:
+        """
+        Comprueba varios enlaces a la vez.
+
+        Args:
+            urls: Enlaces tal como aparecen en el HTML (absolutos o relativos)
+
+        Returns:
+            Un LinkStatus por URL, en el mismo orden (las repetidas se
+            comprueban una vez)
+        """
+        absolute = [self._absolute(url) for url in urls]
+        results: Dict[str, LinkStatus] = {}
+        pending: List[str] = []
+
+        for target in dict.fromkeys(absolute):
+            cached = self._cached(target)
+            if cached is not None:
+                results[target] = cached
+            else:
+                pending.append(target)
+
+        if pending:
+            executor = self._get_executor()
+            futures = {target: executor.submit(self._check_shared, target) for target in pending}
+            for target, future in futures.items():
+                results[target] = future.result()
+
+        return [
+            LinkStatus(**{**asdict(results[target]), 'url': url})
+            for url, target in zip(urls, absolute)
+        ]
+
+    def check_html(self, html_content: str) -> List[Dict[str, Any]]:
+        """
+        Comprueba los enlaces <a> de un HTML (salvo anclas internas,
+        mailto: y tel:).
+
+        Returns:
+            Lista de dicts con url, anchor y el estado de cada enlace
+        """
+        if not html_content or not _html_utils_available:
+            return []
+        links = [
+            link for link in analyze_html(html_content).links
+            if link['url'] and not link['url'].lower().startswith(SKIPPED_PREFIXES)
+        ]
+        statuses = self.check_many([link['url'] for link in links])
+        return [
+            {**status.to_dict(), 'anchor': link['anchor']}
+            for link, status in zip(links, statuses)
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del comprobador."""
+        with self._lock:
+            return {
+                **self._stats,
+                'cache_size': len(self._cache),
+                'max_workers': self._max_workers,
+                'per_host_limit': self._per_host_limit,
+            }
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """Cierra el pool de hilos y la sesión."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------------
+    # INTERNOS
+    # ------------------------------------------------------------------------
+
+    def _absolute(self, url: str) -> str:
+        url = (url or '').strip()
+        if url.startswith('//'):
+            return 'https:' + url
+        if not urlparse(url).scheme:
+            return urljoin(self._base_url + '/', url)
+        return url
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="link-checker"
+                )
+            return self._executor
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self._per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def _cached(self, url: str) -> Optional[LinkStatus]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            expires_at, status = entry
+            if expires_at < time.time():
+                del self._cache[url]
+                return None
+            self._cache.move_to_end(url)
+            self._stats['cache_hits'] += 1
+        return LinkStatus(**{**asdict(status), 'cached': True})
+
+    def _store(self, status: LinkStatus) -> None:
+        ttl = self._cache_ttl if status.ok else self._error_ttl
+        with self._lock:
+            self._cache[status.checked_url] = (time.time() + ttl, status)
+            self._cache.move_to_end(status.checked_url)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _check_shared(self, url: str) -> LinkStatus:
+        # Otra sesión puede estar comprobando la misma URL ahora mismo
+        return self._flight.do(url, self._check_and_store, url)
+
+    def _check_and_store(self, url: str) -> LinkStatus:
+        status = self._check(url)
+        self._store(status)
+        return status
+
+    def _rejected(self, url: str) -> Optional[str]:
+        """
+        Motivo por el que no se puede pedir url (None si se puede).
+
+        Si se resolvió el dominio, su host queda fijado a la IP comprobada;
+        un host ya fijado no se vuelve a resolver.
+        """
+        if self._validator is None:
+            return None
+        host = urlparse(url).hostname or ''
+        resolve_dns = self._resolve_dns and self._adapter.pinned_address(host) is None
+        validation = self._validator.validate_batch(
+            [url], resolve_dns=resolve_dns, resolver=self._resolver
+        )[0]
+        if not validation.is_valid:
+            with self._lock:
+                self._stats['rejected'] += 1
+            return validation.error
+
+        resolved_ips = (validation.details or {}).get('resolved_ips')
+        if resolved_ips:
+            self._adapter.pin(host, resolved_ips[0])
+        return None
+
+    def _request(self, method: str, url: str) -> Tuple[Any, str, int, Optional[str]]:
+        """
+        Pide url siguiendo las redirecciones a mano.
+
+        Returns:
+            (última respuesta, su URL, redirecciones seguidas, motivo si un
+            salto no estaba permitido)
+        """
+        current = url
+        for redirects in range(MAX_REDIRECTS + 1):
+            response = self._session.request(
+                method, current, timeout=self._timeout,
+                allow_redirects=False, stream=method == 'GET'
+            )
+            response.close()
+            if not response.is_redirect:
+                return response, current, redirects, None
+
+            target = urljoin(current, response.headers['location'])
+            rejected = self._rejected(target)
+            if rejected is not None:
+                return response, target, redirects, rejected
+            current = target
+
+        raise requests.exceptions.TooManyRedirects(f"Más de {MAX_REDIRECTS} redirecciones")
+
+    def _check(self, url: str) -> LinkStatus:
+        rejected = self._rejected(url)
+        if rejected is not None:
+            return LinkStatus(url=url, checked_url=url, error=f"URL no permitida: {rejected}")
+
+        host = urlparse(url).netloc.lower()
+        start = time.perf_counter()
+        with self._host_slot(host):
+            with self._lock:
+                self._stats['checks'] += 1
+            try:
+                method = 'HEAD'
+                response, final_url, redirects, rejected = self._request(method, url)
+                if rejected is None and response.status_code in HEAD_FALLBACK_STATUS:
+                    with self._lock:
+                        self._stats['head_fallbacks'] += 1
+                    method = 'GET'
+                    response, final_url, redirects, rejected = self._request(method, url)
+            except requests.exceptions.TooManyRedirects:
+                return self._failed(url, start, 'Demasiadas redirecciones')
+            except requests.exceptions.Timeout:
+                return self._failed(url, start, 'Timeout')
+            except requests.exceptions.RequestException as e:
+                return self._failed(url, start, f"Error de conexión: {type(e).__name__}")
+
+        return LinkStatus(
+            url=url,
+            checked_url=url,
+            status_code=response.status_code,
+            final_url=final_url,
+            redirects=redirects,
+            latency_ms=round((time.perf_counter() - start) * 1000, 1),
+            method=method,
+            error=f"Redirección no permitida: {rejected}" if rejected is not None else None,
+        )
+
+    @staticmethod
+    def _failed(url: str, start: float, error: str) -> LinkStatus:
+        return LinkStatus(
+            url=url,
+            checked_url=url,
+            latency_ms=round((time.perf_counter() - start) * 1000, 1),
+            error=error,
+        )
+
+
+# ============================================================================
+# SINGLETON Y FUNCIONES DE CONVENIENCIA
+# ============================================================================
+
+_checker: Optional[LinkChecker] = None
+_checker_lock = threading.Lock()
+
+
+def get_link_checker(**kwargs) -> LinkChecker:
+    """
+    Obtiene el comprobador compartido (y su caché).
+
+    Args:
+        **kwargs: Argumentos para LinkChecker (solo al crearlo)
+    """
+    global _checker
+    with _checker_lock:
+        if _checker is None:
+            _checker = LinkChecker(**kwargs)
+        return _checker
+
+
+def reset_link_checker() -> None:
+    """Cierra y descarta el comprobador compartido."""
+    global _checker
+    with _checker_lock:
+        if _checker is not None:
+            _checker.close()
+        _checker = None
+
+
+def check_links(urls: List[str]) -> List[LinkStatus]:
+    """Comprueba enlaces con el comprobador compartido."""
+    return get_link_checker().check_many(urls)
+
+
+def check_html_links(html_content: str) -> List[Dict[str, Any]]:
+    """Comprueba los enlaces <a> de un HTML con el comprobador compartido."""
+    return get_link_checker().check_html(html_content)
+
+
+def summarize_link_statuses(statuses: List[Any]) -> Dict[str, int]:
+    """
+    Resume resultados (LinkStatus o sus dicts).
+
+    Returns:
+        Dict con total, ok, broken y redirected
+    """
+    def flag(status: Any, name: str) -> bool:
+        return bool(status.get(name) if isinstance(status, dict) else getattr(status, name))
+
+    return {
+        'total': len(statuses),
+        'ok': sum(1 for status in statuses if flag(status, 'ok')),
+        'broken': sum(1 for status in statuses if not flag(status, 'ok')),
+        'redirected': sum(1 for status in statuses if flag(status, 'redirected')),
+    }
+
+
+def is_link_checker_available() -> bool:
+    return _requests_available
+
+
+__all__ = [
+    '__version__',
+    'DEFAULT_BASE_URL',
+    'SKIPPED_PREFIXES',
+    'HEAD_FALLBACK_STATUS',
+    'LinkStatus',
+    'LinkChecker',
+    'get_link_checker',
+    'reset_link_checker',
+    'check_links',
+    'check_html_links',
+    'summarize_link_statuses',
+    'is_link_checker_available',
+]
@@ -24,6 +24,8 @@ import urllib3
 from typing import Dict, Optional, Any, Tuple, List
 from dataclasses import dataclass, field
 
+from utils.singleflight import SingleFlight
+
 # Configurar logger
 logger = logging.getLogger(__name__)
 
@@ -44,6 +46,9 @@ CLICKHOUSE_URL = "http://clickhouse.clickhouse-prod:8123"
 # Bearer token por defecto para API catálogo (del workflow)
 DEFAULT_CATALOG_TOKEN = "Bearer header.eyJpYXQiOjE1NzE5MDAzMTIsImV4cCI6MTU3MTkwMzkxMiwicm9sZXMiOlsiUk9MRV9QSU1fUE0iLCJST0xFX1VTRVIiXSwidXNlcm5hbWUiOiJhaUBwY2NvbXBvbmVudGVzLmNvbSIsInVzZXJfaWQiOiIwN2UxNzViMC0yM2ZhLTRjYTgtYWYzYi1jMDhiYzZkZDAwNmUifQ==.signature"
 
+# Deduplicación de peticiones idénticas al webhook en vuelo
+_n8n_flight = SingleFlight(name="n8n")
+
 # Patrones para extraer legacy_id de URLs
 URL_PATTERNS = [
     r'/(\d{6,10})(?:\?|$|/)',  # Número de 6-10 dígitos en la URL
@@ -166,6 +171,27 @@ def fetch_product_via_n8n_webhook(
     if not webhook_url:
         return False, None, "No se ha configurado N8N_WEBHOOK_URL"
     
+    # Fetches idénticos concurrentes comparten una sola llamada al webhook
+    return _n8n_flight.do(
+        (webhook_url, legacy_id, product_url, verify_ssl),
+        _fetch_product_via_n8n_webhook,
+        legacy_id,
+        product_url,
+        webhook_url,
+        timeout,
+        verify_ssl
+    )
+
+
+def _fetch_product_via_n8n_webhook(
+    legacy_id: str,
+    product_url: str,
+    webhook_url: str,
+    timeout: int,
+    verify_ssl: bool
+) -> Tuple[bool, Optional[ProductData], str]:
+    """Implementación de fetch_product_via_n8n_webhook (sin deduplicación)."""
+
     headers = {"Content-Type": "application/json"}
     
     # Lista de payloads a intentar en orden
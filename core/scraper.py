@@ -12,6 +12,9 @@ Este módulo proporciona:
 - Extracción de contenido HTML limpio
 - Validación de URLs
 - Sistema de reintentos configurable
+- Deduplicación de scrapes idénticos en vuelo (single-flight)
+- Conexión a IPs ya resueltas y validadas (sin segunda resolución DNS),
+  validando también cada salto de redirección
 
 Autor: PcComponentes - Product Discovery & Content
 """
@@ -19,6 +22,7 @@ Autor: PcComponentes - Product Discovery & Content
 import re
 import time
 import logging
+import threading
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from urllib.parse import urlparse, urljoin
@@ -35,6 +39,8 @@ try:
     import requests
     from requests.adapters import HTTPAdapter
     from urllib3.util.retry import Retry
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
     _requests_available = True
 except ImportError as e:
     logger.error(f"No se pudo importar requests: {e}")
@@ -47,6 +53,14 @@ except ImportError as e:
     logger.warning(f"BeautifulSoup no disponible: {e}")
     _bs4_available = False
 
+from utils.singleflight import SingleFlight
+
+try:
+    from utils.url_validator import get_validator, validate_urls_batch
+    _url_validator_available = True
+except ImportError:
+    _url_validator_available = False
+
 try:
     from config.settings import (
         REQUEST_TIMEOUT as SETTINGS_TIMEOUT,
@@ -103,6 +117,9 @@ RETRYABLE_STATUS_CODES = [408, 429, 500, 502, 503, 504]
 # Tamaño máximo de respuesta (10 MB)
 MAX_RESPONSE_SIZE = 10 * 1024 * 1024
 
+# Segundos que se usa una IP fijada para un host
+PINNED_ADDRESS_TTL = 300
+
 # Selectores CSS para extracción de contenido
 CONTENT_SELECTORS = [
     'article',
@@ -255,6 +272,96 @@ class ScrapeResult:
     metadata: Optional[Dict[str, Any]] = None
 
 
+# ============================================================================
+# ADAPTADOR CON DIRECCIONES FIJADAS
+# ============================================================================
+
+def _pinned_pool_classes(adapter: 'PinnedDNSAdapter') -> Dict[str, type]:
+    """Pools de urllib3 cuyas conexiones abren el socket a la IP fijada del host."""
+
+    def connection_class(base: type) -> type:
+        class PinnedConnection(base):
+            def _new_conn(self):
+                address = adapter.pinned_address(self.host)
+                if address is None:
+                    return super()._new_conn()
+                # Solo el socket va a la IP; Host, SNI y certificado siguen
+                # usando el nombre del host
+                dns_host = self._dns_host
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                finally:
+                    self._dns_host = dns_host
+        return PinnedConnection
+
+    class PinnedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = connection_class(HTTPConnection)
+
+    class PinnedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = connection_class(HTTPSConnection)
+
+    return {'http': PinnedHTTPConnectionPool, 'https': PinnedHTTPSConnectionPool}
+
+
+class PinnedDNSAdapter(HTTPAdapter if _requests_available else object):
+    """
+    HTTPAdapter que conecta a IPs fijadas por host.
+
+    Cuando la URL ya se validó resolviendo su dominio (ver
+    URLValidator.validate_batch con resolve_dns), fijar la IP evita una
+    segunda resolución y que el DNS cambie entre validar y descargar. Los
+    hosts sin IP fijada se resuelven con normalidad.
+
+    Example:
+        >>> adapter = PinnedDNSAdapter()
+        >>> adapter.pin('www.example.com', '93.184.215.14')
+        >>> session.mount('https://', adapter)
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._pins: Dict[str, Tuple[str, float]] = {}
+        self._pins_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _pinned_pool_classes(self)
+
+    def pin(self, host: str, address: str, ttl: float = PINNED_ADDRESS_TTL) -> None:
+        """
+        Fija la IP a la que se conecta un host durante ttl segundos.
+
+        Si el host tenía otra IP, se cierran sus conexiones abiertas.
+        """
+        host = host.lower()
+        with self._pins_lock:
+            previous = self._pins.get(host)
+            self._pins[host] = (address, time.monotonic() + ttl)
+        if previous is None or previous[0] != address:
+            self._drop_pools(host)
+
+    def pinned_address(self, host: str) -> Optional[str]:
+        """IP fijada para el host (None si no hay o caducó)."""
+        with self._pins_lock:
+            entry = self._pins.get(host.lower())
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._pins[host.lower()]
+                return None
+            return entry[0]
+
+    def _drop_pools(self, host: str) -> None:
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            if key.key_host == host:
+                try:
+                    del pools[key]
+                except KeyError:
+                    pass
+
+
 # ============================================================================
 # CLASE PRINCIPAL: WebScraper
 # ============================================================================
@@ -317,6 +424,9 @@ class WebScraper:
         # Crear sesión con retry automático
         self._session = self._create_session()
         
+        # Deduplicación de peticiones idénticas en vuelo
+        self._flight = SingleFlight(name="scraper")
+        
         logger.info(
             f"WebScraper inicializado: timeout={self._config.timeout.read}s, "
             f"max_retries={self._config.retry.max_retries}"
@@ -335,9 +445,10 @@ class WebScraper:
             raise_on_status=False
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = PinnedDNSAdapter(max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
+        self._adapter = adapter
         
         # Configurar headers por defecto
         session.headers.update(self._config.headers)
@@ -348,7 +459,8 @@ class WebScraper:
         self,
         url: str,
         extract_content: bool = True,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        resolved_ip: Optional[str] = None
     ) -> ScrapeResult:
         """
         Extrae contenido de una URL.
@@ -357,10 +469,32 @@ class WebScraper:
             url: URL a scrapear
             extract_content: Si True, extrae solo el contenido principal
             timeout: Timeout específico para esta petición (opcional)
+            resolved_ip: IP ya resuelta y validada del host (se conecta a
+                ella sin volver a resolver el dominio); las redirecciones se
+                siguen entonces a mano, validando y fijando cada salto
             
         Returns:
             ScrapeResult con el contenido extraído
         """
+        # Scrapes idénticos concurrentes comparten una sola descarga
+        flight_key = (url.strip() if url else url, extract_content, timeout, resolved_ip)
+        return self._flight.do(
+            flight_key,
+            self._scrape_url,
+            url,
+            extract_content,
+            timeout,
+            resolved_ip
+        )
+    
+    def _scrape_url(
+        self,
+        url: str,
+        extract_content: bool,
+        timeout: Optional[float],
+        resolved_ip: Optional[str] = None
+    ) -> ScrapeResult:
+        """Implementación de scrape_url (ver scrape_url)."""
         start_time = time.time()
         
         # Validar URL
@@ -374,6 +508,11 @@ class WebScraper:
                 response_time=time.time() - start_time
             )
         
+        if resolved_ip:
+            host = urlparse(validated_url).hostname
+            if host:
+                self._adapter.pin(host, resolved_ip)
+        
         # Configurar timeout
         if timeout is not None:
             timeout = max(MIN_TIMEOUT, min(float(timeout), MAX_TIMEOUT))
@@ -383,7 +522,10 @@ class WebScraper:
         
         # Realizar petición con manejo de errores específico
         try:
-            response = self._make_request(validated_url, request_timeout)
+            if resolved_ip:
+                response = self._fetch_pinned(validated_url, request_timeout)
+            else:
+                response = self._make_request(validated_url, request_timeout)
             
             # Verificar tamaño de respuesta
             content_length = int(response.headers.get('content-length', 0))
@@ -455,6 +597,15 @@ class WebScraper:
                 response_time=time.time() - start_time
             )
         
+        except URLValidationError as e:
+            logger.warning(f"Redirección rechazada en {validated_url}: {e}")
+            return ScrapeResult(
+                success=False,
+                url=validated_url,
+                error=str(e),
+                response_time=time.time() - start_time
+            )
+        
         except requests.exceptions.TooManyRedirects as e:
             logger.warning(f"Demasiados redirects en {validated_url}: {e}")
             return ScrapeResult(
@@ -485,7 +636,8 @@ class WebScraper:
     def _make_request(
         self,
         url: str,
-        timeout: Tuple[float, float]
+        timeout: Tuple[float, float],
+        allow_redirects: Optional[bool] = None
     ) -> 'requests.Response':
         """
         Realiza la petición HTTP con reintentos manuales adicionales.
@@ -493,10 +645,13 @@ class WebScraper:
         Args:
             url: URL a solicitar
             timeout: Tupla (connect_timeout, read_timeout)
+            allow_redirects: Seguir redirecciones (None = config.follow_redirects)
             
         Returns:
             Response de requests
         """
+        if allow_redirects is None:
+            allow_redirects = self._config.follow_redirects
         last_error = None
         current_delay = self._config.retry.retry_delay
         
@@ -508,7 +663,7 @@ class WebScraper:
                     url,
                     timeout=timeout,
                     verify=self._config.verify_ssl,
-                    allow_redirects=self._config.follow_redirects,
+                    allow_redirects=allow_redirects,
                 )
                 
                 # Si es un error recuperable y no es el último intento
@@ -547,6 +702,59 @@ class WebScraper:
         
         raise RetryExhaustedError(f"Reintentos agotados para {url}", url)
     
+    def _fetch_pinned(
+        self,
+        url: str,
+        timeout: Tuple[float, float]
+    ) -> 'requests.Response':
+        """
+        Petición a un host con IP fijada, siguiendo las redirecciones a mano.
+        
+        Cada salto se valida (ver _check_redirect) antes de pedirlo, así que
+        ninguna redirección lleva a una IP sin comprobar.
+        
+        Raises:
+            URLValidationError: Si una redirección no está permitida
+        """
+        current = url
+        for _ in range(self._config.max_redirects + 1):
+            response = self._make_request(current, timeout, allow_redirects=False)
+            if not (self._config.follow_redirects and response.is_redirect):
+                return response
+            target = urljoin(current, response.headers['location'])
+            response.close()
+            self._check_redirect(target)
+            current = target
+        
+        raise requests.exceptions.TooManyRedirects(
+            f"Más de {self._config.max_redirects} redirecciones", response=response
+        )
+    
+    def _check_redirect(self, url: str) -> None:
+        """
+        Valida un salto de redirección y fija la IP de su host.
+        
+        Un host ya fijado no se vuelve a resolver; uno nuevo se resuelve y
+        se rechaza si apunta a una IP no permitida.
+        
+        Raises:
+            URLValidationError: Si el salto no está permitido
+        """
+        host = urlparse(url).hostname or ''
+        if not _url_validator_available:
+            if self._adapter.pinned_address(host) is None:
+                raise URLValidationError(f"Redirección a otro host no verificable: {host}", url)
+            return
+        
+        pinned = self._adapter.pinned_address(host) is not None
+        result = get_validator().validate_batch([url], resolve_dns=not pinned)[0]
+        if not result.is_valid:
+            raise URLValidationError(f"Redirección no permitida: {result.error}", url)
+        
+        resolved_ips = (result.details or {}).get('resolved_ips')
+        if resolved_ips:
+            self._adapter.pin(host, resolved_ips[0])
+    
     def _validate_url(self, url: str) -> str:
         """
         Valida y normaliza una URL.
@@ -738,7 +946,8 @@ def reset_scraper() -> None:
 def scrape_url(
     url: str,
     timeout: Optional[float] = None,
-    extract_content: bool = True
+    extract_content: bool = True,
+    resolved_ip: Optional[str] = None
 ) -> ScrapeResult:
     """
     Scrapea una URL usando el scraper global.
@@ -747,12 +956,15 @@ def scrape_url(
         url: URL a scrapear
         timeout: Timeout específico (opcional)
         extract_content: Si extraer solo contenido principal
+        resolved_ip: IP ya validada del host (opcional)
         
     Returns:
         ScrapeResult con el contenido
     """
     scraper = get_scraper()
-    return scraper.scrape_url(url, extract_content=extract_content, timeout=timeout)
+    return scraper.scrape_url(
+        url, extract_content=extract_content, timeout=timeout, resolved_ip=resolved_ip
+    )
 
 
 def scrape_pdp_data(
@@ -800,7 +1012,8 @@ def scrape_pdp_data(
 def scrape_competitor_urls(
     urls: List[str],
     timeout: Optional[float] = None,
-    max_concurrent: int = 1
+    max_concurrent: int = 1,
+    resolve_dns: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Scrapea múltiples URLs de competidores.
@@ -809,6 +1022,9 @@ def scrape_competitor_urls(
         urls: Lista de URLs a scrapear
         timeout: Timeout por URL (opcional)
         max_concurrent: Número máximo de requests concurrentes (futuro)
+        resolve_dns: Validar antes todas las URLs resolviendo sus dominios en
+            lote (descarta las que apuntan a IPs privadas) y conectar a las
+            IPs validadas
         
     Returns:
         Lista de dicts con datos de cada competidor
@@ -816,10 +1032,36 @@ def scrape_competitor_urls(
     results = []
     scraper = get_scraper()
     
+    validation = {}
+    if resolve_dns:
+        if _url_validator_available:
+            validation = validate_urls_batch(urls, resolve_dns=True)
+        else:
+            logger.warning("utils.url_validator no disponible; se scrapea sin resolver DNS")
+    
     for url in urls:
         logger.info(f"Scrapeando competidor: {url}")
         
-        result = scraper.scrape_url(url, extract_content=True, timeout=timeout)
+        checked = validation.get(url)
+        if checked is not None and not checked.is_valid:
+            results.append({
+                'url': url,
+                'success': False,
+                'title': '',
+                'content': '',
+                'word_count': 0,
+                'error': checked.error,
+                'response_time': 0.0,
+            })
+            continue
+        
+        resolved_ips = (checked.details or {}).get('resolved_ips') if checked else None
+        result = scraper.scrape_url(
+            url,
+            extract_content=True,
+            timeout=timeout,
+            resolved_ip=resolved_ips[0] if resolved_ips else None
+        )
         
         competitor_data = {
             'url': url,
@@ -1161,6 +1403,7 @@ __all__ = [
     'ScraperConfig',
     'ScrapeResult',
     'WebScraper',
+    'PinnedDNSAdapter',
     
     # Scraper global
     'get_scraper',
@@ -12,6 +12,7 @@ Este módulo proporciona:
 - Caché de respuestas con TTL
 - Reintentos con backoff exponencial
 - Connection pooling
+- Deduplicación de peticiones idénticas en vuelo (single-flight)
 
 Autor: PcComponentes - Product Discovery & Content
 """
@@ -21,12 +22,22 @@ import time
 import logging
 import threading
 import hashlib
-from typing import Dict, List, Optional, Any, Callable, Union
+import sqlite3
+import asyncio
+import weakref
+import io
+import tempfile
+import contextvars
+from typing import Dict, List, Optional, Any, Callable, Union, Iterable, Iterator, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from functools import wraps
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.singleflight import SingleFlight, BackgroundRefresher
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -48,10 +59,18 @@ DEFAULT_MAX_RETRY_DELAY = 30.0
 # Rate limiting
 DEFAULT_RATE_LIMIT = 10  # requests por segundo
 DEFAULT_RATE_WINDOW = 1.0  # ventana en segundos
+DEFAULT_RATE_BUCKET = "semrush"
 
 # Caché
 DEFAULT_CACHE_TTL = 3600  # 1 hora
 DEFAULT_CACHE_MAX_SIZE = 500
+# Ventana tras expirar en la que se sirve el valor viejo mientras se
+# refresca en segundo plano (stale-while-revalidate)
+DEFAULT_CACHE_STALE_GRACE = 3600
+
+# Enriquecimiento masivo de keywords
+DEFAULT_BULK_BATCH_SIZE = 100  # phrase_these admite hasta 100 frases por petición
+DEFAULT_BULK_MAX_WORKERS = 4
 
 # Endpoints de SEMrush
 SEMRUSH_ENDPOINTS = {
@@ -59,6 +78,7 @@ SEMRUSH_ENDPOINTS = {
     'domain_organic': '/analytics/v1/',
     'domain_adwords': '/analytics/v1/',
     'keyword_overview': '/analytics/v1/',
+    'keyword_overview_bulk': '/analytics/v1/',
     'keyword_difficulty': '/analytics/v1/',
     'related_keywords': '/analytics/v1/',
     'phrase_questions': '/analytics/v1/',
@@ -80,6 +100,54 @@ SEMRUSH_DATABASES = {
 
 DEFAULT_DATABASE = 'es'
 
+# Coste en unidades API por línea devuelta, según el parámetro 'type'
+SEMRUSH_UNIT_COSTS = {
+    'phrase_this': 10,
+    'phrase_these': 10,
+    'phrase_kdi': 50,
+    'phrase_related': 40,
+    'phrase_questions': 40,
+    'domain_ranks': 10,
+    'domain_organic': 10,
+    'url_organic': 10,
+    'backlinks_overview': 40,
+}
+
+# Contabilidad de unidades API
+DEFAULT_UNITS_DB = os.path.join(tempfile.gettempdir(), "semrush_units.sqlite")
+DEFAULT_UNIT_SESSION = "default"
+BUDGET_EXHAUSTED_MESSAGE = "Presupuesto de unidades API agotado"
+
+# Columnas del overview de keyword (compartidas por phrase_this y phrase_these)
+KEYWORD_OVERVIEW_COLUMNS = 'Ph,Nq,Cp,Co,Nr,Td'
+
+# Tipo de cada columna de los informes CSV, por nombre de cabecera.
+# Las columnas no listadas se infieren valor a valor (_parse_value).
+SEMRUSH_COLUMN_TYPES: Dict[str, type] = {
+    'Keyword': str,
+    'Url': str,
+    'Domain': str,
+    'Trends': str,
+    'Position': int,
+    'Previous Position': int,
+    'Position Difference': int,
+    'Search Volume': int,
+    'Number of Results': int,
+    'Rank': int,
+    'Organic Keywords': int,
+    'Organic Traffic': int,
+    'Organic Cost': int,
+    'Adwords Keywords': int,
+    'Adwords Traffic': int,
+    'Adwords Cost': int,
+    'CPC': float,
+    'Competition': float,
+    'Traffic (%)': float,
+    'Traffic Cost (%)': float,
+    'Keyword Difficulty Index': float,
+    'Keyword Difficulty': float,
+}
+
 
 # ============================================================================
 # IMPORTS CONDICIONALES
@@ -94,6 +162,12 @@ except ImportError:
     _requests_available = False
     logger.warning("requests no disponible - SEMrush client limitado")
 
+try:
+    import pandas as pd
+    _pandas_available = True
+except ImportError:
+    _pandas_available = False
+
 
 # ============================================================================
 # EXCEPCIONES
@@ -162,6 +236,13 @@ class SEMrushTimeoutError(SEMrushError):
         super().__init__(message, error_code="TIMEOUT")
 
 
+class SEMrushBudgetError(SEMrushError):
+    """Presupuesto de unidades API agotado."""
+    
+    def __init__(self, message: str = BUDGET_EXHAUSTED_MESSAGE):
+        super().__init__(message, error_code="BUDGET_EXCEEDED")
+
+
 # ============================================================================
 # ENUMS Y DATA CLASSES
 # ============================================================================
@@ -172,6 +253,7 @@ class ReportType(Enum):
     DOMAIN_ORGANIC = "domain_organic"
     DOMAIN_ADWORDS = "domain_adwords"
     KEYWORD_OVERVIEW = "keyword_overview"
+    KEYWORD_OVERVIEW_BULK = "keyword_overview_bulk"
     KEYWORD_DIFFICULTY = "keyword_difficulty"
     RELATED_KEYWORDS = "related_keywords"
     PHRASE_QUESTIONS = "phrase_questions"
@@ -185,6 +267,12 @@ class RateLimitConfig:
     requests_per_second: float = DEFAULT_RATE_LIMIT
     window_seconds: float = DEFAULT_RATE_WINDOW
     burst_limit: int = 20  # Permite burst hasta este límite
+    # Ruta a un fichero SQLite para compartir la cuota entre procesos
+    # (varios workers de Streamlit). None = bucket en memoria del proceso.
+    shared_state_path: Optional[str] = field(
+        default_factory=lambda: os.environ.get('SEMRUSH_RATE_LIMIT_DB') or None
+    )
+    bucket_name: str = DEFAULT_RATE_BUCKET
 
 
 @dataclass
@@ -205,6 +293,31 @@ class CacheConfig:
     enabled: bool = True
     ttl: int = DEFAULT_CACHE_TTL
     max_size: int = DEFAULT_CACHE_MAX_SIZE
+    stale_grace: int = DEFAULT_CACHE_STALE_GRACE  # 0 = desactivado
+
+
+def _env_int(name: str) -> Optional[int]:
+    """Lee un entero opcional de variables de entorno."""
+    value = os.environ.get(name, '').strip()
+    return int(value) if value.isdigit() else None
+
+
+@dataclass
+class UnitBudgetConfig:
+    """Presupuestos de unidades API (None = sin límite)."""
+    daily_units: Optional[int] = field(
+        default_factory=lambda: _env_int('SEMRUSH_DAILY_UNIT_BUDGET')
+    )
+    session_units: Optional[int] = field(
+        default_factory=lambda: _env_int('SEMRUSH_SESSION_UNIT_BUDGET')
+    )
+    # Fichero SQLite donde se persiste el consumo (':memory:' = no persistir)
+    storage_path: str = field(
+        default_factory=lambda: os.environ.get('SEMRUSH_UNITS_DB') or DEFAULT_UNITS_DB
+    )
+    # Si True, los informes con display_limit se recortan a lo que quede
+    # de presupuesto en lugar de rechazarse
+    degrade: bool = True
 
 
 @dataclass
@@ -217,6 +330,7 @@ class SEMrushConfig:
     rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
     retry: RetryConfig = field(default_factory=RetryConfig)
     cache: CacheConfig = field(default_factory=CacheConfig)
+    units: UnitBudgetConfig = field(default_factory=UnitBudgetConfig)
     
     def __post_init__(self):
         """Validar configuración después de inicializar."""
@@ -238,6 +352,10 @@ class CacheEntry:
         """Verifica si la entrada ha expirado."""
         return datetime.now() > self.expires_at
     
+    def is_beyond_grace(self, grace: int) -> bool:
+        """Verifica si ha expirado hace más de `grace` segundos."""
+        return datetime.now() > self.expires_at + timedelta(seconds=grace)
+    
     def touch(self) -> None:
         """Actualiza contador de hits."""
         self.hits += 1
@@ -265,20 +383,364 @@ class APIResponse:
         }
 
 
+@dataclass
+class BulkKeywordResult:
+    """Resultado de una keyword dentro de un enriquecimiento masivo."""
+    keyword: str
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    from_cache: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte a diccionario."""
+        return {
+            'keyword': self.keyword,
+            'success': self.success,
+            'data': self.data,
+            'error': self.error,
+            'from_cache': self.from_cache,
+        }
+
+
+# ============================================================================
+# PARSER CSV (STREAMING)
+# ============================================================================
+
+def _parse_value(value: str) -> Any:
+    """Parsea un valor individual de tipo desconocido."""
+    if not value:
+        return None
+    
+    # Intentar convertir a número
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _make_converter(column: str) -> Callable[[str], Any]:
+    """
+    Crea el conversor de una columna a partir de su cabecera.
+    
+    El tipo se fija una vez por columna; solo los valores que no encajan
+    (p.ej. un '12.5' en una columna entera) pasan por la inferencia lenta.
+    """
+    col_type = SEMRUSH_COLUMN_TYPES.get(column)
+    
+    if col_type is None:
+        return _parse_value
+    
+    if col_type is str:
+        return lambda value: value if value else None
+    
+    def convert(value: str) -> Any:
+        if not value:
+            return None
+        try:
+            return col_type(value)
+        except ValueError:
+            return _parse_value(value)
+    
+    return convert
+
+
+class SEMrushCSVParser:
+    """
+    Parser incremental de las respuestas CSV (separador ';') de SEMrush.
+    
+    Consume las líneas de una en una (p.ej. response.iter_lines()), de
+    modo que nunca hay una copia completa del texto troceado en memoria.
+    La cabecera se lee al construir el parser y fija el conversor de cada
+    columna.
+    
+    Example:
+        >>> parser = SEMrushCSVParser(response.iter_lines(decode_unicode=True))
+        >>> for row in parser.iter_rows():
+        ...     print(row['Keyword'], row['Search Volume'])
+    """
+    
+    def __init__(self, lines: Iterable[str]):
+        """
+        Inicializa el parser leyendo la cabecera.
+        
+        Args:
+            lines: Iterable de líneas de texto (sin decodificar no se admite)
+            
+        Raises:
+            SEMrushAPIError: Si la respuesta es un error de SEMrush
+        """
+        self._lines = iter(lines)
+        self.headers: List[str] = []
+        self.rows_read = 0
+        
+        for line in self._lines:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            if line.startswith('ERROR'):
+                raise SEMrushAPIError(f"Error de SEMrush: {line}")
+            self.headers = line.split(';')
+            break
+        
+        self._converters = [_make_converter(h) for h in self.headers]
+    
+    def iter_values(self) -> Iterator[tuple]:
+        """Itera filas como tuplas de valores convertidos (orden de headers)."""
+        if not self.headers:
+            return
+        
+        n_columns = len(self.headers)
+        converters = self._converters
+        
+        for line in self._lines:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            
+            values = line.split(';')
+            if len(values) != n_columns:
+                continue
+            
+            self.rows_read += 1
+            yield tuple(conv(v) for conv, v in zip(converters, values))
+    
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """Itera filas como diccionarios {cabecera: valor}."""
+        headers = self.headers
+        for values in self.iter_values():
+            yield dict(zip(headers, values))
+    
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """Consume el resto de la respuesta en formato columnar."""
+        columns: List[List[Any]] = [[] for _ in self.headers]
+        appends = [col.append for col in columns]
+        
+        for values in self.iter_values():
+            for append, value in zip(appends, values):
+                append(value)
+        
+        return dict(zip(self.headers, columns))
+    
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """Consume el resto de la respuesta en un DataFrame (requiere pandas)."""
+        if not _pandas_available:
+            raise ImportError("pandas no disponible")
+        return pd.DataFrame(self.to_columns(), columns=self.headers)
+
+
+def parse_semrush_csv(
+    source: Union[str, Iterable[str]],
+    columnar: bool = False
+) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+    """
+    Parsea una respuesta CSV de SEMrush.
+    
+    Args:
+        source: Texto completo o iterable de líneas
+        columnar: Si True, retorna {columna: [valores]} en vez de filas
+        
+    Returns:
+        Lista de filas o diccionario columnar
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    
+    parser = SEMrushCSVParser(source)
+    
+    if columnar:
+        return parser.to_columns()
+    return list(parser.iter_rows())
+
+
 # ============================================================================
 # RATE LIMITER
 # ============================================================================
 
+class _LocalTokenBucket:
+    """Token bucket en memoria (un solo proceso). No es thread-safe por sí solo."""
+    
+    def __init__(self, config: RateLimitConfig):
+        self._config = config
+        self._tokens = float(config.burst_limit)
+        self._last_update = time.monotonic()
+    
+    def _refill(self) -> None:
+        """Rellena tokens basado en el tiempo transcurrido."""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        
+        self._tokens = min(
+            self._config.burst_limit,
+            self._tokens + elapsed * self._config.requests_per_second
+        )
+        self._last_update = now
+    
+    def try_take(self, max_wait: Optional[float] = None) -> float:
+        """
+        Intenta consumir un token.
+        
+        Args:
+            max_wait: Ignorado (el bucket en memoria nunca espera)
+        
+        Returns:
+            0 si se consumió, o segundos exactos hasta el próximo token
+        """
+        self._refill()
+        
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        
+        return (1 - self._tokens) / self._config.requests_per_second
+    
+    def peek_wait(self, max_wait: Optional[float] = None) -> float:
+        """Segundos hasta que haya un token, sin consumirlo."""
+        self._refill()
+        
+        if self._tokens >= 1:
+            return 0.0
+        
+        return (1 - self._tokens) / self._config.requests_per_second
+    
+    def close(self) -> None:
+        pass
+
+
+class _SQLiteTokenBucket:
+    """
+    Token bucket persistido en SQLite, compartido entre procesos.
+    
+    Cada operación es una transacción BEGIN IMMEDIATE sobre una fila por
+    bucket, de modo que varios workers consumen de la misma cuota. Usa
+    reloj de pared (time.time) porque monotonic no es comparable entre
+    procesos.
+    
+    Si la base de datos falla (p. ej. bloqueada por otro proceso más allá
+    del plazo del llamante), esa operación usa un bucket local en memoria
+    en vez de propagar el error.
+    """
+    
+    # Espera máxima por el bloqueo de la base de datos (segundos)
+    BUSY_TIMEOUT = 5.0
+    
+    def __init__(self, config: RateLimitConfig, path: str):
+        self._config = config
+        self._name = config.bucket_name
+        self._fallback = _LocalTokenBucket(config)
+        self._conn = sqlite3.connect(
+            path,
+            timeout=self.BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " name TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+    
+    def _update(self, consume: bool, max_wait: Optional[float]) -> float:
+        """Refill + consumo opcional en una única transacción."""
+        rate = self._config.requests_per_second
+        burst = float(self._config.burst_limit)
+        
+        busy_timeout = self.BUSY_TIMEOUT if max_wait is None else min(self.BUSY_TIMEOUT, max_wait)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(max(0.0, busy_timeout) * 1000)}")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = self._conn.execute(
+                "SELECT tokens, updated_at FROM rate_buckets WHERE name = ?",
+                (self._name,)
+            ).fetchone()
+            
+            if row is None:
+                tokens = burst
+            else:
+                elapsed = max(0.0, now - row[1])
+                tokens = min(burst, row[0] + elapsed * rate)
+            
+            wait_time = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if consume and wait_time == 0:
+                tokens -= 1
+            
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) "
+                "VALUES (?, ?, ?)",
+                (self._name, tokens, now)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+        
+        return wait_time
+    
+    def _safe_update(self, consume: bool, max_wait: Optional[float]) -> float:
+        try:
+            return self._update(consume, max_wait)
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limit compartido no disponible ({e}); usando bucket local")
+            return self._fallback.try_take() if consume else self._fallback.peek_wait()
+    
+    def try_take(self, max_wait: Optional[float] = None) -> float:
+        """Como _LocalTokenBucket.try_take; max_wait acota la espera por el bloqueo de la BD."""
+        return self._safe_update(True, max_wait)
+    
+    def peek_wait(self, max_wait: Optional[float] = None) -> float:
+        return self._safe_update(False, max_wait)
+    
+    def close(self) -> None:
+        self._conn.close()
+
+
 class RateLimiter:
     """
     Rate limiter thread-safe con token bucket algorithm.
+    
+    Los hilos que esperan forman una cola FIFO: solo la cabeza duerme,
+    exactamente el tiempo que falta para el siguiente token, y al salir
+    despierta al siguiente. No hay polling.
+    
+    Con RateLimitConfig.shared_state_path el bucket vive en SQLite y la
+    cuota se comparte entre procesos (el orden FIFO es por proceso).
+    
+    self._lock solo protege la cola; las operaciones sobre el bucket (que
+    con SQLite pueden esperar al bloqueo de la base de datos) van con su
+    propio lock, para no retener al resto de hilos mientras tanto.
     """
     
     def __init__(self, config: RateLimitConfig):
         self._config = config
-        self._tokens = config.burst_limit
-        self._last_update = time.monotonic()
         self._lock = threading.Lock()
+        self._bucket_lock = threading.Lock()
+        self._waiters: deque = deque()
+        self._async_locks: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._bucket = self._create_bucket(config)
+    
+    @staticmethod
+    def _create_bucket(config: RateLimitConfig):
+        """Crea el bucket local o compartido según la configuración."""
+        if config.shared_state_path:
+            try:
+                return _SQLiteTokenBucket(config, config.shared_state_path)
+            except sqlite3.Error as e:
+                logger.warning(
+                    f"No se pudo abrir el rate limit compartido "
+                    f"({config.shared_state_path}): {e}. Usando bucket local."
+                )
+        return _LocalTokenBucket(config)
+    
+    @property
+    def is_shared(self) -> bool:
+        """True si la cuota se comparte entre procesos."""
+        return isinstance(self._bucket, _SQLiteTokenBucket)
     
     def acquire(self, timeout: float = 10.0) -> bool:
         """
@@ -292,43 +754,294 @@ class RateLimiter:
         """
         deadline = time.monotonic() + timeout
         
-        while time.monotonic() < deadline:
-            with self._lock:
-                self._refill_tokens()
-                
-                if self._tokens >= 1:
-                    self._tokens -= 1
+        with self._lock:
+            waiter = threading.Condition(self._lock)
+            self._waiters.append(waiter)
+            is_head = self._waiters[0] is waiter
+        
+        try:
+            while True:
+                # Solo la cabeza de la cola toca el bucket, sin self._lock
+                wait_time = self._take(deadline) if is_head else None
+                if wait_time == 0:
                     return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                
+                with self._lock:
+                    if not is_head and self._waiters[0] is waiter:
+                        # Pasó a ser la cabeza mientras no tenía el lock
+                        is_head = True
+                        continue
+                    waiter.wait(
+                        remaining if wait_time is None else min(wait_time, remaining)
+                    )
+                    is_head = self._waiters[0] is waiter
+        finally:
+            with self._lock:
+                was_head = self._waiters[0] is waiter
+                self._waiters.remove(waiter)
+                if was_head and self._waiters:
+                    self._waiters[0].notify()
+    
+    def _take(self, deadline: float, consume: bool = True) -> float:
+        """try_take (o peek_wait) del bucket sin esperar a la BD más allá de deadline."""
+        with self._bucket_lock:
+            max_wait = max(0.0, deadline - time.monotonic())
+            if consume:
+                return self._bucket.try_take(max_wait)
+            return self._bucket.peek_wait(max_wait)
+    
+    async def _take_async(self, deadline: float, consume: bool) -> float:
+        """_take sin bloquear el event loop con la E/S de SQLite."""
+        if not self.is_shared:
+            return self._take(deadline, consume)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._take, deadline, consume)
+    
+    async def acquire_async(self, timeout: float = 10.0) -> bool:
+        """
+        Versión asyncio de acquire: no bloquea el event loop.
+        
+        Los llamantes async de un mismo loop se ordenan FIFO con un
+        asyncio.Lock y ceden el turno a los hilos que ya estén en cola.
+        
+        Args:
+            timeout: Tiempo máximo de espera
             
-            # Esperar un poco antes de reintentar
-            time.sleep(0.05)
+        Returns:
+            True si se adquirió el token
+        """
+        deadline = time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
         
-        return False
-    
-    def _refill_tokens(self) -> None:
-        """Rellena tokens basado en el tiempo transcurrido."""
-        now = time.monotonic()
-        elapsed = now - self._last_update
+        with self._lock:
+            async_lock = self._async_locks.get(loop)
+            if async_lock is None:
+                async_lock = asyncio.Lock()
+                self._async_locks[loop] = async_lock
         
-        # Calcular tokens a añadir
-        tokens_to_add = elapsed * self._config.requests_per_second
+        try:
+            await asyncio.wait_for(async_lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
         
-        self._tokens = min(
-            self._config.burst_limit,
-            self._tokens + tokens_to_add
-        )
-        self._last_update = now
+        try:
+            while True:
+                with self._lock:
+                    threads_waiting = bool(self._waiters)
+                
+                wait_time = await self._take_async(deadline, consume=not threads_waiting)
+                if threads_waiting:
+                    wait_time = wait_time or 1 / self._config.requests_per_second
+                
+                if wait_time == 0:
+                    return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                
+                await asyncio.sleep(min(wait_time, remaining))
+        finally:
+            async_lock.release()
     
     def get_wait_time(self) -> float:
         """Retorna tiempo estimado de espera."""
+        with self._bucket_lock:
+            wait_time = self._bucket.peek_wait()
         with self._lock:
-            self._refill_tokens()
-            
-            if self._tokens >= 1:
-                return 0
+            queued = len(self._waiters)
+        
+        return wait_time + queued / self._config.requests_per_second
+    
+    def close(self) -> None:
+        """Libera el backend del bucket (conexión SQLite si existe)."""
+        with self._bucket_lock:
+            self._bucket.close()
+
+
+# ============================================================================
+# CONTADOR DE UNIDADES API
+# ============================================================================
+
+# Sesión a la que se imputan las unidades. Es un ContextVar: cada hilo de
+# Streamlit tiene la suya y se propaga a los workers del enriquecimiento
+# masivo con contextvars.copy_context().
+_unit_session: contextvars.ContextVar = contextvars.ContextVar(
+    'semrush_unit_session', default=DEFAULT_UNIT_SESSION
+)
+
+
+def estimate_request_units(params: Dict[str, Any]) -> int:
+    """
+    Estima el coste máximo en unidades de una petición antes de hacerla.
+    
+    Args:
+        params: Parámetros de la petición (incluido 'type')
+        
+    Returns:
+        Unidades que costaría si devuelve todas las líneas posibles
+    """
+    unit_cost = SEMRUSH_UNIT_COSTS.get(params.get('type', ''), 0)
+    
+    if 'display_limit' in params:
+        lines = int(params['display_limit'])
+    elif params.get('type') == 'phrase_these':
+        lines = len([p for p in str(params.get('phrase', '')).split(';') if p])
+    else:
+        lines = 1
+    
+    return lines * unit_cost
+
+
+class UnitMeter:
+    """
+    Contador persistente de unidades API de SEMrush.
+    
+    Registra unidades por día, sesión y tipo de informe en SQLite, de modo
+    que el consumo diario sobrevive a reinicios y se comparte entre
+    procesos que usen el mismo fichero.
+    """
+    
+    def __init__(self, config: UnitBudgetConfig):
+        self._config = config
+        self._lock = threading.Lock()
+        
+        try:
+            self._conn = sqlite3.connect(
+                config.storage_path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self._init_schema()
+        except sqlite3.Error as e:
+            logger.warning(
+                f"No se pudo abrir el contador de unidades "
+                f"({config.storage_path}): {e}. Usando memoria."
+            )
+            self._conn = sqlite3.connect(
+                ':memory:',
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self._init_schema()
+    
+    def _init_schema(self) -> None:
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS unit_usage ("
+            " day TEXT NOT NULL,"
+            " session_id TEXT NOT NULL,"
+            " report_type TEXT NOT NULL,"
+            " units INTEGER NOT NULL DEFAULT 0,"
+            " requests INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (day, session_id, report_type))"
+        )
+    
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime('%Y-%m-%d')
+    
+    def record(
+        self,
+        report_type: str,
+        lines: int,
+        session_id: Optional[str] = None
+    ) -> int:
+        """
+        Registra el consumo de una petición.
+        
+        Args:
+            report_type: Valor del parámetro 'type' (phrase_this, ...)
+            lines: Líneas devueltas por la API
+            session_id: Sesión a imputar (None = sesión actual)
             
-            tokens_needed = 1 - self._tokens
-            return tokens_needed / self._config.requests_per_second
+        Returns:
+            Unidades registradas
+        """
+        units = lines * SEMRUSH_UNIT_COSTS.get(report_type, 0)
+        session_id = session_id or _unit_session.get()
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO unit_usage (day, session_id, report_type, units, requests) "
+                "VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT (day, session_id, report_type) DO UPDATE SET "
+                "units = units + excluded.units, requests = requests + 1",
+                (self._today(), session_id, report_type, units)
+            )
+        
+        return units
+    
+    def used_today(self) -> int:
+        """Unidades consumidas hoy (todas las sesiones)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(units), 0) FROM unit_usage WHERE day = ?",
+                (self._today(),)
+            ).fetchone()
+        return int(row[0])
+    
+    def used_by_session(self, session_id: Optional[str] = None) -> int:
+        """Unidades consumidas por una sesión (todas las fechas)."""
+        session_id = session_id or _unit_session.get()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(units), 0) FROM unit_usage WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return int(row[0])
+    
+    def remaining(self, session_id: Optional[str] = None) -> Optional[int]:
+        """
+        Unidades disponibles según los presupuestos configurados.
+        
+        Returns:
+            Mínimo entre presupuesto diario y de sesión restantes,
+            o None si no hay presupuestos
+        """
+        limits = []
+        
+        if self._config.daily_units is not None:
+            limits.append(self._config.daily_units - self.used_today())
+        
+        if self._config.session_units is not None:
+            limits.append(self._config.session_units - self.used_by_session(session_id))
+        
+        if not limits:
+            return None
+        
+        return max(0, min(limits))
+    
+    def get_stats(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Obtiene el consumo de hoy por tipo de informe y de la sesión."""
+        session_id = session_id or _unit_session.get()
+        
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT report_type, SUM(units), SUM(requests) FROM unit_usage "
+                "WHERE day = ? GROUP BY report_type",
+                (self._today(),)
+            ).fetchall()
+        
+        return {
+            'today': sum(r[1] for r in rows),
+            'by_report_type': {
+                r[0]: {'units': r[1], 'requests': r[2]} for r in rows
+            },
+            'session_id': session_id,
+            'session': self.used_by_session(session_id),
+            'daily_budget': self._config.daily_units,
+            'session_budget': self._config.session_units,
+            'remaining': self.remaining(session_id),
+        }
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
 
 # ============================================================================
@@ -348,32 +1061,56 @@ class ResponseCache:
         self._stats = {
             'hits': 0,
             'misses': 0,
+            'stale_hits': 0,
             'evictions': 0,
         }
     
     def get(self, key: str) -> Optional[Any]:
-        """Obtiene valor del caché."""
+        """Obtiene valor del caché (None si no existe o ha expirado)."""
+        value, is_stale = self.lookup(key, allow_stale=False)
+        return value
+    
+    def lookup(self, key: str, allow_stale: bool = True) -> Tuple[Optional[Any], bool]:
+        """
+        Obtiene valor del caché indicando si está caducado.
+        
+        Con allow_stale, una entrada expirada dentro de la ventana
+        stale_grace se devuelve igualmente para refrescarla en segundo plano.
+        
+        Returns:
+            Tupla (valor o None, es_stale)
+        """
         if not self._config.enabled:
-            return None
+            return None, False
         
         with self._lock:
             entry = self._cache.get(key)
             
             if entry is None:
                 self._stats['misses'] += 1
-                return None
+                return None, False
             
             if entry.is_expired():
-                del self._cache[key]
-                self._stats['misses'] += 1
-                return None
+                if entry.is_beyond_grace(self._config.stale_grace):
+                    del self._cache[key]
+                    self._stats['misses'] += 1
+                    return None, False
+                
+                if not allow_stale:
+                    self._stats['misses'] += 1
+                    return None, False
+                
+                self._cache.move_to_end(key)
+                entry.touch()
+                self._stats['stale_hits'] += 1
+                return entry.value, True
             
             # Mover al final (LRU)
             self._cache.move_to_end(key)
             entry.touch()
             self._stats['hits'] += 1
             
-            return entry.value
+            return entry.value, False
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Guarda valor en caché."""
@@ -440,8 +1177,10 @@ class ResponseCache:
                 'max_size': self._config.max_size,
                 'hits': self._stats['hits'],
                 'misses': self._stats['misses'],
+                'stale_hits': self._stats['stale_hits'],
                 'hit_rate': f"{hit_rate:.1f}%",
                 'evictions': self._stats['evictions'],
+                'stale_grace': self._config.stale_grace,
                 'enabled': self._config.enabled,
             }
     
@@ -455,7 +1194,7 @@ class ResponseCache:
         """Limpia entradas expiradas."""
         expired_keys = [
             k for k, v in self._cache.items()
-            if v.is_expired()
+            if v.is_beyond_grace(self._config.stale_grace)
         ]
         
         for key in expired_keys:
@@ -562,6 +1301,9 @@ class SEMrushClient(metaclass=SingletonMeta):
         # Inicializar componentes
         self._rate_limiter = RateLimiter(self._config.rate_limit)
         self._cache = ResponseCache(self._config.cache)
+        self._flight = SingleFlight(name="semrush")
+        self._refresher = BackgroundRefresher(name="semrush", flight=self._flight)
+        self._unit_meter = UnitMeter(self._config.units)
         self._session: Optional[requests.Session] = None
         self._lock = threading.RLock()
         
@@ -600,49 +1342,113 @@ class SEMrushClient(metaclass=SingletonMeta):
         key_string = f"{endpoint}:{sorted_params}"
         return hashlib.md5(key_string.encode()).hexdigest()
     
-    def _make_request(
+    def _make_request(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        use_cache: bool = True
+    ) -> APIResponse:
+        """
+        Realiza una petición a la API de SEMrush.
+        
+        Args:
+            endpoint: Endpoint de la API
+            params: Parámetros de la petición
+            use_cache: Si usar caché
+            
+        Returns:
+            APIResponse con el resultado
+        """
+        if not _requests_available:
+            return APIResponse(
+                success=False,
+                error="requests no disponible"
+            )
+        
+        if not self._config.api_key:
+            return APIResponse(
+                success=False,
+                error="API key no configurada"
+            )
+        
+        # Generar clave de caché
+        cache_key = self._generate_cache_key(endpoint, params)
+        
+        # Verificar caché (un valor caducado en ventana de gracia se sirve
+        # ya y se refresca en segundo plano)
+        if use_cache:
+            cached, is_stale = self._cache.lookup(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit para {endpoint}" + (" (stale)" if is_stale else ""))
+                if is_stale:
+                    self._refresher.submit(
+                        cache_key, self._refresh, endpoint, params, cache_key
+                    )
+                return APIResponse(
+                    success=True,
+                    data=cached,
+                    from_cache=True
+                )
+        
+        # Presupuesto de unidades: rechazar o degradar antes de gastar
+        try:
+            budgeted = self._apply_unit_budget(params)
+        except SEMrushBudgetError as e:
+            return APIResponse(success=False, error=str(e))
+        
+        if budgeted is not params:
+            params = budgeted
+            cache_key = self._generate_cache_key(endpoint, params)
+        
+        # Peticiones idénticas concurrentes comparten una sola llamada
+        return self._flight.do(
+            cache_key,
+            self._fetch,
+            endpoint,
+            params,
+            cache_key,
+            use_cache
+        )
+    
+    def _refresh(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        cache_key: str
+    ) -> APIResponse:
+        """Refresco en segundo plano de una entrada caducada."""
+        # Un refresco nunca se degrada: si no cabe entero se sigue sirviendo
+        # el valor viejo hasta que acabe la ventana de gracia
+        try:
+            fits = self._apply_unit_budget(params) is params
+        except SEMrushBudgetError:
+            fits = False
+        
+        if not fits:
+            logger.debug(f"Refresco de {cache_key} omitido: sin presupuesto")
+            return APIResponse(success=False, error=BUDGET_EXHAUSTED_MESSAGE)
+        
+        return self._fetch(endpoint, params, cache_key, True)
+    
+    def _fetch(
         self,
         endpoint: str,
         params: Dict[str, Any],
-        use_cache: bool = True
+        cache_key: str,
+        use_cache: bool
     ) -> APIResponse:
         """
-        Realiza una petición a la API de SEMrush.
+        Ejecuta la petición HTTP real (tras un miss de caché).
         
         Args:
             endpoint: Endpoint de la API
             params: Parámetros de la petición
-            use_cache: Si usar caché
+            cache_key: Clave de caché ya calculada
+            use_cache: Si guardar el resultado en caché
             
         Returns:
             APIResponse con el resultado
         """
-        if not _requests_available:
-            return APIResponse(
-                success=False,
-                error="requests no disponible"
-            )
-        
-        if not self._config.api_key:
-            return APIResponse(
-                success=False,
-                error="API key no configurada"
-            )
-        
-        # Generar clave de caché
-        cache_key = self._generate_cache_key(endpoint, params)
-        
-        # Verificar caché
-        if use_cache:
-            cached = self._cache.get(cache_key)
-            if cached is not None:
-                logger.debug(f"Cache hit para {endpoint}")
-                return APIResponse(
-                    success=True,
-                    data=cached,
-                    from_cache=True
-                )
-        
         # Aplicar rate limiting
         if not self._rate_limiter.acquire(timeout=30):
             return APIResponse(
@@ -650,8 +1456,8 @@ class SEMrushClient(metaclass=SingletonMeta):
                 error="Rate limit: no se pudo adquirir token"
             )
         
-        # Añadir API key a params
-        params['key'] = self._config.api_key
+        # Añadir API key a params (copia: no mutar los del llamante)
+        params = {**params, 'key': self._config.api_key}
         
         # Construir URL
         url = f"{self._config.api_url}{endpoint}"
@@ -659,35 +1465,28 @@ class SEMrushClient(metaclass=SingletonMeta):
         start_time = time.time()
         
         try:
-            with self._lock:
-                response = self._session.get(
-                    url,
-                    params=params,
-                    timeout=self._config.timeout
-                )
+            # Sin lock global: el pool de HTTPAdapter gestiona la concurrencia
+            response = self._session.get(
+                url,
+                params=params,
+                timeout=self._config.timeout,
+                stream=True
+            )
             
             response_time = time.time() - start_time
             
             # Verificar errores
-            if response.status_code == 429:
-                retry_after = float(response.headers.get('Retry-After', 60))
-                raise SEMrushRateLimitError(
-                    f"Rate limit excedido. Reintentar en {retry_after}s",
-                    retry_after=retry_after
-                )
+            self._check_response_status(response)
             
-            if response.status_code == 401:
-                raise SEMrushAuthError("API key inválida o expirada")
-            
-            if response.status_code != 200:
-                raise SEMrushAPIError(
-                    f"Error de API: {response.status_code}",
-                    status_code=response.status_code,
-                    response_text=response.text
-                )
+            # Parsear respuesta según llega, sin cargar el texto entero
+            try:
+                data = list(SEMrushCSVParser(
+                    self._iter_response_lines(response)
+                ).iter_rows())
+            finally:
+                response.close()
             
-            # Parsear respuesta
-            data = self._parse_response(response.text)
+            self._unit_meter.record(params.get('type', ''), len(data))
             
             # Guardar en caché
             if use_cache and data:
@@ -725,57 +1524,91 @@ class SEMrushClient(metaclass=SingletonMeta):
                 response_time=time.time() - start_time
             )
     
-    def _parse_response(self, text: str) -> List[Dict[str, Any]]:
+    def _apply_unit_budget(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Parsea la respuesta de SEMrush (formato CSV/TSV).
+        Ajusta una petición al presupuesto de unidades restante.
         
-        Args:
-            text: Texto de respuesta
-            
         Returns:
-            Lista de diccionarios con los datos
+            Los mismos params si caben, o una copia con display_limit
+            reducido (modo degradado)
+            
+        Raises:
+            SEMrushBudgetError: Si no cabe ni siquiera degradada
         """
-        if not text or text.startswith('ERROR'):
-            if 'ERROR' in text:
-                raise SEMrushAPIError(f"Error de SEMrush: {text}")
-            return []
+        remaining = self._unit_meter.remaining()
+        if remaining is None:
+            return params
+        
+        estimated = estimate_request_units(params)
+        if estimated <= remaining:
+            return params
         
-        lines = text.strip().split('\n')
+        unit_cost = SEMRUSH_UNIT_COSTS.get(params.get('type', ''), 0)
         
-        if len(lines) < 2:
-            return []
+        if (
+            self._config.units.degrade
+            and 'display_limit' in params
+            and unit_cost
+            and remaining >= unit_cost
+        ):
+            limit = remaining // unit_cost
+            logger.warning(
+                f"Presupuesto SEMrush: display_limit {params['display_limit']} "
+                f"reducido a {limit} ({remaining} unidades restantes)"
+            )
+            return {**params, 'display_limit': limit}
         
-        # Primera línea son headers
-        headers = lines[0].split(';')
+        raise SEMrushBudgetError(
+            f"{BUDGET_EXHAUSTED_MESSAGE} ({estimated} necesarias, {remaining} disponibles)"
+        )
+    
+    @staticmethod
+    def _check_response_status(response: Any) -> None:
+        """Lanza la excepción adecuada si el status HTTP no es 200."""
+        if response.status_code == 200:
+            return
         
-        results = []
-        for line in lines[1:]:
-            if not line.strip():
-                continue
+        try:
+            if response.status_code == 429:
+                retry_after = float(response.headers.get('Retry-After', 60))
+                raise SEMrushRateLimitError(
+                    f"Rate limit excedido. Reintentar en {retry_after}s",
+                    retry_after=retry_after
+                )
             
-            values = line.split(';')
+            if response.status_code == 401:
+                raise SEMrushAuthError("API key inválida o expirada")
             
-            if len(values) == len(headers):
-                row = {
-                    headers[i]: self._parse_value(values[i])
-                    for i in range(len(headers))
-                }
-                results.append(row)
+            raise SEMrushAPIError(
+                f"Error de API: {response.status_code}",
+                status_code=response.status_code,
+                response_text=response.text
+            )
+        finally:
+            response.close()
+    
+    @staticmethod
+    def _iter_response_lines(response: Any) -> Iterator[str]:
+        """Itera las líneas de una respuesta HTTP en streaming."""
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        return response.iter_lines(decode_unicode=True)
+    
+    def _parse_response(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Parsea la respuesta de SEMrush (formato CSV/TSV).
         
-        return results
+        Args:
+            text: Texto de respuesta
+            
+        Returns:
+            Lista de diccionarios con los datos
+        """
+        return parse_semrush_csv(text)
     
     def _parse_value(self, value: str) -> Any:
         """Parsea un valor individual."""
-        if not value or value == '':
-            return None
-        
-        # Intentar convertir a número
-        try:
-            if '.' in value:
-                return float(value)
-            return int(value)
-        except ValueError:
-            return value
+        return _parse_value(value)
     
     # ========================================================================
     # MÉTODOS PÚBLICOS - KEYWORDS
@@ -798,17 +1631,234 @@ class SEMrushClient(metaclass=SingletonMeta):
         Returns:
             APIResponse con datos de la keyword
         """
-        params = {
+        return self._make_request(
+            SEMRUSH_ENDPOINTS['keyword_overview'],
+            self._keyword_overview_params(keyword, database),
+            use_cache
+        )
+    
+    def _keyword_overview_params(
+        self,
+        keyword: str,
+        database: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Parámetros de phrase_this (también definen su clave de caché)."""
+        return {
             'type': 'phrase_this',
             'phrase': keyword,
             'database': database or self._config.database,
-            'export_columns': 'Ph,Nq,Cp,Co,Nr,Td',
+            'export_columns': KEYWORD_OVERVIEW_COLUMNS,
         }
+    
+    def get_keywords_overview_bulk(
+        self,
+        keywords: Iterable[str],
+        database: Optional[str] = None,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        max_workers: int = DEFAULT_BULK_MAX_WORKERS,
+        max_units: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Iterator[BulkKeywordResult]:
+        """
+        Obtiene el overview de muchas keywords (enriquecimiento masivo).
         
-        return self._make_request(
-            SEMRUSH_ENDPOINTS['keyword_overview'],
-            params,
-            use_cache
+        Las keywords ya cacheadas (por esta función o por
+        get_keyword_overview) se devuelven de inmediato. El resto se
+        agrupa en lotes phrase_these que se lanzan en paralelo, con
+        concurrencia acotada y respetando el RateLimiter. Los resultados
+        se emiten a medida que llegan.
+        
+        Args:
+            keywords: Keywords a enriquecer (se deduplican)
+            database: Base de datos regional
+            batch_size: Keywords por petición (máx. 100)
+            max_workers: Peticiones simultáneas como máximo
+            max_units: Presupuesto de unidades API del job (None = sin límite)
+            use_cache: Si usar caché
+            
+        Yields:
+            BulkKeywordResult por cada keyword única
+        """
+        database = database or self._config.database
+        batch_size = max(1, min(batch_size, DEFAULT_BULK_BATCH_SIZE))
+        unit_cost = SEMRUSH_UNIT_COSTS['phrase_these']
+        units_reserved = 0
+        
+        # El presupuesto del job no puede superar el global (día/sesión)
+        remaining = self._unit_meter.remaining()
+        if remaining is not None:
+            max_units = remaining if max_units is None else min(max_units, remaining)
+        
+        pending = self._iter_bulk_batches(
+            keywords, database, batch_size, use_cache
+        )
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="semrush-bulk"
+        )
+        futures: Dict[Any, List[str]] = {}
+        budget_exhausted = False
+        
+        try:
+            while True:
+                # Rellenar hasta max_workers lotes en vuelo
+                while not budget_exhausted and len(futures) < max(1, max_workers):
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    
+                    if isinstance(item, BulkKeywordResult):
+                        yield item
+                        continue
+                    
+                    batch = item
+                    if max_units is not None:
+                        affordable = max(0, (max_units - units_reserved) // unit_cost)
+                        if affordable < len(batch):
+                            budget_exhausted = True
+                            for keyword in batch[affordable:]:
+                                yield self._budget_exhausted_result(keyword)
+                            batch = batch[:affordable]
+                        if not batch:
+                            break
+                    
+                    units_reserved += len(batch) * unit_cost
+                    # Copia del contexto: las unidades se imputan a la sesión del llamante
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        self._fetch_keyword_batch, batch, database, use_cache
+                    )
+                    futures[future] = batch
+                
+                if not futures:
+                    break
+                
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    futures.pop(future)
+                    for result in future.result():
+                        yield result
+            
+            # Keywords restantes tras agotar el presupuesto
+            if budget_exhausted:
+                for item in pending:
+                    if isinstance(item, BulkKeywordResult):
+                        yield item
+                    else:
+                        for keyword in item:
+                            yield self._budget_exhausted_result(keyword)
+        
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _iter_bulk_batches(
+        self,
+        keywords: Iterable[str],
+        database: str,
+        batch_size: int,
+        use_cache: bool
+    ) -> Iterator[Union[BulkKeywordResult, List[str]]]:
+        """
+        Deduplica keywords, resuelve las cacheadas y agrupa el resto en lotes.
+        
+        Yields:
+            BulkKeywordResult para cache hits, o listas de keywords a pedir
+        """
+        seen = set()
+        batch: List[str] = []
+        
+        for keyword in keywords:
+            keyword = (keyword or '').strip()
+            if not keyword or keyword.lower() in seen:
+                continue
+            seen.add(keyword.lower())
+            
+            if use_cache:
+                cache_key = self._generate_cache_key(
+                    SEMRUSH_ENDPOINTS['keyword_overview'],
+                    self._keyword_overview_params(keyword, database)
+                )
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    yield BulkKeywordResult(
+                        keyword=keyword,
+                        success=True,
+                        data=cached[0] if cached else None,
+                        from_cache=True
+                    )
+                    continue
+            
+            batch.append(keyword)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        
+        if batch:
+            yield batch
+    
+    def _fetch_keyword_batch(
+        self,
+        batch: List[str],
+        database: str,
+        use_cache: bool
+    ) -> List[BulkKeywordResult]:
+        """
+        Pide un lote de keywords con phrase_these y reparte las filas.
+        
+        Cada fila se guarda en caché con la misma clave que usaría
+        get_keyword_overview para esa keyword.
+        """
+        params = {
+            'type': 'phrase_these',
+            'phrase': ';'.join(batch),
+            'database': database,
+            'export_columns': KEYWORD_OVERVIEW_COLUMNS,
+        }
+        
+        try:
+            response = self._make_request(
+                SEMRUSH_ENDPOINTS['keyword_overview_bulk'],
+                params,
+                use_cache=False
+            )
+        except SEMrushError as e:
+            response = APIResponse(success=False, error=str(e))
+        
+        if not response.success:
+            return [
+                BulkKeywordResult(keyword=keyword, success=False, error=response.error)
+                for keyword in batch
+            ]
+        
+        rows_by_phrase: Dict[str, Dict[str, Any]] = {}
+        for row in response.data or []:
+            phrase = row.get('Keyword', row.get('Ph'))
+            if phrase is not None:
+                rows_by_phrase[str(phrase).strip().lower()] = row
+        
+        results = []
+        for keyword in batch:
+            row = rows_by_phrase.get(keyword.lower())
+            
+            if row is not None and use_cache:
+                cache_key = self._generate_cache_key(
+                    SEMRUSH_ENDPOINTS['keyword_overview'],
+                    self._keyword_overview_params(keyword, database)
+                )
+                self._cache.set(cache_key, [row])
+            
+            results.append(BulkKeywordResult(keyword=keyword, success=True, data=row))
+        
+        return results
+    
+    @staticmethod
+    def _budget_exhausted_result(keyword: str) -> BulkKeywordResult:
+        """Resultado para una keyword no pedida por falta de presupuesto."""
+        return BulkKeywordResult(
+            keyword=keyword,
+            success=False,
+            error=BUDGET_EXHAUSTED_MESSAGE
         )
     
     def get_keyword_difficulty(
@@ -941,6 +1991,36 @@ class SEMrushClient(metaclass=SingletonMeta):
             use_cache
         )
     
+    def _domain_organic_params(
+        self,
+        domain: str,
+        database: Optional[str],
+        limit: int
+    ) -> Dict[str, Any]:
+        """Parámetros del informe domain_organic."""
+        return {
+            'type': 'domain_organic',
+            'domain': domain,
+            'database': database or self._config.database,
+            'display_limit': limit,
+            'export_columns': 'Ph,Po,Pp,Pd,Nq,Cp,Ur,Tr,Tc,Co,Nr,Td',
+        }
+    
+    def _url_organic_params(
+        self,
+        url: str,
+        database: Optional[str],
+        limit: int
+    ) -> Dict[str, Any]:
+        """Parámetros del informe url_organic."""
+        return {
+            'type': 'url_organic',
+            'url': url,
+            'database': database or self._config.database,
+            'display_limit': limit,
+            'export_columns': 'Ph,Po,Nq,Cp,Co,Tr,Tc',
+        }
+    
     def get_domain_organic_keywords(
         self,
         domain: str,
@@ -960,13 +2040,7 @@ class SEMrushClient(metaclass=SingletonMeta):
         Returns:
             APIResponse con keywords orgánicas
         """
-        params = {
-            'type': 'domain_organic',
-            'domain': domain,
-            'database': database or self._config.database,
-            'display_limit': limit,
-            'export_columns': 'Ph,Po,Pp,Pd,Nq,Cp,Ur,Tr,Tc,Co,Nr,Td',
-        }
+        params = self._domain_organic_params(domain, database, limit)
         
         return self._make_request(
             SEMRUSH_ENDPOINTS['domain_organic'],
@@ -993,13 +2067,7 @@ class SEMrushClient(metaclass=SingletonMeta):
         Returns:
             APIResponse con keywords de la URL
         """
-        params = {
-            'type': 'url_organic',
-            'url': url,
-            'database': database or self._config.database,
-            'display_limit': limit,
-            'export_columns': 'Ph,Po,Nq,Cp,Co,Tr,Tc',
-        }
+        params = self._url_organic_params(url, database, limit)
         
         return self._make_request(
             SEMRUSH_ENDPOINTS['url_organic'],
@@ -1007,6 +2075,113 @@ class SEMrushClient(metaclass=SingletonMeta):
             use_cache
         )
     
+    # ========================================================================
+    # MÉTODOS PÚBLICOS - EXPORTS GRANDES (STREAMING)
+    # ========================================================================
+    
+    def stream_report(
+        self,
+        params: Dict[str, Any],
+        columnar: bool = False
+    ) -> Union[Iterator[Dict[str, Any]], Dict[str, List[Any]]]:
+        """
+        Descarga un informe procesándolo según llega, sin caché.
+        
+        Pensado para exports con display_limit alto: las filas se parsean
+        línea a línea con tipos fijados por la cabecera.
+        
+        Args:
+            params: Parámetros del informe (incluido 'type')
+            columnar: Si True, retorna {columna: [valores]} ya consumido;
+                si False, un iterador de filas
+            
+        Returns:
+            Iterador de filas o diccionario columnar
+            
+        Raises:
+            SEMrushError: Si falla la petición o SEMrush devuelve error
+        """
+        if columnar:
+            with self._open_report(params) as parser:
+                return parser.to_columns()
+        
+        return self._iter_report_rows(params)
+    
+    def _iter_report_rows(self, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Generador de filas de stream_report (libera la conexión al acabar)."""
+        with self._open_report(params) as parser:
+            yield from parser.iter_rows()
+    
+    @contextmanager
+    def _open_report(self, params: Dict[str, Any]) -> Iterator[SEMrushCSVParser]:
+        """Abre la petición en streaming y cede el parser ya con cabecera."""
+        params = self._apply_unit_budget(params)
+        
+        if not self._rate_limiter.acquire(timeout=30):
+            raise SEMrushRateLimitError("Rate limit: no se pudo adquirir token")
+        
+        report_type = params.get('type', '')
+        endpoint = SEMRUSH_ENDPOINTS.get(report_type, '/analytics/v1/')
+        
+        try:
+            response = self._session.get(
+                f"{self._config.api_url}{endpoint}",
+                params={**params, 'key': self._config.api_key},
+                timeout=self._config.timeout,
+                stream=True
+            )
+        except requests.exceptions.RequestException as e:
+            raise SEMrushAPIError(f"Error de conexión: {e}")
+        
+        self._check_response_status(response)
+        
+        parser = None
+        try:
+            parser = SEMrushCSVParser(self._iter_response_lines(response))
+            yield parser
+        finally:
+            response.close()
+            if parser is not None:
+                self._unit_meter.record(params.get('type', ''), parser.rows_read)
+    
+    def iter_domain_organic_keywords(
+        self,
+        domain: str,
+        database: Optional[str] = None,
+        limit: int = 10000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Itera las keywords orgánicas de un dominio en streaming (sin caché).
+        
+        Args:
+            domain: Dominio a analizar
+            database: Base de datos regional
+            limit: Número máximo de resultados
+            
+        Returns:
+            Iterador de filas
+        """
+        return self.stream_report(self._domain_organic_params(domain, database, limit))
+    
+    def iter_url_organic_keywords(
+        self,
+        url: str,
+        database: Optional[str] = None,
+        limit: int = 10000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Itera las keywords orgánicas de una URL en streaming (sin caché).
+        
+        Args:
+            url: URL a analizar
+            database: Base de datos regional
+            limit: Número máximo de resultados
+            
+        Returns:
+            Iterador de filas
+        """
+        return self.stream_report(self._url_organic_params(url, database, limit))
+    
     # ========================================================================
     # MÉTODOS PÚBLICOS - BACKLINKS
     # ========================================================================
@@ -1047,7 +2222,24 @@ class SEMrushClient(metaclass=SingletonMeta):
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas del caché."""
-        return self._cache.get_stats()
+        stats = self._cache.get_stats()
+        stats['single_flight'] = self._flight.get_stats()
+        stats['background_refresh'] = self._refresher.get_stats()
+        stats['units'] = self._unit_meter.get_stats()
+        return stats
+    
+    def get_unit_usage(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Obtiene el consumo de unidades API (hoy, por informe y por sesión)."""
+        return self._unit_meter.get_stats(session_id)
+    
+    def set_unit_session(self, session_id: str) -> None:
+        """
+        Fija la sesión a la que se imputan las unidades en el contexto actual.
+        
+        En Streamlit basta con llamarlo al inicio de cada rerun: cada
+        sesión de usuario se ejecuta en su propio hilo.
+        """
+        _unit_session.set(session_id or DEFAULT_UNIT_SESSION)
     
     def clear_cache(self) -> int:
         """Limpia el caché."""
@@ -1072,6 +2264,12 @@ class SEMrushClient(metaclass=SingletonMeta):
             'database': self._config.database,
             'timeout': self._config.timeout,
             'cache_enabled': self._config.cache.enabled,
+            'rate_limit_shared': self._rate_limiter.is_shared,
+            'unit_budgets': {
+                'daily_units': self._config.units.daily_units,
+                'session_units': self._config.units.session_units,
+                'degrade': self._config.units.degrade,
+            },
             'is_configured': self.is_configured(),
         }
     
@@ -1082,6 +2280,9 @@ class SEMrushClient(metaclass=SingletonMeta):
                 self._session.close()
                 self._session = None
             self._cache.clear()
+            self._refresher.shutdown()
+            self._rate_limiter.close()
+            self._unit_meter.close()
         
         logger.info("SEMrushClient cerrado")
     
@@ -1171,6 +2372,36 @@ def get_keyword_data(
     return None
 
 
+def get_keywords_data_bulk(
+    keywords: Iterable[str],
+    database: str = DEFAULT_DATABASE,
+    max_units: Optional[int] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Obtiene datos de muchas keywords (función de conveniencia).
+    
+    Args:
+        keywords: Keywords a analizar
+        database: Base de datos regional
+        max_units: Presupuesto de unidades API (None = sin límite)
+        
+    Returns:
+        Dict keyword -> datos (None si no hay datos o hubo error)
+    """
+    client = get_semrush_client()
+    
+    if not client.is_configured():
+        logger.warning("SEMrush no configurado")
+        return {}
+    
+    return {
+        result.keyword: result.data
+        for result in client.get_keywords_overview_bulk(
+            keywords, database, max_units=max_units
+        )
+    }
+
+
 def get_related_keywords(
     keyword: str,
     limit: int = 20,
@@ -1246,6 +2477,7 @@ __all__ = [
     'CacheConfig',
     'SEMrushConfig',
     'APIResponse',
+    'BulkKeywordResult',
     
     # Componentes
     'RateLimiter',
@@ -1253,6 +2485,12 @@ __all__ = [
     
     # Cliente principal
     'SEMrushClient',
+    'SEMrushBudgetError',
+    'UnitBudgetConfig',
+    'UnitMeter',
+    'estimate_request_units',
+    'SEMrushCSVParser',
+    'parse_semrush_csv',
     
     # Funciones de acceso
     'get_semrush_client',
@@ -1262,6 +2500,7 @@ __all__ = [
     
     # Funciones de conveniencia
     'get_keyword_data',
+    'get_keywords_data_bulk',
     'get_related_keywords',
     'get_domain_keywords',
     
@@ -1269,4 +2508,5 @@ __all__ = [
     'DEFAULT_DATABASE',
     'SEMRUSH_DATABASES',
     'SEMRUSH_ENDPOINTS',
+    'SEMRUSH_UNIT_COSTS',
 ]
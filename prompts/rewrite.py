@@ -24,6 +24,11 @@ from typing import Dict, List, Optional, Any
 import json
 import re
 
+try:
+    from utils.html_utils import compact_html
+except ImportError:
+    compact_html = None
+
 __version__ = "4.7.1"
 
 # ============================================================================
@@ -639,7 +644,9 @@ def format_main_product_for_prompt(main_product: Dict[str, Any]) -> str:
 # ============================================================================
 
 def _strip_html(html: str) -> str:
-    """Elimina tags HTML y retorna texto plano."""
+    """Elimina tags HTML y retorna texto plano (sin scripts, estilos ni SVGs)."""
+    if compact_html is not None:
+        html = compact_html(html).html
     text = re.sub(r'<[^>]+>', ' ', html)
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
@@ -734,6 +741,8 @@ def build_rewrite_prompt_stage1(
             
             html = content.get('html', '')
             if html:
+                if compact_html is not None:
+                    html = compact_html(html).html
                 html_preview = html[:6000] + "\n\n[... truncado ...]" if len(html) > 6000 else html
                 sections.append(f"\n**Contenido HTML:**\n```html\n{html_preview}\n```")
             sections.append("")
@@ -0,0 +1,310 @@
+"""
+Benchmarks de throughput contra los servicios falsos (tests/fake_services.py)
+
+Mide peticiones/s, latencia p50/p99, tasa de aciertos de caché y pico de
+memoria de SEMrushClient, fetch_product_via_n8n_webhook y WebScraper, en
+modo secuencial y concurrente.
+
+Uso:
+    python tests/benchmarks.py --requests 200 --concurrency 8 --latency-ms 20
+    python tests/benchmarks.py --json bench.json   # para comparar en CI
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fake_services import FakeServiceServer  # noqa: E402
+
+
+# ============================================================================
+# RESULTADOS
+# ============================================================================
+
+@dataclass
+class BenchmarkResult:
+    """Métricas de un escenario."""
+    name: str
+    mode: str
+    requests: int
+    errors: int
+    duration_s: float
+    requests_per_s: float
+    p50_ms: float
+    p99_ms: float
+    cache_hit_rate: Optional[float] = None
+    peak_memory_kb: float = 0.0
+    backend_calls: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(
+    name: str,
+    fn: Callable[[Any], bool],
+    inputs: Sequence[Any],
+    concurrency: int = 1
+) -> BenchmarkResult:
+    """
+    Ejecuta fn sobre cada input y mide latencias.
+
+    Args:
+        name: Nombre del escenario
+        fn: Función que recibe un input y retorna True si tuvo éxito
+        inputs: Entradas (una llamada por entrada)
+        concurrency: 1 = secuencial; >1 = pool de hilos
+    """
+    latencies: List[float] = []
+
+    def timed(item) -> bool:
+        start = time.perf_counter()
+        try:
+            ok = fn(item)
+        except Exception:
+            ok = False
+        latencies.append((time.perf_counter() - start) * 1000)
+        return ok
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    if concurrency <= 1:
+        outcomes = [timed(item) for item in inputs]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(timed, inputs))
+
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    errors = sum(1 for ok in outcomes if not ok)
+
+    return BenchmarkResult(
+        name=name,
+        mode='sequential' if concurrency <= 1 else f'concurrent x{concurrency}',
+        requests=len(inputs),
+        errors=errors,
+        duration_s=round(duration, 4),
+        requests_per_s=round(len(inputs) / duration, 1) if duration else 0.0,
+        p50_ms=round(_percentile(latencies, 50), 2),
+        p99_ms=round(_percentile(latencies, 99), 2),
+        peak_memory_kb=round(peak / 1024, 1),
+    )
+
+
+# ============================================================================
+# ESCENARIOS
+# ============================================================================
+
+def _semrush_client(server: FakeServiceServer):
+    from core.semrush import (
+        CacheConfig,
+        RateLimitConfig,
+        SEMrushClient,
+        UnitBudgetConfig,
+        reset_semrush_client,
+    )
+
+    reset_semrush_client()
+    return SEMrushClient(
+        api_key='benchmark',
+        api_url=server.url,
+        rate_limit=RateLimitConfig(requests_per_second=10000, burst_limit=10000),
+        cache=CacheConfig(max_size=100000),
+        units=UnitBudgetConfig(storage_path=':memory:'),
+    )
+
+
+def _hit_rate(stats: Dict[str, Any]) -> float:
+    total = stats['hits'] + stats['misses']
+    return round(stats['hits'] / total, 3) if total else 0.0
+
+
+def bench_semrush_overview(
+    server: FakeServiceServer,
+    n_requests: int,
+    concurrency: int,
+    unique_ratio: float = 0.5
+) -> List[BenchmarkResult]:
+    """get_keyword_overview con un % de keywords repetidas (aciertos de caché)."""
+    unique = max(1, int(n_requests * unique_ratio))
+    keywords = [f"keyword {i % unique}" for i in range(n_requests)]
+    results = []
+
+    for workers in (1, concurrency):
+        client = _semrush_client(server)
+        server.reset_counts()
+
+        result = measure(
+            'semrush.get_keyword_overview',
+            lambda kw: client.get_keyword_overview(kw).success,
+            keywords,
+            workers
+        )
+        result.cache_hit_rate = _hit_rate(client.get_cache_stats())
+        result.backend_calls = server.request_counts().get('/analytics', 0)
+        results.append(result)
+
+    return results
+
+
+def bench_semrush_bulk(server: FakeServiceServer, n_keywords: int, concurrency: int) -> List[BenchmarkResult]:
+    """Enriquecimiento masivo (phrase_these en lotes)."""
+    keywords = [f"bulk keyword {i}" for i in range(n_keywords)]
+    results = []
+
+    for workers in (1, concurrency):
+        client = _semrush_client(server)
+        server.reset_counts()
+
+        result = measure(
+            'semrush.get_keywords_overview_bulk',
+            lambda kws: all(
+                r.success for r in client.get_keywords_overview_bulk(kws, max_workers=workers)
+            ),
+            [keywords],
+        )
+        result.mode = 'sequential' if workers <= 1 else f'concurrent x{workers}'
+        result.backend_calls = server.request_counts().get('/analytics', 0)
+        results.append(result)
+
+    return results
+
+
+def bench_n8n(server: FakeServiceServer, n_requests: int, concurrency: int) -> List[BenchmarkResult]:
+    """fetch_product_via_n8n_webhook contra el webhook falso."""
+    from core.n8n_integration import fetch_product_via_n8n_webhook
+
+    webhook = f"{server.url}/webhook/product"
+    ids = [str(100000 + i) for i in range(n_requests)]
+    results = []
+
+    for workers in (1, concurrency):
+        server.reset_counts()
+        result = measure(
+            'n8n.fetch_product_via_n8n_webhook',
+            lambda legacy_id: fetch_product_via_n8n_webhook(legacy_id, '', webhook)[0],
+            ids,
+            workers
+        )
+        result.backend_calls = server.request_counts().get('/webhook', 0)
+        results.append(result)
+
+    return results
+
+
+def bench_scraper(server: FakeServiceServer, n_requests: int, concurrency: int) -> List[BenchmarkResult]:
+    """WebScraper.scrape_url con extracción de contenido."""
+    from core.scraper import WebScraper
+
+    scraper = WebScraper(timeout=10, max_retries=1)
+    urls = [f"{server.url}/competitor/articulo-{i}" for i in range(n_requests)]
+    results = []
+
+    for workers in (1, concurrency):
+        server.reset_counts()
+        result = measure(
+            'scraper.scrape_url',
+            lambda url: scraper.scrape_url(url).success,
+            urls,
+            workers
+        )
+        result.backend_calls = server.request_counts().get('/competitor', 0)
+        results.append(result)
+
+    return results
+
+
+def run_all(
+    n_requests: int = 100,
+    concurrency: int = 8,
+    latency_ms: float = 10.0,
+    jitter_ms: float = 2.0,
+    error_rate: float = 0.0,
+    seed: Optional[int] = 42
+) -> List[BenchmarkResult]:
+    """Levanta el servidor falso y ejecuta todos los escenarios."""
+    with FakeServiceServer(
+        latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, seed=seed
+    ) as server:
+        results: List[BenchmarkResult] = []
+        results += bench_semrush_overview(server, n_requests, concurrency)
+        results += bench_semrush_bulk(server, n_requests * 5, concurrency)
+        results += bench_n8n(server, n_requests, concurrency)
+        results += bench_scraper(server, n_requests, concurrency)
+
+    # No dejar el singleton apuntando a un servidor ya parado
+    from core.semrush import reset_semrush_client
+    reset_semrush_client()
+
+    return results
+
+
+def format_table(results: Sequence[BenchmarkResult]) -> str:
+    """Tabla de texto para la consola."""
+    lines = [
+        f"{'escenario':<36} {'modo':<15} {'req':>5} {'err':>4} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'cache':>6} {'backend':>7} {'mem KB':>9}"
+    ]
+    for r in results:
+        hit = f"{r.cache_hit_rate:.0%}" if r.cache_hit_rate is not None else '-'
+        lines.append(
+            f"{r.name:<36} {r.mode:<15} {r.requests:>5} {r.errors:>4} "
+            f"{r.requests_per_s:>9.1f} {r.p50_ms:>8.2f} {r.p99_ms:>8.2f} "
+            f"{hit:>6} {r.backend_calls:>7} {r.peak_memory_kb:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks contra servicios falsos")
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=10.0)
+    parser.add_argument('--jitter-ms', type=float, default=2.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--json', dest='json_path', help="Guardar resultados en JSON")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar logs de los clientes")
+    args = parser.parse_args(argv)
+
+    # Con --error-rate los errores son esperados: no ensuciar la salida
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    results = run_all(
+        n_requests=args.requests,
+        concurrency=args.concurrency,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+    )
+
+    print(format_table(results))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump([r.to_dict() for r in results], f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
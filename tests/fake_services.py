@@ -0,0 +1,372 @@
+"""
+Servidor local que imita SEMrush, el webhook de n8n y páginas de competidores
+
+Permite hacer pruebas de carga de SEMrushClient, fetch_product_via_n8n_webhook
+y WebScraper sin tocar servicios de pago ni internos. La latencia (media +
+jitter) y la tasa de errores son configurables, también en caliente.
+
+Rutas:
+    GET  /analytics/v1/?type=...     CSV de SEMrush (phrase_this, phrase_these,
+                                     domain_organic, url_organic, ...)
+    POST /webhook/product            JSON de producto como el de n8n
+    GET  /competitor/<slug>          HTML de un artículo de competidor
+    GET  /redirect/<slug>            301 a /competitor/<slug>
+    GET  /redirect-to?url=<url>      301 a cualquier URL (open redirect)
+
+HEAD responde en /competitor/ y las redirecciones; en /analytics/ da 405.
+
+Uso:
+    >>> with FakeServiceServer(latency_ms=20, error_rate=0.01) as server:
+    ...     client = SEMrushClient(api_key='x', api_url=server.url)
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+@dataclass
+class FakeServiceConfig:
+    """Comportamiento del servidor falso."""
+    latency_ms: float = 0.0      # Latencia media por respuesta
+    jitter_ms: float = 0.0       # Variación uniforme +/- sobre la media
+    error_rate: float = 0.0      # Fracción de respuestas con error HTTP
+    error_status: int = 503
+    seed: Optional[int] = None
+
+
+SEMRUSH_HEADERS = {
+    'phrase_this': "Keyword;Search Volume;CPC;Competition;Number of Results;Trends",
+    'phrase_these': "Keyword;Search Volume;CPC;Competition;Number of Results;Trends",
+    'phrase_related': "Keyword;Search Volume;CPC;Competition;Number of Results;Trends",
+    'phrase_questions': "Keyword;Search Volume;CPC;Competition;Number of Results;Trends",
+    'phrase_kdi': "Keyword;Keyword Difficulty Index",
+    'domain_organic': (
+        "Keyword;Position;Previous Position;Position Difference;Search Volume;"
+        "CPC;Url;Traffic (%);Traffic Cost (%);Competition;Number of Results;Trends"
+    ),
+    'url_organic': "Keyword;Position;Search Volume;CPC;Competition;Traffic (%);Traffic Cost (%)",
+    'domain_ranks': "Domain;Rank;Organic Keywords;Organic Traffic;Organic Cost",
+    'backlinks_overview': "ascore;total;domains_num;urls_num;ips_num;follows_num;nofollows_num",
+}
+
+KEYWORD_WORDS = [
+    'monitor', 'gaming', 'portatil', 'ssd', 'teclado', 'raton', 'auriculares',
+    'grafica', 'procesador', 'placa', 'base', 'silla', 'router', 'barato',
+    'mejor', 'oferta', '4k', 'rgb', 'inalambrico', 'mecanico',
+]
+
+
+def _seed_for(text: str) -> int:
+    """Semilla estable por texto: la misma keyword da siempre los mismos datos."""
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+# ============================================================================
+# GENERADORES DE RESPUESTAS
+# ============================================================================
+
+def _keyword_row(phrase: str) -> str:
+    rnd = random.Random(_seed_for(phrase))
+    trends = ",".join(f"{rnd.random():.2f}" for _ in range(12))
+    return (
+        f"{phrase};{rnd.randint(10, 90000)};{rnd.uniform(0.05, 3):.2f};"
+        f"{rnd.random():.2f};{rnd.randint(1000, 9000000)};{trends}"
+    )
+
+
+def _organic_row(rnd: random.Random, i: int, domain: str, with_url: bool) -> str:
+    keyword = " ".join(rnd.sample(KEYWORD_WORDS, 3))
+    position = rnd.randint(1, 100)
+    if with_url:
+        trends = ",".join(f"{rnd.random():.2f}" for _ in range(12))
+        return (
+            f"{keyword} {i};{position};{position + rnd.randint(-5, 5)};"
+            f"{rnd.randint(-5, 5)};{rnd.randint(10, 50000)};{rnd.uniform(0.05, 3):.2f};"
+            f"https://{domain}/{keyword.replace(' ', '-')};{rnd.random():.2f};"
+            f"{rnd.random():.2f};{rnd.random():.2f};{rnd.randint(1000, 9000000)};{trends}"
+        )
+    return (
+        f"{keyword} {i};{position};{rnd.randint(10, 50000)};{rnd.uniform(0.05, 3):.2f};"
+        f"{rnd.random():.2f};{rnd.random():.2f};{rnd.random():.2f}"
+    )
+
+
+def semrush_csv(params: Dict[str, str]) -> str:
+    """Genera una respuesta CSV realista para los parámetros de SEMrush."""
+    report_type = params.get('type', '')
+    header = SEMRUSH_HEADERS.get(report_type)
+    if header is None:
+        return "ERROR 50 :: NOTHING FOUND"
+
+    limit = int(params.get('display_limit', 10))
+    target = params.get('domain') or params.get('url') or params.get('target') or ''
+    rnd = random.Random(_seed_for(report_type + target + params.get('phrase', '')))
+
+    if report_type in ('phrase_this', 'phrase_these'):
+        rows = [_keyword_row(p) for p in params.get('phrase', '').split(';') if p]
+    elif report_type in ('phrase_related', 'phrase_questions'):
+        base = params.get('phrase', 'monitor')
+        rows = [_keyword_row(f"{base} {w}") for w in rnd.sample(KEYWORD_WORDS, min(limit, 20))]
+    elif report_type == 'phrase_kdi':
+        rows = [f"{p};{rnd.uniform(5, 95):.2f}" for p in params.get('phrase', '').split(';') if p]
+    elif report_type == 'domain_organic':
+        rows = [_organic_row(rnd, i, target, True) for i in range(limit)]
+    elif report_type == 'url_organic':
+        rows = [_organic_row(rnd, i, target, False) for i in range(limit)]
+    elif report_type == 'domain_ranks':
+        rows = [f"{target};{rnd.randint(1, 5000)};{rnd.randint(1000, 900000)};"
+                f"{rnd.randint(1000, 9000000)};{rnd.randint(1000, 9000000)}"]
+    else:
+        rows = [";".join(str(rnd.randint(1, 100000)) for _ in header.split(';'))]
+
+    return "\r\n".join([header] + rows)
+
+
+def n8n_product(payload: Dict) -> Dict:
+    """Genera el JSON de producto que devuelve el workflow de n8n."""
+    ref = str(
+        payload.get('legacy_id') or payload.get('product_url')
+        or payload.get('url') or payload.get('chatInput') or ''
+    )
+    rnd = random.Random(_seed_for(ref))
+    name = " ".join(w.capitalize() for w in rnd.sample(KEYWORD_WORDS, 3))
+
+    return {
+        'legacy_id': payload.get('legacy_id', str(rnd.randint(100000, 999999))),
+        'product_id': hashlib.md5(ref.encode()).hexdigest(),
+        'title': name,
+        'brand_name': rnd.choice(['ASUS', 'MSI', 'Logitech', 'Samsung', 'Corsair']),
+        'price': round(rnd.uniform(20, 2000), 2),
+        'description': " ".join(rnd.choices(KEYWORD_WORDS, k=80)),
+        'attributes': [
+            {'label': f"Atributo {i}", 'value': rnd.choice(KEYWORD_WORDS)}
+            for i in range(15)
+        ],
+        'images': [f"https://img.example.com/{ref}/{i}.jpg" for i in range(5)],
+        'family_name': 'Componentes',
+        'available': True,
+    }
+
+
+def competitor_html(slug: str, paragraphs: int = 30) -> str:
+    """Genera el HTML de un artículo de competidor."""
+    rnd = random.Random(_seed_for(slug))
+    title = " ".join(w.capitalize() for w in rnd.sample(KEYWORD_WORDS, 4))
+    body = []
+
+    for i in range(paragraphs):
+        if i % 5 == 0:
+            body.append(f"<h2>{' '.join(rnd.sample(KEYWORD_WORDS, 3))}</h2>")
+        words = " ".join(rnd.choices(KEYWORD_WORDS, k=60))
+        body.append(f"<p>{words} <a href=\"/competitor/{slug}-{i}\">más info</a></p>")
+
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{title}</title>"
+        f"<meta name=\"description\" content=\"Guía de {title.lower()}\">"
+        "</head><body><nav><a href=\"/\">Inicio</a></nav>"
+        f"<article><h1>{title}</h1>{''.join(body)}</article>"
+        "<footer>© Competidor</footer><script>var x = 1;</script>"
+        "</body></html>"
+    )
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _simulate(self) -> bool:
+        """Aplica latencia y decide si esta respuesta es un error."""
+        server: 'FakeServiceServer' = self.server.owner
+        delay_ms, fail = server.next_behavior()
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        if fail:
+            self._send(server.config.error_status, "text/plain", "Service Unavailable")
+            return False
+        return True
+
+    def _send(self, status: int, content_type: str, body: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        self.server.owner.count(parsed.path)
+
+        if not self._simulate():
+            return
+
+        if parsed.path.startswith('/analytics/'):
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            self._send(200, "text/plain", semrush_csv(params))
+        elif parsed.path.startswith('/competitor/'):
+            params = parse_qs(parsed.query)
+            paragraphs = int(params.get('paragraphs', ['30'])[0])
+            slug = parsed.path.rsplit('/', 1)[-1]
+            self._send(200, "text/html", competitor_html(slug, paragraphs))
+        elif parsed.path.startswith('/redirect/'):
+            self._redirect(parsed.path.replace('/redirect/', '/competitor/', 1))
+        elif parsed.path == '/redirect-to':
+            self._redirect(parse_qs(parsed.query).get('url', ['/'])[0])
+        else:
+            self._send(404, "text/plain", "Not Found")
+
+    def do_HEAD(self):
+        parsed = urlparse(self.path)
+        self.server.owner.count(parsed.path)
+
+        if not self._simulate():
+            return
+
+        if parsed.path.startswith('/competitor/'):
+            self._send(200, "text/html", "")
+        elif parsed.path.startswith('/redirect/'):
+            self._redirect(parsed.path.replace('/redirect/', '/competitor/', 1))
+        elif parsed.path == '/redirect-to':
+            self._redirect(parse_qs(parsed.query).get('url', ['/'])[0])
+        elif parsed.path.startswith('/analytics/'):
+            # Como muchas APIs: sin HEAD
+            self._send(405, "text/plain", "")
+        else:
+            self._send(404, "text/plain", "")
+
+    def _redirect(self, location: str) -> None:
+        self.send_response(301)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        self.server.owner.count(parsed.path)
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length) if length else b''
+
+        if not self._simulate():
+            return
+
+        if parsed.path.startswith('/webhook/'):
+            try:
+                payload = json.loads(raw or b'{}')
+            except ValueError:
+                payload = {}
+            self._send(200, "application/json", json.dumps(n8n_product(payload)))
+        else:
+            self._send(404, "text/plain", "Not Found")
+
+
+class _Server(ThreadingHTTPServer):
+    # La cola por defecto (5) hace que las ráfagas de conexiones esperen
+    # reintentos de SYN (~1 s) en vez de la latencia configurada
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeServiceServer:
+    """
+    Servidor HTTP local en un hilo de fondo.
+
+    Se usa como context manager; url apunta a http://127.0.0.1:<puerto>.
+    """
+
+    def __init__(self, config: Optional[FakeServiceConfig] = None, **kwargs):
+        self.config = config or FakeServiceConfig(**kwargs)
+        self._rnd = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **kwargs) -> None:
+        """Cambia latencia/errores en caliente."""
+        with self._lock:
+            for key, value in kwargs.items():
+                setattr(self.config, key, value)
+
+    def next_behavior(self):
+        """Latencia (ms) y si fallar para la siguiente respuesta."""
+        with self._lock:
+            cfg = self.config
+            delay = cfg.latency_ms + self._rnd.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+            fail = self._rnd.random() < cfg.error_rate
+        return max(0.0, delay), fail
+
+    def count(self, path: str) -> None:
+        route = '/' + path.strip('/').split('/', 1)[0]
+        with self._lock:
+            self._counts[route] = self._counts.get(route, 0) + 1
+
+    def request_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def start(self) -> 'FakeServiceServer':
+        self._httpd = _Server(('127.0.0.1', 0), _Handler)
+        self._httpd.owner = self
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-services", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> 'FakeServiceServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor falso SEMrush/n8n/competidores")
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    with FakeServiceServer(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate
+    ) as server:
+        print(f"Escuchando en {server.url} (Ctrl+C para salir)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
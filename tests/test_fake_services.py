@@ -0,0 +1,141 @@
+"""
+Smoke test de los servicios falsos y del benchmark (tests/benchmarks.py)
+"""
+import os
+import sys
+import time
+from urllib.parse import quote, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import requests
+
+from benchmarks import run_all
+from fake_services import FakeServiceServer
+from core.link_checker import LinkChecker
+from core.scraper import WebScraper
+from core.semrush import parse_semrush_csv
+from utils.dns_resolver import DNSResolver
+from utils.url_validator import URLValidator
+
+
+def test_fake_server_serves_semrush_n8n_and_html():
+    with FakeServiceServer() as server:
+        csv_text = requests.get(
+            f"{server.url}/analytics/v1/",
+            params={'type': 'domain_organic', 'domain': 'pccomponentes.com', 'display_limit': 25}
+        ).text
+        rows = parse_semrush_csv(csv_text)
+        assert len(rows) == 25
+        assert isinstance(rows[0]['Search Volume'], int)
+
+        product = requests.post(f"{server.url}/webhook/product", json={'legacy_id': '123'}).json()
+        assert product['legacy_id'] == '123' and product['title']
+
+        html = requests.get(f"{server.url}/competitor/guia-monitores").text
+        assert '<h1>' in html
+
+        server.configure(error_rate=1.0)
+        assert requests.get(f"{server.url}/competitor/x").status_code == 503
+        assert server.request_counts()['/competitor'] == 2
+
+
+def test_benchmark_suite_runs_without_errors():
+    results = run_all(n_requests=6, concurrency=3, latency_ms=0, jitter_ms=0)
+
+    assert {r.name for r in results} == {
+        'semrush.get_keyword_overview',
+        'semrush.get_keywords_overview_bulk',
+        'n8n.fetch_product_via_n8n_webhook',
+        'scraper.scrape_url',
+    }
+    assert all(r.errors == 0 and r.requests_per_s > 0 for r in results)
+
+    overview = [r for r in results if r.name == 'semrush.get_keyword_overview']
+    # La mitad de las keywords se repiten: la 2ª vez salen de caché
+    assert overview[0].cache_hit_rate > 0
+    assert overview[0].backend_calls == 3
+
+
+def test_link_checker_concurrent_with_cache_and_fallback():
+    with FakeServiceServer(latency_ms=150) as server:
+        checker = LinkChecker(base_url=server.url, validator=URLValidator(allow_localhost=True, allow_private_ips=True))
+        urls = [f"/competitor/p{i}" for i in range(16)] + [
+            f"{server.url}/redirect/guia",
+            "/analytics/v1/?type=phrase_this",
+            "/no-existe",
+            "/competitor/p0",
+        ]
+
+        start = time.perf_counter()
+        statuses = checker.check_many(urls)
+        elapsed = time.perf_counter() - start
+
+        # 19 URLs distintas a 150 ms: en paralelo, no ~3 s en serie
+        assert elapsed < 1.2
+        assert [s.url for s in statuses] == urls
+        assert all(s.ok and s.method == 'HEAD' for s in statuses[:16])
+        assert statuses[16].redirected and statuses[16].final_url.endswith('/competitor/guia')
+        assert statuses[17].ok and statuses[17].method == 'GET'
+        assert statuses[18].broken and statuses[18].status_code == 404
+
+        server.reset_counts()
+        again = checker.check_many(urls)
+        assert all(s.cached for s in again) and server.request_counts() == {}
+
+        blocked = LinkChecker(base_url=server.url).check("/competitor/x")
+        assert blocked.broken and blocked.error.startswith("URL no permitida")
+        checker.close()
+
+
+def test_link_checker_validates_each_redirect_hop():
+    async def lookup(host):
+        if host != 'shop.example.com':
+            raise OSError("Name or service not known")
+        return ['127.0.0.1']
+
+    with FakeServiceServer() as server:
+        port = urlparse(server.url).port
+        # Loopback permitido solo tras resolver un dominio; IPs literales no
+        checker = LinkChecker(
+            base_url=f"http://shop.example.com:{port}",
+            validator=URLValidator(allow_localhost=True),
+            resolver=DNSResolver(lookup=lookup),
+        )
+
+        followed = checker.check("/redirect/guia")
+        assert followed.ok and followed.redirects == 1
+        assert followed.final_url == f"http://shop.example.com:{port}/competitor/guia"
+
+        server.reset_counts()
+        internal = f"http://127.0.0.1:{port}/competitor/internal"
+        blocked = checker.check(f"/redirect-to?url={quote(internal, safe='')}")
+        assert blocked.broken and blocked.error.startswith("Redirección no permitida")
+        assert blocked.final_url == internal
+        assert server.request_counts() == {'/redirect-to': 1}
+        checker.close()
+
+
+def test_scraper_connects_to_pinned_address():
+    with FakeServiceServer() as server:
+        port = urlparse(server.url).port
+        url = f"http://pinned.invalid:{port}/competitor/guia-monitores"
+        with WebScraper(timeout=5, max_retries=1) as scraper:
+            assert not scraper.scrape_url(url).success  # .invalid no resuelve
+
+            result = scraper.scrape_url(url, resolved_ip='127.0.0.1')
+            assert result.success and result.status_code == 200
+            assert result.url == url
+
+            # Redirección al mismo host: sigue en la IP fijada
+            moved = scraper.scrape_url(url.replace('/competitor/', '/redirect/'), resolved_ip='127.0.0.1')
+            assert moved.success and moved.status_code == 200
+
+            # Redirección a una IP privada: se rechaza sin pedirla
+            server.reset_counts()
+            internal = quote(f"http://127.0.0.1:{port}/competitor/internal", safe='')
+            hop = scraper.scrape_url(f"http://pinned.invalid:{port}/redirect-to?url={internal}", resolved_ip='127.0.0.1')
+            assert not hop.success
+            assert "Redirección no permitida" in hop.error
+            assert server.request_counts() == {'/redirect-to': 1}
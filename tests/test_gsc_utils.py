@@ -0,0 +1,423 @@
+"""
+Tests de utilidades GSC (utils/gsc_utils.py)
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.gsc_utils import TTLCache
+
+try:
+    import numpy  # noqa: F401
+    _numpy_available = True
+except ImportError:
+    _numpy_available = False
+
+# GSCDataset, sus índices y el snapshot binario son opcionales (numpy)
+requires_numpy = pytest.mark.skipif(not _numpy_available, reason="requiere numpy")
+
+
+def _expire(cache, key, seconds_ago):
+    cache._cache[key].expires_at = datetime.now() - timedelta(seconds=seconds_ago)
+
+
+def _wait_refresh(cache):
+    deadline = time.monotonic() + 2
+    while cache._refresher.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_get_or_load_serves_stale_and_refreshes_in_background():
+    cache = TTLCache(ttl=60, name="test", stale_grace=600)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(1)
+        return len(calls)
+
+    assert cache.get_or_load('k', loader) == 1
+    _expire(cache, 'k', 10)
+
+    # Se sirve el valor viejo sin esperar al recálculo, una sola vez
+    assert cache.get_or_load('k', loader) == 1
+    assert cache.get_or_load('k', loader) == 1
+    assert cache.get('k') is None
+    release.set()
+    _wait_refresh(cache)
+
+    assert len(calls) == 2
+    assert cache.get_or_load('k', loader) == 2
+    assert cache.get_stats()['stale_hits'] == 2
+
+
+def test_get_or_load_beyond_grace_reloads_synchronously():
+    cache = TTLCache(ttl=60, name="test", stale_grace=60)
+    values = iter([1, 2])
+
+    assert cache.get_or_load('k', lambda: next(values)) == 1
+    _expire(cache, 'k', 120)
+
+    assert cache.get_or_load('k', lambda: next(values)) == 2
+
+
+GSC_CSV = (
+    "query,page,clicks,impressions,ctr,position\n"
+    "monitor gaming,https://www.pccomponentes.com/monitores,50,1000,5%,3.2\n"
+    "Monitor Gaming 144hz,https://www.pccomponentes.com/monitores,20,400,5%,5.0\n"
+    "monitor gaming barato,https://www.pccomponentes.com/guia-monitores,30,800,3.75%,7.5\n"
+    "teclado mecánico,https://www.pccomponentes.com/teclados,10,300,3.3%,4.0\n"
+    "monitor 4k,https://www.pccomponentes.com/monitores-4k,5,5,100%,12.0\n"
+    "monitor gaming,,3,100,3%,9.0\n"
+)
+
+KEYWORDS_CSV = (
+    "url;keyword;position;impressions;clicks;ctr;last_updated\n"
+    "https://www.pccomponentes.com/monitores;monitor gaming;3.2;1000;50;5.0;2024-01-01\n"
+    "https://www.pccomponentes.com/guia;mejor monitor gaming;7.5;800;30;3.75;2024-01-02\n"
+    "https://www.pccomponentes.com/ratones;ratón gaming;4.0;300;40;13.3;2024-01-03\n"
+    "https://www.pccomponentes.com/sillas;silla;9.0;10;1;10.0;2024-01-04\n"
+)
+
+
+@requires_numpy
+def test_columnar_dataset_matches_list_of_dicts(tmp_path, monkeypatch):
+    import utils.gsc_utils as gsc
+
+    csv_path = tmp_path / "gsc.csv"
+    csv_path.write_text(GSC_CSV, encoding='utf-8')
+    loaded = gsc._load_gsc_with_csv(csv_path, 'utf-8')
+    records = loaded['data']
+    legacy = [dict(row) for row in records]
+
+    assert isinstance(loaded['dataset'], gsc.GSCDataset)
+    assert legacy[1]['query'] == 'Monitor Gaming 144hz' and legacy[1]['clicks'] == 20
+
+    def both(fn, *args, **kwargs):
+        monkeypatch.setattr(gsc, 'load_gsc_data', lambda *a, **k: {'data': records, 'dataset': loaded['dataset']})
+        columnar = fn(*args, **kwargs)
+        monkeypatch.setattr(gsc, 'load_gsc_data', lambda *a, **k: {'data': legacy})
+        return columnar, fn(*args, **kwargs)
+
+    gsc.reset_gsc_cache()
+    columnar, expected = both(gsc.check_cannibalization, 'monitor gaming')
+    assert columnar == expected
+    assert [r['url'] for r in columnar] == [
+        'https://www.pccomponentes.com/monitores',
+        'https://www.pccomponentes.com/guia-monitores',
+    ]
+
+    for fn, args in (
+        (gsc.get_keywords_for_url.__wrapped__, ('https://www.pccomponentes.com/monitores',)),
+        (gsc.get_top_keywords.__wrapped__, ()),
+        (gsc.get_related_keywords.__wrapped__, ('monitor',)),
+    ):
+        columnar, expected = both(fn, *args)
+        assert columnar == expected, fn.__name__
+
+
+@requires_numpy
+def test_search_existing_content_on_keywords_dataset(tmp_path):
+    import utils.gsc_utils as gsc
+
+    csv_path = tmp_path / "gsc_keywords.csv"
+    csv_path.write_text(KEYWORDS_CSV, encoding='utf-8')
+    rows = gsc.load_gsc_keywords_csv(csv_path, force_reload=True)
+    try:
+        assert isinstance(rows, gsc.GSCRecords)
+        assert rows[2] == {
+            'url': 'https://www.pccomponentes.com/ratones', 'keyword': 'ratón gaming',
+            'position': 4.0, 'impressions': 300, 'clicks': 40, 'ctr': 13.3,
+            'last_updated': '2024-01-03',
+        }
+
+        results = gsc.search_existing_content('monitor gaming')
+        assert [(r['url'], r['match_score']) for r in results] == [
+            ('https://www.pccomponentes.com/monitores', 100),
+            ('https://www.pccomponentes.com/guia', 80),
+            ('https://www.pccomponentes.com/ratones', 30),
+        ]
+        assert results[0]['clicks'] == 50 and results[0]['last_updated'] == '2024-01-01'
+    finally:
+        gsc._gsc_keywords_cache = None
+
+
+@requires_numpy
+def test_text_index_candidates():
+    from utils.gsc_index import TextIndex
+
+    index = TextIndex(['monitor gaming', 'gaming', '', 'monitores 4k', 'ssd'])
+
+    assert index.contains('monitor').tolist() == [0, 3]
+    # Una coincidencia que cruza dos cadenas no cuenta
+    assert index.contains('gss').tolist() == []
+    assert index.contained_in('monitor gaming').tolist() == [0, 1, 2]
+    ids, counts = index.word_counts({'gaming', 'monitor'})
+    assert ids.tolist() == [0, 1] and counts.tolist() == [2, 1]
+    assert index.common_words({'gaming'}, ids).tolist() == [1, 1]
+
+
+@requires_numpy
+def test_page_index_matches_substring_semantics():
+    from utils.gsc_index import PageIndex
+
+    pages = [
+        'https://www.pccomponentes.com/monitores',
+        'https://www.pccomponentes.com/monitores-gaming',
+        'https://www.pccomponentes.com/amp?u=https://www.pccomponentes.com/monitores',
+        'https://www.pccomponentes.com/ssd',
+    ]
+    index = PageIndex(pages)
+
+    for url in ('https://www.pccomponentes.com/monitores', 'https://www.pccomponentes.com/s', '/monitores', 'gaming', ''):
+        expected = [i for i, page in enumerate(pages) if url in page]
+        assert index.find(url).tolist() == expected, url
+    assert index.exact(pages[3]).tolist() == [3]
+
+
+@requires_numpy
+def test_load_gsc_data_uses_binary_snapshot(tmp_path):
+    import utils.gsc_utils as gsc
+    from utils.gsc_snapshot import snapshot_path
+
+    csv_path = tmp_path / "gsc.csv"
+    csv_path.write_text(GSC_CSV, encoding='utf-8')
+    load = gsc.load_gsc_data.__wrapped__
+
+    first = load(csv_path)
+    assert first['source'] != 'snapshot'
+    assert (snapshot_path(csv_path) / 'manifest.json').exists()
+
+    second = load(csv_path)
+    assert second['source'] == 'snapshot'
+    assert list(second['data']) == list(first['data'])
+    assert second['dataset'].queries.index().contains('monitor').tolist() == [0, 1, 2, 4]
+
+    # Un cambio en el CSV invalida el snapshot
+    csv_path.write_text(GSC_CSV + "ssd nvme,https://www.pccomponentes.com/ssd,1,10,10%,2.0\n", encoding='utf-8')
+    third = load(csv_path)
+    assert third['source'] != 'snapshot' and third['row_count'] == 7
+
+
+def test_cached_keys_are_namespaced_and_dataset_versioned(tmp_path, monkeypatch):
+    import utils.gsc_utils as gsc
+
+    first_csv, second_csv = tmp_path / "a.csv", tmp_path / "b.csv"
+    first_csv.write_text("query\na\n", encoding='utf-8')
+    second_csv.write_text("query\nb\n", encoding='utf-8')
+    cache = gsc.reset_gsc_cache(stale_grace=0)
+    calls = []
+
+    @gsc.cached(key_prefix="test_fn", dataset=lambda path, value: path)
+    def compute(path, value):
+        calls.append((path, value))
+        return value
+
+    compute(first_csv, 'x')
+    compute(first_csv, 'x')
+    compute(second_csv, 'x')
+    assert len(calls) == 2
+
+    # Cambiar el archivo cambia la versión: no se sirve el resultado viejo
+    first_csv.write_text("query\na\nc\n", encoding='utf-8')
+    compute(first_csv, 'x')
+    assert len(calls) == 3
+
+    # Invalidar un dataset conserva las entradas del otro
+    assert gsc.invalidate_dataset_cache(first_csv) == 1
+    compute(second_csv, 'x')
+    assert len(calls) == 3
+
+    assert gsc.invalidate_keyword_cache('x') == 2
+    compute(first_csv, 'x')
+    assert compute.invalidate_all() == 1
+    assert cache.get_stats()['size'] == 0
+
+
+def test_cannibalization_bulk_weights_position_by_impressions(tmp_path, monkeypatch):
+    import utils.gsc_utils as gsc
+
+    csv_path = tmp_path / "gsc.csv"
+    csv_path.write_text(GSC_CSV, encoding='utf-8')
+    loaded = gsc._load_gsc_with_csv(csv_path, 'utf-8')
+    monkeypatch.setattr(gsc, 'load_gsc_data', lambda *a, **k: loaded)
+
+    keywords = ['monitor gaming', 'Teclado', 'monitor', 'nada', '']
+    bulk = gsc.check_cannibalization_bulk(keywords, min_impressions=1, max_results=2)
+
+    assert set(bulk) == set(keywords)
+    assert bulk['nada'] == [] and bulk[''] == []
+    assert bulk['monitor gaming'][0] == {
+        'url': 'https://www.pccomponentes.com/monitores',
+        'clicks': 70,
+        'impressions': 1400,
+        # (3.2 * 1000 + 5.0 * 400) / 1400
+        'position': 3.7,
+        'ctr': 5.0,
+    }
+    assert len(bulk['monitor']) == 2
+    assert bulk['Teclado'] == gsc.check_cannibalization('teclado', min_impressions=1)
+
+    # Misma agregación sin NumPy (lista de dicts)
+    legacy = [dict(row) for row in loaded['data']]
+    for keyword in ('monitor gaming', 'monitor', 'Teclado'):
+        assert gsc._cannibalization_rows(legacy, keyword.lower(), 1, 2) == bulk[keyword]
+
+
+def test_fuzzy_matching_catches_spanish_variants(tmp_path):
+    import utils.gsc_utils as gsc
+    from utils.spanish_text import normalize_keyword
+
+    assert normalize_keyword("Ratones para Portátiles") == normalize_keyword("raton portatil")
+    assert normalize_keyword("año") != normalize_keyword("ano")
+
+    csv_path = tmp_path / "gsc_keywords.csv"
+    csv_path.write_text(
+        "url;keyword;position;impressions;clicks;ctr;last_updated\n"
+        "https://www.pccomponentes.com/portatiles-gaming;portátiles gaming;3.0;900;80;8.9;2024-01-01\n"
+        "https://www.pccomponentes.com/ratones;ratón inalámbrico;5.0;500;20;4.0;2024-01-01\n"
+        "https://www.pccomponentes.com/sillas;silla gaming;9.0;100;5;5.0;2024-01-01\n",
+        encoding='utf-8'
+    )
+    gsc.load_gsc_keywords_csv(csv_path, force_reload=True)
+    try:
+        # Sin fuzzy solo comparte 'gaming', igual que la silla
+        exact = gsc.search_existing_content('portatil gaming', fuzzy=False)
+        assert [r['match_score'] for r in exact] == [30, 30]
+
+        results = gsc.search_existing_content('portatil gaming')
+        assert results[0]['url'].endswith('/portatiles-gaming')
+        assert results[0]['match_score'] == 90
+
+        # Errata y plural
+        assert gsc.search_existing_content('ratones inalambricos')[0]['url'].endswith('/ratones')
+        assert gsc.search_existing_content('raton inalambrico')[0]['match_score'] == 90
+    finally:
+        gsc._gsc_keywords_cache = None
+
+
+@requires_numpy
+def test_topic_clusters_group_variants_and_persist(tmp_path):
+    import utils.gsc_utils as gsc
+    from utils.gsc_clusters import topics_path
+
+    csv_path = tmp_path / "gsc_keywords.csv"
+    csv_path.write_text(
+        "url;keyword;position;impressions;clicks;ctr;last_updated\n"
+        "https://www.pccomponentes.com/portatiles-gaming;portátiles gaming;3.0;900;80;8.9;2024-01-01\n"
+        "https://www.pccomponentes.com/guia-portatiles;mejores portatiles gaming;6.0;400;10;2.5;2024-01-01\n"
+        "https://www.pccomponentes.com/portatiles-gaming;portatil gaming barato;4.0;300;30;10.0;2024-01-01\n"
+        "https://www.pccomponentes.com/ratones;ratón inalámbrico;5.0;500;20;4.0;2024-01-01\n",
+        encoding='utf-8'
+    )
+    gsc.load_gsc_keywords_csv(csv_path, force_reload=True)
+    try:
+        topic = gsc.get_keyword_topic('portatiles gaming')
+        assert topic['label'] == 'portátiles gaming'
+        assert topic['keywords'] == 3 and topic['clicks'] == 120 and topic['pages'] == 2
+        assert topic['owner_url'].endswith('/portatiles-gaming')
+        assert topic['owner_share'] == round(110 / 120, 4)
+
+        # Sin estar en el CSV: por similitud
+        other = gsc.get_keyword_topic('raton inalambrico logitech')
+        assert other['owner_url'].endswith('/ratones') and other['similarity'] < 1
+
+        assert gsc.analyze_keyword_coverage('portátil gaming')['topic']['topic_id'] == topic['topic_id']
+
+        # El cálculo de fondo persiste los temas junto al CSV
+        deadline = time.monotonic() + 5
+        while not (topics_path(csv_path) / 'manifest.json').exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        gsc.load_gsc_keywords_csv(csv_path, force_reload=True)
+        clusters = gsc.get_topic_clusters()
+        assert clusters.topic(topic['topic_id']).to_dict() == {
+            k: v for k, v in topic.items() if k != 'similarity'
+        }
+    finally:
+        gsc._gsc_keywords_cache = None
+
+
+def test_sqlite_store_matches_memory_and_ingests_appended_rows(tmp_path, monkeypatch):
+    import utils.gsc_utils as gsc
+    import utils.gsc_store as gsc_store
+
+    csv_path = tmp_path / "gsc.csv"
+    csv_path.write_text(GSC_CSV, encoding='utf-8')
+    monkeypatch.setattr(gsc, 'GSC_DATA_FILE', csv_path)
+    calls = (
+        (gsc.get_keywords_for_url.__wrapped__, ('https://www.pccomponentes.com/monitores',)),
+        (gsc.get_top_keywords.__wrapped__, ()),
+        (gsc.get_related_keywords.__wrapped__, ('monitor',)),
+        (gsc.get_gsc_summary.__wrapped__, ()),
+    )
+
+
+    def run():
+        results = [fn(*args) for fn, args in calls]
+        results[-1].pop('loaded_at')
+        return results
+
+    gsc.reset_gsc_cache()
+    expected = run()
+
+    monkeypatch.setattr(gsc_store, 'GSC_STORE_PATH', str(tmp_path / "store.sqlite"))
+    gsc_store.reset_gsc_store()
+    try:
+        assert run() == expected
+
+        # Filas añadidas al final: solo se ingiere lo nuevo
+        store, source_id = gsc._gsc_store_source('gsc_data')
+        rows_before = store.source_info(source_id)['row_count']
+        with open(csv_path, 'a', encoding='utf-8') as f:
+            f.write("monitor gaming,https://www.pccomponentes.com/monitores-4k,90,2000,4.5,1.5\n")
+        assert gsc._gsc_store_source('gsc_data') == (store, source_id)
+        assert store.source_info(source_id)['row_count'] == rows_before + 1
+        assert store.get_stats()['incremental_ingests'] == 1
+        assert gsc.get_keywords_for_url.__wrapped__('monitores-4k')[0]['clicks'] == 90
+    finally:
+        gsc_store.reset_gsc_store()
+        gsc.reset_gsc_cache()
+
+
+@requires_numpy
+def test_incremental_load_merges_appended_rows_and_partitions(tmp_path, monkeypatch):
+    import utils.gsc_utils as gsc
+
+    csv_path = tmp_path / "gsc.csv"
+    csv_path.write_text(GSC_CSV, encoding='utf-8')
+    monkeypatch.setattr(gsc, 'GSC_DATA_FILE', csv_path)
+    gsc.reset_gsc_cache()
+
+    untouched = gsc.get_keywords_for_url('teclados')
+    touched = gsc.get_keywords_for_url('/monitores')
+
+    with open(csv_path, 'a', encoding='utf-8') as f:
+        f.write("monitor gaming,https://www.pccomponentes.com/monitores,7,70,10%,2.0\n")
+    loaded = gsc.load_gsc_data()
+    assert loaded['source'] == 'incremental' and loaded['row_count'] == 7
+    assert list(loaded['data']) == list(gsc._load_gsc_with_csv(csv_path, 'utf-8')['data'])
+
+    # Las filas nuevas no tocan /teclados: se reutiliza el resultado anterior
+    assert gsc.get_keywords_for_url('teclados') is untouched
+    assert len(gsc.get_keywords_for_url('/monitores')) == len(touched) + 1
+
+    # Directorio de particiones: una partición nueva solo añade sus filas
+    partitions = tmp_path / "gsc"
+    partitions.mkdir()
+    lines = GSC_CSV.splitlines(keepends=True)
+    (partitions / "2025-01-06.csv").write_text(''.join(lines[:4]), encoding='utf-8')
+    load = gsc.load_gsc_data.__wrapped__
+    assert load(partitions)['source'] == 'partitions'
+
+    (partitions / "2025-01-13.csv").write_text(lines[0] + ''.join(lines[4:]), encoding='utf-8')
+    merged = load(partitions)
+    assert merged['source'] == 'incremental'
+    assert list(merged['data']) == list(gsc._load_gsc_with_csv(csv_path, 'utf-8')['data'])[:6]
@@ -48,11 +48,182 @@ def test_html_utils():
     print("✅ HTML utils funcionan")
     return True
 
+def test_html_analysis():
+    """Verifica que las funciones HTML son vistas del mismo análisis"""
+    from utils.html_utils import (
+        analyze_html, analyze_links, count_words_in_html,
+        extract_content_structure, get_heading_hierarchy, validate_cms_structure,
+    )
+    
+    html = (
+        '<article class="contentGenerator__main"><span class="kicker">Guía</span>'
+        '<h2>Mejores <em>monitores</em></h2><p>Precio &lt; 200 &amp; más, ver '
+        '<a href="https://www.pccomponentes.com/monitor-x">este <b>monitor</b></a> o '
+        '<a href="/blog/guia">la guía</a> y <a href="https://example.com">fuera</a></p>'
+        '<h3>FAQ</h3></article>'
+    )
+    analysis = analyze_html(html)
+    
+    assert analysis.word_count == count_words_in_html(html) == 15
+    assert analysis.headings == get_heading_hierarchy(html) == [
+        {'level': 'h2', 'text': 'Mejores monitores'},
+        {'level': 'h3', 'text': 'FAQ'},
+    ]
+    links = analyze_links(html)
+    assert [l['anchor'] for l in links['internal']] == ['este monitor', 'la guía']
+    assert len(links['pdp']) == len(links['blog']) == links['external_count'] == 1
+    assert extract_content_structure(html)['title'] == 'Mejores monitores'
+    assert validate_cms_structure(html) == analysis.cms_result()
+    assert not analysis.is_valid
+    
+    assert validate_cms_structure("") == (False, ["❌ El contenido HTML está vacío"], [])
+    assert analyze_links("")['total'] == 0
+    return True
+
+def test_html_analysis_memo():
+    """Verifica que el mismo HTML no se vuelve a analizar"""
+    from utils.html_utils import (
+        analyze_html, clear_html_analysis_cache, count_words_in_html,
+        get_html_analysis_stats, validate_word_count_target,
+    )
+    
+    clear_html_analysis_cache()
+    html = "<article><h2>Título</h2><p>" + "palabra " * 500 + "</p></article>"
+    first = analyze_html(html)
+    before = get_html_analysis_stats()
+    
+    # Copia con el mismo contenido (como en otro rerun o sesión)
+    assert analyze_html("".join(list(html))) is first
+    assert count_words_in_html(html) == 501
+    assert validate_word_count_target(html, 500)['within_range']
+    stats = get_html_analysis_stats()
+    assert stats['misses'] == before['misses']
+    assert stats['hits'] == before['hits'] + 3
+    return True
+
+def test_streaming_html_validator():
+    """Verifica la validación a trozos frente a la del documento completo"""
+    from utils.html_utils import StreamingHTMLValidator, count_words_in_html
+    
+    html = (
+        '<article class="contentGenerator__main"><h2>Guía</h2>'
+        + '<p>Texto con <a href="/portatil-x">enlace</a> &amp; más</p>' * 40
+        + '</article>'
+    )
+    validator = StreamingHTMLValidator(target_length=400)
+    wrapped = "```html\n" + html + "\n```"
+    for i in range(0, len(wrapped), 7):
+        progress = validator.feed(wrapped[i:i + 7])
+    
+    assert validator.finish().word_count == progress.word_count == count_words_in_html(html)
+    assert len(progress.links) == 40 and progress.article_count == 1
+    assert progress.open_tags == [] and progress.warnings == [] and not progress.should_abort
+    
+    validator = StreamingHTMLValidator(strict=True)
+    validator.feed('<article><h')
+    assert validator.feed('1>Título</h1>').should_abort
+    
+    validator = StreamingHTMLValidator()
+    for _ in range(40):
+        progress = validator.feed("Aquí tienes el artículo ")
+    assert progress.should_abort
+    return True
+
+def test_compact_html():
+    """Verifica que el HTML para prompts se reduce a su esqueleto semántico"""
+    from utils.html_utils import compact_html
+    
+    html = (
+        '<html><head><style>.a{color:red}</style></head><body>'
+        '<div class="wrap" style="margin:0" data-track="1">'
+        '<h2 id="s1" class="t">Monitores <span>gaming</span></h2>'
+        '<p style="font-size:17px">Si a < b, mira <a class="btn" onclick="t()" '
+        'href="https://www.pccomponentes.com/monitores?utm_source=blog&page=2">esta PLP</a>.</p>'
+        '<!-- <p>oculto</p> --><script>x = "</div>";</script><svg><path d="M0"/></svg>'
+        '<ul class="l"><li>144 Hz</li><li> </li></ul>'
+        '<table><tbody><tr><td>IPS</td><td>VA</td></tr></tbody></table><p></p>'
+        '</div></body></html>'
+    )
+    compacted = compact_html(html)
+    
+    assert compacted.html == (
+        '<h2>Monitores gaming</h2>\n'
+        '<p>Si a &lt; b, mira <a href="https://www.pccomponentes.com/monitores?page=2">esta PLP</a>.</p>\n'
+        '<ul>\n<li>144 Hz</li>\n</ul>\n'
+        '<table>\n<tr><td>IPS</td><td>VA</td></tr>\n</table>'
+    )
+    assert compacted.text.splitlines()[-1] == 'IPS VA'
+    assert compacted.bytes_saved == len(html) - len(compacted.html)
+    assert compacted.tokens_saved > 0 and 0 < compacted.ratio < 1
+    assert compact_html('').html == ''
+    return True
+
+def test_compact_html_forms_nesting_and_stray_lt():
+    """Verifica formularios, elementos eliminados anidados y '<' sueltos"""
+    from utils.html_utils import compact_html
+    
+    assert compact_html('<form><h1>Title</h1><p>Body</p><button>Enviar</button></form>').html == (
+        '<h1>Title</h1>\n<p>Body</p>'
+    )
+    assert compact_html('<svg><svg><text>a</text></svg><text>b</text></svg><p>ok</p>').html == '<p>ok</p>'
+    
+    # Sin contenido tras compactar: se conserva el original
+    only_nav = '<nav><a href="/">Inicio</a></nav>'
+    assert compact_html(only_nav).html == only_nav
+    
+    # Miles de '<' en un mismo tramo no agotan la pila
+    compacted = compact_html('<p>' + 'a < ' * 3000 + '></p>')
+    assert compacted.html.count('&lt;') == 3000
+    assert compacted.html.startswith('<p>a &lt; a &lt;')
+    return True
+
+def test_html_diff():
+    """Verifica el diff por bloques y los deltas del historial"""
+    from utils.html_diff import apply_delta, diff_html, make_delta, split_blocks
+    
+    before = (
+        '<style>:root{--a:#fff}</style><article>\n<h2>Monitores</h2>\n'
+        '<p>El panel IPS ofrece mejores colores que el VA.</p>\n'
+        '<h3>Precio</h3>\n<p>Cuesta 200 euros.</p>\n<ul><li>Uno</li><li>Dos</li></ul>\n</article>'
+    )
+    after = (
+        '<style>:root{--a:#000}</style><article>\n<h2>Monitores</h2>\n'
+        '<p class="x">El panel IPS ofrece  mejores colores y ángulos que el VA.</p>\n'
+        '<h3>Precio</h3>\n<ul><li>Uno</li><li>Dos</li><li>Tres</li></ul>\n</article>'
+    )
+    assert ''.join(split_blocks(before)) == before
+    
+    diff = diff_html(before, after)
+    assert diff.css_changed
+    assert [(c.kind, c.tag, c.section) for c in diff.changes] == [
+        ('modified', 'p', 'Monitores'),
+        ('removed', 'p', 'Precio'),
+        ('added', 'li', 'Precio'),
+    ]
+    assert ('+', 'y ángulos') in diff.changes[0].word_diff()
+    assert not diff_html(before, before).changed
+    
+    delta = make_delta(after, before)
+    assert apply_delta(after, delta) == before
+    assert delta.size < len(before)
+    try:
+        apply_delta(before, delta)
+        assert False, "el delta solo se aplica sobre su base"
+    except ValueError:
+        pass
+    return True
+
 if __name__ == "__main__":
     tests = [
         test_imports,
         test_archetipos,
-        test_html_utils
+        test_html_utils,
+        test_html_analysis,
+        test_html_analysis_memo,
+        test_streaming_html_validator,
+        test_compact_html,
+        test_compact_html_forms_nesting_and_stray_lt,
+        test_html_diff
     ]
     
     passed = sum(1 for test in tests if test())
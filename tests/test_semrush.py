@@ -0,0 +1,264 @@
+"""
+Tests del cliente SEMrush (core/semrush.py) con una sesión HTTP simulada
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from core.semrush import (
+    RateLimitConfig,
+    RateLimiter,
+    SEMrushAPIError,
+    SEMrushClient,
+    UnitBudgetConfig,
+    parse_semrush_csv,
+    reset_semrush_client,
+)
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+        self.headers = {}
+        self.encoding = 'utf-8'
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.text.split('\n'))
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Simula la API: responde una fila por cada frase pedida."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params, timeout, stream=False):
+        self.requests.append(dict(params))
+        phrases = params.get('phrase', '').split(';')
+        rows = [f"{p};{len(p) * 10};0.50" for p in phrases if p]
+        return FakeResponse("Keyword;Search Volume;CPC\n" + "\n".join(rows))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _in_memory_units(monkeypatch):
+    # Ningún cliente de los tests escribe en el registro de unidades real
+    monkeypatch.setenv('SEMRUSH_UNITS_DB', ':memory:')
+
+
+@pytest.fixture
+def client():
+    reset_semrush_client()
+    c = SEMrushClient(
+        api_key='test-key',
+        units=UnitBudgetConfig(storage_path=':memory:')
+    )
+    c._session = FakeSession()
+    yield c
+    reset_semrush_client()
+
+
+def test_bulk_overview_batches_and_skips_cached(client):
+    client.get_keyword_overview('monitor gaming')
+    keywords = ['monitor gaming'] + [f"kw {i}" for i in range(7)] + ['KW 0']
+
+    results = list(client.get_keywords_overview_bulk(keywords, batch_size=3))
+
+    assert len(results) == 8
+    assert sum(r.from_cache for r in results) == 1
+    assert all(r.success and r.data for r in results)
+    # 1 phrase_this previa + 3 lotes phrase_these (3 + 3 + 1)
+    assert [p['type'] for p in client._session.requests].count('phrase_these') == 3
+
+    # Las filas del lote quedan cacheadas para get_keyword_overview
+    assert client.get_keyword_overview('kw 5').from_cache
+
+
+def test_bulk_overview_respects_unit_budget(client):
+    keywords = [f"kw {i}" for i in range(10)]
+
+    results = list(client.get_keywords_overview_bulk(
+        keywords, batch_size=4, max_units=50
+    ))
+
+    fetched = [r for r in results if r.success]
+    refused = [r for r in results if not r.success]
+    assert len(fetched) == 5
+    assert len(refused) == 5
+    assert all('Presupuesto' in r.error for r in refused)
+
+
+def test_unit_meter_records_and_degrades(client):
+    client.set_unit_session('s1')
+    client.get_keyword_overview('monitor')
+    client.stream_report({'type': 'phrase_these', 'phrase': 'a;b;c'}, columnar=True)
+
+    usage = client.get_unit_usage()
+    assert usage['by_report_type']['phrase_this']['units'] == 10
+    assert usage['by_report_type']['phrase_these']['units'] == 30
+    assert usage['session'] == 40
+    assert client.get_cache_stats()['units']['today'] == 40
+
+    # Con presupuesto: display_limit se recorta a lo que queda
+    client._config.units.session_units = 70
+    client.get_domain_organic_keywords('pccomponentes.com', limit=100)
+    assert client._session.requests[-1]['display_limit'] == 3
+
+    # Sin presupuesto suficiente para una línea se rechaza
+    client._config.units.session_units = 45
+    response = client.get_keyword_overview('teclado')
+    assert not response.success and 'Presupuesto' in response.error
+
+
+def test_csv_parser_types_columns_from_header():
+    text = (
+        "Keyword;Search Volume;CPC;Trends;Custom\r\n"
+        "1080p monitor;1300;0.85;0.5,1.0;7\r\n"
+        "roto;1;2\r\n"
+        "\r\n"
+        "ssd;;1;;x\r\n"
+    )
+
+    rows = parse_semrush_csv(text)
+    assert rows[0] == {
+        'Keyword': '1080p monitor', 'Search Volume': 1300, 'CPC': 0.85,
+        'Trends': '0.5,1.0', 'Custom': 7,
+    }
+    assert rows[1]['Search Volume'] is None and rows[1]['CPC'] == 1.0
+
+    columns = parse_semrush_csv(text.splitlines(), columnar=True)
+    assert columns['Keyword'] == ['1080p monitor', 'ssd']
+    assert columns['Search Volume'] == [1300, None]
+
+    with pytest.raises(SEMrushAPIError):
+        parse_semrush_csv("ERROR 50 :: NOTHING FOUND")
+
+
+def test_stream_report_rows_and_columns(client):
+    rows = client.stream_report({'type': 'phrase_these', 'phrase': 'x;yy'})
+    assert [r['Keyword'] for r in rows] == ['x', 'yy']
+
+    columns = client.stream_report(
+        {'type': 'phrase_these', 'phrase': 'a;bb;ccc'}, columnar=True
+    )
+    assert columns['Search Volume'] == [10, 20, 30]
+
+
+def test_rate_limiter_waits_exactly_in_fifo_order():
+    limiter = RateLimiter(RateLimitConfig(requests_per_second=20, burst_limit=1))
+    assert limiter.acquire(timeout=1)
+
+    order = []
+
+    def worker(i):
+        if limiter.acquire(timeout=2):
+            order.append(i)
+
+    threads = []
+    for i in range(4):
+        t = threading.Thread(target=worker, args=(i,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.005)
+
+    start = time.monotonic()
+    for t in threads:
+        t.join()
+
+    assert order == [0, 1, 2, 3]
+    # 4 tokens a 20 req/s ~ 0.2s, sin polling añadido
+    assert time.monotonic() - start < 0.4
+
+
+def test_rate_limiter_shared_between_instances(tmp_path):
+    config = RateLimitConfig(
+        requests_per_second=0.5,
+        burst_limit=2,
+        shared_state_path=str(tmp_path / "rate.db")
+    )
+    first = RateLimiter(config)
+    second = RateLimiter(config)
+
+    assert first.is_shared
+    assert first.acquire(timeout=0.1)
+    assert second.acquire(timeout=0.1)
+    # La cuota es común: ninguno de los dos tiene ya tokens
+    assert not first.acquire(timeout=0.1)
+    assert not second.acquire(timeout=0.1)
+    first.close()
+    second.close()
+
+
+def test_rate_limiter_survives_locked_shared_db(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "rate.db")
+    limiter = RateLimiter(RateLimitConfig(requests_per_second=10, burst_limit=5, shared_state_path=path))
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    try:
+        # Espera al bloqueo como mucho el plazo del llamante y no lanza
+        start = time.monotonic()
+        assert limiter.acquire(timeout=0.3)
+        assert time.monotonic() - start < 1.0
+
+        # La espera por SQLite no bloquea el event loop
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            acquired = await limiter.acquire_async(timeout=0.3)
+            task.cancel()
+            return acquired, ticks
+
+        acquired, ticks = asyncio.run(run())
+        assert acquired and ticks >= 10
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        limiter.close()
+
+
+def test_rate_limiter_async_acquire():
+    limiter = RateLimiter(RateLimitConfig(requests_per_second=50, burst_limit=1))
+
+    async def run():
+        return [await limiter.acquire_async(timeout=1) for _ in range(3)]
+
+    assert asyncio.run(run()) == [True, True, True]
+
+
+def test_stale_entry_is_served_and_refreshed(client):
+    assert not client.get_keyword_overview('ssd').from_cache
+    for entry in client._cache._cache.values():
+        entry.expires_at = datetime.now() - timedelta(seconds=5)
+
+    stale = client.get_keyword_overview('ssd')
+    assert stale.success and stale.from_cache
+
+    deadline = time.monotonic() + 2
+    while client._refresher.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(client._session.requests) == 2
+    assert client._cache.get_stats()['stale_hits'] == 1
+    assert client.get_keyword_overview('ssd').from_cache
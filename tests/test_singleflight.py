@@ -0,0 +1,70 @@
+"""
+Tests de deduplicación single-flight (utils/singleflight.py)
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.singleflight import SingleFlight
+
+
+def _run_concurrently(fn, n):
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(name="test")
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'value': 42}
+
+    results, errors = _run_concurrently(lambda: flight.do('k', slow_fetch), 8)
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert errors == [None] * 8
+    assert flight.get_stats()['shared'] == 7
+    assert flight.in_flight() == 0
+
+
+def test_errors_propagate_to_all_waiters():
+    flight = SingleFlight(name="test")
+
+    def failing_fetch():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    _, errors = _run_concurrently(lambda: flight.do('k', failing_fetch), 4)
+
+    assert all(isinstance(e, ValueError) for e in errors)
+
+    # Tras el fallo la clave se libera y se puede volver a ejecutar
+    assert flight.do('k', lambda: 'ok') == 'ok'
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight(name="test")
+
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.get_stats()['executions'] == 2
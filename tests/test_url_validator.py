@@ -0,0 +1,107 @@
+"""
+Tests de utils/url_validator.py
+"""
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.dns_resolver import DNSResolver
+from utils.url_validator import ThreatType, URLStatus, URLValidator
+
+
+def test_batch_validation_is_cached_and_matches_single():
+    urls = [
+        "https://www.pccomponentes.com/monitores?b=2&a=1",
+        "data:image/png;base64,AAAA",
+        "https://example.com/a/../b",
+        "https://example.com/p/%2e%2e/x",
+        "https://example.com/s?q=<script>",
+        "https://example.com/setup.EXE",
+        "https://example.com/app.js/",
+        "http://10.0.0.1/admin",
+        "https://www.pccomponentes.com/monitores?b=2&a=1",
+    ]
+    uncached = [URLValidator(cache_size=0).validate(url).to_dict() for url in urls]
+
+    validator = URLValidator(cache_size=4)
+    results = validator.validate_batch(urls)
+
+    assert [r.to_dict() for r in results] == uncached
+    assert results[0] is results[-1]
+    assert results[0].normalized_url == "https://www.pccomponentes.com/monitores?a=1&b=2"
+    assert results[1].threat_type == ThreatType.DANGEROUS_PROTOCOL
+    assert results[4].threat_type == ThreatType.XSS
+    assert results[5].error == "Extensión de archivo peligrosa: .exe"
+    assert results[6].is_valid
+    assert results[7].status == URLStatus.PRIVATE_IP
+
+    stats = validator.get_cache_stats()
+    assert stats['size'] == 4 and stats['misses'] == 8
+    assert validator.validate(urls[-2]) is results[-2]
+    assert validator.validate(urls[0]) is not results[0]  # expulsada por LRU
+
+
+def test_batch_validation_resolves_domains_in_one_batch():
+    zone = {
+        'www.example.com': ['93.184.215.14'],
+        'intranet.example.com': ['93.184.215.15', '10.0.0.5'],
+        'local.example.com': ['127.0.0.1'],
+    }
+    lookups = []
+
+    async def lookup(host):
+        lookups.append(host)
+        if host not in zone:
+            raise OSError("Name or service not known")
+        return zone[host]
+
+    resolver = DNSResolver(lookup=lookup)
+    urls = [
+        "https://www.example.com/a",
+        "https://intranet.example.com/admin",
+        "https://local.example.com/",
+        "https://nx.example.com/",
+        "https://www.example.com/b",
+        "https://8.8.8.8/",
+    ]
+    validator = URLValidator()
+    results = validator.validate_batch(urls, resolve_dns=True, resolver=resolver)
+
+    assert sorted(lookups) == ['intranet.example.com', 'local.example.com', 'nx.example.com', 'www.example.com']
+    assert results[0].is_valid and results[0].details['resolved_ips'] == ['93.184.215.14']
+    assert results[1].status == URLStatus.PRIVATE_IP and results[1].threat_type == ThreatType.SSRF
+    assert "10.0.0.5" in results[1].error
+    assert results[2].status == URLStatus.PRIVATE_IP
+    assert results[3].status == URLStatus.UNRESOLVED
+    assert results[4].is_valid and results[5].is_valid
+    # Los resultados cacheados sin DNS no se tocan
+    assert 'resolved_ips' not in validator.validate(urls[0]).details
+
+    again = URLValidator(allow_localhost=True).validate_batch(urls[:3], resolve_dns=True, resolver=resolver)
+    assert len(lookups) == 4 and resolver.get_stats()['hits'] == 3
+    assert resolver.resolve('WWW.example.com.').addresses == ['93.184.215.14']
+    assert [r.is_valid for r in again] == [True, False, True]
+
+
+def test_dns_timeout_bounds_batch_time(monkeypatch):
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host == 'slow.example.com':
+            time.sleep(2)
+        return real_getaddrinfo('127.0.0.1', *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    resolver = DNSResolver(timeout=0.3)
+
+    start = time.perf_counter()
+    resolved = resolver.resolve_many(['slow.example.com', 'fast.example.com'])
+    elapsed = time.perf_counter() - start
+    resolver.close()
+
+    assert elapsed < 1.0
+    assert resolved['slow.example.com'].error.startswith("Timeout")
+    assert resolved['fast.example.com'].addresses == ['127.0.0.1']
@@ -87,6 +87,8 @@ def render_gsc_verification_section(
     else:
         render_no_matches(keyword)
     
+    render_keyword_topic(analysis.get('topic'))
+    
     # Guardar en session state
     st.session_state['gsc_analysis'] = analysis
     
@@ -359,6 +361,43 @@ def render_no_matches(keyword: str) -> None:
     """)
 
 
+# ============================================================================
+# TEMA DE LA KEYWORD
+# ============================================================================
+
+def render_keyword_topic(topic: Optional[dict]) -> None:
+    """
+    Muestra el tema (cluster de keywords) de la keyword y su URL dueña.
+    
+    Args:
+        topic: Dict de get_keyword_topic() o None
+    """
+    
+    if not topic:
+        return
+    
+    with st.expander(f"🧩 Tema: {topic['label']}", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Keywords del Tema", f"{topic['keywords']:,}")
+        
+        with col2:
+            st.metric("Clics del Tema", f"{topic['clicks']:,}")
+        
+        with col3:
+            st.metric("URLs Rankeando", f"{topic['pages']:,}")
+        
+        if topic['owner_url']:
+            st.markdown(
+                f"**URL dueña:** [{topic['owner_url']}]({topic['owner_url']}) "
+                f"({topic['owner_share']:.0%} de los clics del tema)"
+            )
+        
+        if topic['similarity'] < 1:
+            st.caption(f"Tema asignado por similitud ({topic['similarity']:.0%}) con una keyword del dataset.")
+
+
 # ============================================================================
 # UTILIDADES
 # ============================================================================
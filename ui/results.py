@@ -15,13 +15,22 @@ from typing import Dict, List, Tuple, Optional
 
 # Importar utilidades
 from utils.html_utils import (
-    count_words_in_html,
-    extract_content_structure,
-    validate_html_structure,
-    validate_cms_structure,
-    analyze_links
+    HTMLAnalysis,
+    analyze_html,
 )
 
+try:
+    from utils.html_diff import HTMLDiff, diff_html
+    _html_diff_available = True
+except ImportError:
+    _html_diff_available = False
+
+try:
+    from core.link_checker import check_html_links, summarize_link_statuses
+    _link_checker_available = True
+except ImportError:
+    _link_checker_available = False
+
 
 # ============================================================================
 # FUNCIÓN PRINCIPAL DE RENDERIZADO
@@ -73,6 +82,10 @@ def render_results_section(
         available_tabs.append("✅ Etapa 3: Versión Final")
         tab_contents.append(("final", final_html))
     
+    if draft_html and final_html and _html_diff_available:
+        available_tabs.append("🔀 Cambios 1 → 3")
+        tab_contents.append(("diff", (draft_html, final_html)))
+    
     # Si no hay resultados, mostrar mensaje
     if not available_tabs:
         st.info("👆 Los resultados aparecerán aquí después de iniciar la generación.")
@@ -98,6 +111,9 @@ def render_results_section(
             elif tab_type == "analysis":
                 # Tab de análisis JSON
                 render_analysis_tab(content, mode)
+            elif tab_type == "diff":
+                # Qué cambió del borrador a la versión final
+                render_html_diff(*content, before_label="Borrador", after_label="Versión final")
 
 
 # ============================================================================
@@ -129,18 +145,21 @@ def render_content_tab(
         is_final: Si es True, aplica validaciones más estrictas
         
     Notes:
-        - Usa validate_cms_structure() para validación completa
+        - Analiza el HTML una sola vez con analyze_html() (word count,
+          validación CMS, flags, enlaces y estructura)
         - Muestra errores críticos en rojo, warnings en amarillo
         - Calcula precisión de word count vs objetivo
     """
     
     st.markdown(f"### {stage_name} (Etapa {stage_number}/3)")
     
+    analysis = analyze_html(html_content)
+    
     # Métricas principales
     col1, col2, col3, col4 = st.columns(4)
     
     # Contar palabras
-    word_count = count_words_in_html(html_content)
+    word_count = analysis.word_count
     
     with col1:
         st.metric("📝 Palabras", f"{word_count:,}")
@@ -180,7 +199,7 @@ def render_content_tab(
     st.markdown("---")
     st.markdown("#### 🔍 Validación de Estructura CMS")
     
-    is_valid, errors, warnings = validate_cms_structure(html_content)
+    is_valid, errors, warnings = analysis.cms_result()
     
     # Mostrar estado general
     if is_valid and not warnings:
@@ -206,7 +225,7 @@ def render_content_tab(
                 st.markdown(f"**{i}.** {warning}")
     
     # Validación básica adicional
-    basic_validation = validate_html_structure(html_content)
+    basic_validation = analysis.flags
     
     validation_cols = st.columns(3)
     
@@ -224,7 +243,7 @@ def render_content_tab(
     
     with validation_cols[2]:
         st.markdown("**Análisis de enlaces:**")
-        links_analysis = analyze_links(html_content)
+        links_analysis = analysis.link_summary()
         
         internal_count = links_analysis.get('internal_links_count', 0)
         external_count = links_analysis.get('external_links_count', 0)
@@ -254,6 +273,9 @@ def render_content_tab(
             else:
                 st.markdown(f"❌ **{elem_name}**")
     
+    if _link_checker_available and analysis.links:
+        render_link_check(html_content, stage_number)
+    
     # Botones de acción
     st.markdown("---")
     action_cols = st.columns([2, 1, 1])
@@ -329,7 +351,7 @@ th{background:var(--gray-100);font-weight:600;}
             st.markdown(clean_html, unsafe_allow_html=True)
     
     with preview_tab2:
-        render_structure_analysis(html_content)
+        render_structure_analysis(html_content, analysis)
 
 
 # ============================================================================
@@ -534,7 +556,7 @@ def render_analysis_tab(analysis_json: str, mode: str = "new") -> None:
 # ANÁLISIS DE ESTRUCTURA HTML
 # ============================================================================
 
-def render_structure_analysis(html_content: str) -> None:
+def render_structure_analysis(html_content: str, analysis: Optional[HTMLAnalysis] = None) -> None:
     """
     Renderiza un análisis detallado de la estructura del contenido HTML.
     
@@ -546,9 +568,10 @@ def render_structure_analysis(html_content: str) -> None:
     
     Args:
         html_content: Contenido HTML a analizar
+        analysis: Análisis ya calculado de html_content (opcional)
         
     Notes:
-        - Usa extract_content_structure() para obtener la estructura
+        - Usa HTMLAnalysis.structure() (lo mismo que extract_content_structure())
         - Muestra visualización jerárquica de headings
         - Identifica elementos clave del CMS
     """
@@ -557,7 +580,9 @@ def render_structure_analysis(html_content: str) -> None:
     
     # Extraer estructura
     try:
-        structure = extract_content_structure(html_content)
+        if analysis is None:
+            analysis = analyze_html(html_content)
+        structure = analysis.structure()
     except Exception as e:
         st.error(f"❌ Error al extraer estructura: {str(e)}")
         return
@@ -633,6 +658,99 @@ def render_structure_analysis(html_content: str) -> None:
         render_validation_check("Grid Layout", structure.get('has_grid', False))
 
 
+# ============================================================================
+# RENDERIZADO DE DIFERENCIAS ENTRE VERSIONES
+# ============================================================================
+
+# Palabras sin cambios que se muestran a cada lado de un cambio
+DIFF_CONTEXT_WORDS = 8
+
+# Caracteres máximos de un bloque añadido o eliminado
+DIFF_BLOCK_MAX_CHARS = 300
+
+
+def _shorten(text: str, limit: int = DIFF_BLOCK_MAX_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit].rsplit(' ', 1)[0] + " …"
+
+
+def _inline_word_diff(change) -> str:
+    """Markdown de un bloque modificado: ~~eliminado~~ **añadido**, con contexto recortado."""
+    parts = []
+    ops = change.word_diff()
+    for i, (op, text) in enumerate(ops):
+        if op == '-':
+            parts.append(f"~~{text}~~")
+        elif op == '+':
+            parts.append(f"**{text}**")
+        else:
+            words = text.split()
+            keep_start = DIFF_CONTEXT_WORDS if i > 0 else 0
+            keep_end = DIFF_CONTEXT_WORDS if i < len(ops) - 1 else 0
+            if len(words) > keep_start + keep_end + 3:
+                text = " ".join(
+                    words[:keep_start] + ["…"] + (words[-keep_end:] if keep_end else [])
+                )
+            parts.append(text)
+    return " ".join(parts)
+
+
+def render_html_diff(
+    before: str,
+    after: str,
+    before_label: str = "Antes",
+    after_label: str = "Después",
+    diff: Optional['HTMLDiff'] = None
+) -> None:
+    """
+    Renderiza qué ha cambiado entre dos versiones del HTML.
+    
+    Los cambios se agrupan por sección (encabezado) y se muestran por
+    bloque: añadidos, eliminados y modificados (palabra a palabra).
+    
+    Args:
+        before: HTML de la versión anterior
+        after: HTML de la versión nueva
+        before_label: Nombre de la versión anterior
+        after_label: Nombre de la versión nueva
+        diff: HTMLDiff ya calculado (opcional)
+    """
+    if not _html_diff_available:
+        st.info("Comparación de versiones no disponible")
+        return
+    
+    diff = diff or diff_html(before, after)
+    summary = diff.summary()
+    
+    cols = st.columns(4)
+    cols[0].metric("➕ Añadidos", summary['added'])
+    cols[1].metric("➖ Eliminados", summary['removed'])
+    cols[2].metric("✏️ Modificados", summary['modified'])
+    cols[3].metric(
+        f"📝 Palabras ({after_label})",
+        f"{summary['words_after']:,}",
+        f"{summary['words_after'] - summary['words_before']:+,} vs {before_label}"
+    )
+    
+    if not diff.changed:
+        st.info(f"Sin cambios de contenido entre {before_label} y {after_label}")
+        return
+    
+    if diff.css_changed:
+        st.caption("🎨 También cambian los estilos (<style>)")
+    
+    for section in diff.sections:
+        st.markdown(f"**§ {section or 'Inicio'}**")
+        for change in diff.changes:
+            if change.section != section:
+                continue
+            if change.kind == 'added':
+                st.markdown(f"➕ `{change.tag or 'texto'}` {_shorten(change.new_text)}")
+            elif change.kind == 'removed':
+                st.markdown(f"➖ `{change.tag or 'texto'}` ~~{_shorten(change.old_text)}~~")
+            else:
+                st.markdown(f"✏️ `{change.tag or 'texto'}` {_inline_word_diff(change)}")
+
+
 # ============================================================================
 # COMPONENTES DE UI AUXILIARES
 # ============================================================================
@@ -654,6 +772,49 @@ def render_validation_check(label: str, is_valid: bool) -> None:
     st.markdown(f":{color}[{icon}] {label}")
 
 
+def render_link_check(html_content: str, stage_number: int) -> None:
+    """
+    Botón para comprobar los enlaces del contenido y su resultado.
+    
+    El resultado se guarda en session_state junto al HTML comprobado, así
+    que sobrevive a los reruns mientras el contenido no cambie.
+    
+    Args:
+        html_content: HTML cuyos enlaces comprobar
+        stage_number: Número de etapa (para las keys de Streamlit)
+    """
+    state_key = f'link_check_{stage_number}'
+    
+    if st.button("🔗 Comprobar enlaces", key=f"check_links_{stage_number}"):
+        with st.spinner("Comprobando enlaces..."):
+            st.session_state[state_key] = (html_content, check_html_links(html_content))
+    
+    checked = st.session_state.get(state_key)
+    if not checked or checked[0] != html_content:
+        return
+    
+    results = checked[1]
+    summary = summarize_link_statuses(results)
+    
+    if not summary['total']:
+        st.info("ℹ️ No hay enlaces que comprobar (solo anclas internas, mailto: o tel:)")
+        return
+    
+    if summary['broken']:
+        st.error(f"❌ {summary['broken']} de {summary['total']} enlace(s) no responden correctamente")
+    else:
+        st.success(f"✅ Los {summary['total']} enlaces responden ({summary['redirected']} con redirección)")
+    
+    with st.expander("🔗 Estado de los enlaces", expanded=summary['broken'] > 0):
+        for result in results:
+            icon = "✅" if result['ok'] else "❌"
+            status = result['error'] or result['status_code']
+            line = f"{icon} `{status}` [{result['anchor'] or result['url']}]({result['url']}) · {result['latency_ms']:.0f} ms"
+            if result['redirected']:
+                line += f" → {result['final_url']}"
+            st.markdown(line)
+
+
 def render_problem_card(problema: Dict, index: int) -> None:
     """
     Renderiza una tarjeta con información de un problema identificado.
@@ -1,8 +1,17 @@
 """
 Sidebar de la aplicación
 """
+import uuid
+
 import streamlit as st
 
+try:
+    from core.semrush import get_semrush_client, is_semrush_available
+    _semrush_available = True
+except ImportError:
+    _semrush_available = False
+
+
 def render_sidebar():
     """Renderiza el sidebar con información de la app"""
     with st.sidebar:
@@ -25,7 +34,43 @@ def render_sidebar():
         for feature in features:
             st.markdown(f"✅ {feature}")
         
+        render_semrush_units()
+        
         st.markdown("---")
         st.markdown("### Info")
         st.markdown("Versión 4.1")
         st.markdown("© 2025 PcComponentes")
+
+
+def render_semrush_units():
+    """Muestra el consumo de unidades SEMrush de hoy y de esta sesión"""
+    if not _semrush_available or not is_semrush_available():
+        return
+    
+    client = get_semrush_client()
+    
+    # Imputar las unidades de este rerun a la sesión del usuario
+    if 'semrush_unit_session' not in st.session_state:
+        st.session_state.semrush_unit_session = uuid.uuid4().hex[:12]
+    client.set_unit_session(st.session_state.semrush_unit_session)
+    
+    usage = client.get_unit_usage()
+    
+    st.markdown("---")
+    st.markdown("### Unidades SEMrush")
+    
+    col1, col2 = st.columns(2)
+    daily = usage['daily_budget']
+    col1.metric("Hoy", f"{usage['today']:,}" + (f" / {daily:,}" if daily else ""))
+    col2.metric("Sesión", f"{usage['session']:,}")
+    
+    if usage['remaining'] is not None:
+        st.caption(f"Quedan {usage['remaining']:,} unidades de presupuesto")
+    
+    if usage['by_report_type']:
+        with st.expander("Por tipo de informe"):
+            for report_type, data in sorted(usage['by_report_type'].items()):
+                st.markdown(
+                    f"- `{report_type}`: {data['units']:,} uds "
+                    f"({data['requests']} peticiones)"
+                )
@@ -23,6 +23,9 @@ try:
         is_bs4_available,
         # Data classes
         ExtractedContent,
+        # Análisis
+        HTMLAnalysis,
+        analyze_html,
         # Conteo
         count_words_in_html,
         get_word_count,
@@ -36,6 +39,9 @@ try:
         # Limpieza
         sanitize_html,
         clean_html,
+        # Compactación para prompts
+        CompactHTML,
+        compact_html,
         # Validación
         validate_html_structure,
         validate_cms_structure,
@@ -56,6 +62,8 @@ except ImportError as e:
     def get_bs4_parser(): return 'html.parser'
     def is_bs4_available(): return False
     class ExtractedContent: pass
+    class HTMLAnalysis: pass
+    def analyze_html(html): return HTMLAnalysis()
     def count_words_in_html(html): return 0
     def get_word_count(html): return 0
     def strip_html_tags(html): return html
@@ -66,6 +74,8 @@ except ImportError as e:
     def extract_meta_tags(html): return {}
     def sanitize_html(html): return html
     def clean_html(html): return html
+    class CompactHTML: pass
+    def compact_html(html): return CompactHTML()
     def validate_html_structure(html): return {}
     def validate_cms_structure(html): return True, [], []
     def validate_word_count_target(html, target, tol=0.05): return {}
@@ -132,6 +142,9 @@ __all__ = [
     'is_bs4_available',
     # HTML utils - Data classes
     'ExtractedContent',
+    # HTML utils - Análisis
+    'HTMLAnalysis',
+    'analyze_html',
     # HTML utils - Conteo
     'count_words_in_html',
     'get_word_count',
@@ -145,6 +158,9 @@ __all__ = [
     # HTML utils - Limpieza
     'sanitize_html',
     'clean_html',
+    # HTML utils - Compactación
+    'CompactHTML',
+    'compact_html',
     # HTML utils - Validación
     'validate_html_structure',
     'validate_cms_structure',
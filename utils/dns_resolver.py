@@ -0,0 +1,326 @@
+"""
+DNS Resolver - PcComponentes Content Generator
+Versión 4.6.0
+
+Resolución DNS asíncrona y cacheada para la validación de URLs.
+
+URLValidator solo detecta IPs privadas cuando la URL las lleva escritas;
+un dominio que resuelve a 10.x o 127.x pasa. Resolver cada URL de forma
+bloqueante antes de usarla sumaría una latencia por host, así que:
+
+- Los hosts de un lote se resuelven a la vez (asyncio, getaddrinfo en un
+  pool de hilos propio) con un timeout por host que acota lo que tarda el
+  lote: un host colgado no lo retiene (su hilo termina por su cuenta)
+- Las respuestas se cachean con TTL (más corto para los fallos) y se
+  comparten entre lotes y sesiones
+- Las direcciones obtenidas se pueden pasar al scraper para conectar
+  directamente a la IP ya validada (sin segunda resolución, y sin que un
+  cambio de DNS entre validar y descargar cuele otra IP)
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import asyncio
+import functools
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Segundos que vale una resolución correcta y una fallida
+DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', '300'))
+DNS_NEGATIVE_TTL = int(os.getenv('DNS_NEGATIVE_TTL', '60'))
+
+# Timeout por host (segundos)
+DNS_TIMEOUT = float(os.getenv('DNS_TIMEOUT', '3.0'))
+
+# Hosts en caché
+DNS_CACHE_SIZE = 4096
+
+# Hilos para getaddrinfo (bloqueante)
+DNS_MAX_WORKERS = 16
+
+# Función de resolución: host -> lista de IPs
+Lookup = Callable[[str], Awaitable[List[str]]]
+
+
+# ============================================================================
+# DATA CLASSES
+# ============================================================================
+
+@dataclass
+class ResolvedHost:
+    """Resultado de resolver un host."""
+    host: str
+    addresses: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.addresses)
+
+    @property
+    def address(self) -> Optional[str]:
+        """Primera dirección (la que usaría una conexión)."""
+        return self.addresses[0] if self.addresses else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'host': self.host,
+            'addresses': list(self.addresses),
+            'error': self.error,
+            'cached': self.cached,
+            'ok': self.ok,
+        }
+
+
+# ============================================================================
+# RESOLUCIÓN
+# ============================================================================
+
+def normalize_host(host: str) -> str:
+    """Clave de un host en resultados y caché: minúsculas, sin punto final."""
+    return host.lower().rstrip('.')
+
+
+def _ip_literal(host: str) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address(host.strip('[]')))
+    except ValueError:
+        return None
+
+
+class DNSResolver:
+    """
+    Resolver DNS por lotes con caché TTL.
+
+    Example:
+        >>> resolver = DNSResolver()
+        >>> resolved = resolver.resolve_many(['www.pccomponentes.com', 'example.com'])
+        >>> resolved['example.com'].addresses
+        ['93.184.215.14', ...]
+    """
+
+    def __init__(
+        self,
+        ttl: int = DNS_CACHE_TTL,
+        negative_ttl: int = DNS_NEGATIVE_TTL,
+        timeout: float = DNS_TIMEOUT,
+        max_size: int = DNS_CACHE_SIZE,
+        lookup: Optional[Lookup] = None
+    ):
+        """
+        Inicializa el resolver.
+
+        Args:
+            ttl: Segundos que vale una resolución correcta
+            negative_ttl: Segundos que vale un fallo
+            timeout: Timeout por host en segundos
+            max_size: Máximo de hosts en caché
+            lookup: Corrutina host -> IPs (por defecto getaddrinfo del sistema)
+        """
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._timeout = timeout
+        self._max_size = max(1, max_size)
+        self._lookup = lookup or self._getaddrinfo
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'lookups': 0, 'errors': 0}
+
+    # ------------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------------
+
+    def resolve(self, host: str) -> ResolvedHost:
+        """Resuelve un host (o lo sirve de caché)."""
+        return self.resolve_many([host])[normalize_host(host)]
+
+    def resolve_many(self, hosts: Iterable[str]) -> Dict[str, ResolvedHost]:
+        """
+        Resuelve varios hosts a la vez.
+
+        Se puede llamar desde código síncrono; si el hilo ya tiene un loop
+        de asyncio en marcha, el lote se resuelve en un hilo aparte.
+
+        Args:
+            hosts: Nombres de host (o IPs, que se devuelven tal cual)
+
+        Returns:
+            Dict normalize_host(host) -> ResolvedHost
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.resolve_many_async(hosts))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.resolve_many_async(hosts)).result()
+
+    async def resolve_many_async(self, hosts: Iterable[str]) -> Dict[str, ResolvedHost]:
+        """Versión asíncrona de resolve_many."""
+        results: Dict[str, ResolvedHost] = {}
+        pending: List[str] = []
+
+        for host in dict.fromkeys(normalize_host(h) for h in hosts if h):
+            literal = _ip_literal(host)
+            if literal is not None:
+                results[host] = ResolvedHost(host, [literal])
+                continue
+            cached = self._cached(host)
+            if cached is not None:
+                results[host] = cached
+            else:
+                pending.append(host)
+
+        if pending:
+            resolved = await asyncio.gather(*(self._resolve_one(host) for host in pending))
+            for host, result in zip(pending, resolved):
+                self._store(result)
+                results[host] = result
+
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        """Estadísticas del resolver."""
+        with self._lock:
+            return {**self._stats, 'size': len(self._cache)}
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """Cierra el pool de hilos (sin esperar a búsquedas colgadas)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------------
+    # INTERNOS
+    # ------------------------------------------------------------------------
+
+    async def _getaddrinfo(self, host: str) -> List[str]:
+        """IPs de host según el resolver del sistema, sin duplicados y en orden."""
+        # No se usa el executor por defecto del loop: asyncio.run espera a
+        # que terminen sus hilos, y un getaddrinfo colgado alargaría el lote
+        # más allá del timeout
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=DNS_MAX_WORKERS, thread_name_prefix="dns-resolver"
+                )
+            executor = self._executor
+        infos = await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(socket.getaddrinfo, host, None, type=socket.SOCK_STREAM)
+        )
+        # Las IPv6 link-local llevan el scope (fe80::1%eth0)
+        return list(dict.fromkeys(info[4][0].split('%', 1)[0] for info in infos))
+
+    async def _resolve_one(self, host: str) -> ResolvedHost:
+        with self._lock:
+            self._stats['lookups'] += 1
+        try:
+            addresses = await asyncio.wait_for(self._lookup(host), self._timeout)
+        except asyncio.TimeoutError:
+            return self._failed(host, f"Timeout resolviendo {host}")
+        except (OSError, UnicodeError) as e:
+            return self._failed(host, f"No se pudo resolver {host}: {e}")
+
+        if not addresses:
+            return self._failed(host, f"{host} no tiene direcciones")
+        return ResolvedHost(host, list(addresses))
+
+    def _failed(self, host: str, error: str) -> ResolvedHost:
+        with self._lock:
+            self._stats['errors'] += 1
+        logger.debug(error)
+        return ResolvedHost(host, error=error)
+
+    def _cached(self, host: str) -> Optional[ResolvedHost]:
+        with self._lock:
+            entry = self._cache.get(host)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._cache[host]
+                return None
+            self._cache.move_to_end(host)
+            self._stats['hits'] += 1
+        return ResolvedHost(result.host, list(result.addresses), result.error, cached=True)
+
+    def _store(self, result: ResolvedHost) -> None:
+        ttl = self._ttl if result.ok else self._negative_ttl
+        with self._lock:
+            self._cache[result.host] = (time.monotonic() + ttl, result)
+            self._cache.move_to_end(result.host)
+            while len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+
+
+# ============================================================================
+# INSTANCIA GLOBAL
+# ============================================================================
+
+_default_resolver: Optional[DNSResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_dns_resolver(**kwargs) -> DNSResolver:
+    """
+    Obtiene el resolver global (y su caché).
+
+    Args:
+        **kwargs: Argumentos para DNSResolver (solo al crearlo)
+    """
+    global _default_resolver
+    with _resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = DNSResolver(**kwargs)
+        return _default_resolver
+
+
+def reset_dns_resolver() -> None:
+    """Cierra y descarta el resolver global."""
+    global _default_resolver
+    with _resolver_lock:
+        if _default_resolver is not None:
+            _default_resolver.close()
+        _default_resolver = None
+
+
+def resolve_hosts(hosts: Iterable[str]) -> Dict[str, ResolvedHost]:
+    """Resuelve hosts con el resolver global."""
+    return get_dns_resolver().resolve_many(hosts)
+
+
+__all__ = [
+    '__version__',
+    'DNS_CACHE_TTL',
+    'DNS_NEGATIVE_TTL',
+    'DNS_TIMEOUT',
+    'ResolvedHost',
+    'normalize_host',
+    'DNSResolver',
+    'get_dns_resolver',
+    'reset_dns_resolver',
+    'resolve_hosts',
+]
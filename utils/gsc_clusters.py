@@ -0,0 +1,526 @@
+"""
+GSC Clusters - PcComponentes Content Generator
+Versión 4.6.0
+
+Agrupación offline de las búsquedas de GSC en temas.
+
+Cada keyword distinta (por forma normalizada, ver spanish_text) se
+resume con una firma MinHash de sus trigramas y palabras. Las firmas se
+reparten en bandas (LSH): dos keywords solo se comparan si coinciden en
+alguna banda. El agrupamiento es por líderes: en orden de impresiones,
+cada keyword se une al tema del líder más parecido que encuentre el LSH
+o abre uno nuevo, así que no hay cadenas de temas que se van uniendo.
+
+Por tema se guardan los totales de tráfico y la URL dueña (la que más
+clics se lleva). El resultado se persiste junto al CSV, en
+`<csv>.topics/`, con la misma huella que el snapshot binario, y
+consultar el tema de una keyword pasa a ser una búsqueda en índice.
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.spanish_text import FUZZY_MIN_SIMILARITY, char_trigrams
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# IMPORTS CON MANEJO DE ERRORES
+# ============================================================================
+
+try:
+    import numpy as np
+    from utils.gsc_dataset import GSCDataset
+    from utils.gsc_snapshot import is_snapshot_available
+    _clusters_available = True
+except ImportError:
+    _clusters_available = False
+
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Se incrementa si cambia el formato en disco o el algoritmo
+TOPICS_FORMAT_VERSION = 1
+
+TOPICS_SUFFIX = '.topics'
+MANIFEST_FILE = 'manifest.json'
+
+# Firmas de TOPIC_NUM_PERM hashes en TOPIC_BANDS bandas: con 16 bandas de
+# 4 filas, dos keywords con Jaccard 0.5 coinciden en alguna banda el 65%
+# de las veces y con 0.7 el 98%
+TOPIC_NUM_PERM = 64
+TOPIC_BANDS = 16
+
+# Fracción de la firma que debe coincidir con el líder para entrar en su tema
+TOPIC_MIN_SIMILARITY = 0.5
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_HASH_SEED = 4242
+
+
+def is_clustering_available() -> bool:
+    """Indica si se pueden calcular temas (requiere NumPy)."""
+    return _clusters_available
+
+
+def topics_path(source: Path) -> Path:
+    """Directorio con los temas persistidos de un CSV."""
+    source = Path(source)
+    return source.with_name(source.name + TOPICS_SUFFIX)
+
+
+# ============================================================================
+# DATACLASSES
+# ============================================================================
+
+@dataclass
+class Topic:
+    """Tema: keywords parecidas con sus totales y su URL dueña."""
+    topic_id: int
+    label: str
+    keywords: int
+    clicks: int
+    impressions: int
+    pages: int
+    owner_url: str
+    owner_clicks: int
+    owner_share: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ============================================================================
+# MINHASH + LSH
+# ============================================================================
+
+def _shingles(form: str) -> List[str]:
+    """Trigramas de caracteres y palabras (marcadas con #) de una forma."""
+    return char_trigrams(form) + ['#' + token for token in form.split()]
+
+
+def _minhash_signatures(forms: List[str], num_perm: int) -> 'np.ndarray':
+    """
+    Firmas MinHash (una fila por forma no vacía) de los shingles.
+
+    Los hashes son deterministas (crc32 y una semilla fija) para que
+    los temas no cambien entre procesos con los mismos datos.
+    """
+    shingle_hash: Dict[str, int] = {}
+    hashes: List[int] = []
+    offsets = np.zeros(len(forms) + 1, dtype=np.int64)
+
+    for i, form in enumerate(forms):
+        for shingle in set(_shingles(form)):
+            value = shingle_hash.get(shingle)
+            if value is None:
+                value = shingle_hash[shingle] = zlib.crc32(shingle.encode('utf-8')) % _MERSENNE_PRIME
+            hashes.append(value)
+        offsets[i + 1] = len(hashes)
+
+    values = np.asarray(hashes, dtype=np.int64)
+    rng = np.random.default_rng(_HASH_SEED)
+    a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+    signatures = np.empty((len(forms), num_perm), dtype=np.uint32)
+    for p in range(num_perm):
+        permuted = (a[p] * values + b[p]) % _MERSENNE_PRIME
+        signatures[:, p] = np.minimum.reduceat(permuted, offsets[:-1])
+    return signatures
+
+
+def _band_keys(signatures: 'np.ndarray', bands: int) -> 'np.ndarray':
+    """Clave de cada banda de cada firma (forma x banda)."""
+    rows = signatures.shape[1] // bands
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for r in range(rows):
+            column = signatures[:, r::rows][:, :bands].astype(np.uint64)
+            keys = keys * np.uint64(1000003) ^ column
+    return keys
+
+
+def _leader_clusters(
+    signatures: 'np.ndarray',
+    order: 'np.ndarray',
+    bands: int,
+    min_similarity: float
+) -> 'np.ndarray':
+    """
+    Tema de cada firma, recorriéndolas en el orden dado.
+
+    Solo los líderes se registran en los buckets del LSH: cada firma se
+    compara con los líderes con los que comparte banda y entra en el tema
+    del más parecido si llega al mínimo; si no, abre un tema nuevo.
+    """
+    topic_of = np.full(len(signatures), -1, dtype=np.int32)
+    leader_topic: Dict[int, int] = {}
+    buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+    keys = _band_keys(signatures, bands).tolist()
+
+    for i in order.tolist():
+        candidates = set()
+        for band, key in enumerate(keys[i]):
+            leaders = buckets[band].get(key)
+            if leaders:
+                candidates.update(leaders)
+
+        if candidates:
+            leaders = np.fromiter(sorted(candidates), dtype=np.int64, count=len(candidates))
+            agreement = (signatures[leaders] == signatures[i]).mean(axis=1)
+            best = int(np.argmax(agreement))
+            if agreement[best] >= min_similarity:
+                topic_of[i] = leader_topic[int(leaders[best])]
+                continue
+
+        topic_of[i] = leader_topic[i] = len(leader_topic)
+        for band, key in enumerate(keys[i]):
+            buckets[band].setdefault(key, []).append(i)
+
+    return topic_of
+
+
+# ============================================================================
+# CLASE PRINCIPAL: TopicClusters
+# ============================================================================
+
+class TopicClusters:
+    """
+    Temas de las keywords de un GSCDataset.
+
+    Example:
+        >>> clusters = build_topic_clusters(dataset)
+        >>> topic, similarity = clusters.find('portatiles gaming')
+        >>> topic.owner_url
+        'https://www.pccomponentes.com/portatiles-gaming'
+    """
+
+    def __init__(self, code_topic: 'np.ndarray', topics: List[Topic], queries: Any = None):
+        """
+        Args:
+            code_topic: Tema de cada valor único de la columna de búsqueda
+                (-1 si no tiene: keywords sin letras ni números)
+            topics: Temas, en orden de id
+            queries: Columna categórica de búsqueda del dataset (para find)
+        """
+        self.code_topic = code_topic
+        self.topics = topics
+        self._queries = queries
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def topic(self, topic_id: int) -> Topic:
+        """Tema por id."""
+        return self.topics[topic_id]
+
+    def topic_of_code(self, code: int) -> Optional[Topic]:
+        """Tema de un valor único de la columna de búsqueda."""
+        topic_id = int(self.code_topic[code])
+        return self.topics[topic_id] if topic_id >= 0 else None
+
+    def find(
+        self,
+        keyword: str,
+        min_similarity: float = FUZZY_MIN_SIMILARITY
+    ) -> Optional[Tuple[Topic, float]]:
+        """
+        Tema de una keyword, esté o no en los datos.
+
+        Si la keyword está tal cual, su tema; si no, el de la keyword más
+        parecida del índice de trigramas (ver FuzzyIndex).
+
+        Returns:
+            (tema, similitud de la keyword usada) o None
+        """
+        if self._queries is None or not keyword or not keyword.strip():
+            return None
+
+        for code in self._queries.index().exact(keyword.strip().lower()).tolist():
+            topic = self.topic_of_code(code)
+            if topic is not None:
+                return topic, 1.0
+
+        ids, similarity, coverage = self._queries.fuzzy_index().similar(keyword, min_similarity)
+        if not len(ids):
+            return None
+
+        # Más parecida primero; a igualdad, la que más cubre la búsqueda
+        for i in np.lexsort((-coverage, -similarity)).tolist():
+            topic = self.topic_of_code(int(ids[i]))
+            if topic is not None:
+                return topic, float(similarity[i])
+        return None
+
+    def top(self, limit: int = 10) -> List[Topic]:
+        """Temas con más clics."""
+        return sorted(self.topics, key=lambda t: (t.clicks, t.impressions), reverse=True)[:limit]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'topics': len(self.topics),
+            'keywords': int((self.code_topic >= 0).sum()),
+            'unassigned': int((self.code_topic < 0).sum()),
+        }
+
+    def __repr__(self) -> str:
+        return f"TopicClusters(topics={len(self.topics)}, keywords={len(self.code_topic)})"
+
+
+def build_topic_clusters(
+    dataset: 'GSCDataset',
+    min_similarity: float = TOPIC_MIN_SIMILARITY,
+    num_perm: int = TOPIC_NUM_PERM,
+    bands: int = TOPIC_BANDS
+) -> Optional[TopicClusters]:
+    """
+    Agrupa las keywords de un dataset en temas.
+
+    Args:
+        dataset: Datos GSC (export o gsc_keywords.csv)
+        min_similarity: Similitud MinHash mínima con el líder del tema
+        num_perm: Hashes por firma
+        bands: Bandas del LSH (num_perm debe ser múltiplo)
+
+    Returns:
+        TopicClusters o None si el dataset no tiene columna de búsqueda
+    """
+    queries = dataset.queries
+    if queries is None:
+        return None
+    if num_perm % bands:
+        raise ValueError("num_perm debe ser múltiplo de bands")
+
+    n_codes = len(queries.categories)
+    clicks = dataset.metric('clicks') if dataset.has_column('clicks') else np.zeros(len(dataset))
+    impressions = dataset.metric('impressions') if dataset.has_column('impressions') else np.zeros(len(dataset))
+    code_clicks = np.bincount(queries.codes, weights=clicks, minlength=n_codes)
+    code_impressions = np.bincount(queries.codes, weights=impressions, minlength=n_codes)
+
+    # Se agrupan formas normalizadas, no valores: las variantes ya comparten forma
+    fuzzy = queries.fuzzy_index()
+    string_forms = fuzzy.string_forms
+    form_impressions = np.bincount(string_forms, weights=code_impressions, minlength=len(fuzzy.forms))
+    non_empty = np.flatnonzero([bool(form) for form in fuzzy.forms])
+
+    form_topic = np.full(len(fuzzy.forms), -1, dtype=np.int32)
+    if len(non_empty):
+        signatures = _minhash_signatures([fuzzy.forms[f] for f in non_empty.tolist()], num_perm)
+        order = np.lexsort((non_empty, -form_impressions[non_empty]))
+        form_topic[non_empty] = _leader_clusters(signatures, order, bands, min_similarity)
+
+    code_topic = form_topic[string_forms] if n_codes else np.empty(0, dtype=np.int32)
+    topics = _topic_table(dataset, code_topic, code_clicks, code_impressions, clicks, impressions)
+    return TopicClusters(code_topic, topics, queries)
+
+
+def _topic_table(
+    dataset: 'GSCDataset',
+    code_topic: 'np.ndarray',
+    code_clicks: 'np.ndarray',
+    code_impressions: 'np.ndarray',
+    clicks: 'np.ndarray',
+    impressions: 'np.ndarray'
+) -> List[Topic]:
+    """Totales, etiqueta y URL dueña de cada tema."""
+    queries = dataset.queries
+    n_topics = int(code_topic.max()) + 1 if len(code_topic) else 0
+    if n_topics == 0:
+        return []
+
+    assigned = np.flatnonzero(code_topic >= 0)
+    topic_keywords = np.bincount(code_topic[assigned], minlength=n_topics)
+    topic_clicks = np.bincount(code_topic[assigned], weights=code_clicks[assigned], minlength=n_topics)
+    topic_impressions = np.bincount(code_topic[assigned], weights=code_impressions[assigned], minlength=n_topics)
+
+    # Etiqueta: la keyword con más impresiones (la última de cada tema al ordenar)
+    order = assigned[np.lexsort((code_clicks[assigned], code_impressions[assigned], code_topic[assigned]))]
+    last = np.r_[code_topic[order][1:] != code_topic[order][:-1], True]
+    label_code = np.empty(n_topics, dtype=np.int64)
+    label_code[code_topic[order[last]]] = order[last]
+
+    owner_url = [''] * n_topics
+    owner_clicks = np.zeros(n_topics)
+    owner_impressions = np.zeros(n_topics)
+    topic_pages = np.zeros(n_topics, dtype=np.int64)
+
+    pages = dataset.pages
+    if pages is not None and len(dataset):
+        row_topic = code_topic[queries.codes]
+        rows = np.flatnonzero(row_topic >= 0)
+        n_pages = max(len(pages.categories), 1)
+        pair_keys, inverse = np.unique(
+            row_topic[rows].astype(np.int64) * n_pages + pages.codes[rows], return_inverse=True
+        )
+        pair_clicks = np.bincount(inverse, weights=clicks[rows], minlength=len(pair_keys))
+        pair_impressions = np.bincount(inverse, weights=impressions[rows], minlength=len(pair_keys))
+        pair_topic = pair_keys // n_pages
+        topic_pages = np.bincount(pair_topic, minlength=n_topics)
+
+        # Dueña: más clics y, a igualdad, más impresiones
+        order = np.lexsort((pair_impressions, pair_clicks, pair_topic))
+        last = np.r_[pair_topic[order][1:] != pair_topic[order][:-1], True]
+        for pair in order[last].tolist():
+            topic_id = int(pair_topic[pair])
+            owner_url[topic_id] = pages.categories[int(pair_keys[pair] % n_pages)]
+            owner_clicks[topic_id] = pair_clicks[pair]
+            owner_impressions[topic_id] = pair_impressions[pair]
+
+    topics = []
+    for topic_id in range(n_topics):
+        total_clicks = topic_clicks[topic_id]
+        if total_clicks > 0:
+            share = owner_clicks[topic_id] / total_clicks
+        elif topic_impressions[topic_id] > 0:
+            share = owner_impressions[topic_id] / topic_impressions[topic_id]
+        else:
+            share = 0.0
+        topics.append(Topic(
+            topic_id=topic_id,
+            label=queries.categories[int(label_code[topic_id])],
+            keywords=int(topic_keywords[topic_id]),
+            clicks=int(round(total_clicks)),
+            impressions=int(round(topic_impressions[topic_id])),
+            pages=int(topic_pages[topic_id]),
+            owner_url=owner_url[topic_id],
+            owner_clicks=int(round(owner_clicks[topic_id])),
+            owner_share=round(float(share), 4),
+        ))
+    return topics
+
+
+# ============================================================================
+# PERSISTENCIA
+# ============================================================================
+
+def _params() -> Dict[str, Any]:
+    return {
+        'num_perm': TOPIC_NUM_PERM,
+        'bands': TOPIC_BANDS,
+        'min_similarity': TOPIC_MIN_SIMILARITY,
+    }
+
+
+def save_topic_clusters(
+    source: Path,
+    clusters: TopicClusters,
+    fingerprint: Dict[str, Any]
+) -> bool:
+    """
+    Guarda los temas de un CSV (reemplazando los anteriores).
+
+    Args:
+        source: CSV de origen
+        clusters: Temas calculados
+        fingerprint: Huella del CSV (ver gsc_snapshot.file_fingerprint)
+
+    Returns:
+        True si se guardaron; False si no se pudo (el error solo se registra)
+    """
+    if not _clusters_available or not is_snapshot_available():
+        return False
+
+    target = topics_path(source)
+    manifest = {
+        'format_version': TOPICS_FORMAT_VERSION,
+        'source': Path(source).name,
+        'fingerprint': fingerprint,
+        'params': _params(),
+        'topics': [topic.to_dict() for topic in clusters.topics],
+    }
+
+    try:
+        tmp_dir = Path(tempfile.mkdtemp(prefix=target.name + '.', dir=target.parent))
+        try:
+            np.save(tmp_dir / 'code_topic.npy', np.asarray(clusters.code_topic, dtype=np.int32), allow_pickle=False)
+            with open(tmp_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            if target.exists():
+                shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp_dir, target)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Temas GSC guardados: {target} ({len(clusters)} temas)")
+        return True
+
+    except OSError as e:
+        logger.warning(f"No se pudieron guardar los temas de {source}: {e}")
+        return False
+
+
+def load_topic_clusters(
+    source: Path,
+    fingerprint: Dict[str, Any],
+    dataset: 'GSCDataset'
+) -> Optional[TopicClusters]:
+    """
+    Carga los temas persistidos de un CSV si siguen vigentes.
+
+    Args:
+        source: CSV de origen
+        fingerprint: Huella actual del CSV
+        dataset: Dataset cargado de ese CSV (para las búsquedas)
+
+    Returns:
+        TopicClusters o None si no hay temas válidos para esa huella
+    """
+    if not _clusters_available or not is_snapshot_available() or dataset.queries is None:
+        return None
+
+    target = topics_path(source)
+    manifest_file = target / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('format_version') != TOPICS_FORMAT_VERSION or manifest.get('params') != _params():
+            return None
+        if manifest.get('fingerprint') != fingerprint:
+            logger.debug(f"Temas caducados para {source}")
+            return None
+
+        code_topic = np.load(target / 'code_topic.npy', allow_pickle=False)
+        if len(code_topic) != len(dataset.queries.categories):
+            raise ValueError("número de keywords distinto al del dataset")
+        topics = [Topic(**topic) for topic in manifest['topics']]
+
+        return TopicClusters(code_topic, topics, dataset.queries)
+
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Temas inválidos para {source}, se recalculan: {e}")
+        return None
+
+
+__all__ = [
+    '__version__',
+    'TOPIC_MIN_SIMILARITY',
+    'TOPIC_NUM_PERM',
+    'TOPIC_BANDS',
+    'Topic',
+    'TopicClusters',
+    'is_clustering_available',
+    'topics_path',
+    'build_topic_clusters',
+    'save_topic_clusters',
+    'load_topic_clusters',
+]
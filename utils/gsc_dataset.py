@@ -0,0 +1,635 @@
+"""
+GSC Dataset - PcComponentes Content Generator
+Versión 4.6.0
+
+Almacén columnar en memoria para los datos de Google Search Console.
+
+En lugar de una lista con un dict por fila, cada columna se guarda una
+sola vez: las métricas como arrays de NumPy y las columnas de texto
+(query, page, ...) como categóricas (códigos int32 + valores únicos).
+Las funciones de utils/gsc_utils.py trabajan directamente sobre estos
+arrays; la vista lista-de-dicts (GSCRecords) se mantiene solo como capa
+de compatibilidad perezosa que construye cada dict al leerlo.
+
+El dataset no cambia una vez creado: append() devuelve otro con filas
+añadidas al final, que amplía los índices ya construidos en vez de
+recalcularlos (carga incremental, ver utils/gsc_incremental.py).
+
+Sirve para los dos formatos de CSV del proyecto:
+- Export de GSC: query;page;clicks;impressions;ctr;position
+- gsc_keywords.csv: url;keyword;position;impressions;clicks;ctr;last_updated
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import logging
+import threading
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# IMPORTS CON MANEJO DE ERRORES
+# ============================================================================
+
+try:
+    import numpy as np
+    from utils.gsc_index import FuzzyIndex, PageIndex, TextIndex
+    _numpy_available = True
+except ImportError:
+    _numpy_available = False
+
+try:
+    import pandas as pd
+    _pandas_available = True
+except ImportError:
+    _pandas_available = False
+
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Nombres aceptados para la columna de búsqueda y la de URL
+QUERY_COLUMNS = ('query', 'keyword')
+PAGE_COLUMNS = ('page', 'url')
+
+# Métricas numéricas conocidas
+INT_METRICS = ('clicks', 'impressions')
+FLOAT_METRICS = ('ctr', 'position')
+
+# Filas por bloque al materializar dicts en la vista de compatibilidad
+_RECORDS_CHUNK = 4096
+
+
+def is_dataset_available() -> bool:
+    """Indica si se puede usar GSCDataset (requiere NumPy)."""
+    return _numpy_available
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _factorize(values: Iterable[Any]) -> Tuple['np.ndarray', List[str]]:
+    """
+    Convierte una columna de texto en (códigos, valores únicos).
+
+    Los valores únicos quedan en orden de primera aparición y los nulos
+    se representan como ''.
+    """
+    if _pandas_available:
+        codes, uniques = pd.factorize(
+            values if isinstance(values, (pd.Series, pd.Index)) else np.array(list(values), dtype=object),
+            use_na_sentinel=True
+        )
+        categories = ['' if u is None else str(u) for u in uniques]
+
+        if (codes < 0).any():
+            if '' in categories:
+                empty_code = categories.index('')
+            else:
+                empty_code = len(categories)
+                categories.append('')
+            codes = np.where(codes < 0, empty_code, codes)
+
+        return codes.astype(np.int32, copy=False), categories
+
+    index: Dict[str, int] = {}
+    codes_list: List[int] = []
+    for value in values:
+        value = '' if value is None else str(value)
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(index)
+        codes_list.append(code)
+
+    return np.asarray(codes_list, dtype=np.int32), list(index)
+
+
+class _Categorical:
+    """Columna de texto: códigos por fila + valores únicos."""
+
+    __slots__ = (
+        'codes', 'categories', '_lower', '_groups', '_category_groups', '_row_order', '_indexes', '_lock'
+    )
+
+    def __init__(self, codes: 'np.ndarray', categories: List[str]):
+        self.codes = codes
+        self.categories = categories
+        self._lower: Optional[List[str]] = None
+        self._groups: Optional[Tuple['np.ndarray', List[str], 'np.ndarray']] = None
+        self._category_groups: Optional['np.ndarray'] = None
+        self._row_order: Optional[Tuple['np.ndarray', 'np.ndarray']] = None
+        self._indexes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _derived(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Índice derivado, construido una sola vez aunque lo pidan varios hilos."""
+        index = self._indexes.get(name)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = self._indexes[name] = factory()
+        return index
+
+    @property
+    def lower(self) -> List[str]:
+        """Valores únicos en minúsculas (misma posición que categories)."""
+        if self._lower is None:
+            self._lower = [c.lower() for c in self.categories]
+        return self._lower
+
+    def groups(self) -> Tuple['np.ndarray', List[str], 'np.ndarray']:
+        """
+        Agrupa por valor normalizado (strip + lower).
+
+        Returns:
+            (grupo por fila, clave de cada grupo, primera fila de cada grupo),
+            con los grupos en orden de primera aparición
+        """
+        if self._groups is None:
+            key_index: Dict[str, int] = {}
+            category_to_group = np.empty(len(self.categories), dtype=np.int32)
+
+            for code, category in enumerate(self.categories):
+                key = category.strip().lower()
+                group = key_index.get(key)
+                if group is None:
+                    group = key_index[key] = len(key_index)
+                category_to_group[code] = group
+
+            row_groups = category_to_group[self.codes] if len(self.codes) else self.codes
+            first_row = np.full(len(key_index), len(self.codes), dtype=np.int64)
+            np.minimum.at(first_row, row_groups, np.arange(len(self.codes)))
+
+            self._groups = (row_groups, list(key_index), first_row)
+            self._category_groups = category_to_group
+
+        return self._groups
+
+    def extended(self, values: Iterable[Any]) -> '_Categorical':
+        """
+        Columna con values añadidos al final (esta no cambia).
+
+        Los valores nuevos van detrás de los existentes en categories, así
+        que los códigos actuales se conservan; lo ya calculado (minúsculas,
+        grupos e índices) se amplía con lo nuevo en vez de recalcularse.
+        """
+        delta_codes, delta_categories = _factorize(values)
+        categories = list(self.categories)
+        lookup = {category: code for code, category in enumerate(categories)}
+        mapping = np.empty(len(delta_categories), dtype=np.int32)
+        for k, category in enumerate(delta_categories):
+            code = lookup.get(category)
+            if code is None:
+                code = lookup[category] = len(categories)
+                categories.append(category)
+            mapping[k] = code
+
+        start = len(self.categories)
+        new_codes = mapping[delta_codes] if len(delta_codes) else delta_codes
+        column = _Categorical(np.concatenate([self.codes, new_codes]).astype(np.int32, copy=False), categories)
+
+        if self._lower is not None:
+            column._lower = self._lower + [c.lower() for c in categories[start:]]
+        if self._groups is not None:
+            column._extend_groups(self, new_codes)
+
+        for name, index in list(self._indexes.items()):
+            if name in ('group_text', 'group_fuzzy'):
+                column._indexes[name] = index.extended(column.groups()[1])
+            else:
+                column._indexes[name] = index.extended(column.lower)
+
+        return column
+
+    def _extend_groups(self, previous: '_Categorical', new_codes: 'np.ndarray') -> None:
+        """groups() a partir de los de previous más las filas con new_codes."""
+        row_groups, keys, first_row = previous._groups
+        keys = list(keys)
+        key_index = dict(zip(keys, range(len(keys))))
+
+        start = len(previous.categories)
+        category_to_group = np.empty(len(self.categories), dtype=np.int32)
+        category_to_group[:start] = previous._category_groups
+        for code in range(start, len(self.categories)):
+            key = self.categories[code].strip().lower()
+            group = key_index.get(key)
+            if group is None:
+                group = key_index[key] = len(keys)
+                keys.append(key)
+            category_to_group[code] = group
+
+        new_row_groups = category_to_group[new_codes]
+        first_row = np.concatenate([first_row, np.full(len(keys) - len(first_row), len(self.codes), dtype=np.int64)])
+        np.minimum.at(first_row, new_row_groups, np.arange(len(row_groups), len(self.codes)))
+
+        self._groups = (np.concatenate([row_groups, new_row_groups]), keys, first_row)
+        self._category_groups = category_to_group
+
+    def index(self) -> 'TextIndex':
+        """Índice de texto sobre los valores únicos en minúsculas (ids = códigos)."""
+        return self._derived('text', lambda: TextIndex(self.lower))
+
+    def group_index(self) -> 'TextIndex':
+        """Índice de texto sobre las claves de groups() (ids = grupos)."""
+        return self._derived('group_text', lambda: TextIndex(self.groups()[1]))
+
+    def fuzzy_index(self) -> 'FuzzyIndex':
+        """Índice aproximado sobre los valores únicos (ids = códigos)."""
+        return self._derived('fuzzy', lambda: FuzzyIndex(self.lower))
+
+    def group_fuzzy_index(self) -> 'FuzzyIndex':
+        """Índice aproximado sobre las claves de groups() (ids = grupos)."""
+        return self._derived('group_fuzzy', lambda: FuzzyIndex(self.groups()[1]))
+
+    def page_index(self) -> 'PageIndex':
+        """Índice de URLs sobre los valores únicos en minúsculas (ids = códigos)."""
+        return self._derived('page', lambda: PageIndex(self.lower))
+
+    def rows_of(self, codes: 'np.ndarray') -> 'np.ndarray':
+        """
+        Filas (ascendentes) cuyo valor es alguno de los códigos dados.
+
+        Usa una ordenación de filas por código calculada una sola vez,
+        así que solo se tocan las filas resultantes.
+        """
+        if self._row_order is None:
+            order = np.argsort(self.codes, kind='stable')
+            offsets = np.zeros(len(self.categories) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.codes, minlength=len(self.categories)), out=offsets[1:])
+            self._row_order = (order, offsets)
+
+        order, offsets = self._row_order
+        codes = np.asarray(codes, dtype=np.int64)
+        starts = offsets[codes]
+        lengths = offsets[codes + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        return np.sort(order[positions])
+
+
+# ============================================================================
+# CLASE PRINCIPAL: GSCDataset
+# ============================================================================
+
+class GSCDataset:
+    """
+    Datos de GSC en formato columnar.
+
+    Example:
+        >>> ds = GSCDataset.from_dataframe(df)
+        >>> clicks = ds.metric('clicks')          # np.ndarray
+        >>> queries = ds.text('query')            # categórica
+        >>> rows = ds.records()                   # vista lista-de-dicts perezosa
+    """
+
+    def __init__(
+        self,
+        numeric: Dict[str, 'np.ndarray'],
+        text: Dict[str, _Categorical],
+        column_order: List[str]
+    ):
+        """
+        Inicializa el dataset (usar los constructores from_*).
+
+        Args:
+            numeric: Columnas numéricas
+            text: Columnas de texto categóricas
+            column_order: Orden original de las columnas
+        """
+        if not _numpy_available:
+            raise ImportError("GSCDataset requiere numpy")
+
+        self._numeric = numeric
+        self._text = text
+        self.columns = list(column_order)
+        self._length = self._infer_length()
+
+        self.query_column = next((c for c in QUERY_COLUMNS if c in text), None)
+        self.page_column = next((c for c in PAGE_COLUMNS if c in text), None)
+
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+
+    def _infer_length(self) -> int:
+        for array in self._numeric.values():
+            return len(array)
+        for column in self._text.values():
+            return len(column.codes)
+        return 0
+
+    # ------------------------------------------------------------------------
+    # Constructores
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]]) -> 'GSCDataset':
+        """
+        Crea el dataset desde listas por columna (ya convertidas).
+
+        Las métricas conocidas se guardan como arrays numéricos; el resto,
+        como categóricas.
+        """
+        numeric: Dict[str, 'np.ndarray'] = {}
+        text: Dict[str, _Categorical] = {}
+
+        for name, values in columns.items():
+            if name in INT_METRICS:
+                numeric[name] = _to_numeric_array(values, np.int64)
+            elif name in FLOAT_METRICS:
+                numeric[name] = np.asarray(values, dtype=np.float64)
+            else:
+                text[name] = _Categorical(*_factorize(values))
+
+        return cls(numeric, text, list(columns))
+
+    @classmethod
+    def from_dataframe(cls, df: 'pd.DataFrame') -> 'GSCDataset':
+        """Crea el dataset desde un DataFrame con columnas ya normalizadas."""
+        numeric: Dict[str, 'np.ndarray'] = {}
+        text: Dict[str, _Categorical] = {}
+
+        for name in df.columns:
+            series = df[name]
+            if name in INT_METRICS or name in FLOAT_METRICS or (
+                pd.api.types.is_numeric_dtype(series)
+                and name not in QUERY_COLUMNS + PAGE_COLUMNS
+            ):
+                numeric[name] = series.to_numpy()
+            else:
+                text[name] = _Categorical(*_factorize(series))
+
+        return cls(numeric, text, list(df.columns))
+
+    @classmethod
+    def from_arrays(
+        cls,
+        numeric: Dict[str, 'np.ndarray'],
+        text: Dict[str, Tuple['np.ndarray', List[str]]],
+        column_order: List[str]
+    ) -> 'GSCDataset':
+        """
+        Reconstruye el dataset desde sus arrays (ver to_arrays).
+
+        Los arrays pueden ser de solo lectura (p. ej. np.load con mmap_mode).
+        """
+        return cls(
+            dict(numeric),
+            {name: _Categorical(codes, categories) for name, (codes, categories) in text.items()},
+            column_order
+        )
+
+    def to_arrays(self) -> Tuple[Dict[str, 'np.ndarray'], Dict[str, Tuple['np.ndarray', List[str]]]]:
+        """Columnas en bruto: (numéricas, {texto: (códigos, valores únicos)})."""
+        text = {name: (column.codes, column.categories) for name, column in self._text.items()}
+        return dict(self._numeric), text
+
+    # ------------------------------------------------------------------------
+    # Acceso a columnas
+    # ------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._length
+
+    def has_column(self, name: str) -> bool:
+        return name in self._numeric or name in self._text
+
+    def metric(self, name: str) -> 'np.ndarray':
+        """Array de una métrica (ceros si la columna no existe)."""
+        array = self._numeric.get(name)
+        if array is None:
+            return np.zeros(self._length, dtype=np.int64)
+        return array
+
+    def text(self, name: str) -> Optional[_Categorical]:
+        """Columna de texto categórica (None si no existe)."""
+        return self._text.get(name)
+
+    @property
+    def queries(self) -> Optional[_Categorical]:
+        """Columna de búsqueda ('query' o 'keyword')."""
+        return self._text.get(self.query_column) if self.query_column else None
+
+    @property
+    def pages(self) -> Optional[_Categorical]:
+        """Columna de URL ('page' o 'url')."""
+        return self._text.get(self.page_column) if self.page_column else None
+
+    def value(self, name: str, row: int) -> Any:
+        """Valor nativo de Python de una celda."""
+        column = self._text.get(name)
+        if column is not None:
+            return column.categories[column.codes[row]]
+        return self._numeric[name][row].item()
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Fila como dict (mismas claves y tipos que el cargador antiguo)."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("índice de fila fuera de rango")
+        return {name: self.value(name, index) for name in self.columns}
+
+    def take(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        """Materializa varias filas como dicts."""
+        return [self.row(int(i)) for i in indices]
+
+    def derived(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Resultado calculado sobre todo el dataset (p. ej. los temas de
+        utils/gsc_clusters.py), construido una sola vez aunque lo pidan
+        varios hilos.
+        """
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = self._derived[name] = factory()
+        return value
+
+    def append(self, columns: Dict[str, List[Any]]) -> 'GSCDataset':
+        """
+        Dataset con filas añadidas al final; este no cambia.
+
+        Solo se procesan las filas nuevas: las métricas se concatenan y
+        las columnas de texto amplían sus valores únicos e índices (ver
+        _Categorical.extended).
+
+        Args:
+            columns: Listas por columna (ya convertidas), con las mismas
+                columnas que el dataset
+
+        Raises:
+            ValueError: Si las columnas no coinciden
+        """
+        if set(columns) != set(self.columns):
+            raise ValueError(f"columnas distintas: {sorted(columns)} != {sorted(self.columns)}")
+
+        numeric = {
+            name: np.concatenate([array, _numeric_values(columns[name], array.dtype)])
+            for name, array in self._numeric.items()
+        }
+        text = {name: column.extended(columns[name]) for name, column in self._text.items()}
+        return GSCDataset(numeric, text, self.columns)
+
+    def build_indexes(self) -> None:
+        """
+        Construye por adelantado los índices que usan las consultas.
+
+        Se llama en segundo plano al cargar los datos; si una consulta
+        llega antes, espera al mismo índice en vez de construir otro.
+        """
+        queries = self.queries
+        if queries is not None:
+            queries.index()
+            # Export de GSC: relacionadas por query agrupada; CSV de keywords: por valor
+            if self.query_column == 'query':
+                queries.group_index()
+                queries.group_fuzzy_index()
+            else:
+                queries.fuzzy_index()
+        pages = self.pages
+        if pages is not None and self.page_column == 'page':
+            pages.page_index()
+
+    # ------------------------------------------------------------------------
+    # Vistas
+    # ------------------------------------------------------------------------
+
+    def records(self) -> 'GSCRecords':
+        """Vista lista-de-dicts perezosa (compatibilidad)."""
+        return GSCRecords(self)
+
+    def iter_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Itera filas como dicts, materializando por bloques."""
+        stop = self._length if stop is None else min(stop, self._length)
+
+        for chunk_start in range(start, stop, _RECORDS_CHUNK):
+            chunk_stop = min(chunk_start + _RECORDS_CHUNK, stop)
+            chunk = []
+
+            for name in self.columns:
+                column = self._text.get(name)
+                if column is not None:
+                    categories = column.categories
+                    chunk.append([categories[c] for c in column.codes[chunk_start:chunk_stop].tolist()])
+                else:
+                    chunk.append(self._numeric[name][chunk_start:chunk_stop].tolist())
+
+            for values in zip(*chunk):
+                yield dict(zip(self.columns, values))
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        """Convierte a DataFrame (columnas de texto como category)."""
+        if not _pandas_available:
+            raise ImportError("pandas no disponible")
+
+        data = {}
+        for name in self.columns:
+            column = self._text.get(name)
+            if column is not None:
+                data[name] = pd.Categorical.from_codes(column.codes, column.categories)
+            else:
+                data[name] = self._numeric[name]
+        return pd.DataFrame(data, columns=self.columns)
+
+    def memory_usage(self) -> int:
+        """Bytes aproximados ocupados por las columnas."""
+        total = sum(a.nbytes for a in self._numeric.values())
+        for column in self._text.values():
+            total += column.codes.nbytes
+            total += sum(len(c) + 49 for c in column.categories)
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Resumen del dataset."""
+        return {
+            'rows': self._length,
+            'columns': self.columns,
+            'unique_queries': len(self.queries.categories) if self.queries else 0,
+            'unique_pages': len(self.pages.categories) if self.pages else 0,
+            'memory_bytes': self.memory_usage(),
+        }
+
+    def __repr__(self) -> str:
+        return f"GSCDataset(rows={self._length}, columns={self.columns})"
+
+
+def _to_numeric_array(values: List[Any], dtype) -> 'np.ndarray':
+    """Array entero si todos los valores lo son; si no, float."""
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError, OverflowError):
+        return np.asarray(values, dtype=np.float64)
+
+
+def _numeric_values(values: List[Any], dtype) -> 'np.ndarray':
+    """Como _to_numeric_array; lo que no es un número queda como NaN (igual que pd.to_numeric)."""
+    try:
+        return _to_numeric_array(values, dtype)
+    except (TypeError, ValueError):
+        return np.asarray([_float_or_nan(value) for value in values], dtype=np.float64)
+
+
+def _float_or_nan(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+# ============================================================================
+# VISTA DE COMPATIBILIDAD
+# ============================================================================
+
+class GSCRecords(Sequence):
+    """
+    Vista lista-de-dicts sobre un GSCDataset.
+
+    Se comporta como la lista que devolvían los cargadores (len, índices,
+    slices, iteración) pero no guarda los dicts: cada fila se construye al
+    leerla. El dataset columnar está disponible en `.dataset`.
+    """
+
+    __slots__ = ('dataset',)
+
+    def __init__(self, dataset: GSCDataset):
+        self.dataset = dataset
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.dataset.row(i) for i in range(*index.indices(len(self)))]
+        return self.dataset.row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.dataset.iter_records()
+
+    def __repr__(self) -> str:
+        return f"GSCRecords({len(self)} filas)"
+
+
+# ============================================================================
+# EXPORTS
+# ============================================================================
+
+__all__ = [
+    '__version__',
+    'GSCDataset',
+    'GSCRecords',
+    'is_dataset_available',
+    'QUERY_COLUMNS',
+    'PAGE_COLUMNS',
+]
@@ -0,0 +1,312 @@
+"""
+GSC Incremental - PcComponentes Content Generator
+Versión 4.6.0
+
+Carga incremental de los CSV de GSC.
+
+Los exports de GSC se renuevan cada semana y casi siempre solo añaden
+filas: al final del mismo CSV o como un archivo nuevo en un directorio de
+particiones por fecha (p. ej. data/gsc_data/2025-01-06.csv, 2025-01-13.csv,
+...; se leen en orden de nombre). En vez de volver a parsear todo:
+
+- SourceState guarda qué archivos se leyeron, hasta qué byte y el hash
+  del final de lo leído
+- plan_increment() comprueba que lo leído no ha cambiado y dice qué falta
+  (el final de la última partición y las particiones nuevas); si algo se
+  ha reescrito o borrado, retorna None y se recarga entero
+- read_csv_rows() lee las filas de un archivo entre dos bytes
+- DatasetDelta describe las filas añadidas (con índices propios) para
+  saber qué resultados cacheados siguen valiendo (ver gsc_utils.cached)
+
+Las filas nuevas se añaden con GSCDataset.append, que amplía los índices
+ya construidos en vez de recalcularlos.
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import csv
+import io
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.gsc_snapshot import tail_hash
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# IMPORTS CON MANEJO DE ERRORES
+# ============================================================================
+
+try:
+    import numpy as np
+    from utils.gsc_index import FuzzyIndex, PageIndex, TextIndex
+    _numpy_available = True
+except ImportError:
+    _numpy_available = False
+
+if TYPE_CHECKING:
+    from utils.gsc_dataset import GSCDataset
+
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Archivos de un directorio de particiones
+PARTITION_PATTERN = '*.csv'
+
+
+# ============================================================================
+# EXCEPCIONES
+# ============================================================================
+
+class IncrementalLoadError(Exception):
+    """Lo nuevo no se puede añadir a lo ya cargado (hay que recargar entero)."""
+    pass
+
+
+# ============================================================================
+# ESTADO DE UNA FUENTE
+# ============================================================================
+
+def source_files(source: Union[str, Path]) -> List[Path]:
+    """Archivos de una fuente: el propio CSV o las particiones de un directorio, por nombre."""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(path for path in source.glob(PARTITION_PATTERN) if path.is_file())
+    return [source]
+
+
+@dataclass
+class FileState:
+    """Un archivo leído: tamaño y mtime al leerlo y hash de su final."""
+    path: str
+    size: int
+    mtime_ns: int
+    tail_sha256: Optional[str]
+
+    @classmethod
+    def of(cls, path: Path) -> 'FileState':
+        stat = os.stat(path)
+        return cls(str(path), stat.st_size, stat.st_mtime_ns, tail_hash(path, stat.st_size))
+
+
+@dataclass
+class SourceState:
+    """Lo leído de una fuente (CSV o directorio de particiones)."""
+    files: List[FileState] = field(default_factory=list)
+    columns: List[str] = field(default_factory=list)
+
+    @classmethod
+    def capture(cls, source: Union[str, Path], columns: Iterable[str] = ()) -> 'SourceState':
+        """Estado actual de los archivos de source (tomarlo antes de leerlos)."""
+        return cls([FileState.of(path) for path in source_files(source)], list(columns))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def plan_increment(
+    state: SourceState,
+    source: Union[str, Path]
+) -> Optional[Tuple[SourceState, List[Tuple[Path, int, int]]]]:
+    """
+    Qué falta por leer de source respecto a state.
+
+    Solo se admite crecimiento al final: los archivos ya leídos siguen
+    igual salvo el último, que puede tener filas añadidas (su final
+    anterior debe conservarse), y las particiones nuevas van detrás.
+
+    Returns:
+        (estado nuevo, [(archivo, byte inicial, byte final)]) con la lista
+        vacía si no hay nada nuevo, o None si hay que recargar entero
+    """
+    current = source_files(source)
+    if len(current) < len(state.files):
+        return None
+
+    files: List[FileState] = []
+    reads: List[Tuple[Path, int, int]] = []
+
+    for position, path in enumerate(current):
+        now = FileState.of(path)
+        files.append(now)
+
+        if position >= len(state.files):
+            if now.tail_sha256 is None:
+                return None
+            reads.append((path, 0, now.size))
+            continue
+
+        before = state.files[position]
+        if str(path) != before.path:
+            return None
+        if now.size == before.size and now.mtime_ns == before.mtime_ns:
+            continue
+
+        is_last = position == len(state.files) - 1
+        appended = (
+            is_last
+            and now.size > before.size
+            and before.tail_sha256 is not None
+            and now.tail_sha256 is not None
+            and tail_hash(path, before.size) == before.tail_sha256
+        )
+        if not appended:
+            return None
+        reads.append((path, before.size, now.size))
+
+    return SourceState(files, list(state.columns)), reads
+
+
+# ============================================================================
+# LECTURA
+# ============================================================================
+
+def read_csv_rows(
+    path: Path,
+    start: int,
+    end: int,
+    separator: str,
+    encoding: str,
+    convert: Callable[[str, Optional[str]], Any],
+    columns: Optional[List[str]] = None
+) -> Tuple[List[str], Dict[str, List[Any]]]:
+    """
+    Filas de un CSV entre los bytes start y end, por columna.
+
+    Desde el byte 0 se lee la cabecera (que debe coincidir con columns,
+    si se pasa); desde otro byte, columns es obligatorio.
+
+    Args:
+        path: CSV
+        start: Byte inicial (0 o un final de línea ya leído)
+        end: Byte final (un final de línea)
+        separator: Separador de columnas
+        encoding: Codificación
+        convert: Conversión de cada valor, (columna, texto) -> valor
+        columns: Columnas esperadas (nombres normalizados)
+
+    Returns:
+        (columnas, {columna: valores})
+
+    Raises:
+        IncrementalLoadError: Si la cabecera no coincide o falta columns
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+
+    if start == 0 and encoding.lower().replace('_', '-') in ('utf-8', 'utf8'):
+        encoding = 'utf-8-sig'
+    reader = csv.reader(io.StringIO(raw.decode(encoding), newline=''), delimiter=separator)
+
+    if start == 0:
+        header = next(reader, None) or []
+        found = [col.lower().strip().replace('\ufeff', '') for col in header]
+        if columns is not None and found != columns:
+            raise IncrementalLoadError(f"{path.name}: columnas {found} distintas de {columns}")
+        columns = found
+    elif columns is None:
+        raise IncrementalLoadError("faltan las columnas para leer desde mitad del archivo")
+
+    values: Dict[str, List[Any]] = {name: [] for name in columns}
+    lists = [values[name] for name in columns]
+    for row in reader:
+        if not row:
+            continue
+        for i, name in enumerate(columns):
+            lists[i].append(convert(name, row[i] if i < len(row) else None))
+
+    return columns, values
+
+
+# ============================================================================
+# FILAS AÑADIDAS
+# ============================================================================
+
+class DatasetDelta:
+    """
+    Filas añadidas a un GSCDataset (las de start en adelante).
+
+    Guarda las búsquedas y URLs distintas de esas filas, en minúsculas,
+    con índices propios (pequeños) para responder si una consulta podría
+    haber cambiado con ellas.
+
+    Example:
+        >>> delta = DatasetDelta(merged, start=len(previous))
+        >>> delta.touches_page('/monitores')
+        False
+    """
+
+    def __init__(self, dataset: 'GSCDataset', start: int):
+        if not _numpy_available:
+            raise ImportError("DatasetDelta requiere numpy")
+        self.rows = len(dataset) - start
+        self.queries = self._distinct(dataset.queries, start, strip=True)
+        self.pages = self._distinct(dataset.pages, start)
+        self._query_index: Optional[TextIndex] = None
+        self._fuzzy_index: Optional[FuzzyIndex] = None
+        self._page_index: Optional[PageIndex] = None
+
+    @staticmethod
+    def _distinct(column: Any, start: int, strip: bool = False) -> List[str]:
+        if column is None:
+            return []
+        lower = column.lower
+        values = (lower[code] for code in np.unique(column.codes[start:]).tolist())
+        return sorted({value.strip() for value in values} if strip else set(values))
+
+    def touches_query(self, keyword_lower: str, fuzzy: bool = False) -> bool:
+        """
+        Si alguna búsqueda nueva contiene la keyword, comparte alguna
+        palabra con ella o (con fuzzy) se le parece.
+        """
+        if not self.queries:
+            return False
+        if self._query_index is None:
+            self._query_index = TextIndex(self.queries)
+        index = self._query_index
+        if len(index.contains(keyword_lower)) or len(index.word_counts(keyword_lower.split())[0]):
+            return True
+        if fuzzy:
+            if self._fuzzy_index is None:
+                self._fuzzy_index = FuzzyIndex(self.queries)
+            return len(self._fuzzy_index.similar(keyword_lower)[0]) > 0
+        return False
+
+    def touches_page(self, url_lower: str) -> bool:
+        """Si alguna URL nueva contiene url_lower."""
+        if not self.pages:
+            return False
+        if self._page_index is None:
+            self._page_index = PageIndex(self.pages)
+        return len(self._page_index.find(url_lower)) > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'queries': len(self.queries),
+            'pages': len(self.pages),
+        }
+
+    def __repr__(self) -> str:
+        return f"DatasetDelta(rows={self.rows}, queries={len(self.queries)}, pages={len(self.pages)})"
+
+
+__all__ = [
+    '__version__',
+    'PARTITION_PATTERN',
+    'IncrementalLoadError',
+    'source_files',
+    'FileState',
+    'SourceState',
+    'plan_increment',
+    'read_csv_rows',
+    'DatasetDelta',
+]
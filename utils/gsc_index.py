@@ -0,0 +1,610 @@
+"""
+GSC Index - PcComponentes Content Generator
+Versión 4.6.0
+
+Índices en memoria sobre las columnas de texto de GSCDataset.
+
+TextIndex indexa una lista de cadenas ya normalizadas (los valores únicos
+de una columna, no las filas) para responder sin recorrerlas todas:
+- exact(s): cadenas iguales a s
+- contains(s): cadenas que contienen s; los tokens de s acotan los
+  candidatos mediante el vocabulario y solo si no bastan se recorre un
+  único texto concatenado (en C, no un `in` por cadena)
+- contained_in(s): cadenas que son subcadena de s
+- word_counts(words): cadenas con alguna palabra en común y cuántas
+
+PageIndex resuelve el "url contenida en page" de get_keywords_for_url:
+las URLs absolutas se buscan por prefijo sobre las páginas ordenadas (un
+trie aplanado) y el resto de fragmentos con la misma búsqueda de
+subcadenas que TextIndex.
+
+FuzzyIndex compara keywords normalizadas (utils/spanish_text.py: sin
+acentos ni stopwords, con stemming ligero) por trigramas de caracteres,
+para variantes como "portátil"/"portatil", "ratones"/"raton" o erratas.
+
+Los resultados son ids de cadena (posición en la lista indexada). Para
+pasar a filas se usa _Categorical.rows_of() en utils/gsc_dataset.py.
+
+Un índice no cambia una vez construido: extended() crea otro para la
+lista con cadenas nuevas al final, reutilizando lo ya indexado (ver
+GSCDataset.append).
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import copy
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.spanish_text import (
+    FUZZY_MIN_SIMILARITY,
+    char_trigrams,
+    normalize_keyword,
+    normalize_tokens,
+)
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Separador entre cadenas en el texto concatenado de contains()
+_SEPARATOR = '\x00'
+
+# Longitud máxima para enumerar subcadenas en contained_in()
+MAX_CONTAINED_IN_LENGTH = 200
+
+# Un token solo acota candidatos si aparece en menos de esta fracción de cadenas
+MAX_TOKEN_SELECTIVITY = 0.25
+
+# Esquemas con los que una URL se busca por prefijo en PageIndex
+URL_SCHEMES = ('http://', 'https://')
+
+# Mayor carácter posible: cota superior de los prefijos en la búsqueda binaria
+_MAX_CHAR = chr(0x10FFFF)
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens de una cadena normalizada (separación por espacios)."""
+    return text.split()
+
+
+def _as_ids(ids: Iterable[int]) -> np.ndarray:
+    return np.fromiter(ids, dtype=np.int64)
+
+
+# ============================================================================
+# BÚSQUEDA DE SUBCADENAS
+# ============================================================================
+
+class SubstringSearch:
+    """
+    Búsqueda de subcadenas sobre muchas cadenas a la vez.
+
+    Las cadenas se concatenan en un único texto y str.find recorre ese
+    texto en C; solo se vuelve a Python por cada coincidencia.
+    """
+
+    def __init__(self, strings: List[str]):
+        self.strings = strings
+        self._text = ''
+        self._starts = [0]
+        self._index(0)
+
+    def _index(self, start: int) -> None:
+        """Añade al texto concatenado las cadenas desde start."""
+        new = self.strings[start:]
+        if not new:
+            return
+        joined = _SEPARATOR.join(new)
+        self._text = f"{self._text}{_SEPARATOR}{joined}" if start else joined
+        starts = list(self._starts)
+        for string in new:
+            starts.append(starts[-1] + len(string) + 1)
+        self._starts = starts
+
+    def extended(self, strings: List[str]) -> 'SubstringSearch':
+        """Búsqueda sobre strings, que empieza por las cadenas ya indexadas."""
+        search = copy.copy(self)
+        search.strings = strings
+        search._index(len(self.strings))
+        return search
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Ids (ascendentes) de las cadenas que contienen needle."""
+        if not needle:
+            return np.arange(len(self.strings), dtype=np.int64)
+
+        strings = self.strings
+        starts = self._starts
+        find = self._text.find
+        found: List[int] = []
+        pos = find(needle)
+
+        while pos >= 0:
+            string_id = bisect_right(starts, pos) - 1
+            if needle in strings[string_id]:
+                found.append(string_id)
+                pos = find(needle, starts[string_id + 1])
+            else:
+                # La coincidencia cruza un separador
+                pos = find(needle, pos + 1)
+
+        return _as_ids(found)
+
+
+# ============================================================================
+# CLASE PRINCIPAL: TextIndex
+# ============================================================================
+
+class TextIndex:
+    """
+    Índice invertido sobre una lista de cadenas.
+
+    Example:
+        >>> index = TextIndex(['monitor gaming', 'teclado', 'monitor 4k'])
+        >>> index.contains('monitor').tolist()
+        [0, 2]
+        >>> index.word_counts({'monitor', 'gaming'})
+        (array([0, 2]), array([2, 1]))
+    """
+
+    def __init__(self, strings: List[str]):
+        """
+        Construye el índice (una pasada sobre las cadenas).
+
+        Args:
+            strings: Cadenas ya normalizadas; su posición es su id
+        """
+        self.strings = strings
+        self._exact: Dict[str, List[int]] = {}
+        self._postings: Dict[str, np.ndarray] = {}
+        self._substrings = SubstringSearch([])
+        self._vocabulary: List[str] = []
+        self._vocabulary_search = SubstringSearch([])
+        self._index(0)
+
+    def _index(self, start: int) -> None:
+        """
+        Indexa las cadenas desde start sobre lo ya indexado.
+
+        No modifica en sitio ninguna estructura existente: una copia del
+        índice (extended) puede crecer sin alterar el original.
+        """
+        exact = dict(self._exact)
+        new_postings: Dict[str, List[int]] = {}
+        for string_id in range(start, len(self.strings)):
+            string = self.strings[string_id]
+            ids = exact.get(string)
+            exact[string] = [string_id] if ids is None else ids + [string_id]
+            for token in set(tokenize(string)):
+                new_postings.setdefault(token, []).append(string_id)
+
+        postings = dict(self._postings)
+        new_tokens = []
+        for token, ids in new_postings.items():
+            known = postings.get(token)
+            if known is None:
+                new_tokens.append(token)
+                postings[token] = np.asarray(ids, dtype=np.int64)
+            else:
+                postings[token] = np.concatenate([known, np.asarray(ids, dtype=np.int64)])
+
+        self._exact = exact
+        self._postings = postings
+        self._substrings = self._substrings.extended(self.strings)
+        self._vocabulary = self._vocabulary + new_tokens
+        self._vocabulary_search = self._vocabulary_search.extended(self._vocabulary)
+
+    def extended(self, strings: List[str]) -> 'TextIndex':
+        """
+        Índice de strings, que empieza por las cadenas ya indexadas.
+
+        Solo se procesan las nuevas (ids a continuación de las actuales);
+        este índice no cambia.
+        """
+        index = copy.copy(self)
+        index.strings = strings
+        index._index(len(self.strings))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    # ------------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------------
+
+    def exact(self, text: str) -> np.ndarray:
+        """Ids de las cadenas iguales a text."""
+        return _as_ids(self._exact.get(text, ()))
+
+    def contains(self, needle: str) -> np.ndarray:
+        """Ids (ascendentes) de las cadenas que contienen needle."""
+        tokens = tokenize(needle)
+        if not tokens or needle != needle.strip():
+            return self._substrings.contains(needle)
+
+        candidates = self._token_candidates(tokens)
+        if candidates is None:
+            return self._substrings.contains(needle)
+
+        strings = self.strings
+        return _as_ids(i for i in candidates.tolist() if needle in strings[i])
+
+    def _token_candidates(self, tokens: List[str]) -> Optional[np.ndarray]:
+        """
+        Superconjunto de las cadenas que contienen los tokens seguidos.
+
+        Si la subcadena tiene varios tokens, el primero debe ser final de
+        un token de la cadena, el último principio de otro y los de en medio
+        tokens completos; con uno solo, basta que esté dentro de un token.
+        Retorna None si ningún token es lo bastante selectivo.
+        """
+        vocabulary = self._vocabulary
+        limit = max(1, int(len(self.strings) * MAX_TOKEN_SELECTIVITY))
+        candidates: Optional[np.ndarray] = None
+
+        for position, token in enumerate(tokens):
+            if len(tokens) == 1:
+                matches = [vocabulary[v] for v in self._vocabulary_search.contains(token).tolist()]
+            elif position == 0:
+                matches = [vocabulary[v] for v in self._vocabulary_search.contains(token).tolist()
+                           if vocabulary[v].endswith(token)]
+            elif position == len(tokens) - 1:
+                matches = [vocabulary[v] for v in self._vocabulary_search.contains(token).tolist()
+                           if vocabulary[v].startswith(token)]
+            else:
+                matches = [token] if token in self._postings else []
+
+            lists = [self._postings[match] for match in matches]
+            if sum(len(ids) for ids in lists) > limit:
+                continue
+
+            ids = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                break
+
+        return candidates
+
+    def contained_in(self, text: str) -> np.ndarray:
+        """Ids de las cadenas que son subcadena de text (incluida la vacía)."""
+        if len(text) > MAX_CONTAINED_IN_LENGTH:
+            return _as_ids(i for i, s in enumerate(self.strings) if s in text)
+
+        substrings: Set[str] = {
+            text[start:end]
+            for start in range(len(text) + 1)
+            for end in range(start, len(text) + 1)
+        }
+        ids: List[int] = []
+        for substring in substrings:
+            ids.extend(self._exact.get(substring, ()))
+        ids.sort()
+        return _as_ids(ids)
+
+    def word_counts(self, words: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cadenas con alguna palabra de words.
+
+        Returns:
+            (ids ascendentes, número de palabras en común de cada una)
+        """
+        lists = [self._postings[w] for w in set(words) if w in self._postings]
+        if not lists:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.unique(np.concatenate(lists), return_counts=True)
+
+    def common_words(self, words: Iterable[str], ids: np.ndarray) -> np.ndarray:
+        """Número de palabras de words presentes en cada id de ids."""
+        matched, counts = self.word_counts(words)
+        result = np.zeros(len(ids), dtype=np.int64)
+        if len(matched):
+            pos = np.searchsorted(matched, ids)
+            pos = np.minimum(pos, len(matched) - 1)
+            hit = matched[pos] == ids
+            result[hit] = counts[pos[hit]]
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'strings': len(self.strings),
+            'vocabulary': len(self._postings),
+            'postings': int(sum(len(ids) for ids in self._postings.values())),
+        }
+
+    def __repr__(self) -> str:
+        return f"TextIndex(strings={len(self.strings)}, vocabulary={len(self._postings)})"
+
+
+# ============================================================================
+# ÍNDICE DE URLs: PageIndex
+# ============================================================================
+
+class PageIndex:
+    """
+    Índice de URLs para búsquedas "url contenida en page".
+
+    - URL absoluta (http/https): una página la contiene si empieza por ella
+      (búsqueda binaria sobre las páginas ordenadas, equivalente a bajar
+      por un trie de prefijos) o si lleva otra URL embebida más adelante;
+      estas últimas se apartan al construir el índice y se comprueban aparte.
+    - Ruta o fragmento ("/monitores", "monitor-4k"): búsqueda de subcadenas.
+
+    Example:
+        >>> index = PageIndex(['https://x.com/monitores', 'https://x.com/ssd'])
+        >>> index.find('https://x.com/mon').tolist()
+        [0]
+    """
+
+    def __init__(self, pages: List[str]):
+        """
+        Construye el índice.
+
+        Args:
+            pages: URLs ya en minúsculas; su posición es su id
+        """
+        self.pages = pages
+
+        order = sorted(range(len(pages)), key=pages.__getitem__)
+        self._sorted = [pages[i] for i in order]
+        self._sorted_ids = np.asarray(order, dtype=np.int64)
+
+        # Páginas con una URL embebida (p. ej. ?redirect=https://...)
+        self._embedded = [i for i, page in enumerate(pages) if page.find('http', 1) >= 0]
+
+        self._substrings: Optional[SubstringSearch] = None
+
+    def extended(self, pages: List[str]) -> 'PageIndex':
+        """
+        Índice de pages, que empieza por las URLs ya indexadas.
+
+        Las nuevas se intercalan en el orden existente (búsqueda binaria)
+        en vez de volver a ordenar todas; este índice no cambia.
+        """
+        start = len(self.pages)
+        new_ids = sorted(range(start, len(pages)), key=pages.__getitem__)
+        positions = [bisect_right(self._sorted, pages[i]) for i in new_ids]
+
+        merged: List[str] = []
+        previous = 0
+        for position, page_id in zip(positions, new_ids):
+            merged.extend(self._sorted[previous:position])
+            merged.append(pages[page_id])
+            previous = position
+        merged.extend(self._sorted[previous:])
+
+        index = copy.copy(self)
+        index.pages = pages
+        index._sorted = merged
+        index._sorted_ids = np.insert(self._sorted_ids, positions, np.asarray(new_ids, dtype=np.int64))
+        index._embedded = self._embedded + [
+            i for i in range(start, len(pages)) if pages[i].find('http', 1) >= 0
+        ]
+        if self._substrings is not None:
+            index._substrings = self._substrings.extended(pages)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def exact(self, url_lower: str) -> np.ndarray:
+        """Id de la página igual a url_lower (vacío si no existe)."""
+        pos = bisect_left(self._sorted, url_lower)
+        if pos < len(self._sorted) and self._sorted[pos] == url_lower:
+            return self._sorted_ids[pos:pos + 1]
+        return np.empty(0, dtype=np.int64)
+
+    def with_prefix(self, prefix: str) -> np.ndarray:
+        """Ids (ascendentes) de las páginas que empiezan por prefix."""
+        lo = bisect_left(self._sorted, prefix)
+        hi = bisect_left(self._sorted, prefix + _MAX_CHAR, lo)
+        return np.sort(self._sorted_ids[lo:hi])
+
+    def find(self, url_lower: str) -> np.ndarray:
+        """Ids (ascendentes) de las páginas que contienen url_lower."""
+        if url_lower.startswith(URL_SCHEMES):
+            embedded = [i for i in self._embedded if url_lower in self.pages[i]]
+            return union_ids(self.with_prefix(url_lower), _as_ids(embedded))
+
+        if self._substrings is None:
+            self._substrings = SubstringSearch(self.pages)
+        return self._substrings.contains(url_lower)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'pages': len(self.pages),
+            'embedded_urls': len(self._embedded),
+        }
+
+    def __repr__(self) -> str:
+        return f"PageIndex(pages={len(self.pages)})"
+
+
+# ============================================================================
+# ÍNDICE APROXIMADO: FuzzyIndex
+# ============================================================================
+
+class FuzzyIndex:
+    """
+    Índice de trigramas sobre keywords normalizadas.
+
+    Las cadenas con la misma forma normalizada comparten entrada, así que
+    el índice crece con las keywords distintas tras normalizar.
+
+    Example:
+        >>> index = FuzzyIndex(['portátil gaming', 'ratones', 'monitor'])
+        >>> ids, similarity, coverage = index.similar('portatil gamer')
+        >>> ids.tolist()
+        [0]
+    """
+
+    def __init__(self, strings: List[str]):
+        """
+        Construye el índice (normaliza cada cadena una vez).
+
+        Args:
+            strings: Cadenas a indexar; su posición es su id
+        """
+        self.strings = strings
+        self.forms: List[str] = []
+        self._form_ids: Dict[str, int] = {}
+        self._string_form = np.empty(0, dtype=np.int64)
+        self._postings: Dict[str, np.ndarray] = {}
+        self._sizes = np.empty(0, dtype=np.int64)
+        self._index(0)
+
+    def _index(self, start: int) -> None:
+        """Indexa las cadenas desde start sin modificar en sitio lo ya indexado."""
+        forms = list(self.forms)
+        form_ids = dict(self._form_ids)
+        new_string_form = np.empty(len(self.strings) - start, dtype=np.int64)
+        for k, string in enumerate(self.strings[start:]):
+            form = ' '.join(normalize_tokens(string))
+            form_id = form_ids.get(form)
+            if form_id is None:
+                form_id = form_ids[form] = len(forms)
+                forms.append(form)
+            new_string_form[k] = form_id
+
+        first_form = len(self.forms)
+        new_postings: Dict[str, List[int]] = {}
+        new_sizes = np.zeros(len(forms) - first_form, dtype=np.int64)
+        for form_id in range(first_form, len(forms)):
+            form = forms[form_id]
+            if not form:
+                continue
+            grams = set(char_trigrams(form))
+            new_sizes[form_id - first_form] = len(grams)
+            for gram in grams:
+                new_postings.setdefault(gram, []).append(form_id)
+
+        postings = dict(self._postings)
+        for gram, ids in new_postings.items():
+            known = postings.get(gram)
+            ids = np.asarray(ids, dtype=np.int64)
+            postings[gram] = ids if known is None else np.concatenate([known, ids])
+
+        self.forms = forms
+        self._form_ids = form_ids
+        self._string_form = string_form = np.concatenate([self._string_form, new_string_form])
+        self._postings = postings
+        self._sizes = np.concatenate([self._sizes, new_sizes])
+
+        # Cadenas de cada forma (CSR)
+        self._form_order = np.argsort(string_form, kind='stable')
+        self._form_offsets = np.zeros(len(forms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(string_form, minlength=len(forms)), out=self._form_offsets[1:])
+
+    def extended(self, strings: List[str]) -> 'FuzzyIndex':
+        """
+        Índice de strings, que empieza por las cadenas ya indexadas.
+
+        Solo se normalizan las nuevas; este índice no cambia.
+        """
+        index = copy.copy(self)
+        index.strings = strings
+        index._index(len(self.strings))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    @property
+    def string_forms(self) -> np.ndarray:
+        """Id de forma de cada cadena (posición en forms)."""
+        return self._string_form
+
+    def form_of(self, string_id: int) -> str:
+        """Forma normalizada de una cadena."""
+        return self.forms[self._string_form[string_id]]
+
+    def similar(
+        self,
+        text: str,
+        min_similarity: float = FUZZY_MIN_SIMILARITY
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Cadenas parecidas a text.
+
+        Una cadena entra si su similitud (Dice de trigramas) o su cobertura
+        (fracción de los trigramas de text que contiene) llegan al mínimo.
+
+        Returns:
+            (ids ascendentes, similitud, cobertura)
+        """
+        empty = np.empty(0, dtype=np.int64)
+        form = normalize_keyword(text)
+        grams = set(char_trigrams(form)) if form else set()
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not lists:
+            return empty, np.empty(0), np.empty(0)
+
+        overlap = np.bincount(np.concatenate(lists), minlength=len(self.forms))
+        forms = np.flatnonzero(overlap)
+        overlap = overlap[forms]
+        similarity = 2 * overlap / (len(grams) + self._sizes[forms])
+        coverage = overlap / len(grams)
+
+        keep = np.maximum(similarity, coverage) >= min_similarity
+        forms, similarity, coverage = forms[keep], similarity[keep], coverage[keep]
+
+        # De formas a cadenas
+        starts = self._form_offsets[forms]
+        lengths = self._form_offsets[forms + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return empty, np.empty(0), np.empty(0)
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        ids = self._form_order[positions]
+        order = np.argsort(ids, kind='stable')
+        return (
+            ids[order],
+            np.repeat(similarity, lengths)[order],
+            np.repeat(coverage, lengths)[order],
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'strings': len(self.strings),
+            'forms': len(self.forms),
+            'trigrams': len(self._postings),
+        }
+
+    def __repr__(self) -> str:
+        return f"FuzzyIndex(strings={len(self.strings)}, forms={len(self.forms)})"
+
+
+def union_ids(*arrays: np.ndarray) -> np.ndarray:
+    """Unión ordenada y sin duplicados de varios arrays de ids."""
+    arrays = [a for a in arrays if len(a)]
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(arrays))
+
+
+__all__ = [
+    '__version__',
+    'MAX_CONTAINED_IN_LENGTH',
+    'MAX_TOKEN_SELECTIVITY',
+    'URL_SCHEMES',
+    'SubstringSearch',
+    'FUZZY_MIN_SIMILARITY',
+    'TextIndex',
+    'PageIndex',
+    'FuzzyIndex',
+    'tokenize',
+    'union_ids',
+]
@@ -0,0 +1,282 @@
+"""
+GSC Snapshot - PcComponentes Content Generator
+Versión 4.6.0
+
+Caché binaria en disco de los CSV de GSC.
+
+La primera carga de un CSV guarda su GSCDataset junto al archivo, en un
+directorio `<csv>.snapshot/`:
+- manifest.json: huella del CSV, orden y tipo de columnas, metadatos
+- n<i>.npy: columnas numéricas
+- t<i>.codes.npy + t<i>.txt: códigos y valores únicos de las de texto
+
+Las siguientes cargas abren los .npy con memory-map si la huella del CSV
+(mtime, tamaño y hash de su principio y final) no ha cambiado, sin volver
+a detectar separador ni convertir valores fila a fila.
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# IMPORTS CON MANEJO DE ERRORES
+# ============================================================================
+
+try:
+    import numpy as np
+    from utils.gsc_dataset import GSCDataset
+    _snapshot_available = True
+except ImportError:
+    _snapshot_available = False
+
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Se incrementa si cambia el formato en disco (invalida snapshots antiguos)
+SNAPSHOT_FORMAT_VERSION = 1
+
+SNAPSHOT_SUFFIX = '.snapshot'
+MANIFEST_FILE = 'manifest.json'
+
+# Bytes del principio y del final del CSV que entran en el hash
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+# Separador de los valores únicos en t<i>.txt
+_CATEGORY_SEPARATOR = '\x00'
+
+# Desactivable con GSC_SNAPSHOTS=false (p. ej. en un disco de solo lectura)
+GSC_SNAPSHOTS_ENABLED: bool = os.getenv('GSC_SNAPSHOTS', 'true').lower() == 'true'
+
+
+def is_snapshot_available() -> bool:
+    """Indica si se pueden usar snapshots (requiere NumPy y estar activados)."""
+    return _snapshot_available and GSC_SNAPSHOTS_ENABLED
+
+
+def snapshot_path(source: Path) -> Path:
+    """Directorio del snapshot de un CSV."""
+    source = Path(source)
+    return source.with_name(source.name + SNAPSHOT_SUFFIX)
+
+
+# ============================================================================
+# HUELLA DEL CSV
+# ============================================================================
+
+def file_fingerprint(source: Path) -> Dict[str, Any]:
+    """
+    Huella de un archivo: mtime, tamaño y hash del primer y último bloque.
+
+    El hash no recorre el archivo entero para que comprobar el snapshot
+    siga costando milisegundos con CSV de cientos de MB; cubre cabeceras,
+    reescrituras que conservan tamaño y mtime, y añadidos al final.
+    """
+    stat = os.stat(source)
+    digest = hashlib.sha256()
+
+    with open(source, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+        if stat.st_size > FINGERPRINT_BLOCK_SIZE:
+            f.seek(max(FINGERPRINT_BLOCK_SIZE, stat.st_size - FINGERPRINT_BLOCK_SIZE))
+            digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+
+    return {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest.hexdigest(),
+    }
+
+
+def tail_hash(source: Path, end: int) -> Optional[str]:
+    """
+    Hash del último bloque antes de end, o None si no acaba en salto de
+    línea (entonces no se puede continuar leyendo desde ahí).
+
+    Con él se comprueba que un CSV que ha crecido conserva lo ya leído y
+    solo tiene filas nuevas al final.
+    """
+    start = max(0, end - FINGERPRINT_BLOCK_SIZE)
+    with open(source, 'rb') as f:
+        f.seek(start)
+        block = f.read(end - start)
+    if len(block) != end - start or not block.endswith(b'\n'):
+        return None
+    return hashlib.sha256(block).hexdigest()
+
+
+# ============================================================================
+# ESCRITURA Y LECTURA
+# ============================================================================
+
+def save_snapshot(
+    source: Path,
+    dataset: 'GSCDataset',
+    fingerprint: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Guarda el snapshot de un CSV (reemplazando el anterior).
+
+    Args:
+        source: CSV de origen
+        dataset: Datos ya cargados
+        fingerprint: Huella del CSV tomada ANTES de leerlo, para que un
+            cambio durante la carga no quede marcado como vigente
+        metadata: Datos extra a conservar (p. ej. el cargador original)
+
+    Returns:
+        True si se guardó; False si no se pudo (el error solo se registra)
+    """
+    if not is_snapshot_available():
+        return False
+
+    target = snapshot_path(source)
+    numeric, text = dataset.to_arrays()
+
+    if any(array.dtype == object for array in numeric.values()):
+        logger.debug(f"Snapshot omitido para {source}: columna numérica no convertible")
+        return False
+    if any(_CATEGORY_SEPARATOR in c for _, categories in text.values() for c in categories):
+        logger.debug(f"Snapshot omitido para {source}: valores con separador reservado")
+        return False
+
+    manifest: Dict[str, Any] = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'source': Path(source).name,
+        'fingerprint': fingerprint,
+        'rows': len(dataset),
+        'columns': [],
+        'metadata': metadata or {},
+    }
+
+    try:
+        tmp_dir = Path(tempfile.mkdtemp(prefix=target.name + '.', dir=target.parent))
+        try:
+            for i, name in enumerate(dataset.columns):
+                if name in numeric:
+                    np.save(tmp_dir / f"n{i}.npy", numeric[name], allow_pickle=False)
+                    manifest['columns'].append({'name': name, 'kind': 'numeric'})
+                else:
+                    codes, categories = text[name]
+                    np.save(tmp_dir / f"t{i}.codes.npy", codes, allow_pickle=False)
+                    (tmp_dir / f"t{i}.txt").write_text(
+                        _CATEGORY_SEPARATOR.join(categories), encoding='utf-8'
+                    )
+                    manifest['columns'].append({
+                        'name': name, 'kind': 'text', 'categories': len(categories)
+                    })
+
+            # El manifest se escribe el último: sin él el snapshot no es válido
+            with open(tmp_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+            if target.exists():
+                shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp_dir, target)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Snapshot GSC guardado: {target} ({len(dataset)} filas)")
+        return True
+
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el snapshot de {source}: {e}")
+        return False
+
+
+def load_snapshot(
+    source: Path,
+    fingerprint: Optional[Dict[str, Any]] = None
+) -> Optional[Tuple['GSCDataset', Dict[str, Any]]]:
+    """
+    Carga el snapshot de un CSV si sigue vigente.
+
+    Args:
+        source: CSV de origen
+        fingerprint: Huella actual del CSV (se calcula si no se pasa)
+
+    Returns:
+        (dataset, metadatos guardados) o None si no hay snapshot válido
+    """
+    if not is_snapshot_available():
+        return None
+
+    target = snapshot_path(source)
+    manifest_file = target / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            return None
+        if manifest.get('fingerprint') != (fingerprint or file_fingerprint(source)):
+            logger.debug(f"Snapshot caducado para {source}")
+            return None
+
+        numeric: Dict[str, Any] = {}
+        text: Dict[str, Any] = {}
+        column_order = []
+
+        for i, column in enumerate(manifest['columns']):
+            name = column['name']
+            column_order.append(name)
+            if column['kind'] == 'numeric':
+                numeric[name] = np.load(target / f"n{i}.npy", mmap_mode='r', allow_pickle=False)
+            else:
+                codes = np.load(target / f"t{i}.codes.npy", mmap_mode='r', allow_pickle=False)
+                raw = (target / f"t{i}.txt").read_text(encoding='utf-8')
+                categories = raw.split(_CATEGORY_SEPARATOR) if column['categories'] else []
+                if len(categories) != column['categories']:
+                    raise ValueError(f"columna {name}: valores únicos incompletos")
+                text[name] = (codes, categories)
+
+        dataset = GSCDataset.from_arrays(numeric, text, column_order)
+        if len(dataset) != manifest['rows']:
+            raise ValueError("número de filas distinto al del manifest")
+
+        return dataset, manifest.get('metadata', {})
+
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Snapshot inválido para {source}, se recarga el CSV: {e}")
+        return None
+
+
+def remove_snapshot(source: Path) -> bool:
+    """Elimina el snapshot de un CSV. Retorna True si existía."""
+    target = snapshot_path(source)
+    if not target.exists():
+        return False
+    shutil.rmtree(target, ignore_errors=True)
+    return True
+
+
+__all__ = [
+    '__version__',
+    'SNAPSHOT_FORMAT_VERSION',
+    'GSC_SNAPSHOTS_ENABLED',
+    'is_snapshot_available',
+    'snapshot_path',
+    'file_fingerprint',
+    'tail_hash',
+    'save_snapshot',
+    'load_snapshot',
+    'remove_snapshot',
+]
@@ -0,0 +1,837 @@
+"""
+GSC Store - PcComponentes Content Generator
+Versión 4.6.0
+
+Almacén SQLite en disco para los dos formatos de CSV de GSC.
+
+Con GSC_STORE_PATH configurado, los CSV se ingieren en una base SQLite
+(modo WAL) y las consultas de utils/gsc_utils.py se resuelven en SQL
+con índices, sin cargar el dataset en memoria. Como en el almacén
+columnar, el texto se guarda una vez por valor distinto:
+- gsc_queries: búsquedas distintas (minúsculas, clave agrupada y forma
+  normalizada, ver spanish_text) con índice FTS5 de trigramas
+- gsc_pages: URLs distintas en minúsculas, también con FTS5
+- gsc_rows: una fila por fila del CSV (texto original, ids y métricas)
+- gsc_sources: un registro por CSV con su huella, hasta dónde se ingirió
+  y sus totales
+
+La ingesta es incremental: si el CSV solo ha crecido (filas añadidas al
+final), se procesa solo lo nuevo; si ha cambiado, se reemplazan sus filas.
+Varios procesos pueden compartir el mismo archivo: la ingesta va en una
+transacción BEGIN IMMEDIATE y quien llega después ve la huella al día.
+
+DuckDB no está entre las dependencias del proyecto; SQLite viene con
+Python y cubre estas consultas (filtros, agregaciones y subcadenas).
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from utils.gsc_snapshot import file_fingerprint, tail_hash
+from utils.spanish_text import normalize_keyword
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+# Archivo SQLite compartido; vacío = almacén desactivado (datos en memoria)
+GSC_STORE_PATH: str = os.getenv('GSC_STORE_PATH', '')
+
+# Se incrementa si cambia el esquema (las fuentes se vuelven a ingerir)
+STORE_SCHEMA_VERSION = 1
+
+# Filas por lote de INSERT durante la ingesta
+INGEST_BATCH_SIZE = 5000
+
+# Espera máxima (s) por el bloqueo de escritura de otro proceso
+STORE_BUSY_TIMEOUT = 60.0
+
+# Por debajo de esta longitud el índice de trigramas no sirve
+_MIN_TRIGRAM_LENGTH = 3
+
+# Nombres aceptados para la columna de búsqueda y la de URL
+QUERY_COLUMNS = ('query', 'keyword')
+PAGE_COLUMNS = ('page', 'url')
+METRIC_COLUMNS = ('clicks', 'impressions', 'ctr', 'position')
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS gsc_meta ("
+    " key TEXT PRIMARY KEY,"
+    " value TEXT NOT NULL)",
+
+    "CREATE TABLE IF NOT EXISTS gsc_sources ("
+    " source_id INTEGER PRIMARY KEY,"
+    " path TEXT NOT NULL,"
+    " kind TEXT NOT NULL,"
+    " columns TEXT NOT NULL,"
+    " fingerprint TEXT NOT NULL,"
+    " ingested_bytes INTEGER NOT NULL,"
+    " tail_sha256 TEXT NOT NULL,"
+    " row_count INTEGER NOT NULL,"
+    " summary TEXT NOT NULL,"
+    " ingested_at TEXT NOT NULL,"
+    " UNIQUE (path, kind))",
+
+    "CREATE TABLE IF NOT EXISTS gsc_queries ("
+    " query_id INTEGER PRIMARY KEY,"
+    " source_id INTEGER NOT NULL,"
+    " query_lower TEXT NOT NULL,"
+    " query_key TEXT NOT NULL,"
+    " query_form TEXT NOT NULL,"
+    " first_row INTEGER NOT NULL,"
+    " UNIQUE (source_id, query_lower))",
+
+    "CREATE TABLE IF NOT EXISTS gsc_pages ("
+    " page_id INTEGER PRIMARY KEY,"
+    " source_id INTEGER NOT NULL,"
+    " page_lower TEXT NOT NULL,"
+    " UNIQUE (source_id, page_lower))",
+
+    "CREATE TABLE IF NOT EXISTS gsc_rows ("
+    " source_id INTEGER NOT NULL,"
+    " row_num INTEGER NOT NULL,"
+    " query_id INTEGER NOT NULL,"
+    " page_id INTEGER NOT NULL,"
+    " query TEXT NOT NULL,"
+    " page TEXT NOT NULL,"
+    " clicks NUMERIC NOT NULL,"
+    " impressions NUMERIC NOT NULL,"
+    " ctr REAL NOT NULL,"
+    " position REAL NOT NULL,"
+    " extra TEXT)",
+
+    "CREATE INDEX IF NOT EXISTS idx_gsc_queries_key ON gsc_queries (source_id, query_key)",
+    "CREATE INDEX IF NOT EXISTS idx_gsc_queries_form ON gsc_queries (source_id, query_form)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_gsc_rows_row ON gsc_rows (source_id, row_num)",
+    "CREATE INDEX IF NOT EXISTS idx_gsc_rows_page ON gsc_rows (source_id, page_id)",
+    "CREATE INDEX IF NOT EXISTS idx_gsc_rows_clicks ON gsc_rows (source_id, clicks DESC, row_num)",
+    # Cubre las agregaciones por búsqueda (top_keywords)
+    "CREATE INDEX IF NOT EXISTS idx_gsc_rows_query"
+    " ON gsc_rows (source_id, query_id, clicks, impressions, ctr, position)",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS gsc_queries_fts USING fts5("
+    " query_lower, query_form,"
+    " content='gsc_queries', content_rowid='query_id', tokenize='trigram')",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS gsc_pages_fts USING fts5("
+    " page_lower,"
+    " content='gsc_pages', content_rowid='page_id', tokenize='trigram')",
+
+    "CREATE TRIGGER IF NOT EXISTS gsc_queries_ai AFTER INSERT ON gsc_queries BEGIN"
+    " INSERT INTO gsc_queries_fts (rowid, query_lower, query_form)"
+    " VALUES (new.query_id, new.query_lower, new.query_form);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS gsc_queries_ad AFTER DELETE ON gsc_queries BEGIN"
+    " INSERT INTO gsc_queries_fts (gsc_queries_fts, rowid, query_lower, query_form)"
+    " VALUES ('delete', old.query_id, old.query_lower, old.query_form);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS gsc_pages_ai AFTER INSERT ON gsc_pages BEGIN"
+    " INSERT INTO gsc_pages_fts (rowid, page_lower) VALUES (new.page_id, new.page_lower);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS gsc_pages_ad AFTER DELETE ON gsc_pages BEGIN"
+    " INSERT INTO gsc_pages_fts (gsc_pages_fts, rowid, page_lower)"
+    " VALUES ('delete', old.page_id, old.page_lower);"
+    " END",
+)
+
+_TABLES = ('gsc_queries_fts', 'gsc_pages_fts', 'gsc_rows', 'gsc_queries', 'gsc_pages', 'gsc_sources', 'gsc_meta')
+
+# Columnas de una fila completa (ver GSCStore._record)
+_ROW_SELECT = (
+    "r.row_num, r.query, r.page, r.clicks, r.impressions, r.ctr, r.position, r.extra,"
+    " q.query_lower, q.query_form"
+)
+
+
+# ============================================================================
+# EXCEPCIONES
+# ============================================================================
+
+class GSCStoreError(Exception):
+    """Error del almacén SQLite de GSC."""
+    pass
+
+
+# ============================================================================
+# UTILIDADES
+# ============================================================================
+
+def _like_pattern(needle: str) -> str:
+    """Patrón LIKE de subcadena (los comodines del texto dan un superconjunto)."""
+    return f"%{needle}%"
+
+
+def _substrings(text: str) -> List[str]:
+    """Todas las subcadenas de text, incluida la vacía."""
+    return list({
+        text[start:end]
+        for start in range(len(text) + 1)
+        for end in range(start, len(text) + 1)
+    })
+
+
+# ============================================================================
+# CLASE PRINCIPAL: GSCStore
+# ============================================================================
+
+class GSCStore:
+    """
+    Almacén SQLite de datos GSC compartible entre procesos.
+
+    Cada hilo usa su propia conexión; las lecturas no bloquean la ingesta
+    gracias al modo WAL.
+
+    Example:
+        >>> store = GSCStore('/var/data/gsc.sqlite')
+        >>> source_id = store.ingest_csv('gsc_data.csv', 'gsc_data', ',', convert)
+        >>> store.keywords_for_url(source_id, '/portatiles', limit=10)
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Abre (o crea) el almacén.
+
+        Args:
+            path: Archivo SQLite (':memory:' solo sirve para un hilo)
+
+        Raises:
+            GSCStoreError: Si SQLite no tiene FTS5 o no se puede abrir
+        """
+        self.path = str(path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._full_ingests = 0
+        self._incremental_ingests = 0
+
+        conn = self._connection()
+        try:
+            self._init_schema(conn)
+        except sqlite3.Error as e:
+            raise GSCStoreError(f"No se pudo preparar el almacén GSC ({self.path}): {e}") from e
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=STORE_BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = None
+            if self._has_table(conn, 'gsc_meta'):
+                row = conn.execute("SELECT value FROM gsc_meta WHERE key = 'schema_version'").fetchone()
+                version = int(row[0]) if row else None
+
+            if version is not None and version != STORE_SCHEMA_VERSION:
+                logger.info(f"Esquema del almacén GSC obsoleto ({version}), se recrea")
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT OR REPLACE INTO gsc_meta (key, value) VALUES ('schema_version', ?)",
+                (str(STORE_SCHEMA_VERSION),)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def close(self) -> None:
+        """Cierra las conexiones de todos los hilos."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------------
+    # Ingesta
+    # ------------------------------------------------------------------------
+
+    def ingest_csv(
+        self,
+        path: Union[str, Path],
+        kind: str,
+        separator: str,
+        convert: Callable[[str, Optional[str]], Any],
+        encoding: str = 'utf-8'
+    ) -> int:
+        """
+        Ingiere un CSV (solo lo que falte) y retorna su source_id.
+
+        Args:
+            path: CSV de origen
+            kind: Cargador al que corresponde ('gsc_data', 'gsc_keywords')
+            separator: Separador de columnas
+            convert: Conversión de cada valor, (columna, texto) -> valor
+            encoding: Codificación del CSV
+
+        Returns:
+            source_id de la fuente, para las consultas
+        """
+        path = Path(path).resolve()
+        fingerprint = file_fingerprint(path)
+        conn = self._connection()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            source = conn.execute(
+                "SELECT source_id, columns, fingerprint, ingested_bytes, tail_sha256, row_count"
+                " FROM gsc_sources WHERE path = ? AND kind = ?",
+                (str(path), kind)
+            ).fetchone()
+
+            if source is not None and json.loads(source[2]) == fingerprint:
+                conn.execute("COMMIT")
+                return source[0]
+
+            start_offset, start_row, columns = 0, 0, None
+            if source is not None:
+                source_id = source[0]
+                appended = (
+                    fingerprint['size'] > source[3]
+                    and tail_hash(path, source[3]) == source[4]
+                )
+                if appended:
+                    start_offset, start_row, columns = source[3], source[5], json.loads(source[1])
+                else:
+                    for table in ('gsc_rows', 'gsc_queries', 'gsc_pages'):
+                        conn.execute(f"DELETE FROM {table} WHERE source_id = ?", (source_id,))
+            else:
+                source_id = conn.execute(
+                    "INSERT INTO gsc_sources (path, kind, columns, fingerprint, ingested_bytes,"
+                    " tail_sha256, row_count, summary, ingested_at) VALUES (?, ?, '[]', '{}', 0, '', 0, '{}', '')",
+                    (str(path), kind)
+                ).lastrowid
+
+            columns, row_count = self._ingest_rows(
+                conn, source_id, path, separator, convert, encoding,
+                start_offset, start_row, columns
+            )
+
+            conn.execute(
+                "UPDATE gsc_sources SET columns = ?, fingerprint = ?, ingested_bytes = ?,"
+                " tail_sha256 = ?, row_count = ?, summary = ?, ingested_at = ? WHERE source_id = ?",
+                (
+                    json.dumps(columns),
+                    json.dumps(fingerprint),
+                    fingerprint['size'],
+                    tail_hash(path, fingerprint['size']) or '',
+                    row_count,
+                    json.dumps(self._compute_summary(conn, source_id)),
+                    datetime.now().isoformat(),
+                    source_id,
+                )
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if start_offset:
+            self._incremental_ingests += 1
+        else:
+            self._full_ingests += 1
+        mode = 'incremental' if start_offset else 'completa'
+        logger.info(f"GSC ingerido en el almacén ({mode}): {path} -> {row_count - start_row} filas nuevas")
+        return source_id
+
+    def _ingest_rows(
+        self,
+        conn: sqlite3.Connection,
+        source_id: int,
+        path: Path,
+        separator: str,
+        convert: Callable[[str, Optional[str]], Any],
+        encoding: str,
+        start_offset: int,
+        start_row: int,
+        columns: Optional[List[str]]
+    ) -> Tuple[List[str], int]:
+        """Inserta por lotes las filas desde start_offset. Retorna (columnas, total de filas)."""
+        # Ids de los textos ya ingeridos (la ingesta incremental los reutiliza)
+        query_ids: Dict[str, int] = dict(conn.execute(
+            "SELECT query_lower, query_id FROM gsc_queries WHERE source_id = ?", (source_id,)
+        ))
+        page_ids: Dict[str, int] = dict(conn.execute(
+            "SELECT page_lower, page_id FROM gsc_pages WHERE source_id = ?", (source_id,)
+        ))
+        # Con el bloqueo de escritura tomado, los ids siguientes son nuestros
+        next_query_id = conn.execute("SELECT COALESCE(MAX(query_id), 0) + 1 FROM gsc_queries").fetchone()[0]
+        next_page_id = conn.execute("SELECT COALESCE(MAX(page_id), 0) + 1 FROM gsc_pages").fetchone()[0]
+
+        with open(path, 'rb') as raw:
+            if start_offset:
+                raw.seek(start_offset)
+                text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+            else:
+                text = io.TextIOWrapper(raw, encoding='utf-8-sig' if encoding == 'utf-8' else encoding, newline='')
+            reader = csv.reader(text, delimiter=separator)
+
+            if columns is None:
+                header = next(reader, None) or []
+                columns = [col.lower().strip().replace('\ufeff', '') for col in header]
+
+            query_col = next((c for c in QUERY_COLUMNS if c in columns), None)
+            page_col = next((c for c in PAGE_COLUMNS if c in columns), None)
+            extra_cols = [c for c in columns if c not in (query_col, page_col) + METRIC_COLUMNS]
+
+            row_num = start_row
+            rows: List[tuple] = []
+            new_queries: List[tuple] = []
+            new_pages: List[tuple] = []
+
+            for values in reader:
+                if not values:
+                    continue
+                row = {
+                    name: convert(name, values[i] if i < len(values) else None)
+                    for i, name in enumerate(columns)
+                }
+                query = '' if row.get(query_col) is None else str(row.get(query_col))
+                page = '' if row.get(page_col) is None else str(row.get(page_col))
+
+                query_lower = query.lower()
+                query_id = query_ids.get(query_lower)
+                if query_id is None:
+                    query_id = query_ids[query_lower] = next_query_id
+                    next_query_id += 1
+                    new_queries.append((
+                        query_id, source_id, query_lower, query_lower.strip(),
+                        normalize_keyword(query_lower), row_num
+                    ))
+
+                page_lower = page.lower()
+                page_id = page_ids.get(page_lower)
+                if page_id is None:
+                    page_id = page_ids[page_lower] = next_page_id
+                    next_page_id += 1
+                    new_pages.append((page_id, source_id, page_lower))
+
+                extra = {name: row[name] for name in extra_cols}
+                rows.append((
+                    source_id, row_num, query_id, page_id, query, page,
+                    row.get('clicks') or 0, row.get('impressions') or 0,
+                    row.get('ctr') or 0.0, row.get('position') or 0.0,
+                    json.dumps(extra, ensure_ascii=False) if extra else None,
+                ))
+                row_num += 1
+
+                if len(rows) >= INGEST_BATCH_SIZE:
+                    self._insert(conn, rows, new_queries, new_pages)
+                    rows, new_queries, new_pages = [], [], []
+
+            self._insert(conn, rows, new_queries, new_pages)
+            text.detach()
+
+        return columns, row_num
+
+    @staticmethod
+    def _insert(
+        conn: sqlite3.Connection,
+        rows: List[tuple],
+        queries: List[tuple],
+        pages: List[tuple]
+    ) -> None:
+        conn.executemany(
+            "INSERT INTO gsc_queries (query_id, source_id, query_lower, query_key, query_form, first_row)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            queries
+        )
+        conn.executemany(
+            "INSERT INTO gsc_pages (page_id, source_id, page_lower) VALUES (?, ?, ?)",
+            pages
+        )
+        conn.executemany(
+            "INSERT INTO gsc_rows (source_id, row_num, query_id, page_id, query, page,"
+            " clicks, impressions, ctr, position, extra)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def source_info(self, source_id: int) -> Optional[Dict[str, Any]]:
+        """Datos de una fuente ingerida (ruta, columnas, filas, fecha de ingesta)."""
+        row = self._connection().execute(
+            "SELECT path, kind, columns, row_count, ingested_at FROM gsc_sources WHERE source_id = ?",
+            (source_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'path': row[0],
+            'kind': row[1],
+            'columns': json.loads(row[2]),
+            'row_count': row[3],
+            'ingested_at': row[4],
+        }
+
+    # ------------------------------------------------------------------------
+    # Filas
+    # ------------------------------------------------------------------------
+
+    def _record(self, columns: List[str], row: tuple) -> Dict[str, Any]:
+        """
+        Fila como dict con las columnas del CSV original, más '_row',
+        '_query_lower' y '_query_form' para puntuar sin volver a normalizar.
+        """
+        row_num, query, page, clicks, impressions, ctr, position, extra, query_lower, query_form = row
+        extra = json.loads(extra) if extra else {}
+        values = {'clicks': clicks, 'impressions': impressions, 'ctr': ctr, 'position': position}
+        record = {}
+        for name in columns:
+            if name in QUERY_COLUMNS:
+                record[name] = query
+            elif name in PAGE_COLUMNS:
+                record[name] = page
+            elif name in values:
+                record[name] = values[name]
+            else:
+                record[name] = extra.get(name)
+        record['_row'] = row_num
+        record['_query_lower'] = query_lower
+        record['_query_form'] = query_form
+        return record
+
+    def _rows(self, sql: str, params: Sequence[Any]) -> Iterator[tuple]:
+        return iter(self._connection().execute(sql, params))
+
+    @staticmethod
+    def _substring_ids(source_id: int, table: str, column: str, needle: str) -> Tuple[str, List[Any]]:
+        """
+        Subconsulta con los ids de gsc_queries o gsc_pages cuyo column
+        contiene needle.
+
+        Con subcadenas de 3 caracteres o más la resuelve el índice de
+        trigramas (y instr descarta los falsos positivos de los comodines
+        de LIKE; los ids de otras fuentes los filtra quien la usa); las más
+        cortas recorren los valores distintos de la fuente.
+        """
+        if len(needle) >= _MIN_TRIGRAM_LENGTH:
+            return (
+                f"SELECT rowid FROM {table}_fts WHERE {column} LIKE ? AND instr({column}, ?) > 0",
+                [_like_pattern(needle), needle]
+            )
+        id_column = 'query_id' if table == 'gsc_queries' else 'page_id'
+        return (
+            f"SELECT {id_column} FROM {table} WHERE source_id = ? AND instr({column}, ?) > 0",
+            [source_id, needle]
+        )
+
+    def _matching_query_ids(
+        self,
+        source_id: int,
+        keyword_lower: str,
+        words: Sequence[str],
+        form: str,
+        contained: bool
+    ) -> Tuple[str, List[Any]]:
+        """
+        Subconsulta con los ids de las búsquedas que contienen la keyword o
+        alguna palabra, tienen su forma normalizada o la contienen y (con
+        contained) están contenidas en la keyword.
+        """
+        branches: List[str] = []
+        params: List[Any] = []
+
+        for needle in dict.fromkeys([keyword_lower, *words]):
+            branch, branch_params = self._substring_ids(source_id, 'gsc_queries', 'query_lower', needle)
+            branches.append(branch)
+            params += branch_params
+        if form:
+            branches.append("SELECT query_id FROM gsc_queries WHERE source_id = ? AND query_form = ?")
+            params += [source_id, form]
+            branch, branch_params = self._substring_ids(source_id, 'gsc_queries', 'query_form', form)
+            branches.append(branch)
+            params += branch_params
+        if contained:
+            branches.append(
+                "SELECT query_id FROM gsc_queries WHERE source_id = ?"
+                " AND query_lower IN (SELECT value FROM json_each(?))"
+            )
+            params += [source_id, json.dumps(_substrings(keyword_lower))]
+
+        return ' UNION '.join(branches), params
+
+    def matching_texts(
+        self,
+        source_id: int,
+        keyword_lower: str,
+        words: Sequence[str] = (),
+        form: str = '',
+        contained: bool = False
+    ) -> List[Tuple[str, str]]:
+        """
+        Búsquedas distintas candidatas para una keyword.
+
+        La puntuación solo depende del texto, así que se puntúa una vez
+        por búsqueda y después se piden sus filas (rows_for_texts).
+
+        Returns:
+            (búsqueda en minúsculas, forma normalizada), en orden de
+            primera aparición
+        """
+        subquery, params = self._matching_query_ids(source_id, keyword_lower, words, form, contained)
+        sql = (
+            "SELECT query_lower, query_form FROM gsc_queries"
+            f" WHERE query_id IN ({subquery}) AND +source_id = ? ORDER BY first_row"
+        )
+        return list(self._rows(sql, [*params, source_id]))
+
+    def rows_for_texts(
+        self,
+        source_id: int,
+        scores: Dict[str, float],
+        min_impressions: int = 0,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Mejores filas de las búsquedas puntuadas.
+
+        Args:
+            scores: Búsqueda en minúsculas -> puntuación
+            min_impressions: Mínimo de impresiones por fila
+            limit: Máximo de filas
+
+        Returns:
+            Filas (ver _record, más '_score') por puntuación, clicks y
+            orden de fila
+        """
+        if not scores:
+            return []
+        info = self.source_info(source_id)
+        sql = (
+            f"SELECT s.value, {_ROW_SELECT} FROM json_each(?) s"
+            " JOIN gsc_queries q ON q.source_id = ? AND q.query_lower = s.key"
+            " JOIN gsc_rows r ON r.source_id = q.source_id AND r.query_id = q.query_id"
+            " WHERE r.impressions >= ? ORDER BY s.value DESC, r.clicks DESC, r.row_num LIMIT ?"
+        )
+        records = []
+        for row in self._rows(sql, [json.dumps(scores), source_id, min_impressions, limit]):
+            record = self._record(info['columns'], row[1:])
+            record['_score'] = row[0]
+            records.append(record)
+        return records
+
+    def first_rows(self, source_id: int, keys: Sequence[str]) -> List[Dict[str, Any]]:
+        """Primera fila de cada búsqueda agrupada (strip + lower), en orden de fila."""
+        if not keys:
+            return []
+        info = self.source_info(source_id)
+        sql = (
+            f"SELECT {_ROW_SELECT} FROM ("
+            "  SELECT MIN(first_row) AS first_row FROM gsc_queries"
+            "  WHERE source_id = ? AND query_key IN (SELECT value FROM json_each(?))"
+            "  GROUP BY query_key"
+            ") f JOIN gsc_rows r ON r.source_id = ? AND r.row_num = f.first_row"
+            " JOIN gsc_queries q ON q.query_id = r.query_id ORDER BY r.row_num"
+        )
+        return [
+            self._record(info['columns'], row)
+            for row in self._rows(sql, [source_id, json.dumps(list(keys)), source_id])
+        ]
+
+    # ------------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------------
+
+    def keywords_for_url(
+        self,
+        source_id: int,
+        url: str,
+        min_clicks: int = 0,
+        min_impressions: int = 0,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Filas cuya URL contiene url, ordenadas por clicks (mismo formato que get_keywords_for_url)."""
+        condition, params = '1', []
+        if url:
+            subquery, params = self._substring_ids(source_id, 'gsc_pages', 'page_lower', url.lower())
+            condition = f"page_id IN ({subquery})"
+        sql = (
+            "SELECT query, clicks, impressions, ctr, position FROM gsc_rows"
+            f" WHERE source_id = ? AND {condition} AND +clicks >= ? AND +impressions >= ?"
+            " ORDER BY clicks DESC, row_num LIMIT ?"
+        )
+        return [
+            {'query': query, 'clicks': clicks, 'impressions': impressions, 'ctr': ctr, 'position': position}
+            for query, clicks, impressions, ctr, position in self._rows(
+                sql, [source_id, *params, min_clicks, min_impressions, limit]
+            )
+        ]
+
+    def top_keywords(self, source_id: int, limit: int = 100, min_clicks: int = 1) -> List[Dict[str, Any]]:
+        """Queries agregadas (strip + lower) con más clicks (mismo formato que get_top_keywords)."""
+        sql = (
+            "WITH per_query AS ("
+            "  SELECT query_id, SUM(clicks) AS clicks, SUM(impressions) AS impressions,"
+            "  SUM(ctr) AS ctr, SUM(position) AS position, COUNT(*) AS n"
+            "  FROM gsc_rows WHERE source_id = ? GROUP BY query_id"
+            "), per_key AS ("
+            "  SELECT MIN(q.first_row) AS first_row, SUM(p.clicks) AS clicks, SUM(p.impressions) AS impressions,"
+            "  SUM(p.ctr) AS ctr, SUM(p.position) AS position, SUM(p.n) AS n"
+            "  FROM per_query p JOIN gsc_queries q ON q.query_id = p.query_id"
+            "  WHERE q.query_key != '' GROUP BY q.query_key HAVING SUM(p.clicks) >= ?"
+            ")"
+            " SELECT r.query, k.clicks, k.impressions, k.ctr * 1.0 / k.n, k.position * 1.0 / k.n"
+            " FROM per_key k JOIN gsc_rows r ON r.source_id = ? AND r.row_num = k.first_row"
+            " ORDER BY k.clicks DESC, k.first_row LIMIT ?"
+        )
+        return [
+            {'query': query, 'clicks': clicks, 'impressions': impressions, 'ctr': ctr, 'position': position}
+            for query, clicks, impressions, ctr, position in self._rows(
+                sql, [source_id, min_clicks, source_id, limit]
+            )
+        ]
+
+    @staticmethod
+    def _compute_summary(conn: sqlite3.Connection, source_id: int) -> Dict[str, Any]:
+        """Totales de una fuente; se calculan al ingerir y se guardan con ella."""
+        rows = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(clicks), 0), COALESCE(SUM(impressions), 0),"
+            " COALESCE(AVG(position), 0) FROM gsc_rows WHERE source_id = ?",
+            (source_id,)
+        ).fetchone()
+        unique_queries = conn.execute(
+            "SELECT COUNT(*) FROM gsc_queries WHERE source_id = ? AND query_lower != ''", (source_id,)
+        ).fetchone()[0]
+        unique_pages = conn.execute(
+            "SELECT COUNT(*) FROM gsc_pages WHERE source_id = ? AND page_lower != ''", (source_id,)
+        ).fetchone()[0]
+        return {
+            'total_rows': rows[0],
+            'unique_queries': unique_queries,
+            'unique_pages': unique_pages,
+            'total_clicks': rows[1],
+            'total_impressions': rows[2],
+            'avg_position': rows[3],
+        }
+
+    def summary(self, source_id: int) -> Dict[str, Any]:
+        """Totales de una fuente (filas, valores únicos, clicks, impresiones, posición media)."""
+        row = self._connection().execute(
+            "SELECT summary FROM gsc_sources WHERE source_id = ?", (source_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def url_metrics_for_query(
+        self,
+        source_id: int,
+        keyword_lower: str,
+        min_impressions: int,
+        max_results: int
+    ) -> List[Tuple[str, Any, Any, float, float, int]]:
+        """
+        Agregado por URL de las filas cuya búsqueda contiene la keyword.
+
+        Returns:
+            (url, clicks, impresiones, posición * impresiones, suma de
+            posiciones, filas), por clicks descendente y, a igualdad, por
+            la primera fila de cada URL
+        """
+        subquery, params = self._substring_ids(source_id, 'gsc_queries', 'query_lower', keyword_lower)
+        sql = (
+            "SELECT page, SUM(clicks) AS clicks, SUM(impressions), SUM(position * impressions),"
+            " SUM(position), COUNT(*), MIN(row_num) AS first_row FROM gsc_rows"
+            f" WHERE source_id = ? AND query_id IN ({subquery}) AND +impressions >= ? AND page != ''"
+            " GROUP BY page ORDER BY clicks DESC, first_row LIMIT ?"
+        )
+        return [row[:6] for row in self._rows(sql, [source_id, *params, min_impressions, max_results])]
+
+    def get_stats(self) -> Dict[str, Any]:
+        conn = self._connection()
+        sources = conn.execute("SELECT COUNT(*), COALESCE(SUM(row_count), 0) FROM gsc_sources").fetchone()
+        return {
+            'path': self.path,
+            'sources': sources[0],
+            'rows': sources[1],
+            'full_ingests': self._full_ingests,
+            'incremental_ingests': self._incremental_ingests,
+        }
+
+    def __repr__(self) -> str:
+        return f"GSCStore(path={self.path!r})"
+
+
+# ============================================================================
+# INSTANCIA GLOBAL
+# ============================================================================
+
+_store: Optional[GSCStore] = None
+_store_lock = threading.Lock()
+
+
+def get_gsc_store() -> Optional[GSCStore]:
+    """
+    Almacén configurado en GSC_STORE_PATH (None si no hay o no se puede abrir).
+    """
+    global _store
+
+    if not GSC_STORE_PATH:
+        return None
+
+    with _store_lock:
+        if _store is None or _store.path != GSC_STORE_PATH:
+            try:
+                _store = GSCStore(GSC_STORE_PATH)
+            except (GSCStoreError, sqlite3.Error) as e:
+                logger.warning(f"Almacén GSC no disponible, se usan datos en memoria: {e}")
+                return None
+        return _store
+
+
+def reset_gsc_store() -> None:
+    """Cierra el almacén global (se reabre en la siguiente consulta)."""
+    global _store
+
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+__all__ = [
+    '__version__',
+    'GSC_STORE_PATH',
+    'STORE_SCHEMA_VERSION',
+    'GSCStoreError',
+    'GSCStore',
+    'get_gsc_store',
+    'reset_gsc_store',
+]
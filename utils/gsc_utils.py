@@ -22,6 +22,7 @@ import csv
 import json
 import hashlib
 import logging
+import sqlite3
 import threading
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -44,6 +45,38 @@ except ImportError:
     logger.warning("pandas no disponible - funcionalidad limitada")
     _pandas_available = False
 
+try:
+    import numpy as np
+    from utils.gsc_dataset import GSCDataset, GSCRecords
+    from utils.gsc_clusters import (
+        TopicClusters,
+        build_topic_clusters,
+        load_topic_clusters,
+        save_topic_clusters,
+    )
+    from utils.gsc_index import union_ids
+    from utils.gsc_snapshot import (
+        file_fingerprint,
+        is_snapshot_available,
+        load_snapshot,
+        save_snapshot,
+    )
+    _dataset_available = True
+except ImportError:
+    _dataset_available = False
+
+from utils.gsc_incremental import (
+    DatasetDelta,
+    IncrementalLoadError,
+    SourceState,
+    plan_increment,
+    read_csv_rows,
+    source_files,
+)
+from utils.gsc_store import GSCStore, get_gsc_store
+from utils.singleflight import SingleFlight, BackgroundRefresher
+from utils.spanish_text import FUZZY_MIN_SIMILARITY, normalize_keyword, trigram_similarity
+
 try:
     from config.settings import DATA_DIR, GSC_DATA_FILE
 except ImportError:
@@ -62,6 +95,9 @@ DEFAULT_CACHE_TTL = 3600  # 1 hora en segundos
 DEFAULT_CACHE_MAX_SIZE = 100  # Máximo de entradas en caché
 MIN_CACHE_TTL = 60  # Mínimo 1 minuto
 MAX_CACHE_TTL = 86400  # Máximo 24 horas
+# Ventana tras expirar en la que se sirve el valor viejo mientras se
+# recalcula en segundo plano (stale-while-revalidate). 0 = desactivado
+DEFAULT_CACHE_STALE_GRACE = 1800
 
 # Configuración de GSC
 GSC_DEFAULT_COLUMNS = [
@@ -152,6 +188,10 @@ class CacheEntry:
         """Verifica si la entrada ha expirado."""
         return datetime.now() > self.expires_at
     
+    def is_beyond_grace(self, grace: int) -> bool:
+        """Verifica si ha expirado hace más de `grace` segundos."""
+        return datetime.now() > self.expires_at + timedelta(seconds=grace)
+    
     def time_to_live(self) -> float:
         """Retorna segundos restantes de vida."""
         remaining = (self.expires_at - datetime.now()).total_seconds()
@@ -172,6 +212,7 @@ class TTLCache:
     - Límite máximo de entradas (LRU eviction)
     - Invalidación automática de entradas expiradas
     - Invalidación manual por clave o patrón
+    - Stale-while-revalidate con get_or_load (ventana de gracia)
     - Thread-safe con locks
     - Estadísticas de uso
     
@@ -186,7 +227,8 @@ class TTLCache:
         self,
         ttl: int = DEFAULT_CACHE_TTL,
         max_size: int = DEFAULT_CACHE_MAX_SIZE,
-        name: str = "default"
+        name: str = "default",
+        stale_grace: int = DEFAULT_CACHE_STALE_GRACE
     ):
         """
         Inicializa el caché.
@@ -195,17 +237,23 @@ class TTLCache:
             ttl: Time-to-live en segundos (default: 3600)
             max_size: Número máximo de entradas (default: 100)
             name: Nombre del caché para logging
+            stale_grace: Segundos tras expirar en los que get_or_load
+                sirve el valor viejo y lo recalcula en segundo plano
         """
         self._ttl = max(MIN_CACHE_TTL, min(ttl, MAX_CACHE_TTL))
         self._max_size = max(1, max_size)
         self._name = name
+        self._stale_grace = max(0, stale_grace)
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self._lock = threading.RLock()
+        self._flight = SingleFlight(name=f"cache-{name}")
+        self._refresher = BackgroundRefresher(name=f"cache-{name}", flight=self._flight)
         
         # Estadísticas
         self._stats = {
             'hits': 0,
             'misses': 0,
+            'stale_hits': 0,
             'evictions': 0,
             'expirations': 0,
             'invalidations': 0,
@@ -224,25 +272,104 @@ class TTLCache:
         Returns:
             Valor almacenado o default
         """
+        value, is_stale = self.lookup(key, default, allow_stale=False)
+        return value
+    
+    def lookup(
+        self,
+        key: str,
+        default: Any = None,
+        allow_stale: bool = True
+    ) -> Tuple[Any, bool]:
+        """
+        Obtiene un valor indicando si está caducado.
+        
+        Con allow_stale, una entrada expirada dentro de la ventana de
+        gracia se devuelve igualmente (para refrescarla en segundo plano).
+        
+        Args:
+            key: Clave a buscar
+            default: Valor si no existe, expiró o está fuera de gracia
+            allow_stale: Si devolver valores caducados en ventana de gracia
+            
+        Returns:
+            Tupla (valor o default, es_stale)
+        """
         with self._lock:
             entry = self._cache.get(key)
             
             if entry is None:
                 self._stats['misses'] += 1
-                return default
+                return default, False
             
             if entry.is_expired():
-                self._remove_entry(key)
-                self._stats['expirations'] += 1
-                self._stats['misses'] += 1
-                return default
+                if entry.is_beyond_grace(self._stale_grace):
+                    self._remove_entry(key)
+                    self._stats['expirations'] += 1
+                    self._stats['misses'] += 1
+                    return default, False
+                
+                if not allow_stale:
+                    self._stats['misses'] += 1
+                    return default, False
+                
+                self._cache.move_to_end(key)
+                entry.touch()
+                self._stats['stale_hits'] += 1
+                return entry.value, True
             
             # Mover al final (más reciente) y actualizar stats
             self._cache.move_to_end(key)
             entry.touch()
             self._stats['hits'] += 1
             
-            return entry.value
+            return entry.value, False
+    
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Obtiene un valor o lo calcula, con stale-while-revalidate.
+        
+        - Fresco: se devuelve directamente.
+        - Caducado dentro de la ventana de gracia: se devuelve el valor
+          viejo y se recalcula en segundo plano (una vez por clave).
+        - Sin valor: se calcula en primer plano; las llamadas concurrentes
+          con la misma clave comparten un único cálculo.
+        
+        Los resultados None no se cachean.
+        
+        Args:
+            key: Clave de caché
+            loader: Función sin argumentos que calcula el valor
+            ttl: TTL específico para esta entrada (opcional)
+            
+        Returns:
+            Valor cacheado o recién calculado
+        """
+        value, is_stale = self.lookup(key)
+        
+        if value is not None:
+            if is_stale:
+                self._refresher.submit(key, self._load_and_store, key, loader, ttl)
+            return value
+        
+        return self._flight.do(key, self._load_and_store, key, loader, ttl)
+    
+    def _load_and_store(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[int]
+    ) -> Any:
+        """Ejecuta el loader y guarda el resultado (interno)."""
+        result = loader()
+        if result is not None:
+            self.set(key, result, ttl=ttl)
+        return result
     
     def set(
         self,
@@ -334,6 +461,31 @@ class TTLCache:
             
             return len(keys_to_remove)
     
+    def invalidate_prefix(self, prefix: str) -> int:
+        """
+        Invalida todas las entradas cuya clave empieza por un prefijo.
+        
+        Args:
+            prefix: Prefijo de clave (p. ej. el namespace de una función)
+            
+        Returns:
+            Número de entradas invalidadas
+        """
+        with self._lock:
+            keys_to_remove = [key for key in self._cache.keys() if key.startswith(prefix)]
+            
+            for key in keys_to_remove:
+                self._remove_entry(key)
+                self._stats['invalidations'] += 1
+            
+            if keys_to_remove:
+                logger.info(
+                    f"Caché '{self._name}': INVALIDATE_PREFIX '{prefix}' "
+                    f"({len(keys_to_remove)} entradas)"
+                )
+            
+            return len(keys_to_remove)
+    
     def invalidate_all(self) -> int:
         """
         Invalida todas las entradas del caché.
@@ -373,7 +525,8 @@ class TTLCache:
             if entry is None:
                 return False
             if entry.is_expired():
-                self._remove_entry(key)
+                if entry.is_beyond_grace(self._stale_grace):
+                    self._remove_entry(key)
                 return False
             return True
     
@@ -414,10 +567,13 @@ class TTLCache:
                 'ttl': self._ttl,
                 'hits': self._stats['hits'],
                 'misses': self._stats['misses'],
+                'stale_hits': self._stats['stale_hits'],
                 'hit_rate': f"{hit_rate:.1f}%",
                 'evictions': self._stats['evictions'],
                 'expirations': self._stats['expirations'],
                 'invalidations': self._stats['invalidations'],
+                'stale_grace': self._stale_grace,
+                'background_refresh': self._refresher.get_stats(),
             }
     
     def _remove_entry(self, key: str) -> None:
@@ -437,7 +593,7 @@ class TTLCache:
         """Limpia entradas expiradas (interno)."""
         expired_keys = [
             key for key, entry in self._cache.items()
-            if entry.is_expired()
+            if entry.is_beyond_grace(self._stale_grace)
         ]
         
         for key in expired_keys:
@@ -474,7 +630,8 @@ def get_gsc_cache() -> TTLCache:
 
 def reset_gsc_cache(
     ttl: Optional[int] = None,
-    max_size: Optional[int] = None
+    max_size: Optional[int] = None,
+    stale_grace: Optional[int] = None
 ) -> TTLCache:
     """
     Resetea el caché GSC con nueva configuración.
@@ -482,6 +639,7 @@ def reset_gsc_cache(
     Args:
         ttl: Nuevo TTL (opcional)
         max_size: Nuevo tamaño máximo (opcional)
+        stale_grace: Nueva ventana stale-while-revalidate (opcional)
         
     Returns:
         Nueva instancia del caché
@@ -491,7 +649,8 @@ def reset_gsc_cache(
     _gsc_cache = TTLCache(
         ttl=ttl or DEFAULT_CACHE_TTL,
         max_size=max_size or DEFAULT_CACHE_MAX_SIZE,
-        name="gsc"
+        name="gsc",
+        stale_grace=DEFAULT_CACHE_STALE_GRACE if stale_grace is None else stale_grace
     )
     
     return _gsc_cache
@@ -503,19 +662,80 @@ def reset_gsc_cache(
 
 T = TypeVar('T')
 
+# Separador de las partes de una clave: namespace|versión|arg|arg...
+_KEY_SEPARATOR = "|"
+
+
+def _short_hash(value: Any) -> str:
+    """Hash corto de un argumento (el mismo que usan invalidate_*_cache)."""
+    return hashlib.md5(str(value).encode()).hexdigest()[:8]
+
+
+def get_dataset_version(file_path: Optional[Union[str, Path]] = None) -> str:
+    """
+    Versión de un archivo de datos GSC según su identidad en disco.
+    
+    Cambia cuando cambian la ruta, el mtime o el tamaño del archivo (o de
+    cualquier partición, si es un directorio), así que las entradas de
+    caché calculadas con otro contenido dejan de coincidir sin necesidad
+    de invalidarlas.
+    
+    Args:
+        file_path: Archivo de datos (por defecto, GSC_DATA_FILE)
+        
+    Returns:
+        Identificador corto de la versión ("nofile" si no existe)
+    """
+    path = os.path.abspath(file_path or GSC_DATA_FILE)
+    try:
+        if os.path.isdir(path):
+            stats = [(p.name, p.stat()) for p in source_files(path)]
+            identity = ";".join(f"{name}:{st.st_mtime_ns}:{st.st_size}" for name, st in stats)
+        else:
+            stat = os.stat(path)
+            identity = f"{stat.st_mtime_ns}:{stat.st_size}"
+    except OSError:
+        return "nofile"
+    return hashlib.md5(f"{path}:{identity}".encode()).hexdigest()[:12]
+
+
+def _make_cache_key(namespace: str, version: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Clave de caché: namespace|versión|hash(arg)|...|k=hash(v)| (cada parte cerrada por |)."""
+    parts = [_short_hash(arg) for arg in args]
+    parts.extend(f"{k}={_short_hash(v)}" for k, v in sorted(kwargs.items()))
+    return _KEY_SEPARATOR.join([namespace, version, *parts, ''])
+
+
+def _default_gsc_file(*args, **kwargs) -> Path:
+    """Dataset del que dependen las funciones de análisis (el CSV por defecto)."""
+    return GSC_DATA_FILE
+
 
 def cached(
     ttl: Optional[int] = None,
     key_prefix: str = "",
-    cache_instance: Optional[TTLCache] = None
+    cache_instance: Optional[TTLCache] = None,
+    dataset: Optional[Callable[..., Optional[Union[str, Path]]]] = _default_gsc_file,
+    unaffected: Optional[Callable[..., bool]] = None
 ) -> Callable:
     """
     Decorador para cachear resultados de funciones.
     
+    Las claves llevan el namespace de la función y la versión del dataset
+    del que depende el resultado (ver get_dataset_version), de modo que un
+    cambio de datos no sirve resultados calculados con los anteriores y
+    se puede invalidar por función o por dataset.
+    
     Args:
         ttl: TTL específico (usa el del caché si no se especifica)
-        key_prefix: Prefijo para las claves de caché
+        key_prefix: Namespace de las claves (por defecto, el nombre de la función)
         cache_instance: Instancia de caché a usar (usa global si no se especifica)
+        dataset: Función que recibe los mismos argumentos y retorna el
+            archivo de datos del que depende el resultado (None = sin versión)
+        unaffected: Predicado (delta, *args, **kwargs) que indica si las
+            filas añadidas al dataset (DatasetDelta) dejan el resultado
+            igual; si el dataset creció de forma incremental y lo dejan
+            igual, se reutiliza el resultado de la versión anterior
         
     Returns:
         Decorador configurado
@@ -525,72 +745,93 @@ def cached(
         ... def get_keywords(url: str) -> List[str]:
         ...     # Lógica costosa
         ...     return keywords
+        >>> get_keywords.invalidate_all()  # solo las entradas de esta función
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        namespace = key_prefix or func.__name__
+        
+        def make_key(args: tuple, kwargs: Dict[str, Any]) -> str:
+            version = get_dataset_version(dataset(*args, **kwargs)) if dataset else "-"
+            return _make_cache_key(namespace, version, args, kwargs)
+        
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
             cache = cache_instance or _gsc_cache
+            key = make_key(args, kwargs)
             
-            # Generar clave única basada en argumentos
-            key_parts = [key_prefix or func.__name__]
-            
-            for arg in args:
-                key_parts.append(str(arg))
-            
-            for k, v in sorted(kwargs.items()):
-                key_parts.append(f"{k}={v}")
-            
-            cache_key = hashlib.md5(
-                ":".join(key_parts).encode()
-            ).hexdigest()
-            
-            # Intentar obtener del caché
-            cached_value = cache.get(cache_key)
-            
-            if cached_value is not None:
-                logger.debug(f"Cache HIT: {func.__name__}")
-                return cached_value
-            
-            # Ejecutar función y cachear resultado
-            logger.debug(f"Cache MISS: {func.__name__}")
-            result = func(*args, **kwargs)
+            def load() -> T:
+                if unaffected is not None and dataset is not None:
+                    carried = _carry_over(
+                        cache, namespace, dataset(*args, **kwargs), key, args, kwargs, unaffected
+                    )
+                    if carried is not None:
+                        return carried
+                return func(*args, **kwargs)
             
-            if result is not None:
-                cache.set(cache_key, result, ttl=ttl)
-            
-            return result
+            # Caché con stale-while-revalidate: al expirar se sirve el
+            # valor viejo y se recalcula en segundo plano
+            return cache.get_or_load(key, load, ttl=ttl)
         
-        # Añadir método para invalidar caché de esta función
+        # Métodos para invalidar el caché de esta función
         def invalidate_cache(*args, **kwargs) -> bool:
-            cache = cache_instance or _gsc_cache
-            
-            key_parts = [key_prefix or func.__name__]
-            for arg in args:
-                key_parts.append(str(arg))
-            for k, v in sorted(kwargs.items()):
-                key_parts.append(f"{k}={v}")
-            
-            cache_key = hashlib.md5(
-                ":".join(key_parts).encode()
-            ).hexdigest()
-            
-            return cache.invalidate(cache_key)
+            return (cache_instance or _gsc_cache).invalidate(make_key(args, kwargs))
         
         wrapper.invalidate = invalidate_cache
-        wrapper.invalidate_all = lambda: (cache_instance or _gsc_cache).invalidate_pattern(
-            key_prefix or func.__name__
+        wrapper.invalidate_all = lambda: (cache_instance or _gsc_cache).invalidate_prefix(
+            namespace + _KEY_SEPARATOR
         )
+        wrapper.cache_namespace = namespace
         
         return wrapper
     
     return decorator
 
 
+def _carry_over(
+    cache: TTLCache,
+    namespace: str,
+    file_path: Optional[Union[str, Path]],
+    key: str,
+    args: tuple,
+    kwargs: Dict[str, Any],
+    unaffected: Callable[..., bool]
+) -> Any:
+    """
+    Resultado cacheado con una versión anterior del dataset que las filas
+    añadidas desde entonces no cambian (None si no hay).
+    
+    Se recorren las cargas incrementales hacia atrás mientras el
+    predicado confirme que cada delta no afecta a la llamada.
+    """
+    if file_path is None:
+        return None
+    _sync_dataset(file_path)
+    
+    version = key.split(_KEY_SEPARATOR)[1]
+    while True:
+        with _ingest_lock:
+            step = _dataset_lineage.get(version)
+        if step is None:
+            return None
+        version, delta = step
+        if not unaffected(delta, *args, **kwargs):
+            return None
+        value = cache.get(_make_cache_key(namespace, version, args, kwargs))
+        if value is not None:
+            logger.debug(f"Caché GSC: {namespace} reutilizado de la versión {version} (+{delta.rows} filas)")
+            return value
+
+
 # ============================================================================
 # FUNCIONES DE CARGA DE DATOS GSC
 # ============================================================================
 
-@cached(ttl=3600, key_prefix="gsc_file")
+def _gsc_file_argument(file_path: Optional[Union[str, Path]] = None, *args, **kwargs) -> Path:
+    """Dataset del que depende load_gsc_data: su propio archivo."""
+    return Path(file_path) if file_path else GSC_DATA_FILE
+
+
+@cached(ttl=3600, key_prefix="gsc_file", dataset=_gsc_file_argument)
 def load_gsc_data(
     file_path: Optional[Union[str, Path]] = None,
     encoding: str = 'utf-8'
@@ -619,10 +860,44 @@ def load_gsc_data(
         # Actualizar fecha de carga
         set_gsc_data_date(datetime.now())
         
+        # Carga anterior más solo lo nuevo (filas añadidas o particiones nuevas)
+        dataset = _load_incremental(file_path, 'gsc_data', encoding, {'loader': 'gsc_data', 'encoding': encoding})
+        if dataset is not None:
+            return _gsc_data_result(dataset, file_path, 'incremental')
+        
+        version = get_dataset_version(file_path)
+        state = SourceState.capture(file_path)
+        
+        # Directorio de particiones (p. ej. un CSV por semana)
+        if file_path.is_dir():
+            result = _load_gsc_partitions(file_path, encoding)
+            _remember_ingest(file_path, 'gsc_data', version, state, result.get('dataset'))
+            _schedule_index_build(result.get('dataset'))
+            _schedule_topic_build(result.get('dataset'), file_path, None)
+            return result
+        
+        # Snapshot binario vigente: sin volver a parsear el CSV
+        fingerprint = file_fingerprint(file_path) if _dataset_available and is_snapshot_available() else None
+        if fingerprint is not None:
+            dataset = _load_gsc_snapshot(file_path, fingerprint, loader='gsc_data', encoding=encoding)
+            if dataset is not None:
+                _remember_ingest(file_path, 'gsc_data', version, state, dataset)
+                _schedule_index_build(dataset)
+                _schedule_topic_build(dataset, file_path, fingerprint)
+                return _gsc_data_result(dataset, file_path, 'snapshot')
+        
         if _pandas_available:
-            return _load_gsc_with_pandas(file_path, encoding)
+            result = _load_gsc_with_pandas(file_path, encoding)
         else:
-            return _load_gsc_with_csv(file_path, encoding)
+            result = _load_gsc_with_csv(file_path, encoding)
+        
+        if fingerprint is not None and result.get('dataset') is not None:
+            save_snapshot(file_path, result['dataset'], fingerprint, {'loader': 'gsc_data', 'encoding': encoding})
+        _remember_ingest(file_path, 'gsc_data', version, state, result.get('dataset'))
+        _schedule_index_build(result.get('dataset'))
+        _schedule_topic_build(result.get('dataset'), file_path, fingerprint)
+        
+        return result
             
     except UnicodeDecodeError as e:
         logger.error(f"Error de codificación al leer {file_path}: {e}")
@@ -646,6 +921,299 @@ def load_gsc_data(
         )
 
 
+# Construcción de índices (texto, trigramas, URLs) en segundo plano tras cada carga
+_index_builder = BackgroundRefresher("gsc_indexes", max_workers=1)
+
+
+def _schedule_index_build(dataset: Optional['GSCDataset']) -> None:
+    """Precalcula los índices de un dataset recién cargado sin bloquear la carga."""
+    if dataset is not None:
+        _index_builder.submit(id(dataset), dataset.build_indexes)
+
+
+def _schedule_topic_build(
+    dataset: Optional['GSCDataset'],
+    file_path: Path,
+    fingerprint: Optional[Dict[str, Any]]
+) -> None:
+    """
+    Calcula (o recupera de disco) los temas de un dataset recién cargado,
+    en segundo plano y después de sus índices.
+    """
+    if dataset is not None and dataset.queries is not None:
+        _index_builder.submit(
+            ('topics', id(dataset)), _topic_clusters_for, dataset, file_path, fingerprint
+        )
+
+
+def _topic_clusters_for(
+    dataset: 'GSCDataset',
+    file_path: Optional[Path] = None,
+    fingerprint: Optional[Dict[str, Any]] = None
+) -> Optional['TopicClusters']:
+    """
+    Temas de un dataset, calculados una sola vez.
+    
+    Con el CSV de origen y su huella se reutilizan los temas persistidos
+    junto al archivo o se guardan los recién calculados.
+    """
+    def load_or_build() -> Optional['TopicClusters']:
+        if file_path is not None and fingerprint is not None:
+            clusters = load_topic_clusters(file_path, fingerprint, dataset)
+            if clusters is not None:
+                return clusters
+        
+        clusters = build_topic_clusters(dataset)
+        if clusters is not None and file_path is not None and fingerprint is not None:
+            save_topic_clusters(file_path, clusters, fingerprint)
+        return clusters
+    
+    return dataset.derived('topics', load_or_build)
+
+
+def _load_gsc_snapshot(
+    file_path: Path,
+    fingerprint: Dict[str, Any],
+    **expected: Any
+) -> Optional['GSCDataset']:
+    """
+    Dataset del snapshot binario de un CSV, si es vigente y se generó
+    con el mismo cargador y opciones (expected).
+    """
+    snapshot = load_snapshot(file_path, fingerprint)
+    if snapshot is None:
+        return None
+    
+    dataset, metadata = snapshot
+    if any(metadata.get(key) != value for key, value in expected.items()):
+        return None
+    
+    logger.info(f"GSC cargado desde snapshot: {file_path} ({len(dataset)} filas)")
+    return dataset
+
+
+def _gsc_data_result(dataset: 'GSCDataset', file_path: Path, source: str) -> Dict[str, Any]:
+    """Resultado de load_gsc_data para un dataset ya construido."""
+    return {
+        'data': dataset.records(),
+        'dataset': dataset,
+        'columns': list(dataset.columns),
+        'row_count': len(dataset),
+        'file_path': str(file_path),
+        'loaded_at': datetime.now().isoformat(),
+        'source': source
+    }
+
+
+# ============================================================================
+# CARGA INCREMENTAL
+# ============================================================================
+
+# Máximo de cargas incrementales recordadas para reutilizar resultados cacheados
+MAX_DATASET_LINEAGE = 16
+
+
+@dataclass
+class _Ingested:
+    """Última carga de una fuente: lo leído, su versión y el dataset resultante."""
+    state: 'SourceState'
+    version: str
+    dataset: 'GSCDataset'
+
+
+# (ruta, cargador) -> última carga; se conserva el dataset para añadirle lo nuevo
+_ingest_states: Dict[Tuple[str, str], _Ingested] = {}
+
+# Versión nueva -> (versión anterior, filas añadidas entre ambas)
+_dataset_lineage: 'OrderedDict[str, Tuple[str, DatasetDelta]]' = OrderedDict()
+_ingest_lock = threading.Lock()
+
+
+def _ingest_key(file_path: Union[str, Path], loader: str) -> Tuple[str, str]:
+    return os.path.abspath(file_path), loader
+
+
+def _remember_ingest(
+    file_path: Path,
+    loader: str,
+    version: str,
+    state: 'SourceState',
+    dataset: Optional['GSCDataset']
+) -> None:
+    """Registra una carga completa como base de las siguientes incrementales."""
+    if dataset is None:
+        return
+    state.columns = list(dataset.columns)
+    with _ingest_lock:
+        _ingest_states[_ingest_key(file_path, loader)] = _Ingested(state, version, dataset)
+
+
+def _csv_value(loader: str) -> Callable[[str, Optional[str]], Any]:
+    """Conversión de valores del cargador csv correspondiente, (columna, texto) -> valor."""
+    if loader == 'gsc_keywords':
+        return _keywords_csv_value
+    return lambda name, value: _CSV_CONVERTERS.get(name, _keep_value)(value)
+
+
+def _load_incremental(
+    file_path: Path,
+    loader: str,
+    encoding: str,
+    snapshot_metadata: Dict[str, Any]
+) -> Optional['GSCDataset']:
+    """
+    Dataset de la última carga de file_path con solo lo nuevo añadido.
+    
+    Retorna None si no hay carga previa, no hay nada nuevo o lo ya leído
+    ha cambiado (reescrito, particiones borradas o con otras columnas):
+    entonces se carga como siempre.
+    """
+    if not _dataset_available:
+        return None
+    
+    key = _ingest_key(file_path, loader)
+    with _ingest_lock:
+        previous = _ingest_states.get(key)
+    if previous is None:
+        return None
+    
+    version = get_dataset_version(file_path)
+    try:
+        plan = plan_increment(previous.state, file_path)
+        if plan is None:
+            return None
+        state, reads = plan
+        if not reads:
+            # Sin filas nuevas: carga normal (snapshot o CSV)
+            return None
+        
+        columns: Dict[str, List[Any]] = {name: [] for name in previous.state.columns}
+        convert = _csv_value(loader)
+        for path, start, end in reads:
+            _, values = read_csv_rows(
+                path, start, end, _detect_csv_separator(path, encoding), encoding,
+                convert, previous.state.columns
+            )
+            for name, column in values.items():
+                columns[name].extend(column)
+        
+        dataset = previous.dataset.append(columns)
+    except (OSError, csv.Error, UnicodeDecodeError, ValueError, IncrementalLoadError) as e:
+        logger.info(f"Carga incremental no aplicable a {file_path}, se recarga entero: {e}")
+        return None
+    
+    delta = DatasetDelta(dataset, len(previous.dataset))
+    with _ingest_lock:
+        _ingest_states[key] = _Ingested(state, version, dataset)
+        if version != previous.version:
+            _dataset_lineage[version] = (previous.version, delta)
+            while len(_dataset_lineage) > MAX_DATASET_LINEAGE:
+                _dataset_lineage.popitem(last=False)
+    logger.info(f"GSC {file_path}: +{delta.rows} filas (carga incremental, {len(dataset)} en total)")
+    
+    # Snapshot solo si el CSV sigue exactamente como se leyó
+    fingerprint = None
+    if file_path.is_file() and is_snapshot_available():
+        fingerprint = file_fingerprint(file_path)
+        read = state.files[-1]
+        if (fingerprint['size'], fingerprint['mtime_ns']) == (read.size, read.mtime_ns):
+            save_snapshot(file_path, dataset, fingerprint, snapshot_metadata)
+        else:
+            fingerprint = None
+    _schedule_index_build(dataset)
+    _schedule_topic_build(dataset, file_path, fingerprint)
+    
+    return dataset
+
+
+def _sync_dataset(file_path: Union[str, Path]) -> None:
+    """
+    Carga (incremental) el CSV por defecto antes de buscar resultados de
+    versiones anteriores, para que su delta esté registrado.
+    
+    Con el almacén SQLite las consultas no usan el dataset en memoria y
+    no se carga.
+    """
+    if Path(file_path) != GSC_DATA_FILE or _gsc_store_source('gsc_data') is not None:
+        return
+    load_gsc_data()
+
+
+def _load_gsc_partitions(directory: Path, encoding: str) -> Dict[str, Any]:
+    """Carga un directorio de particiones CSV, concatenadas por orden de nombre."""
+    files = source_files(directory)
+    if not files:
+        raise GSCParseError("Directorio GSC sin archivos CSV", {"directory": str(directory)})
+    
+    fieldnames: Optional[List[str]] = None
+    columns: Dict[str, List[Any]] = {}
+    convert = _csv_value('gsc_data')
+    
+    for path in files:
+        try:
+            found, values = read_csv_rows(
+                path, 0, path.stat().st_size, _detect_csv_separator(path, encoding), encoding,
+                convert, fieldnames
+            )
+        except IncrementalLoadError as e:
+            raise GSCParseError("Particiones GSC con columnas distintas", {"error": str(e)})
+        if fieldnames is None:
+            fieldnames, columns = found, values
+        else:
+            for name in fieldnames:
+                columns[name].extend(values[name])
+    
+    logger.info(f"GSC cargado desde {len(files)} particiones: {directory}")
+    return _columns_result(columns, directory, 'partitions')
+
+
+# ============================================================================
+# ALMACÉN SQLITE (GSC_STORE_PATH)
+# ============================================================================
+
+# (almacén, ruta, cargador) -> (versión del CSV ingerida, source_id)
+_store_sources: Dict[Tuple[str, str, str], Tuple[str, int]] = {}
+_store_sources_lock = threading.Lock()
+
+
+def _gsc_store_source(kind: str) -> Optional[Tuple['GSCStore', int]]:
+    """
+    Almacén SQLite y source_id del CSV por defecto de un cargador.
+    
+    Con el almacén configurado, el CSV se ingiere (solo lo nuevo) la
+    primera vez y cada vez que cambia su versión; si no hay almacén o falla
+    la ingesta, retorna None y las consultas usan los datos en memoria.
+    
+    Args:
+        kind: 'gsc_data' (export de GSC) o 'gsc_keywords' (CSV de keywords)
+    """
+    store = get_gsc_store()
+    if store is None:
+        return None
+    
+    file_path = GSC_DATA_FILE if kind == 'gsc_data' else _find_keywords_csv()
+    # Los directorios de particiones solo se cargan en memoria
+    if file_path is None or not Path(file_path).is_file():
+        return None
+    
+    version = get_dataset_version(file_path)
+    key = (store.path, str(file_path), kind)
+    with _store_sources_lock:
+        known = _store_sources.get(key)
+    if known is not None and known[0] == version:
+        return store, known[1]
+    
+    try:
+        source_id = store.ingest_csv(file_path, kind, _detect_csv_separator(file_path), _csv_value(kind))
+    except (OSError, sqlite3.Error, csv.Error, UnicodeDecodeError) as e:
+        logger.warning(f"No se pudo ingerir {file_path} en el almacén GSC: {e}")
+        return None
+    
+    with _store_sources_lock:
+        _store_sources[key] = (version, source_id)
+    return store, source_id
+
+
 def _detect_csv_separator(file_path: Path, encoding: str = 'utf-8') -> str:
     """Detecta el separador del CSV (coma o punto y coma)."""
     try:
@@ -695,8 +1263,12 @@ def _load_gsc_with_pandas(
     if 'ctr' in df.columns:
         df['ctr'] = df['ctr'].apply(_parse_ctr)
     
+    # Almacén columnar; 'data' es solo una vista perezosa de compatibilidad
+    dataset = GSCDataset.from_dataframe(df)
+    
     return {
-        'data': df.to_dict('records'),
+        'data': dataset.records(),
+        'dataset': dataset,
         'columns': list(df.columns),
         'row_count': len(df),
         'file_path': str(file_path),
@@ -710,56 +1282,81 @@ def _load_gsc_with_csv(
     encoding: str
 ) -> Dict[str, Any]:
     """Carga GSC usando módulo csv estándar."""
-    rows = []
-    
     # Detectar separador
     separator = _detect_csv_separator(file_path, encoding)
     
     with open(file_path, 'r', encoding=encoding) as f:
         # Usar el separador detectado
-        reader = csv.DictReader(f, delimiter=separator)
+        reader = csv.reader(f, delimiter=separator)
         
-        # Normalizar nombres de columnas
-        if reader.fieldnames:
-            # Limpiar BOM y espacios
-            fieldnames = [col.lower().strip().replace('\ufeff', '') for col in reader.fieldnames]
-        else:
+        # Normalizar nombres de columnas (BOM y espacios)
+        header = next(reader, None)
+        if not header:
             raise GSCParseError("Archivo CSV sin cabeceras")
+        fieldnames = [col.lower().strip().replace('\ufeff', '') for col in header]
         
-        for row in reader:
-            # Normalizar claves
-            normalized_row = {}
-            for key, value in row.items():
-                norm_key = key.lower().strip()
-                
-                # Convertir valores numéricos
-                if norm_key in ['clicks', 'impressions']:
-                    try:
-                        normalized_row[norm_key] = int(value) if value else 0
-                    except ValueError:
-                        normalized_row[norm_key] = 0
-                elif norm_key == 'position':
-                    try:
-                        normalized_row[norm_key] = float(value) if value else 0.0
-                    except ValueError:
-                        normalized_row[norm_key] = 0.0
-                elif norm_key == 'ctr':
-                    normalized_row[norm_key] = _parse_ctr(value)
-                else:
-                    normalized_row[norm_key] = value
-                    
-            rows.append(normalized_row)
+        # Una lista por columna, con el valor ya convertido
+        converters = [_CSV_CONVERTERS.get(name, _keep_value) for name in fieldnames]
+        columns: List[List[Any]] = [[] for _ in fieldnames]
+        
+        for values in reader:
+            if not values:
+                continue
+            for i, convert in enumerate(converters):
+                columns[i].append(convert(values[i] if i < len(values) else None))
+    
+    return _columns_result(dict(zip(fieldnames, columns)), file_path, 'csv')
+
+
+def _columns_result(columns: Dict[str, List[Any]], file_path: Path, source: str) -> Dict[str, Any]:
+    """Resultado de load_gsc_data a partir de listas por columna (ya convertidas)."""
+    fieldnames = list(columns)
+    
+    if _dataset_available:
+        dataset = GSCDataset.from_columns(columns)
+        data = dataset.records()
+    else:
+        dataset = None
+        data = [dict(zip(fieldnames, values)) for values in zip(*columns.values())]
     
     return {
-        'data': rows,
+        'data': data,
+        'dataset': dataset,
         'columns': fieldnames,
-        'row_count': len(rows),
+        'row_count': len(data),
         'file_path': str(file_path),
         'loaded_at': datetime.now().isoformat(),
-        'source': 'csv'
+        'source': source
     }
 
 
+def _to_int(value: Any) -> int:
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _keep_value(value: Any) -> Any:
+    return value
+
+
+# Conversión por columna del cargador csv (export de GSC)
+_CSV_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'clicks': _to_int,
+    'impressions': _to_int,
+    'position': _to_float,
+    'ctr': lambda value: _parse_ctr(value),
+}
+
+
 def _parse_ctr(value: Any) -> float:
     """Parsea valor de CTR (puede venir como %, decimal, etc.)."""
     if value is None or value == '':
@@ -784,11 +1381,55 @@ def _parse_ctr(value: Any) -> float:
         return 0.0
 
 
+# ============================================================================
+# ACCESO AL ALMACÉN COLUMNAR
+# ============================================================================
+
+def _get_dataset(data: Any) -> Optional['GSCDataset']:
+    """
+    Obtiene el GSCDataset detrás de unos datos GSC, si lo hay.
+    
+    Acepta el dict de load_gsc_data, una vista GSCRecords o el propio
+    dataset. Retorna None para listas de dicts o DataFrames.
+    """
+    if not _dataset_available or data is None:
+        return None
+    
+    if isinstance(data, dict):
+        dataset = data.get('dataset')
+        data = dataset if dataset is not None else data.get('data')
+    
+    if isinstance(data, GSCDataset):
+        return data
+    if isinstance(data, GSCRecords):
+        return data.dataset
+    return None
+
+
+def _top_indices(indices: 'np.ndarray', *keys: 'np.ndarray', limit: Optional[int] = None) -> 'np.ndarray':
+    """
+    Ordena índices por varias claves descendentes (la primera manda).
+    
+    Los empates conservan el orden de entrada, igual que list.sort().
+    """
+    if len(indices) == 0:
+        return indices
+    order = np.lexsort((np.arange(len(indices)),) + tuple(-k for k in reversed(keys)))
+    if limit is not None:
+        order = order[:limit]
+    return indices[order]
+
+
 # ============================================================================
 # FUNCIONES DE ANÁLISIS DE DATOS GSC
 # ============================================================================
 
-@cached(ttl=1800, key_prefix="gsc_keywords")
+def _url_unaffected(delta: 'DatasetDelta', url: str, *args, **kwargs) -> bool:
+    """get_keywords_for_url no cambia si ninguna URL añadida contiene url."""
+    return not delta.touches_page(url.lower())
+
+
+@cached(ttl=1800, key_prefix="gsc_keywords", unaffected=_url_unaffected)
 def get_keywords_for_url(
     url: str,
     min_clicks: int = 0,
@@ -807,11 +1448,20 @@ def get_keywords_for_url(
     Returns:
         Lista de keywords con métricas, ordenadas por clicks
     """
+    store_source = _gsc_store_source('gsc_data')
+    if store_source is not None:
+        store, source_id = store_source
+        return store.keywords_for_url(source_id, url, min_clicks, min_impressions, limit)
+    
     gsc_data = load_gsc_data()
     
     if not gsc_data or not gsc_data.get('data'):
         return []
     
+    dataset = _get_dataset(gsc_data)
+    if dataset is not None:
+        return _keywords_for_url_columnar(dataset, url, min_clicks, min_impressions, limit)
+    
     # Filtrar por URL
     results = []
     
@@ -845,13 +1495,53 @@ def get_keywords_for_url(
     return results[:limit]
 
 
-@cached(ttl=1800, key_prefix="gsc_top")
-def get_top_keywords(
-    limit: int = 100,
-    min_clicks: int = 1
+def _keywords_for_url_columnar(
+    dataset: 'GSCDataset',
+    url: str,
+    min_clicks: int,
+    min_impressions: int,
+    limit: int
 ) -> List[Dict[str, Any]]:
     """
-    Obtiene las keywords con más clicks.
+    get_keywords_for_url sobre el almacén columnar.
+    
+    El índice de URLs da las páginas que contienen la URL y, con ellas,
+    solo sus filas; no se recorre el dataset.
+    """
+    pages = dataset.text('page')
+    url_lower = url.lower()
+    
+    if pages is not None:
+        rows = pages.rows_of(pages.page_index().find(url_lower))
+    elif not url_lower:
+        rows = np.arange(len(dataset))
+    else:
+        return []
+    
+    clicks = dataset.metric('clicks')
+    rows = rows[(clicks[rows] >= min_clicks) & (dataset.metric('impressions')[rows] >= min_impressions)]
+    
+    top = _top_indices(rows, clicks[rows], limit=limit)
+    
+    return [
+        {
+            'query': dataset.value('query', i) if dataset.has_column('query') else '',
+            'clicks': clicks[i].item(),
+            'impressions': dataset.metric('impressions')[i].item(),
+            'ctr': dataset.metric('ctr')[i].item(),
+            'position': dataset.metric('position')[i].item(),
+        }
+        for i in top.tolist()
+    ]
+
+
+@cached(ttl=1800, key_prefix="gsc_top")
+def get_top_keywords(
+    limit: int = 100,
+    min_clicks: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Obtiene las keywords con más clicks.
     
     Args:
         limit: Número máximo de resultados
@@ -860,11 +1550,20 @@ def get_top_keywords(
     Returns:
         Lista de keywords ordenadas por clicks
     """
+    store_source = _gsc_store_source('gsc_data')
+    if store_source is not None:
+        store, source_id = store_source
+        return store.top_keywords(source_id, limit, min_clicks)
+    
     gsc_data = load_gsc_data()
     
     if not gsc_data or not gsc_data.get('data'):
         return []
     
+    dataset = _get_dataset(gsc_data)
+    if dataset is not None:
+        return _top_keywords_columnar(dataset, limit, min_clicks)
+    
     # Filtrar y agregar por query
     query_stats: Dict[str, Dict] = {}
     
@@ -912,10 +1611,61 @@ def get_top_keywords(
     return results[:limit]
 
 
-@cached(ttl=1800, key_prefix="gsc_related")
+def _top_keywords_columnar(
+    dataset: 'GSCDataset',
+    limit: int,
+    min_clicks: int
+) -> List[Dict[str, Any]]:
+    """get_top_keywords sobre el almacén columnar (agregación con bincount)."""
+    queries = dataset.text('query')
+    if queries is None or len(dataset) == 0:
+        return []
+    
+    row_groups, keys, first_row = queries.groups()
+    n_groups = len(keys)
+    
+    clicks = dataset.metric('clicks')
+    impressions = dataset.metric('impressions')
+    clicks_sum = np.bincount(row_groups, weights=clicks, minlength=n_groups)
+    impressions_sum = np.bincount(row_groups, weights=impressions, minlength=n_groups)
+    ctr_sum = np.bincount(row_groups, weights=dataset.metric('ctr'), minlength=n_groups)
+    position_sum = np.bincount(row_groups, weights=dataset.metric('position'), minlength=n_groups)
+    counts = np.bincount(row_groups, minlength=n_groups)
+    
+    valid = clicks_sum >= min_clicks
+    valid &= np.fromiter((bool(k) for k in keys), dtype=bool, count=n_groups)
+    
+    top = _top_indices(np.flatnonzero(valid), clicks_sum[valid], limit=limit)
+    
+    int_clicks = clicks.dtype.kind in 'iu'
+    int_impressions = impressions.dtype.kind in 'iu'
+    
+    results = []
+    for g in top.tolist():
+        results.append({
+            'query': dataset.value('query', int(first_row[g])),
+            'clicks': int(clicks_sum[g]) if int_clicks else float(clicks_sum[g]),
+            'impressions': int(impressions_sum[g]) if int_impressions else float(impressions_sum[g]),
+            'ctr': float(ctr_sum[g] / counts[g]),
+            'position': float(position_sum[g] / counts[g]),
+        })
+    
+    return results
+
+
+def _related_unaffected(delta: 'DatasetDelta', keyword: str, limit: int = 20, fuzzy: bool = True) -> bool:
+    """
+    get_related_keywords no cambia si ninguna búsqueda añadida es candidata
+    (las métricas son las de la primera aparición, que no cambia).
+    """
+    return not delta.touches_query(keyword.lower().strip(), fuzzy=fuzzy)
+
+
+@cached(ttl=1800, key_prefix="gsc_related", unaffected=_related_unaffected)
 def get_related_keywords(
     keyword: str,
-    limit: int = 20
+    limit: int = 20,
+    fuzzy: bool = True
 ) -> List[Dict[str, Any]]:
     """
     Encuentra keywords relacionadas con una keyword dada.
@@ -923,17 +1673,28 @@ def get_related_keywords(
     Args:
         keyword: Keyword base para buscar relacionadas
         limit: Número máximo de resultados
+        fuzzy: Si True, también variantes (acentos, plurales, erratas);
+            solo con el almacén columnar
         
     Returns:
         Lista de keywords relacionadas
     """
+    keyword_lower = keyword.lower().strip()
+    keyword_words = set(keyword_lower.split())
+    
+    store_source = _gsc_store_source('gsc_data')
+    if store_source is not None:
+        store, source_id = store_source
+        return _related_keywords_store(store, source_id, keyword_lower, keyword_words, limit, fuzzy)
+    
     gsc_data = load_gsc_data()
     
     if not gsc_data or not gsc_data.get('data'):
         return []
     
-    keyword_lower = keyword.lower().strip()
-    keyword_words = set(keyword_lower.split())
+    dataset = _get_dataset(gsc_data)
+    if dataset is not None:
+        return _related_keywords_columnar(dataset, keyword_lower, keyword_words, limit, fuzzy)
     
     results = []
     seen_queries = set()
@@ -971,6 +1732,145 @@ def get_related_keywords(
     return results[:limit]
 
 
+def _related_keywords_columnar(
+    dataset: 'GSCDataset',
+    keyword_lower: str,
+    keyword_words: set,
+    limit: int,
+    fuzzy: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    get_related_keywords sobre el almacén columnar.
+    
+    Los candidatos salen del índice de texto de las queries únicas
+    (subcadena o palabra en común) y, con fuzzy, del de trigramas; solo se
+    puntúan esos. Con fuzzy la relevancia es la mayor entre palabras en
+    común, palabras normalizadas en común y similitud de trigramas. Las
+    métricas son las de la primera aparición de cada query, como en el
+    recorrido por filas.
+    """
+    queries = dataset.text('query')
+    if queries is None:
+        return []
+    
+    _, keys, first_row = queries.groups()
+    index = queries.group_index()
+    
+    groups = union_ids(index.contains(keyword_lower), index.word_counts(keyword_words)[0])
+    if fuzzy:
+        fuzzy_index = queries.group_fuzzy_index()
+        similar, similarity, _ = fuzzy_index.similar(keyword_lower)
+        groups = union_ids(groups, similar)
+    groups = np.setdiff1d(groups, index.exact(keyword_lower), assume_unique=True)
+    if len(groups) == 0:
+        return []
+    
+    common = index.common_words(keyword_words, groups)
+    relevance = common / len(keyword_words) if keyword_words else np.zeros(len(groups))
+    
+    if fuzzy:
+        # Palabras normalizadas en común y similitud de los candidatos aproximados
+        keyword_tokens = set(normalize_keyword(keyword_lower).split())
+        if keyword_tokens:
+            shared = np.fromiter(
+                (len(keyword_tokens.intersection(fuzzy_index.form_of(g).split())) for g in groups.tolist()),
+                dtype=np.float64,
+                count=len(groups)
+            )
+            relevance = np.maximum(relevance, shared / len(keyword_tokens))
+        
+        in_groups = np.isin(similar, groups)
+        fuzzy_relevance = np.zeros(len(groups))
+        fuzzy_relevance[np.searchsorted(groups, similar[in_groups])] = np.where(
+            similarity[in_groups] >= FUZZY_MIN_SIMILARITY, similarity[in_groups], 0.0
+        )
+        relevance = np.maximum(relevance, fuzzy_relevance)
+        
+        # Los candidatos aproximados sin ninguna relevancia se descartan
+        keep = relevance > 0
+        for k in np.flatnonzero(~keep).tolist():
+            keep[k] = keyword_lower in keys[groups[k]]
+        groups, relevance = groups[keep], relevance[keep]
+        if len(groups) == 0:
+            return []
+    
+    rows = first_row[groups]
+    
+    top = _top_indices(np.arange(len(groups)), relevance, dataset.metric('clicks')[rows], limit=limit)
+    
+    results = []
+    for k in top.tolist():
+        i = int(rows[k])
+        results.append({
+            'query': dataset.value('query', i).strip(),
+            'clicks': dataset.metric('clicks')[i].item(),
+            'impressions': dataset.metric('impressions')[i].item(),
+            'ctr': dataset.metric('ctr')[i].item(),
+            'position': dataset.metric('position')[i].item(),
+            'relevance': relevance[k].item()
+        })
+    
+    return results
+
+
+def _related_keywords_store(
+    store: 'GSCStore',
+    source_id: int,
+    keyword_lower: str,
+    keyword_words: set,
+    limit: int,
+    fuzzy: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    get_related_keywords sobre el almacén SQLite.
+    
+    SQL da las queries candidatas sin repetir (subcadena, palabra o forma
+    normalizada); aquí se puntúan una vez cada una, con los mismos
+    criterios que en memoria, y solo se leen las filas de las relacionadas.
+    Con fuzzy, las erratas solo se detectan entre esos candidatos.
+    """
+    keyword_form = normalize_keyword(keyword_lower) if fuzzy else ''
+    keyword_tokens = set(keyword_form.split())
+    
+    relevance_by_key: Dict[str, float] = {}
+    for query_lower, row_form in store.matching_texts(
+        source_id, keyword_lower, sorted(keyword_words), form=keyword_form
+    ):
+        query_key = query_lower.strip()
+        if query_key in relevance_by_key or query_key == keyword_lower:
+            continue
+        
+        common_words = keyword_words.intersection(query_key.split())
+        relevance = len(common_words) / len(keyword_words) if keyword_words else 0
+        related = keyword_lower in query_key or len(common_words) >= 1
+        
+        if keyword_tokens:
+            relevance = max(relevance, len(keyword_tokens.intersection(row_form.split())) / len(keyword_tokens))
+            similarity = trigram_similarity(keyword_form, row_form)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                relevance = max(relevance, similarity)
+            related = related or relevance > 0
+        
+        if related:
+            relevance_by_key[query_key] = relevance
+    
+    results = []
+    for row in store.first_rows(source_id, list(relevance_by_key)):
+        results.append({
+            'query': row.get('query', '').strip(),
+            'clicks': row.get('clicks', 0),
+            'impressions': row.get('impressions', 0),
+            'ctr': row.get('ctr', 0),
+            'position': row.get('position', 0),
+            'relevance': relevance_by_key[row['_query_lower'].strip()]
+        })
+    
+    # Orden por relevancia y clicks; a igualdad, primera aparición
+    results.sort(key=lambda x: (x['relevance'], x['clicks']), reverse=True)
+    
+    return results[:limit]
+
+
 @cached(ttl=3600, key_prefix="gsc_summary")
 def get_gsc_summary() -> Dict[str, Any]:
     """
@@ -979,6 +1879,26 @@ def get_gsc_summary() -> Dict[str, Any]:
     Returns:
         Dict con estadísticas resumidas
     """
+    store_source = _gsc_store_source('gsc_data')
+    if store_source is not None:
+        store, source_id = store_source
+        stats = store.summary(source_id)
+        if stats.get('total_rows'):
+            info = store.source_info(source_id) or {}
+            total_impressions = stats['total_impressions']
+            return {
+                'available': True,
+                'total_rows': stats['total_rows'],
+                'unique_queries': stats['unique_queries'],
+                'unique_pages': stats['unique_pages'],
+                'total_clicks': stats['total_clicks'],
+                'total_impressions': total_impressions,
+                'avg_position': round(stats['avg_position'], 2),
+                'avg_ctr': round(stats['total_clicks'] / total_impressions * 100, 2) if total_impressions > 0 else 0,
+                'file_path': info.get('path'),
+                'loaded_at': info.get('ingested_at'),
+            }
+    
     gsc_data = load_gsc_data()
     
     if not gsc_data or not gsc_data.get('data'):
@@ -988,16 +1908,29 @@ def get_gsc_summary() -> Dict[str, Any]:
         }
     
     data = gsc_data['data']
+    dataset = _get_dataset(gsc_data)
     
-    total_clicks = sum(row.get('clicks', 0) for row in data)
-    total_impressions = sum(row.get('impressions', 0) for row in data)
-    unique_queries = len(set(row.get('query', '').lower() for row in data if row.get('query')))
-    unique_pages = len(set(row.get('page', '').lower() for row in data if row.get('page')))
-    
-    avg_position = (
-        sum(row.get('position', 0) for row in data) / len(data)
-        if data else 0
-    )
+    if dataset is not None:
+        total_clicks = dataset.metric('clicks').sum().item()
+        total_impressions = dataset.metric('impressions').sum().item()
+        
+        # Conteos sobre valores únicos, no sobre filas
+        queries = dataset.text('query')
+        pages = dataset.text('page')
+        unique_queries = len({q for q in queries.lower if q}) if queries else 0
+        unique_pages = len({p for p in pages.lower if p}) if pages else 0
+        
+        avg_position = dataset.metric('position').mean().item() if len(dataset) else 0
+    else:
+        total_clicks = sum(row.get('clicks', 0) for row in data)
+        total_impressions = sum(row.get('impressions', 0) for row in data)
+        unique_queries = len(set(row.get('query', '').lower() for row in data if row.get('query')))
+        unique_pages = len(set(row.get('page', '').lower() for row in data if row.get('page')))
+        
+        avg_position = (
+            sum(row.get('position', 0) for row in data) / len(data)
+            if data else 0
+        )
     
     avg_ctr = total_clicks / total_impressions if total_impressions > 0 else 0
     
@@ -1021,7 +1954,7 @@ def get_gsc_summary() -> Dict[str, Any]:
 
 def invalidate_gsc_cache() -> int:
     """
-    Invalida todo el caché de GSC.
+    Invalida todo el caché de GSC (todas las funciones y datasets).
     
     Returns:
         Número de entradas invalidadas
@@ -1039,9 +1972,8 @@ def invalidate_url_cache(url: str) -> int:
     Returns:
         Número de entradas invalidadas
     """
-    # Generar hash de la URL para buscar en caché
-    url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-    return _gsc_cache.invalidate_pattern(url_hash)
+    # Cada argumento va hasheado como una parte de la clave (posicional o k=v)
+    return _gsc_cache.invalidate_pattern(f"{_short_hash(url)}{_KEY_SEPARATOR}")
 
 
 def invalidate_keyword_cache(keyword: str) -> int:
@@ -1054,19 +1986,36 @@ def invalidate_keyword_cache(keyword: str) -> int:
     Returns:
         Número de entradas invalidadas
     """
-    keyword_hash = hashlib.md5(keyword.encode()).hexdigest()[:8]
-    return _gsc_cache.invalidate_pattern(keyword_hash)
+    return _gsc_cache.invalidate_pattern(f"{_short_hash(keyword)}{_KEY_SEPARATOR}")
+
+
+def invalidate_dataset_cache(file_path: Optional[Union[str, Path]] = None) -> int:
+    """
+    Invalida las entradas calculadas con la versión actual de un dataset.
+    
+    Las de otros datasets (u otras versiones) se conservan.
+    
+    Args:
+        file_path: Archivo de datos (por defecto, GSC_DATA_FILE)
+        
+    Returns:
+        Número de entradas invalidadas
+    """
+    version = get_dataset_version(file_path)
+    return _gsc_cache.invalidate_pattern(f"{_KEY_SEPARATOR}{version}{_KEY_SEPARATOR}")
 
 
 def refresh_gsc_data() -> Optional[Dict[str, Any]]:
     """
     Fuerza recarga de datos GSC invalidando caché.
     
+    Solo se invalida lo que depende del CSV por defecto (su carga y los
+    análisis calculados sobre él).
+    
     Returns:
         Datos frescos de GSC
     """
-    # Invalidar caché de archivo
-    _gsc_cache.invalidate_pattern("gsc_file")
+    invalidate_dataset_cache(GSC_DATA_FILE)
     
     # Recargar
     return load_gsc_data()
@@ -1195,12 +2144,25 @@ def set_gsc_data_date(date: Optional[datetime] = None) -> None:
     
     _gsc_loaded_date = date
     
-    # También guardar en Streamlit session_state si está disponible
-    try:
+    # También guardar en Streamlit session_state si está disponible y se
+    # llama desde el hilo de un script (no desde un refresco en segundo plano
+    # de @cached, que no tiene sesión)
+    if _in_script_thread():
         import streamlit as st
         st.session_state['gsc_data_date'] = date
+
+
+def _in_script_thread() -> bool:
+    """Si el hilo actual ejecuta un script de Streamlit (tiene session_state)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
     except ImportError:
-        pass
+        return False
+    try:
+        return get_script_run_ctx(suppress_warning=True) is not None
+    except TypeError:
+        # Versiones sin suppress_warning
+        return get_script_run_ctx() is not None
 
 
 def get_gsc_data_age_days() -> Optional[int]:
@@ -1258,6 +2220,69 @@ def get_recommended_update_date() -> str:
 # ANÁLISIS DE CANIBALIZACIÓN
 # ============================================================================
 
+# Último origen de datos no columnar convertido a GSCDataset (objeto, dataset)
+_converted_source: Optional[Tuple[Any, Any]] = None
+_converted_lock = threading.Lock()
+
+
+def _session_gsc_data() -> Any:
+    """Datos GSC guardados en session_state de Streamlit, si los hay."""
+    try:
+        import streamlit as st
+        return st.session_state.get('gsc_data')
+    except ImportError:
+        return None
+
+
+def _get_cannibalization_source() -> Any:
+    """Datos GSC para canibalización: session_state de Streamlit o archivo."""
+    # Intentar desde Streamlit session_state primero
+    gsc_data = _session_gsc_data()
+    
+    # Si no hay datos en session_state, cargar del archivo
+    if gsc_data is None:
+        loaded = load_gsc_data()
+        if loaded:
+            gsc_data = loaded
+    
+    return gsc_data
+
+
+def _as_dataset(gsc_data: Any) -> Optional['GSCDataset']:
+    """
+    GSCDataset para cualquier forma de datos GSC.
+    
+    Los DataFrames y listas de dicts (p. ej. en session_state) se convierten
+    una vez y la conversión se reutiliza mientras sea el mismo objeto.
+    """
+    global _converted_source
+    
+    dataset = _get_dataset(gsc_data)
+    if dataset is not None or not _dataset_available:
+        return dataset
+    
+    if isinstance(gsc_data, dict) and 'data' in gsc_data:
+        gsc_data = gsc_data['data']
+    
+    with _converted_lock:
+        if _converted_source is not None and _converted_source[0] is gsc_data:
+            return _converted_source[1]
+    
+    if _pandas_available and isinstance(gsc_data, pd.DataFrame):
+        dataset = GSCDataset.from_dataframe(gsc_data)
+    elif isinstance(gsc_data, list):
+        names = list(dict.fromkeys(key for row in gsc_data for key in row))
+        dataset = GSCDataset.from_columns({
+            name: [row.get(name) for row in gsc_data] for name in names
+        })
+    else:
+        return None
+    
+    with _converted_lock:
+        _converted_source = (gsc_data, dataset)
+    return dataset
+
+
 def check_cannibalization(
     keyword: str,
     min_impressions: int = 10,
@@ -1275,149 +2300,234 @@ def check_cannibalization(
         max_results: Máximo de resultados a retornar
     
     Returns:
-        Lista de dicts con URLs y métricas:
+        Lista de dicts con URLs y métricas, ordenada por clicks:
         - url: URL de la página
         - clicks: Total de clicks
         - impressions: Total de impresiones
-        - position: Posición promedio
-        - ctr: CTR calculado
+        - position: Posición media ponderada por impresiones
+        - ctr: CTR calculado (clicks / impresiones, en %)
     """
     if not keyword or not keyword.strip():
         return []
     
-    keyword_lower = keyword.strip().lower()
+    return check_cannibalization_bulk([keyword], min_impressions, max_results)[keyword]
+
+
+def check_cannibalization_bulk(
+    keywords: List[str],
+    min_impressions: int = 10,
+    max_results: int = 10
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Canibalización de muchas keywords en una sola pasada.
     
-    # Obtener datos GSC
-    gsc_data = None
+    Pensado para auditar un plan de keywords completo: la agregación por
+    (keyword, URL) se hace de una vez para todas.
     
-    # Intentar desde Streamlit session_state primero
-    try:
-        import streamlit as st
-        gsc_data = st.session_state.get('gsc_data')
-    except ImportError:
-        pass
+    Args:
+        keywords: Keywords a analizar
+        min_impressions: Mínimo de impresiones para considerar una fila
+        max_results: Máximo de URLs por keyword
+        
+    Returns:
+        Dict keyword -> lista de URLs (mismo formato que check_cannibalization)
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {keyword: [] for keyword in keywords}
+    normalized = {keyword: keyword.strip().lower() for keyword in keywords if keyword and keyword.strip()}
+    if not normalized:
+        return results
+    
+    unique_keywords = list(dict.fromkeys(normalized.values()))
+    
+    # Sin datos en sesión, el almacén SQLite (si está configurado) agrega en SQL
+    store_source = _gsc_store_source('gsc_data') if _session_gsc_data() is None else None
+    if store_source is not None:
+        store, source_id = store_source
+        for keyword, keyword_lower in normalized.items():
+            results[keyword] = [
+                _cannibalization_metrics(*metrics)
+                for metrics in store.url_metrics_for_query(source_id, keyword_lower, min_impressions, max_results)
+            ]
+        return results
     
-    # Si no hay datos en session_state, cargar del archivo
-    if gsc_data is None:
-        try:
-            loaded = load_gsc_data()
-            if loaded:
-                gsc_data = loaded.get('data', [])
-        except Exception as e:
-            logger.warning(f"Error cargando datos GSC para canibalización: {e}")
-            return []
+    try:
+        gsc_data = _get_cannibalization_source()
+    except Exception as e:
+        logger.warning(f"Error cargando datos GSC para canibalización: {e}")
+        return results
     
     if not gsc_data:
-        return []
+        return results
+    
+    dataset = _as_dataset(gsc_data)
+    if dataset is not None:
+        by_keyword = _cannibalization_columnar(dataset, unique_keywords, min_impressions, max_results)
+    else:
+        by_keyword = {
+            keyword_lower: _cannibalization_rows(gsc_data, keyword_lower, min_impressions, max_results)
+            for keyword_lower in unique_keywords
+        }
+    
+    for keyword, keyword_lower in normalized.items():
+        results[keyword] = [dict(r) for r in by_keyword.get(keyword_lower, [])]
+    
+    return results
+
+
+def _cannibalization_metrics(
+    url: str,
+    clicks: int,
+    impressions: int,
+    weighted_position: float,
+    position_sum: float,
+    count: int
+) -> Dict[str, Any]:
+    """Métricas de una URL: posición ponderada por impresiones y CTR agregado."""
+    if impressions > 0:
+        position = weighted_position / impressions
+    else:
+        position = position_sum / count if count else 0
+    ctr = (clicks / impressions * 100) if impressions > 0 else 0
     
-    # Si gsc_data es un dict con 'data', extraer la lista
+    return {
+        'url': url,
+        'clicks': clicks,
+        'impressions': impressions,
+        'position': round(position, 1),
+        'ctr': round(ctr, 2)
+    }
+
+
+def _cannibalization_rows(
+    gsc_data: Any,
+    keyword_lower: str,
+    min_impressions: int,
+    max_results: int
+) -> List[Dict[str, Any]]:
+    """Canibalización sobre una lista de dicts (sin NumPy)."""
     if isinstance(gsc_data, dict) and 'data' in gsc_data:
         gsc_data = gsc_data['data']
+    if not isinstance(gsc_data, list):
+        return []
     
-    # Procesar datos
     url_metrics: Dict[str, Dict[str, Any]] = {}
     
-    # Si es DataFrame de pandas
-    if _pandas_available and hasattr(gsc_data, 'iterrows'):
-        try:
-            df = gsc_data
-            
-            # Filtrar por keyword
-            mask = df['query'].str.lower().str.contains(keyword_lower, na=False, regex=False)
-            matching = df[mask]
-            
-            # Filtrar por impresiones mínimas
-            if 'impressions' in matching.columns:
-                matching = matching[matching['impressions'] >= min_impressions]
-            
-            # Determinar columna de URL
-            url_col = 'page' if 'page' in matching.columns else 'url'
-            if url_col not in matching.columns:
-                return []
-            
-            # Agrupar por URL
-            grouped = matching.groupby(url_col).agg({
-                'clicks': 'sum',
-                'impressions': 'sum',
-                'position': 'mean'
-            }).reset_index()
-            
-            # Calcular CTR
-            grouped['ctr'] = (grouped['clicks'] / grouped['impressions'] * 100).round(2)
-            
-            # Ordenar y limitar
-            grouped = grouped.sort_values('clicks', ascending=False).head(max_results)
-            
-            results = []
-            for _, row in grouped.iterrows():
-                results.append({
-                    'url': row[url_col],
-                    'clicks': int(row['clicks']),
-                    'impressions': int(row['impressions']),
-                    'position': round(float(row['position']), 1),
-                    'ctr': float(row['ctr'])
-                })
-            
-            return results
-            
-        except Exception as e:
-            logger.warning(f"Error procesando GSC con pandas: {e}")
-            # Continuar con procesamiento manual
-    
-    # Procesamiento manual (lista de dicts)
-    if isinstance(gsc_data, list):
-        for row in gsc_data:
-            query = str(row.get('query', '')).lower()
-            
-            # Verificar si la keyword está en la query
-            if keyword_lower not in query:
-                continue
-            
-            # Filtrar por impresiones mínimas
-            impressions = int(row.get('impressions', 0))
-            if impressions < min_impressions:
-                continue
-            
-            # Obtener URL
-            url = row.get('page') or row.get('url', '')
-            if not url:
-                continue
-            
-            # Acumular métricas por URL
-            if url not in url_metrics:
-                url_metrics[url] = {
-                    'clicks': 0,
-                    'impressions': 0,
-                    'position_sum': 0,
-                    'count': 0
-                }
-            
-            metrics = url_metrics[url]
-            metrics['clicks'] += int(row.get('clicks', 0))
-            metrics['impressions'] += impressions
-            metrics['position_sum'] += float(row.get('position', 0))
-            metrics['count'] += 1
-        
-        # Convertir a lista de resultados
-        results = []
-        for url, metrics in url_metrics.items():
-            avg_position = metrics['position_sum'] / metrics['count'] if metrics['count'] > 0 else 0
-            ctr = (metrics['clicks'] / metrics['impressions'] * 100) if metrics['impressions'] > 0 else 0
-            
-            results.append({
-                'url': url,
-                'clicks': metrics['clicks'],
-                'impressions': metrics['impressions'],
-                'position': round(avg_position, 1),
-                'ctr': round(ctr, 2)
-            })
+    for row in gsc_data:
+        query = str(row.get('query', '')).lower()
+        
+        # Verificar si la keyword está en la query
+        if keyword_lower not in query:
+            continue
+        
+        # Filtrar por impresiones mínimas
+        impressions = int(row.get('impressions', 0))
+        if impressions < min_impressions:
+            continue
         
-        # Ordenar por clicks descendente
-        results.sort(key=lambda x: x['clicks'], reverse=True)
+        # Obtener URL
+        url = row.get('page') or row.get('url', '')
+        if not url:
+            continue
         
-        return results[:max_results]
+        # Acumular métricas por URL
+        metrics = url_metrics.setdefault(url, {
+            'clicks': 0, 'impressions': 0, 'weighted_position': 0.0, 'position_sum': 0.0, 'count': 0
+        })
+        position = float(row.get('position', 0))
+        metrics['clicks'] += int(row.get('clicks', 0))
+        metrics['impressions'] += impressions
+        metrics['weighted_position'] += position * impressions
+        metrics['position_sum'] += position
+        metrics['count'] += 1
+    
+    results = [_cannibalization_metrics(url, **metrics) for url, metrics in url_metrics.items()]
+    
+    # Ordenar por clicks descendente
+    results.sort(key=lambda x: x['clicks'], reverse=True)
+    
+    return results[:max_results]
+
+
+def _cannibalization_columnar(
+    dataset: 'GSCDataset',
+    keywords_lower: List[str],
+    min_impressions: int,
+    max_results: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Canibalización de varias keywords sobre el almacén columnar.
+    
+    El índice de texto da, por keyword, las filas cuya query la contiene;
+    después todas las parejas (keyword, URL) se agregan a la vez con
+    bincount. Orden por keyword: clicks descendente y, a igualdad, la URL
+    cuya primera fila coincidente aparece antes.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {keyword: [] for keyword in keywords_lower}
+    queries = dataset.queries
+    pages = dataset.pages
+    if queries is None or pages is None:
+        return results
+    
+    index = queries.index()
+    impressions = dataset.metric('impressions')
+    
+    # Filas candidatas de cada keyword
+    row_blocks, keyword_blocks = [], []
+    for k, keyword_lower in enumerate(keywords_lower):
+        rows = queries.rows_of(index.contains(keyword_lower))
+        rows = rows[impressions[rows] >= min_impressions]
+        row_blocks.append(rows)
+        keyword_blocks.append(np.full(len(rows), k, dtype=np.int64))
+    
+    rows = np.concatenate(row_blocks) if row_blocks else np.empty(0, dtype=np.int64)
+    if len(rows) == 0:
+        return results
+    keyword_ids = np.concatenate(keyword_blocks)
+    
+    # Descartar la URL vacía
+    page_codes = pages.codes[rows].astype(np.int64)
+    used_pages = np.unique(page_codes)
+    empty = [c for c in used_pages.tolist() if not pages.categories[c]]
+    if empty:
+        keep = ~np.isin(page_codes, empty)
+        rows, keyword_ids, page_codes = rows[keep], keyword_ids[keep], page_codes[keep]
+        if len(rows) == 0:
+            return results
     
-    return []
+    # Agregación por pareja (keyword, URL)
+    pairs, inverse = np.unique(keyword_ids * len(pages.categories) + page_codes, return_inverse=True)
+    n_pairs = len(pairs)
+    clicks = np.bincount(inverse, weights=dataset.metric('clicks')[rows], minlength=n_pairs)
+    row_impressions = impressions[rows].astype(np.float64)
+    impressions_sum = np.bincount(inverse, weights=row_impressions, minlength=n_pairs)
+    position = dataset.metric('position')[rows]
+    weighted_position = np.bincount(inverse, weights=position * row_impressions, minlength=n_pairs)
+    position_sum = np.bincount(inverse, weights=position, minlength=n_pairs)
+    counts = np.bincount(inverse, minlength=n_pairs)
+    
+    first_row = np.full(n_pairs, len(dataset), dtype=np.int64)
+    np.minimum.at(first_row, inverse, rows)
+    
+    pair_keyword = pairs // len(pages.categories)
+    pair_page = pairs % len(pages.categories)
+    
+    # Orden: keyword, clicks descendente, primera fila; top-N por keyword
+    order = np.lexsort((first_row, -clicks, pair_keyword))
+    sorted_keywords = pair_keyword[order]
+    group_start = np.searchsorted(sorted_keywords, sorted_keywords, side='left')
+    order = order[np.arange(len(order)) - group_start < max_results]
+    
+    for p in order.tolist():
+        results[keywords_lower[pair_keyword[p]]].append(_cannibalization_metrics(
+            pages.categories[pair_page[p]],
+            int(clicks[p]),
+            int(impressions_sum[p]),
+            float(weighted_position[p]),
+            float(position_sum[p]),
+            int(counts[p])
+        ))
+    
+    return results
 
 
 def get_cannibalization_summary(keyword: str) -> Dict[str, Any]:
@@ -1481,11 +2591,44 @@ def get_cannibalization_summary(keyword: str) -> Dict[str, Any]:
 # CARGA DE CSV DE KEYWORDS (FORMATO ESPECÍFICO)
 # ============================================================================
 
-# Cache para el CSV de keywords
+# Cache para el CSV de keywords (lista de dicts o vista GSCRecords)
 _gsc_keywords_cache: Optional[List[Dict[str, Any]]] = None
 _gsc_keywords_cache_time: Optional[datetime] = None
 
 
+def _keywords_csv_value(norm_key: str, value: Optional[str]) -> Any:
+    """Convierte un valor del CSV de keywords según su columna."""
+    if norm_key in ['clicks', 'impressions']:
+        try:
+            return int(float(value)) if value else 0
+        except (ValueError, TypeError):
+            return 0
+    elif norm_key in ['position', 'ctr']:
+        try:
+            return float(value) if value else 0.0
+        except (ValueError, TypeError):
+            return 0.0
+    return value.strip() if value else ''
+
+
+def _find_keywords_csv(file_path: Optional[Union[str, Path]] = None) -> Optional[Path]:
+    """Ruta del CSV de keywords: la indicada o la primera de las ubicaciones habituales."""
+    if file_path:
+        return Path(file_path)
+    
+    # Buscar en ubicaciones comunes
+    possible_paths = [
+        Path("./data/gsc_keywords.csv"),
+        Path("./gsc_keywords.csv"),
+        Path("data/gsc_keywords.csv"),
+        GSC_DATA_FILE.parent / "gsc_keywords.csv" if GSC_DATA_FILE else None,
+    ]
+    for p in possible_paths:
+        if p and p.exists():
+            return p
+    return None
+
+
 def load_gsc_keywords_csv(
     file_path: Optional[Union[str, Path]] = None,
     force_reload: bool = False
@@ -1501,7 +2644,8 @@ def load_gsc_keywords_csv(
         force_reload: Si True, recarga el archivo aunque esté en caché
     
     Returns:
-        Lista de diccionarios con los datos del CSV
+        Lista de diccionarios con los datos del CSV (vista perezosa
+        GSCRecords sobre un GSCDataset si numpy está disponible)
     """
     global _gsc_keywords_cache, _gsc_keywords_cache_time
     
@@ -1512,54 +2656,62 @@ def load_gsc_keywords_csv(
             if age < 3600:  # 1 hora de caché
                 return _gsc_keywords_cache
     
-    # Buscar archivo
-    if file_path:
-        csv_path = Path(file_path)
-    else:
-        # Buscar en ubicaciones comunes
-        possible_paths = [
-            Path("./data/gsc_keywords.csv"),
-            Path("./gsc_keywords.csv"),
-            Path("data/gsc_keywords.csv"),
-            GSC_DATA_FILE.parent / "gsc_keywords.csv" if GSC_DATA_FILE else None,
-        ]
-        csv_path = None
-        for p in possible_paths:
-            if p and p.exists():
-                csv_path = p
-                break
+    csv_path = _find_keywords_csv(file_path)
     
     if not csv_path or not csv_path.exists():
         logger.warning(f"Archivo gsc_keywords.csv no encontrado")
         return []
     
     try:
-        rows = []
+        # Carga anterior más solo las filas añadidas
+        dataset = _load_incremental(csv_path, 'gsc_keywords', 'utf-8', {'loader': 'gsc_keywords'})
+        if dataset is not None:
+            rows = dataset.records()
+            _gsc_keywords_cache = rows
+            _gsc_keywords_cache_time = datetime.now()
+            return rows
+        
+        version = get_dataset_version(csv_path)
+        state = SourceState.capture(csv_path)
+        fingerprint = file_fingerprint(csv_path) if _dataset_available and is_snapshot_available() else None
+        if fingerprint is not None:
+            dataset = _load_gsc_snapshot(csv_path, fingerprint, loader='gsc_keywords')
+        
+        if dataset is not None:
+            _remember_ingest(csv_path, 'gsc_keywords', version, state, dataset)
+            _schedule_index_build(dataset)
+            _schedule_topic_build(dataset, csv_path, fingerprint)
+            rows = dataset.records()
+            _gsc_keywords_cache = rows
+            _gsc_keywords_cache_time = datetime.now()
+            return rows
+        
         separator = _detect_csv_separator(csv_path, 'utf-8')
         
         with open(csv_path, 'r', encoding='utf-8-sig') as f:  # utf-8-sig maneja BOM
-            reader = csv.DictReader(f, delimiter=separator)
+            reader = csv.reader(f, delimiter=separator)
+            header = next(reader, None) or []
+            fieldnames = [key.lower().strip().replace('\ufeff', '') for key in header]
             
-            for row in reader:
-                # Normalizar claves
-                normalized = {}
-                for key, value in row.items():
-                    norm_key = key.lower().strip().replace('\ufeff', '')
-                    
-                    if norm_key in ['clicks', 'impressions']:
-                        try:
-                            normalized[norm_key] = int(float(value)) if value else 0
-                        except (ValueError, TypeError):
-                            normalized[norm_key] = 0
-                    elif norm_key in ['position', 'ctr']:
-                        try:
-                            normalized[norm_key] = float(value) if value else 0.0
-                        except (ValueError, TypeError):
-                            normalized[norm_key] = 0.0
-                    else:
-                        normalized[norm_key] = value.strip() if value else ''
-                
-                rows.append(normalized)
+            # Una lista por columna, con el valor ya convertido
+            columns: List[List[Any]] = [[] for _ in fieldnames]
+            for values in reader:
+                if not values:
+                    continue
+                for i, norm_key in enumerate(fieldnames):
+                    value = values[i] if i < len(values) else None
+                    columns[i].append(_keywords_csv_value(norm_key, value))
+        
+        if _dataset_available:
+            dataset = GSCDataset.from_columns(dict(zip(fieldnames, columns)))
+            rows = dataset.records()
+            if fingerprint is not None:
+                save_snapshot(csv_path, dataset, fingerprint, {'loader': 'gsc_keywords'})
+            _remember_ingest(csv_path, 'gsc_keywords', version, state, dataset)
+            _schedule_index_build(dataset)
+            _schedule_topic_build(dataset, csv_path, fingerprint)
+        else:
+            rows = [dict(zip(fieldnames, values)) for values in zip(*columns)]
         
         # Actualizar caché
         _gsc_keywords_cache = rows
@@ -1576,7 +2728,8 @@ def load_gsc_keywords_csv(
 def search_existing_content(
     keyword: str,
     min_impressions: int = 0,
-    max_results: int = 10
+    max_results: int = 10,
+    fuzzy: bool = True
 ) -> List[Dict[str, Any]]:
     """
     Busca URLs que ya tienen contenido posicionando para una keyword.
@@ -1588,6 +2741,7 @@ def search_existing_content(
         keyword: Keyword a buscar
         min_impressions: Mínimo de impresiones para incluir
         max_results: Máximo de resultados
+        fuzzy: Si True, también variantes (acentos, plurales, erratas)
     
     Returns:
         Lista de URLs con métricas ordenadas por clicks
@@ -1598,11 +2752,25 @@ def search_existing_content(
     keyword_lower = keyword.strip().lower()
     keyword_words = set(keyword_lower.split())
     
+    store_source = _gsc_store_source('gsc_keywords')
+    if store_source is not None:
+        store, source_id = store_source
+        return _search_existing_content_store(
+            store, source_id, keyword_lower, keyword_words, min_impressions, max_results, fuzzy
+        )
+    
     # Cargar datos
     data = load_gsc_keywords_csv()
     if not data:
         return []
     
+    dataset = _get_dataset(data)
+    if dataset is not None:
+        return _search_existing_content_columnar(
+            dataset, keyword_lower, keyword_words, min_impressions, max_results, fuzzy
+        )
+    
+    keyword_form = normalize_keyword(keyword_lower) if fuzzy else ''
     results = []
     
     for row in data:
@@ -1613,24 +2781,12 @@ def search_existing_content(
         if impressions < min_impressions:
             continue
         
-        # Buscar coincidencia
-        # 1. Coincidencia exacta
-        # 2. La keyword buscada está contenida en la keyword del CSV
-        # 3. Palabras en común
-        row_words = set(row_keyword.split())
-        common_words = keyword_words.intersection(row_words)
-        
-        match_score = 0
-        if keyword_lower == row_keyword:
-            match_score = 100  # Coincidencia exacta
-        elif keyword_lower in row_keyword:
-            match_score = 80  # Contenida
-        elif row_keyword in keyword_lower:
-            match_score = 70  # Inversa
-        elif len(common_words) >= 2:
-            match_score = 50 + (len(common_words) * 5)  # Múltiples palabras comunes
-        elif len(common_words) == 1 and len(keyword_words) <= 2:
-            match_score = 30  # Una palabra común (solo para keywords cortas)
+        match_score = _content_match_score(keyword_lower, keyword_words, row_keyword)
+        if keyword_form:
+            row_form = normalize_keyword(row_keyword)
+            match_score = max(match_score, _fuzzy_match_score(
+                keyword_form, row_form, trigram_similarity(keyword_form, row_form)
+            ))
         
         if match_score > 0:
             results.append({
@@ -1650,6 +2806,229 @@ def search_existing_content(
     return results[:max_results]
 
 
+def _content_match_score(keyword_lower: str, keyword_words: set, row_keyword: str) -> int:
+    """
+    Puntúa la coincidencia entre la keyword buscada y la de una URL.
+    
+    1. Coincidencia exacta
+    2. La keyword buscada está contenida en la keyword del CSV
+    3. Palabras en común
+    """
+    common_words = keyword_words.intersection(row_keyword.split())
+    
+    if keyword_lower == row_keyword:
+        return 100  # Coincidencia exacta
+    elif keyword_lower in row_keyword:
+        return 80  # Contenida
+    elif row_keyword in keyword_lower:
+        return 70  # Inversa
+    elif len(common_words) >= 2:
+        return 50 + (len(common_words) * 5)  # Múltiples palabras comunes
+    elif len(common_words) == 1 and len(keyword_words) <= 2:
+        return 30  # Una palabra común (solo para keywords cortas)
+    return 0
+
+
+def _fuzzy_match_score(keyword_form: str, row_form: str, similarity: float) -> int:
+    """
+    Puntúa la coincidencia entre formas normalizadas (ver spanish_text).
+    
+    1. Misma forma ("portátiles gaming" / "portatil gaming")
+    2. La forma buscada está contenida, por palabras, en la de la URL
+    3. Trigramas parecidos (erratas): proporcional a la similitud
+    """
+    if not keyword_form or not row_form:
+        return 0
+    if row_form == keyword_form:
+        return 90
+    if f" {keyword_form} " in f" {row_form} ":
+        return 75
+    if similarity >= FUZZY_MIN_SIMILARITY:
+        return int(round(similarity * 60))
+    return 0
+
+
+def _search_existing_content_store(
+    store: 'GSCStore',
+    source_id: int,
+    keyword_lower: str,
+    keyword_words: set,
+    min_impressions: int,
+    max_results: int,
+    fuzzy: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    search_existing_content sobre el almacén SQLite.
+    
+    SQL da las keywords candidatas sin repetir (contienen la keyword o
+    alguna palabra, están contenidas en ella o, con fuzzy, comparten forma
+    normalizada); se puntúan aquí, igual que en memoria, y SQL devuelve
+    las mejores filas por puntuación y clicks.
+    """
+    keyword_form = normalize_keyword(keyword_lower) if fuzzy else ''
+    scores: Dict[str, int] = {}
+    
+    for row_keyword, row_form in store.matching_texts(
+        source_id, keyword_lower, sorted(keyword_words),
+        form=keyword_form, contained=True
+    ):
+        match_score = _content_match_score(keyword_lower, keyword_words, row_keyword)
+        if keyword_form:
+            match_score = max(match_score, _fuzzy_match_score(
+                keyword_form, row_form, trigram_similarity(keyword_form, row_form)
+            ))
+        if match_score > 0:
+            scores[row_keyword] = match_score
+    
+    return [
+        {
+            'url': row.get('url', ''),
+            'keyword': row.get('keyword', ''),
+            'clicks': row.get('clicks', 0),
+            'impressions': row.get('impressions', 0),
+            'position': row.get('position', 0),
+            'ctr': row.get('ctr', 0),
+            'match_score': row['_score'],
+            'last_updated': row.get('last_updated', '')
+        }
+        for row in store.rows_for_texts(source_id, scores, min_impressions, max_results)
+    ]
+
+
+def _search_existing_content_columnar(
+    dataset: 'GSCDataset',
+    keyword_lower: str,
+    keyword_words: set,
+    min_impressions: int,
+    max_results: int,
+    fuzzy: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    search_existing_content sobre el almacén columnar.
+    
+    Solo se puntúan las keywords únicas que los índices proponen: el de
+    texto (la contienen, están contenidas en ella o comparten alguna
+    palabra) y, con fuzzy, el de trigramas sobre formas normalizadas.
+    """
+    keywords = dataset.text('keyword')
+    if keywords is None:
+        return []
+    
+    index = keywords.index()
+    candidates = union_ids(
+        index.contains(keyword_lower),
+        index.contained_in(keyword_lower),
+        index.word_counts(keyword_words)[0]
+    )
+    
+    # La puntuación solo depende del texto: una vez por keyword única
+    category_scores = np.fromiter(
+        (_content_match_score(keyword_lower, keyword_words, index.strings[c]) for c in candidates.tolist()),
+        dtype=np.int64,
+        count=len(candidates)
+    )
+    
+    if fuzzy:
+        fuzzy_index = keywords.fuzzy_index()
+        keyword_form = normalize_keyword(keyword_lower)
+        similar, similarity, _ = fuzzy_index.similar(keyword_lower)
+        fuzzy_scores = np.fromiter(
+            (_fuzzy_match_score(keyword_form, fuzzy_index.form_of(c), sim)
+             for c, sim in zip(similar.tolist(), similarity.tolist())),
+            dtype=np.int64,
+            count=len(similar)
+        )
+        
+        merged = union_ids(candidates, similar)
+        scores = np.zeros(len(merged), dtype=np.int64)
+        scores[np.searchsorted(merged, candidates)] = category_scores
+        fuzzy_pos = np.searchsorted(merged, similar)
+        scores[fuzzy_pos] = np.maximum(scores[fuzzy_pos], fuzzy_scores)
+        candidates, category_scores = merged, scores
+    candidates = candidates[category_scores > 0]
+    category_scores = category_scores[category_scores > 0]
+    
+    rows = keywords.rows_of(candidates)
+    rows = rows[dataset.metric('impressions')[rows] >= min_impressions]
+    scores = category_scores[np.searchsorted(candidates, keywords.codes[rows])]
+    
+    top = _top_indices(rows, scores, dataset.metric('clicks')[rows], limit=max_results)
+    score_by_row = dict(zip(rows.tolist(), scores.tolist()))
+    
+    results = []
+    for i in top.tolist():
+        row = dataset.row(i)
+        results.append({
+            'url': row.get('url', ''),
+            'keyword': row.get('keyword', ''),
+            'clicks': row.get('clicks', 0),
+            'impressions': row.get('impressions', 0),
+            'position': row.get('position', 0),
+            'ctr': row.get('ctr', 0),
+            'match_score': score_by_row[i],
+            'last_updated': row.get('last_updated', '')
+        })
+    
+    return results
+
+
+# ============================================================================
+# TEMAS (CLUSTERS DE KEYWORDS)
+# ============================================================================
+
+def get_topic_clusters(gsc_data: Any = None) -> Optional['TopicClusters']:
+    """
+    Temas de las keywords GSC (ver utils/gsc_clusters.py).
+    
+    Se calculan en segundo plano al cargar cada CSV; si se piden antes,
+    se espera a ese mismo cálculo.
+    
+    Args:
+        gsc_data: Datos GSC (resultado de load_gsc_data, DataFrame, lista
+            de dicts...). Por defecto, el CSV de keywords.
+    
+    Returns:
+        TopicClusters o None si no hay datos o falta numpy
+    """
+    if not _dataset_available:
+        return None
+    
+    dataset = _as_dataset(gsc_data if gsc_data is not None else load_gsc_keywords_csv())
+    if dataset is None or dataset.queries is None:
+        return None
+    
+    return _topic_clusters_for(dataset)
+
+
+def get_keyword_topic(keyword: str, gsc_data: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    Tema al que pertenece una keyword y su URL dueña.
+    
+    Args:
+        keyword: Keyword a consultar (no hace falta que esté en los datos)
+        gsc_data: Datos GSC (por defecto, el CSV de keywords)
+    
+    Returns:
+        Dict del tema (label, clicks, impressions, owner_url, owner_share...)
+        más la similitud con la keyword usada, o None si no hay tema
+    """
+    if not keyword or not keyword.strip():
+        return None
+    
+    clusters = get_topic_clusters(gsc_data)
+    if clusters is None:
+        return None
+    
+    found = clusters.find(keyword)
+    if found is None:
+        return None
+    
+    topic, similarity = found
+    result = topic.to_dict()
+    result['similarity'] = round(similarity, 3)
+    return result
+
+
 def get_content_coverage_summary(keyword: str) -> Dict[str, Any]:
     """
     Obtiene resumen de cobertura de contenido para una keyword.
@@ -1661,15 +3040,23 @@ def get_content_coverage_summary(keyword: str) -> Dict[str, Any]:
         Dict con resumen de cobertura
     """
     results = search_existing_content(keyword, min_impressions=0, max_results=20)
+    topic = get_keyword_topic(keyword)
     
     if not results:
+        recommendation = 'No hay contenido existente. Puedes crear contenido nuevo para esta keyword.'
+        if topic and topic['owner_url'] and topic['clicks'] > 0:
+            recommendation = (
+                f"No hay contenido para esta keyword, pero su tema ({topic['label']}) ya lo "
+                f"trabaja {topic['owner_url'][:50]}... Valora ampliar esa URL antes de crear otra."
+            )
         return {
             'has_coverage': False,
             'total_urls': 0,
             'exact_match': None,
             'partial_matches': [],
             'total_clicks': 0,
-            'recommendation': 'No hay contenido existente. Puedes crear contenido nuevo para esta keyword.'
+            'topic': topic,
+            'recommendation': recommendation
         }
     
     # Separar coincidencias exactas de parciales
@@ -1697,6 +3084,7 @@ def get_content_coverage_summary(keyword: str) -> Dict[str, Any]:
         'partial_matches': partial[:5],
         'total_clicks': total_clicks,
         'best_url': best_url,
+        'topic': topic,
         'recommendation': recommendation
     }
 
@@ -1752,7 +3140,7 @@ def get_dataset_age() -> Dict[str, Any]:
     }
 
 
-def analyze_keyword_coverage(keyword: str) -> Dict[str, Any]:
+def analyze_keyword_coverage(keyword: str, gsc_data: Any = None) -> Dict[str, Any]:
     """
     Analiza la cobertura de una keyword en el contenido existente.
     
@@ -1760,11 +3148,16 @@ def analyze_keyword_coverage(keyword: str) -> Dict[str, Any]:
     
     Args:
         keyword: Keyword a analizar
+        gsc_data: Datos GSC para el tema de la keyword (por defecto, el
+            CSV de keywords, igual que la cobertura)
     
     Returns:
         Dict con análisis de cobertura
     """
-    return get_content_coverage_summary(keyword)
+    summary = get_content_coverage_summary(keyword)
+    if gsc_data is not None:
+        summary['topic'] = get_keyword_topic(keyword, gsc_data)
+    return summary
 
 
 # ============================================================================
@@ -1804,6 +3197,8 @@ __all__ = [
     
     # Invalidación
     'invalidate_gsc_cache',
+    'invalidate_dataset_cache',
+    'get_dataset_version',
     'invalidate_url_cache',
     'invalidate_keyword_cache',
     'refresh_gsc_data',
@@ -1821,12 +3216,17 @@ __all__ = [
     
     # Análisis de canibalización
     'check_cannibalization',
+    'check_cannibalization_bulk',
     'get_cannibalization_summary',
     
     # Búsqueda de contenido existente
     'search_existing_content',
     'get_content_coverage_summary',
     
+    # Temas (clusters de keywords)
+    'get_topic_clusters',
+    'get_keyword_topic',
+    
     # Compatibilidad con utils/__init__.py
     'get_dataset_age',
     'analyze_keyword_coverage',
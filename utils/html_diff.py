@@ -0,0 +1,360 @@
+"""
+HTML Diff - PcComponentes Content Generator
+Versión 4.6.0
+
+Diferencias estructurales entre dos versiones de un artículo.
+
+El HTML se parte en bloques (encabezados, párrafos, items de lista, filas
+de tabla, articles, divs...) cortando antes de cada tag de bloque que abre
+y después de cada uno que cierra. Los trozos cubren el documento entero,
+así que concatenados lo reconstruyen exacto. Sobre esas secuencias de
+bloques (no sobre líneas) se alinean dos versiones:
+
+- diff_html(): qué ha cambiado para quien revisa (bloques añadidos,
+  eliminados o modificados, cada uno con la sección a la que pertenece)
+- make_delta() / apply_delta(): una versión como diferencia respecto a
+  otra, para guardar el historial de deshacer sin copias completas
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import difflib
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple, Union
+
+__version__ = "4.6.0"
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+# Tags por los que se parte el documento
+BLOCK_TAGS = (
+    'article', 'section', 'div', 'header', 'footer', 'main', 'aside', 'nav',
+    'figure', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul',
+    'ol', 'li', 'dl', 'dt', 'dd', 'table', 'thead', 'tbody', 'tfoot', 'tr',
+    'caption', 'blockquote', 'pre', 'style', 'script', 'details', 'summary',
+)
+
+# Similitud mínima (0-1) entre textos para considerar un bloque modificado
+# en vez de eliminado + añadido
+MODIFIED_MIN_RATIO = 0.4
+
+_BLOCK_TAG_RE = re.compile(
+    r'<(/?)(' + '|'.join(BLOCK_TAGS) + r')\b[^>]*>', re.I
+)
+_HEADING_TAG_RE = re.compile(r'<h[1-6]\b', re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+# Bloques cuyo contenido no es texto del artículo
+_CODE_TAGS = frozenset({'style', 'script'})
+
+
+# ============================================================================
+# SEGMENTACIÓN
+# ============================================================================
+
+def split_blocks(html: str) -> List[str]:
+    """
+    Parte el HTML en trozos de bloque.
+
+    Se corta antes de cada tag de bloque que abre y después de cada uno
+    que cierra; ''.join(split_blocks(html)) == html.
+    """
+    if not html:
+        return []
+
+    cuts = {0, len(html)}
+    for match in _BLOCK_TAG_RE.finditer(html):
+        cuts.add(match.end() if match.group(1) else match.start())
+
+    bounds = sorted(cuts)
+    return [html[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _block_tag(segment: str) -> str:
+    match = _BLOCK_TAG_RE.match(segment.lstrip())
+    return match.group(2).lower() if match and not match.group(1) else ''
+
+
+def _block_text(segment: str) -> str:
+    return _SPACE_RE.sub(' ', _TAG_RE.sub(' ', segment)).strip()
+
+
+@dataclass
+class Block:
+    """Un trozo de bloque con su texto y la sección donde está."""
+    html: str
+    tag: str
+    text: str
+    section: str
+
+
+def parse_blocks(html: str) -> List[Block]:
+    """
+    Bloques del HTML con texto (o CSS/JS), cada uno con el último
+    encabezado visto antes que él como sección.
+    """
+    blocks: List[Block] = []
+    section = ''
+
+    for segment in split_blocks(html):
+        tag = _block_tag(segment)
+        if tag in _CODE_TAGS:
+            blocks.append(Block(segment, tag, '', section))
+            continue
+        text = _block_text(segment)
+        if not text:
+            continue
+        if _HEADING_TAG_RE.match(segment.lstrip()):
+            section = text
+        blocks.append(Block(segment, tag, text, section))
+
+    return blocks
+
+
+def _key(block: Block) -> str:
+    return block.text if block.tag not in _CODE_TAGS else _SPACE_RE.sub(' ', block.html)
+
+
+# ============================================================================
+# DIFF PARA REVISIÓN
+# ============================================================================
+
+@dataclass
+class BlockChange:
+    """Un bloque añadido, eliminado o modificado."""
+    kind: str                 # 'added' | 'removed' | 'modified'
+    tag: str
+    section: str
+    old_text: str = ''
+    new_text: str = ''
+
+    @property
+    def is_heading(self) -> bool:
+        return len(self.tag) == 2 and self.tag[0] == 'h'
+
+    def word_diff(self) -> List[Tuple[str, str]]:
+        """
+        Diferencia palabra a palabra de un bloque modificado.
+
+        Returns:
+            Lista de (op, texto) con op '=', '-' o '+'
+        """
+        old_words = self.old_text.split()
+        new_words = self.new_text.split()
+        result: List[Tuple[str, str]] = []
+        matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op == 'equal':
+                result.append(('=', ' '.join(old_words[i1:i2])))
+                continue
+            if i2 > i1:
+                result.append(('-', ' '.join(old_words[i1:i2])))
+            if j2 > j1:
+                result.append(('+', ' '.join(new_words[j1:j2])))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'kind': self.kind,
+            'tag': self.tag,
+            'section': self.section,
+            'old_text': self.old_text,
+            'new_text': self.new_text,
+        }
+
+
+@dataclass
+class HTMLDiff:
+    """Cambios entre dos versiones de un HTML."""
+    changes: List[BlockChange] = field(default_factory=list)
+    blocks_before: int = 0
+    blocks_after: int = 0
+    words_before: int = 0
+    words_after: int = 0
+    css_changed: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.changes) or self.css_changed
+
+    @property
+    def sections(self) -> List[str]:
+        """Secciones con cambios, en orden de aparición."""
+        return list(dict.fromkeys(change.section for change in self.changes))
+
+    def summary(self) -> Dict[str, int]:
+        """Conteo de cambios por tipo y palabras antes/después."""
+        counts = {'added': 0, 'removed': 0, 'modified': 0}
+        for change in self.changes:
+            counts[change.kind] += 1
+        return {
+            **counts,
+            'sections': len(self.sections),
+            'words_before': self.words_before,
+            'words_after': self.words_after,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'changes': [change.to_dict() for change in self.changes],
+            'summary': self.summary(),
+            'css_changed': self.css_changed,
+            'blocks_before': self.blocks_before,
+            'blocks_after': self.blocks_after,
+        }
+
+
+def _pair_replaced(old: List[Block], new: List[Block]) -> List[BlockChange]:
+    """Empareja los bloques de un tramo reemplazado (modificados o no)."""
+    changes: List[BlockChange] = []
+    k = 0
+    while k < len(old) and k < len(new):
+        before, after = old[k], new[k]
+        ratio = difflib.SequenceMatcher(None, before.text, after.text, autojunk=False).ratio()
+        if before.tag == after.tag and ratio >= MODIFIED_MIN_RATIO:
+            changes.append(BlockChange('modified', after.tag, after.section, before.text, after.text))
+        else:
+            changes.append(BlockChange('removed', before.tag, before.section, old_text=before.text))
+            changes.append(BlockChange('added', after.tag, after.section, new_text=after.text))
+        k += 1
+    changes.extend(BlockChange('removed', b.tag, b.section, old_text=b.text) for b in old[k:])
+    changes.extend(BlockChange('added', b.tag, b.section, new_text=b.text) for b in new[k:])
+    return changes
+
+
+def diff_html(before: str, after: str) -> HTMLDiff:
+    """
+    Qué ha cambiado entre dos versiones de un HTML, por bloques.
+
+    Los bloques se comparan por su texto (se ignoran atributos y espacios);
+    los cambios en <style>/<script> solo se señalan con css_changed.
+
+    Args:
+        before: Versión anterior
+        after: Versión nueva
+
+    Returns:
+        HTMLDiff con los bloques añadidos, eliminados y modificados
+    """
+    old_blocks = parse_blocks(before or '')
+    new_blocks = parse_blocks(after or '')
+    result = HTMLDiff(
+        blocks_before=len(old_blocks),
+        blocks_after=len(new_blocks),
+        words_before=sum(len(b.text.split()) for b in old_blocks),
+        words_after=sum(len(b.text.split()) for b in new_blocks),
+    )
+
+    matcher = difflib.SequenceMatcher(
+        None, [_key(b) for b in old_blocks], [_key(b) for b in new_blocks], autojunk=False
+    )
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            continue
+        old_range = old_blocks[i1:i2]
+        new_range = new_blocks[j1:j2]
+        if any(b.tag in _CODE_TAGS for b in old_range + new_range):
+            result.css_changed = True
+            old_range = [b for b in old_range if b.tag not in _CODE_TAGS]
+            new_range = [b for b in new_range if b.tag not in _CODE_TAGS]
+        result.changes.extend(_pair_replaced(old_range, new_range))
+
+    return result
+
+
+# ============================================================================
+# DELTAS PARA EL HISTORIAL
+# ============================================================================
+
+def _digest(html: str) -> str:
+    return hashlib.blake2b(html.encode('utf-8'), digest_size=16).hexdigest()
+
+
+@dataclass
+class HTMLDelta:
+    """
+    Una versión de un HTML expresada respecto a otra (la base).
+
+    ops es una lista de (start, end) para copiar los trozos start:end de
+    la base o de str para insertar texto nuevo.
+    """
+    base_digest: str
+    ops: List[Union[Tuple[int, int], str]]
+
+    @property
+    def size(self) -> int:
+        """Bytes aproximados que ocupa el delta."""
+        return sum(len(op.encode('utf-8')) if isinstance(op, str) else 16 for op in self.ops)
+
+    def apply(self, base: str) -> str:
+        return apply_delta(base, self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'base_digest': self.base_digest, 'ops': [list(op) if isinstance(op, tuple) else op for op in self.ops]}
+
+
+def make_delta(base: str, target: str) -> HTMLDelta:
+    """
+    Delta que reconstruye target a partir de base.
+
+    Args:
+        base: Versión de la que se parte (la que habrá al aplicarlo)
+        target: Versión a reconstruir
+    """
+    base_blocks = split_blocks(base)
+    target_blocks = split_blocks(target)
+    ops: List[Union[Tuple[int, int], str]] = []
+
+    matcher = difflib.SequenceMatcher(None, base_blocks, target_blocks, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            if ops and isinstance(ops[-1], tuple) and ops[-1][1] == i1:
+                ops[-1] = (ops[-1][0], i2)
+            else:
+                ops.append((i1, i2))
+        elif j2 > j1:
+            text = ''.join(target_blocks[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += text
+            else:
+                ops.append(text)
+
+    return HTMLDelta(_digest(base), ops)
+
+
+def apply_delta(base: str, delta: HTMLDelta) -> str:
+    """
+    Reconstruye la versión de un delta.
+
+    Raises:
+        ValueError: Si base no es la versión sobre la que se hizo el delta
+    """
+    if _digest(base) != delta.base_digest:
+        raise ValueError("El HTML no es la versión base del delta")
+
+    blocks = split_blocks(base)
+    return ''.join(
+        op if isinstance(op, str) else ''.join(blocks[op[0]:op[1]])
+        for op in delta.ops
+    )
+
+
+__all__ = [
+    '__version__',
+    'BLOCK_TAGS',
+    'MODIFIED_MIN_RATIO',
+    'split_blocks',
+    'Block',
+    'parse_blocks',
+    'BlockChange',
+    'HTMLDiff',
+    'diff_html',
+    'HTMLDelta',
+    'make_delta',
+    'apply_delta',
+]
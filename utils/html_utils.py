@@ -1,16 +1,21 @@
 """
 Utilidades HTML - PcComponentes Content Generator
-Versión 4.3.0
+Versión 4.6.0
 
 Autor: PcComponentes - Product Discovery & Content
 """
 
+import hashlib
+import os
 import re
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from html import unescape
 from html.parser import HTMLParser as BaseHTMLParser
 from dataclasses import dataclass, field
 
-__version__ = "4.3.0"
+__version__ = "4.6.0"
 
 # ============================================================================
 # VERIFICAR BEAUTIFULSOUP
@@ -112,6 +117,711 @@ def get_bs4_parser():
     """Alias para get_parser."""
     return get_parser()
 
+# ============================================================================
+# ANÁLISIS EN UNA PASADA
+# ============================================================================
+
+# Un tag, tal como lo quita strip_html_tags (el grupo deja los tags en el split)
+_TAG_SPLIT_RE = re.compile(r'(<[^>]+>)')
+_ENTITY_RE = re.compile(r'&[a-zA-Z]+;|&#\d+;')
+_HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.I)
+_HEADING_RE = re.compile(r'<(h[1-6])[^>]*>(.*?)</\1>', re.I | re.DOTALL)
+_TITLE_RE = re.compile(r'<h[12][^>]*>(.*?)</h[12]>', re.I | re.DOTALL)
+
+_HEADING_LEVELS = frozenset('123456')
+
+# Patrones de URL de producto (PDP)
+PDP_URL_PATTERNS = (
+    '/producto/', '/p/', 'portatil-', 'monitor-', 'tarjeta-',
+    'procesador-', 'movil-', 'tablet-', 'televisor-', 'auricular-',
+    'teclado-', 'raton-', 'silla-', 'ordenador-'
+)
+
+EMPTY_HTML_ERROR = "❌ El contenido HTML está vacío"
+
+# Análisis recordados por hash del contenido (0 = sin memo)
+HTML_ANALYSIS_CACHE_SIZE: int = int(os.getenv('HTML_ANALYSIS_CACHE_SIZE', '64'))
+
+
+def _collapse(parts: Iterable[str]) -> str:
+    """Une trozos de texto separados por tags como lo haría strip_html_tags."""
+    return ' '.join(' '.join(parts).split())
+
+
+@dataclass
+class HTMLAnalysis:
+    """
+    Todo lo que se valida y se muestra de un HTML, calculado de una vez.
+
+    analyze_html() recorre el documento una sola vez con un tokenizador
+    (tags y texto) y obtiene a la vez el word count, los headings y los
+    enlaces con su texto; los flags del CMS salen del mismo documento en
+    minúsculas. count_words_in_html, validate_cms_structure,
+    validate_html_structure, analyze_links, extract_content_structure y
+    get_heading_hierarchy son vistas sobre este objeto.
+
+    El mismo objeto se comparte entre reruns y sesiones (ver analyze_html):
+    no modificarlo; las vistas devuelven copias.
+
+    Example:
+        >>> analysis = analyze_html(html)
+        >>> is_valid, errors, warnings = analysis.cms_result()
+        >>> analysis.link_summary()['internal_links_count']
+        3
+    """
+    word_count: int = 0
+    title: Optional[str] = None
+    headings: List[Dict[str, str]] = field(default_factory=list)
+    links: List[Dict[str, str]] = field(default_factory=list)
+    link_groups: Dict[str, List[Dict[str, str]]] = field(default_factory=dict)
+    hrefs: List[str] = field(default_factory=list)
+    flags: Dict[str, bool] = field(default_factory=dict)
+    markers: Dict[str, bool] = field(default_factory=dict)
+    article_count: int = 0
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    is_empty: bool = True
+
+    @property
+    def is_valid(self) -> bool:
+        """Si cumple los requisitos del CMS (sin errores)."""
+        return not self.errors
+
+    def cms_result(self) -> Tuple[bool, List[str], List[str]]:
+        """Resultado de validate_cms_structure: (válido, errores, warnings)."""
+        return self.is_valid, list(self.errors), list(self.warnings)
+
+    def heading_list(self) -> List[Dict[str, str]]:
+        """Jerarquía de encabezados (copia)."""
+        return [dict(heading) for heading in self.headings]
+
+    def link_summary(self) -> Dict:
+        """Resultado de analyze_links."""
+        if self.is_empty:
+            return {
+                'total': 0,
+                'internal': [],
+                'external': [],
+                'pdp': [],
+                'blog': [],
+                'internal_links_count': 0,
+                'external_links_count': 0
+            }
+
+        groups = {name: [dict(info) for info in self.link_groups.get(name, [])]
+                  for name in ('internal', 'external', 'pdp', 'blog')}
+        return {
+            'total': len(self.links),
+            **groups,
+            # Aliases para compatibilidad con results.py
+            'internal_count': len(groups['internal']),
+            'external_count': len(groups['external']),
+            'internal_links_count': len(groups['internal']),
+            'external_links_count': len(groups['external']),
+        }
+
+    def structure(self) -> Dict:
+        """Resultado de extract_content_structure."""
+        if self.is_empty:
+            return {'word_count': 0, 'structure_valid': False}
+
+        return {
+            'title': self.title,
+            'headings': self.heading_list(),
+            'word_count': self.word_count,
+            'has_table': self.markers.get('has_table_tag', False),
+            'has_callout': self.markers.get('has_callout', False),
+            'has_faq': self.markers.get('has_faq', False),
+            'has_verdict': self.markers.get('has_verdict', False),
+            'internal_links_count': len([l for l in self.hrefs if 'pccomponentes.com' in l]),
+            'external_links_count': len([l for l in self.hrefs if l.startswith('http') and 'pccomponentes.com' not in l]),
+            'structure_valid': True
+        }
+
+    def word_target(self, target: int, tolerance: float = 0.05) -> Dict:
+        """Resultado de validate_word_count_target (no depende del parseo)."""
+        actual = self.word_count
+        min_ok = int(target * (1 - tolerance))
+        max_ok = int(target * (1 + tolerance))
+        diff = actual - target
+        pct = (diff / target * 100) if target > 0 else 0
+        
+        return {
+            'actual': actual,
+            'target': target,
+            'min_acceptable': min_ok,
+            'max_acceptable': max_ok,
+            'within_range': min_ok <= actual <= max_ok,
+            'difference': diff,
+            'percentage_diff': round(pct, 2)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'word_count': self.word_count,
+            'is_valid': self.is_valid,
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'flags': dict(self.flags),
+            'structure': self.structure(),
+            'links': self.link_summary(),
+        }
+
+
+def _tag_candidates(tag: str) -> List[Tuple[int, str]]:
+    """
+    Posibles tags dentro de un tag: si lleva algún '<' suelto (p. ej. en
+    'precio < 500 <a href=...>'), las regex originales también casaban a
+    partir de cada uno.
+    """
+    candidates = [(0, tag)]
+    k = tag.find('<', 1)
+    while k > 0:
+        candidates.append((k, tag[k:]))
+        k = tag.find('<', k + 1)
+    return candidates
+
+
+def _scan_html(html: str) -> Tuple[int, List[Dict[str, str]], List[Dict[str, str]], Optional[str]]:
+    """
+    Recorrido único del documento partido en texto y tags.
+
+    Reproduce lo que hacían las regex de cada función: los tags cuentan
+    como separadores, un heading o enlace va de su tag de apertura al
+    primer cierre correspondiente y lo que haya dentro no abre otro.
+
+    Returns:
+        (word count, headings, enlaces <a> con href, título)
+    """
+    # [texto, tag, texto, tag, ..., texto]
+    parts = _TAG_SPLIT_RE.split(html)
+    headings: List[Dict[str, str]] = []
+    links: List[Dict[str, str]] = []
+    # Heading abierto: (cierre esperado, nivel, índice del tag, posición en el tag)
+    heading: Optional[Tuple[str, str, int, int]] = None
+    # Enlace abierto: (href, índice del tag)
+    link: Optional[Tuple[str, int]] = None
+    # Título: el primer <h1>/<h2> hasta el primer </h1> o </h2>
+    title: Optional[str] = None
+    title_from: Optional[Tuple[int, int]] = None
+
+    def inner(opened: int, i: int, k: int) -> str:
+        # Texto entre el tag opened y la posición k del tag i (opened < i)
+        texts = parts[opened + 1:i:2]
+        if k:
+            texts[-1] += parts[i][:k]
+        return _collapse(texts)
+
+    for i in range(1, len(parts), 2):
+        tag = parts[i]
+        candidates = _tag_candidates(tag) if '<' in tag[1:] else ((0, tag),)
+        for k, tag in candidates:
+            second = tag[1]
+            if second == '/':
+                if heading is None and link is None and (title_from is None or title is not None):
+                    continue
+                closing = tag.lower()
+                if (title is None and title_from is not None and title_from[0] < i
+                        and closing in ('</h1>', '</h2>')):
+                    title = inner(title_from[0], i, k)
+                if heading is not None and heading[2] < i and closing == heading[0]:
+                    headings.append({'level': heading[1], 'text': inner(heading[2], i, k)})
+                    heading = None
+                elif link is not None and link[1] < i and closing == '</a>':
+                    links.append({'url': link[0], 'anchor': inner(link[1], i, k)})
+                    link = None
+            elif second in 'hH':
+                if title_from is None and tag[2] in '12':
+                    title_from = (i, k)
+                if heading is None and tag[2] in _HEADING_LEVELS:
+                    level = tag[1:3].lower()
+                    heading = (f'</{level}>', level, i, k)
+            elif second in 'aA':
+                if link is None and len(tag) > 3:
+                    # Como <a[^>]+href=...: el último href del tag, tras '<a' y algo más
+                    found = [m for m in _HREF_RE.finditer(tag) if m.start() >= 3]
+                    if found:
+                        link = (found[-1].group(1), i)
+
+    # Sin cierre: la regex original seguía buscando desde el siguiente carácter
+    if heading is not None:
+        position = len(''.join(parts[:heading[2]])) + heading[3]
+        for level, text in _HEADING_RE.findall(html, position + 1):
+            headings.append({'level': level.lower(), 'text': strip_html_tags(text)})
+    if title is None and title_from is not None:
+        position = len(''.join(parts[:title_from[0]])) + title_from[1]
+        match = _TITLE_RE.search(html, position + 1)
+        title = strip_html_tags(match.group(1)) if match else None
+
+    text = ' '.join(parts[0::2])
+    if '&' in text:
+        text = _ENTITY_RE.sub(' ', text)
+    return len(text.split()), headings, links, title
+
+
+def _classify_links(links: List[Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
+    """Agrupa enlaces en internos (con PDP y blog) y externos."""
+    groups: Dict[str, List[Dict[str, str]]] = {'internal': [], 'external': [], 'pdp': [], 'blog': []}
+    for info in links:
+        url = info['url']
+        url_lower = url.lower()
+        if 'pccomponentes.com' in url_lower or url.startswith('/'):
+            groups['internal'].append(info)
+            if '/blog/' in url_lower:
+                groups['blog'].append(info)
+            elif any(pattern in url_lower for pattern in PDP_URL_PATTERNS):
+                groups['pdp'].append(info)
+        elif url.startswith('http'):
+            groups['external'].append(info)
+    return groups
+
+
+def _structure_flags(html_content: str, html_lower: str) -> Dict[str, bool]:
+    """Flags de validate_html_structure."""
+    # Marcadores markdown (```html, ```, etc.)
+    has_markdown = any(md in html_content for md in ['```html', '```', '~~~'])
+
+    # Kicker correcto (con span, no div)
+    has_span_kicker = ('class="kicker"' in html_lower or "class='kicker'" in html_lower) and '<span' in html_lower
+
+    # Callouts (varios formatos posibles)
+    has_bf_callout = any(x in html_lower for x in ['callout-bf', 'callout_bf', 'bf-callout', 'black-friday', 'cyber-monday'])
+    has_callout = 'class="callout"' in html_lower or "class='callout'" in html_lower
+
+    return {
+        'has_article': '<article' in html_lower,
+        'kicker_uses_span': has_span_kicker,
+        'css_has_root': ':root' in html_content and '<style' in html_lower,
+        'has_bf_callout': has_bf_callout,
+        'no_markdown': not has_markdown,
+        'has_table': '<table' in html_lower and '</table>' in html_lower,
+        'has_callout': has_callout or has_bf_callout,
+        'has_verdict_box': any(x in html_lower for x in ['verdict-box', 'verdict_box', 'verdictbox', 'veredicto']),
+        'has_toc': any(x in html_lower for x in ['class="toc"', "class='toc'", 'nav class="toc']),
+        'has_grid': any(x in html_lower for x in ['grid-layout', 'grid_layout', 'display: grid', 'display:grid']),
+    }
+
+
+def _cms_checks(
+    html_content: str,
+    html_lower: str,
+    article_count: int,
+    word_count: int
+) -> Tuple[List[str], List[str]]:
+    """Errores y warnings de validate_cms_structure."""
+    errors = []
+    warnings = []
+
+    if article_count < 3:
+        errors.append(f"❌ Se encontraron {article_count} tags <article>, deben ser mínimo 3")
+    elif article_count > 3:
+        warnings.append(f"⚠️ Se encontraron {article_count} tags <article>, lo normal son 3")
+
+    has_div_kicker = '<div class="kicker">' in html_lower
+    has_span_kicker = '<span class="kicker">' in html_lower
+    if has_div_kicker and not has_span_kicker:
+        errors.append("❌ El kicker usa <div> pero debe usar <span>")
+
+    if '<h1' in html_lower:
+        errors.append("❌ Se encontró <h1> pero el CMS usa H2 como título principal")
+    if '<h2' not in html_lower:
+        warnings.append("⚠️ No se encontró ningún <h2> para el título principal")
+
+    if 'contentgenerator__main' not in html_lower and 'content-generator' not in html_lower:
+        warnings.append("⚠️ No se encontró article principal")
+    if 'faq' not in html_lower:
+        warnings.append("⚠️ No se encontró sección de FAQs")
+    if 'verdict' not in html_lower:
+        warnings.append("⚠️ No se encontró sección de veredicto")
+
+    if word_count < 300:
+        errors.append(f"❌ Solo {word_count} palabras. Mínimo: 500")
+    elif word_count < 500:
+        warnings.append(f"⚠️ {word_count} palabras. Recomendado: 800+")
+
+    if any(md in html_content for md in ['```', '**', '## ']):
+        warnings.append("⚠️ Se detectó posible Markdown residual")
+
+    return errors, warnings
+
+
+def _build_analysis(html_content: str) -> HTMLAnalysis:
+    """Analiza html_content (no vacío) sin pasar por el memo."""
+    word_count, headings, links, title = _scan_html(html_content)
+    html_lower = html_content.lower()
+    article_count = html_lower.count('<article')
+    errors, warnings = _cms_checks(html_content, html_lower, article_count, word_count)
+
+    return HTMLAnalysis(
+        word_count=word_count,
+        title=title,
+        headings=headings,
+        links=links,
+        link_groups=_classify_links(links),
+        hrefs=_HREF_RE.findall(html_content),
+        flags=_structure_flags(html_content, html_lower),
+        markers={
+            'has_table_tag': '<table' in html_lower,
+            'has_callout': 'callout' in html_lower,
+            'has_faq': 'faq' in html_lower,
+            'has_verdict': 'verdict' in html_lower,
+        },
+        article_count=article_count,
+        errors=errors,
+        warnings=warnings,
+        is_empty=False,
+    )
+
+
+# ============================================================================
+# MEMO DE ANÁLISIS
+# ============================================================================
+
+# Cada interacción en Streamlit vuelve a ejecutar app.py y a validar
+# draft_html y final_html aunque no hayan cambiado; con el memo (común a
+# todo el proceso, LRU) un rerun no vuelve a parsear nada y varias
+# sesiones con el mismo resultado comparten la entrada.
+_analysis_memo: 'OrderedDict[str, HTMLAnalysis]' = OrderedDict()
+_analysis_lock = threading.Lock()
+_analysis_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def _content_key(html_content: str) -> str:
+    """Hash del contenido (el objetivo de palabras no cambia el parseo)."""
+    data = html_content.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def analyze_html(html_content: str) -> HTMLAnalysis:
+    """
+    Analiza un HTML de una vez (word count, headings, enlaces, flags y
+    validación CMS).
+
+    El resultado se recuerda por hash del contenido; la comparación con un
+    objetivo de palabras sale de él con HTMLAnalysis.word_target().
+
+    Args:
+        html_content: Contenido HTML
+
+    Returns:
+        HTMLAnalysis con todos los resultados (compartido: no modificar)
+    """
+    if not html_content:
+        return HTMLAnalysis(
+            flags=_structure_flags('', ''),
+            errors=[EMPTY_HTML_ERROR],
+        )
+    if HTML_ANALYSIS_CACHE_SIZE <= 0:
+        return _build_analysis(html_content)
+
+    key = _content_key(html_content)
+    with _analysis_lock:
+        analysis = _analysis_memo.get(key)
+        if analysis is not None:
+            _analysis_memo.move_to_end(key)
+            _analysis_stats['hits'] += 1
+            return analysis
+        _analysis_stats['misses'] += 1
+
+    analysis = _build_analysis(html_content)
+
+    with _analysis_lock:
+        _analysis_memo[key] = analysis
+        _analysis_memo.move_to_end(key)
+        while len(_analysis_memo) > HTML_ANALYSIS_CACHE_SIZE:
+            _analysis_memo.popitem(last=False)
+            _analysis_stats['evictions'] += 1
+    return analysis
+
+
+def get_html_analysis_stats() -> Dict[str, int]:
+    """Estadísticas del memo de análisis."""
+    with _analysis_lock:
+        return {
+            **_analysis_stats,
+            'size': len(_analysis_memo),
+            'max_size': HTML_ANALYSIS_CACHE_SIZE,
+        }
+
+
+def clear_html_analysis_cache() -> None:
+    """Vacía el memo de análisis."""
+    with _analysis_lock:
+        _analysis_memo.clear()
+
+# ============================================================================
+# VALIDACIÓN EN STREAMING
+# ============================================================================
+
+# Tags sin cierre
+VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+})
+
+# Patrones que se vigilan mientras llega el HTML: (mensaje, es error)
+STREAM_FORBIDDEN_PATTERNS: Dict[str, Tuple[str, bool]] = {
+    '<h1': ("❌ Se encontró <h1> pero el CMS usa H2 como título principal", True),
+    '<div class="kicker">': ("⚠️ El kicker usa <div> pero debe usar <span>", False),
+    '```': ("⚠️ Se detectó posible Markdown residual", False),
+}
+
+# Sin ningún tag tras estas palabras, la respuesta no es HTML
+STREAM_MIN_WORDS_FOR_HTML = 150
+
+# Margen sobre el objetivo de palabras a partir del cual se aborta
+STREAM_MAX_OVERRUN = 0.6
+
+_TAG_NAME_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)')
+_LEADING_FENCE_RE = re.compile(r'^\s*```(?:html)?\s*', re.I)
+_TRAILING_FENCE_RE = re.compile(r'\s*```\s*$')
+
+
+@dataclass
+class StreamProgress:
+    """Estado de un HTML que todavía se está generando."""
+    chars: int = 0
+    word_count: int = 0
+    tags: int = 0
+    open_tags: List[str] = field(default_factory=list)
+    article_count: int = 0
+    max_article_depth: int = 0
+    heading_count: int = 0
+    links: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    abort_reason: Optional[str] = None
+
+    @property
+    def should_abort(self) -> bool:
+        """Si la generación va claramente mal y conviene cortarla."""
+        return self.abort_reason is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chars': self.chars,
+            'word_count': self.word_count,
+            'tags': self.tags,
+            'open_tags': list(self.open_tags),
+            'article_count': self.article_count,
+            'max_article_depth': self.max_article_depth,
+            'heading_count': self.heading_count,
+            'links': len(self.links),
+            'errors': list(self.errors),
+            'warnings': list(self.warnings),
+            'abort_reason': self.abort_reason,
+        }
+
+
+class StreamingHTMLValidator:
+    """
+    Valida un HTML a trozos según llega de una respuesta en streaming.
+
+    Mantiene un word count aproximado, la pila de tags abiertos y el
+    anidamiento de <article>, el inventario de enlaces y los patrones
+    prohibidos vistos (<h1, kicker en <div>, bloques ```). Con eso hay
+    progreso y avisos durante la generación, y should_abort indica cuándo
+    no merece la pena seguir pagando tokens:
+
+    - tras STREAM_MIN_WORDS_FOR_HTML palabras no ha llegado ningún tag
+    - el texto supera el objetivo de palabras en más de max_overrun
+    - con strict, cualquier error de STREAM_FORBIDDEN_PATTERNS
+
+    Solo se procesa hasta el último punto seguro (antes de un tag o una
+    palabra a medias); el resto espera al siguiente trozo. finish()
+    devuelve el análisis exacto del documento completo.
+
+    Example:
+        >>> validator = StreamingHTMLValidator(target_length=1500)
+        >>> for chunk in chunks:
+        ...     if validator.feed(chunk).should_abort:
+        ...         break
+        >>> analysis = validator.finish()
+    """
+
+    def __init__(
+        self,
+        target_length: Optional[int] = None,
+        max_overrun: float = STREAM_MAX_OVERRUN,
+        strict: bool = False
+    ):
+        """
+        Args:
+            target_length: Objetivo de palabras (sin él no se vigila la longitud)
+            max_overrun: Fracción sobre el objetivo que se tolera (0.6 = +60%)
+            strict: Si los errores (p. ej. <h1>) también abortan
+        """
+        self.target_length = target_length
+        self.max_overrun = max_overrun
+        self.strict = strict
+        self._chunks: List[str] = []
+        self._pending = ''
+        self._started = False
+        self._seen_tag = False
+        self._overlap = ''
+        self._hits: Dict[str, int] = {}
+        self._fence_at: Optional[int] = None
+        self._first_content: Optional[int] = None
+        self._progress = StreamProgress()
+
+    @property
+    def html(self) -> str:
+        """Lo recibido hasta ahora."""
+        return ''.join(self._chunks)
+
+    @property
+    def progress(self) -> StreamProgress:
+        return self._progress
+
+    def feed(self, chunk: str) -> StreamProgress:
+        """
+        Procesa un trozo de la respuesta.
+
+        Args:
+            chunk: Texto recibido
+
+        Returns:
+            StreamProgress actualizado (el mismo objeto en cada llamada)
+        """
+        if not chunk:
+            return self._progress
+        self._chunks.append(chunk)
+        self._progress.chars += len(chunk)
+        self._scan_patterns(chunk)
+
+        data = self._pending + chunk
+        if not self._started:
+            # El ```html que a veces envuelve la respuesta no cuenta
+            head = data.lstrip()
+            if len(head) < len('```html') and '```html'.startswith(head.lower()):
+                self._pending = data
+                return self._progress
+            data = _LEADING_FENCE_RE.sub('', data, count=1)
+            self._started = True
+        cut = self._safe_cut(data)
+        self._pending = data[cut:]
+        if cut:
+            self._process(data[:cut])
+        self._check_abort()
+        return self._progress
+
+    def finish(self) -> HTMLAnalysis:
+        """
+        Cierra el stream y analiza el documento completo (sin el bloque
+        ```html que a veces lo envuelve).
+        """
+        if self._pending:
+            pending = self._pending if self._started else _LEADING_FENCE_RE.sub('', self._pending)
+            self._process(_TRAILING_FENCE_RE.sub('', pending))
+            self._pending = ''
+            self._check_abort()
+        html = _LEADING_FENCE_RE.sub('', self.html.strip())
+        return analyze_html(_TRAILING_FENCE_RE.sub('', html))
+
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _safe_cut(data: str) -> int:
+        """Hasta dónde se puede procesar data sin partir un tag ni una palabra."""
+        last_close = data.rfind('>')
+        open_after = data.find('<', last_close + 1)
+        if open_after >= 0:
+            return open_after
+        if not data or data[-1].isspace() or data[-1] == '>':
+            return len(data)
+        # Palabra (o entidad) quizá a medias: esperar al siguiente trozo
+        for position in range(len(data) - 1, last_close, -1):
+            if data[position].isspace():
+                return position + 1
+        return last_close + 1
+
+    def _scan_patterns(self, chunk: str) -> None:
+        """Busca los patrones prohibidos, también los partidos entre trozos."""
+        if self._fence_at is not None and chunk.strip():
+            # Tras el ``` sigue habiendo contenido: no era el cierre del envoltorio
+            self._hit('```', self._fence_at)
+            self._fence_at = None
+
+        window = self._overlap + chunk.lower()
+        offset = self._progress.chars - len(window)
+        if self._first_content is None and chunk.strip():
+            self._first_content = self._progress.chars - len(chunk) + (len(chunk) - len(chunk.lstrip()))
+        for pattern in STREAM_FORBIDDEN_PATTERNS:
+            if pattern in self._hits:
+                continue
+            position = window.find(pattern)
+            # El ```html inicial es el envoltorio, no Markdown residual
+            while position >= 0 and pattern == '```' and offset + position == self._first_content:
+                position = window.find(pattern, position + 1)
+            if position < 0:
+                continue
+            if pattern == '```' and not window[position + 3:].strip():
+                # Puede ser el ``` final del envoltorio
+                self._fence_at = offset + position
+                continue
+            self._hit(pattern, offset + position)
+        keep = max(len(pattern) for pattern in STREAM_FORBIDDEN_PATTERNS) - 1
+        self._overlap = window[-keep:]
+
+    def _hit(self, pattern: str, position: int) -> None:
+        message, is_error = STREAM_FORBIDDEN_PATTERNS[pattern]
+        self._hits[pattern] = position
+        (self._progress.errors if is_error else self._progress.warnings).append(message)
+
+    def _process(self, text: str) -> None:
+        progress = self._progress
+        parts = _TAG_SPLIT_RE.split(text)
+
+        words = ' '.join(parts[0::2])
+        if '&' in words:
+            words = _ENTITY_RE.sub(' ', words)
+        progress.word_count += len(words.split())
+
+        stack = progress.open_tags
+        for i in range(1, len(parts), 2):
+            tag = parts[i]
+            self._seen_tag = True
+            progress.tags += 1
+            match = _TAG_NAME_RE.match(tag)
+            if match is None:
+                continue
+            closing, name = match.group(1), match.group(2).lower()
+
+            if closing:
+                if name in stack:
+                    # Cierra también lo que quedara abierto dentro (p. ej. <p>)
+                    del stack[len(stack) - 1 - stack[::-1].index(name):]
+                continue
+
+            if len(name) == 2 and name[0] == 'h' and name[1] in _HEADING_LEVELS:
+                progress.heading_count += 1
+            elif name == 'a':
+                found = [m for m in _HREF_RE.finditer(tag) if m.start() >= 3]
+                if found:
+                    progress.links.append(found[-1].group(1))
+
+            if name in VOID_TAGS or tag.endswith('/>'):
+                continue
+            stack.append(name)
+            if name == 'article':
+                progress.article_count += 1
+                progress.max_article_depth = max(progress.max_article_depth, stack.count('article'))
+
+    def _check_abort(self) -> None:
+        progress = self._progress
+        if progress.abort_reason is not None:
+            return
+        if not self._seen_tag and progress.word_count >= STREAM_MIN_WORDS_FOR_HTML:
+            progress.abort_reason = f"{progress.word_count} palabras sin ningún tag HTML"
+        elif self.target_length and progress.word_count > self.target_length * (1 + self.max_overrun):
+            progress.abort_reason = (
+                f"{progress.word_count} palabras, objetivo {self.target_length} "
+                f"(+{self.max_overrun:.0%} máximo)"
+            )
+        elif self.strict and progress.errors:
+            progress.abort_reason = progress.errors[0]
+
+
 # ============================================================================
 # FUNCIONES DE CONTEO
 # ============================================================================
@@ -120,11 +830,7 @@ def count_words_in_html(html_content: str) -> int:
     """Cuenta palabras en HTML excluyendo tags."""
     if not html_content:
         return 0
-    text = re.sub(r'<[^>]+>', ' ', html_content)
-    text = re.sub(r'&[a-zA-Z]+;', ' ', text)
-    text = re.sub(r'&#\d+;', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return len(text.split()) if text else 0
+    return analyze_html(html_content).word_count
 
 def get_word_count(html_content: str) -> int:
     """Alias para count_words_in_html."""
@@ -151,28 +857,7 @@ def extract_content_structure(html_content: str) -> Dict:
         return {'word_count': 0, 'structure_valid': False}
     
     try:
-        title_match = re.search(r'<h[12][^>]*>(.*?)</h[12]>', html_content, re.I | re.DOTALL)
-        title = strip_html_tags(title_match.group(1)) if title_match else None
-        
-        headings = []
-        for level, text in re.findall(r'<(h[1-6])[^>]*>(.*?)</\1>', html_content, re.I | re.DOTALL):
-            headings.append({'level': level.lower(), 'text': strip_html_tags(text)})
-        
-        html_lower = html_content.lower()
-        links = re.findall(r'href=["\']([^"\']+)["\']', html_content, re.I)
-        
-        return {
-            'title': title,
-            'headings': headings,
-            'word_count': count_words_in_html(html_content),
-            'has_table': '<table' in html_lower,
-            'has_callout': 'callout' in html_lower,
-            'has_faq': 'faq' in html_lower,
-            'has_verdict': 'verdict' in html_lower,
-            'internal_links_count': len([l for l in links if 'pccomponentes.com' in l]),
-            'external_links_count': len([l for l in links if l.startswith('http') and 'pccomponentes.com' not in l]),
-            'structure_valid': True
-        }
+        return analyze_html(html_content).structure()
     except Exception as e:
         return {'error': str(e), 'structure_valid': False}
 
@@ -183,20 +868,16 @@ def extract_content(html_content: str) -> ExtractedContent:
     if not html_content:
         return result
     
+    analysis = analyze_html(html_content)
     result.text = strip_html_tags(html_content)
-    result.word_count = count_words_in_html(html_content)
+    result.word_count = analysis.word_count
     
     # Título
     title_match = re.search(r'<title[^>]*>(.*?)</title>', html_content, re.I | re.DOTALL)
     result.title = strip_html_tags(title_match.group(1)) if title_match else ""
     
-    # Headings
-    for level, text in re.findall(r'<(h[1-6])[^>]*>(.*?)</\1>', html_content, re.I | re.DOTALL):
-        result.headings.append({'level': level.lower(), 'text': strip_html_tags(text)})
-    
-    # Links
-    for match in re.findall(r'<a[^>]+href=["\']([^"\']+)["\'][^>]*>(.*?)</a>', html_content, re.I | re.DOTALL):
-        result.links.append({'href': match[0], 'text': strip_html_tags(match[1])})
+    result.headings = analysis.heading_list()
+    result.links = [{'href': link['url'], 'text': link['anchor']} for link in analysis.links]
     
     return result
 
@@ -240,6 +921,222 @@ def clean_html(html_content: str) -> str:
     """Alias para sanitize_html."""
     return sanitize_html(html_content)
 
+# ============================================================================
+# COMPACTACIÓN PARA PROMPTS
+# ============================================================================
+
+# El HTML que pega el usuario (artículos a reescribir o fusionar, posts y
+# PLPs enlazados) trae estilos inline, clases, scripts, SVGs y atributos de
+# tracking que el modelo no necesita. compact_html() lo reduce al esqueleto
+# semántico: encabezados, párrafos, listas, tablas y enlaces (solo href).
+
+# Elementos que se eliminan con todo su contenido (de los formularios,
+# solo los controles: hay páginas enteras dentro de un <form>)
+COMPACT_DROP_TAGS = frozenset({
+    'script', 'style', 'svg', 'noscript', 'template', 'iframe', 'object',
+    'canvas', 'head', 'button', 'select', 'textarea', 'nav',
+})
+
+# Elementos que se conservan (sin atributos, salvo href en <a>)
+COMPACT_KEEP_TAGS = frozenset({
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'li', 'dl', 'dt',
+    'dd', 'table', 'caption', 'tr', 'th', 'td', 'blockquote', 'a',
+})
+
+# Elementos de bloque que se desenvuelven dejando un salto de línea
+_COMPACT_BREAK_TAGS = frozenset({
+    'div', 'section', 'article', 'header', 'footer', 'main', 'aside',
+    'figure', 'figcaption', 'br', 'hr', 'thead', 'tbody', 'tfoot', 'details',
+    'summary', 'address', 'pre', 'form', 'fieldset',
+})
+
+# Abren línea nueva en la salida
+_COMPACT_LINE_TAGS = frozenset({
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'li', 'dl', 'dt',
+    'dd', 'table', 'caption', 'tr', 'blockquote',
+})
+
+# Parámetros de tracking que se quitan de los href
+_TRACKING_PARAM_RE = re.compile(r'(?:^|&)(?:utm_[a-z]+|gclid|fbclid|mc_[a-z]+)=[^&]*', re.I)
+
+_COMMENT_RE = re.compile(r'<!--.*?(?:-->|$)|<!\[CDATA\[.*?(?:\]\]>|$)', re.DOTALL)
+_EMPTY_ELEMENT_RE = re.compile(r'<(p|li|h[1-6]|td|th|tr|ul|ol|table|blockquote|a|dt|dd|caption)(?: [^>]*)?>\s*</\1>')
+_CELL_END_RE = re.compile(r'</t[dh]>')
+_SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+_LINE_SPACE_RE = re.compile(r' *\n[\n ]*')
+
+# Misma estimación que core.generator.count_tokens
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class CompactHTML:
+    """HTML reducido a su esqueleto semántico y lo que se ahorra."""
+    html: str
+    original_bytes: int
+    compact_bytes: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.compact_bytes
+
+    @property
+    def original_tokens(self) -> int:
+        return self.original_bytes // CHARS_PER_TOKEN
+
+    @property
+    def compact_tokens(self) -> int:
+        return self.compact_bytes // CHARS_PER_TOKEN
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.compact_tokens
+
+    @property
+    def ratio(self) -> float:
+        """Fracción del tamaño original que se ahorra (0-1)."""
+        return self.bytes_saved / self.original_bytes if self.original_bytes else 0.0
+
+    @property
+    def text(self) -> str:
+        """Texto plano del esqueleto (un bloque por línea)."""
+        plain = _TAG_SPLIT_RE.sub('', _CELL_END_RE.sub(' ', self.html))
+        lines = (_collapse([line]) for line in plain.split('\n'))
+        return unescape('\n'.join(line for line in lines if line))
+
+    def summary(self) -> str:
+        """Resumen legible del ahorro."""
+        return (
+            f"{self.original_bytes:,} → {self.compact_bytes:,} bytes "
+            f"(-{self.ratio:.0%}, ~{self.tokens_saved:,} tokens menos)"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'original_bytes': self.original_bytes,
+            'compact_bytes': self.compact_bytes,
+            'bytes_saved': self.bytes_saved,
+            'original_tokens': self.original_tokens,
+            'compact_tokens': self.compact_tokens,
+            'tokens_saved': self.tokens_saved,
+            'ratio': round(self.ratio, 4),
+        }
+
+
+def _compact_href(tag: str) -> Optional[str]:
+    match = _HREF_RE.search(tag)
+    if not match:
+        return None
+    href = match.group(1).strip()
+    if '?' in href:
+        base, _, rest = href.partition('?')
+        query, hash_mark, fragment = rest.partition('#')
+        query = _TRACKING_PARAM_RE.sub('', query).lstrip('&')
+        href = base + ('?' + query if query else '') + hash_mark + fragment
+    return href.replace('"', '&quot;')
+
+
+def _compact_tokens(html: str) -> Iterable[Tuple[bool, str]]:
+    """(es_tag, token); un '<' que no abre un tag es texto (&lt;)."""
+    for i, token in enumerate(_TAG_SPLIT_RE.split(html)):
+        if not i % 2:
+            if token:
+                yield False, token
+            continue
+        # Un tramo <...> puede empezar por '<' sueltos ("a < b < c>"): cada
+        # uno es texto hasta el siguiente '<', y el tag (si lo hay) es el
+        # final del tramo
+        start = 0
+        while not _TAG_NAME_RE.match(token, start) and not token.startswith('<!', start):
+            yield False, '&lt;'
+            following = token.find('<', start + 1)
+            if following == -1:
+                if len(token) > start + 1:
+                    yield False, token[start + 1:]
+                break
+            if following > start + 1:
+                yield False, token[start + 1:following]
+            start = following
+        else:
+            yield True, token[start:] if start else token
+
+
+def compact_html(html_content: str) -> CompactHTML:
+    """
+    Reduce HTML a su esqueleto semántico para pasarlo en un prompt.
+    
+    - Elimina scripts, estilos, SVGs, controles de formulario, navegación y
+      comentarios con todo su contenido (los <form> se desenvuelven)
+    - Conserva encabezados, párrafos, listas, tablas, citas y enlaces, sin
+      atributos salvo href (sin parámetros utm_*, gclid, fbclid)
+    - Desenvuelve el resto (div, span, strong, img...) conservando el texto
+    - Colapsa espacios y elimina elementos vacíos
+    
+    Si no queda nada (todo estaba dentro de elementos eliminados), se
+    devuelve el HTML original para no mandar un prompt vacío.
+    
+    Args:
+        html_content: HTML original
+        
+    Returns:
+        CompactHTML con el HTML compacto y los bytes/tokens ahorrados
+    """
+    if not html_content:
+        return CompactHTML("", 0, 0)
+    
+    original_bytes = len(html_content.encode('utf-8'))
+    parts: List[str] = []
+    skipping: Optional[str] = None
+    skip_depth = 0
+    
+    for is_tag, token in _compact_tokens(_COMMENT_RE.sub('', html_content)):
+        if not is_tag:
+            if skipping is None:
+                parts.append(_SPACE_RE.sub(' ', token.replace('\n', ' ')))
+            continue
+        
+        match = _TAG_NAME_RE.match(token)
+        if match is None:
+            continue
+        closing, name = match.group(1) == '/', match.group(2).lower()
+        
+        if skipping is not None:
+            if name == skipping:
+                if closing:
+                    skip_depth -= 1
+                    if not skip_depth:
+                        skipping = None
+                elif not token.endswith('/>'):
+                    skip_depth += 1
+            continue
+        
+        if name in COMPACT_DROP_TAGS:
+            if not closing and not token.endswith('/>'):
+                skipping, skip_depth = name, 1
+        elif name in COMPACT_KEEP_TAGS:
+            newline = '\n' if name in _COMPACT_LINE_TAGS and not closing else ''
+            if closing:
+                parts.append(f'</{name}>')
+            elif name == 'a':
+                href = _compact_href(token)
+                parts.append(f'<a href="{href}">' if href is not None else '<a>')
+            else:
+                parts.append(f'{newline}<{name}>')
+        elif name in _COMPACT_BREAK_TAGS:
+            parts.append('\n')
+    
+    html = ''.join(parts)
+    html = re.sub(r' ?(</?(?:p|li|h[1-6]|td|th|tr|ul|ol|table|blockquote|dt|dd|caption)>) ?', r'\1', html)
+    previous = None
+    while previous != html:
+        previous, html = html, _EMPTY_ELEMENT_RE.sub('', html)
+    html = _LINE_SPACE_RE.sub('\n', html).strip()
+    
+    if not html and html_content.strip():
+        return CompactHTML(html_content, original_bytes, original_bytes)
+    
+    return CompactHTML(html, original_bytes, len(html.encode('utf-8')))
+
 # ============================================================================
 # FUNCIONES DE VALIDACIÓN
 # ============================================================================
@@ -261,118 +1158,17 @@ def validate_html_structure(html_content: str) -> Dict[str, bool]:
         - has_toc: Tiene tabla de contenidos
         - has_grid: Tiene grid layout
     """
-    if not html_content:
-        return {
-            'has_article': False,
-            'kicker_uses_span': False,
-            'css_has_root': False,
-            'has_bf_callout': False,
-            'no_markdown': True,
-            'has_table': False,
-            'has_callout': False,
-            'has_verdict_box': False,
-            'has_toc': False,
-            'has_grid': False,
-        }
-    
-    html_lower = html_content.lower()
-    
-    # Detectar marcadores markdown (```html, ```, etc.)
-    has_markdown = any(md in html_content for md in ['```html', '```', '~~~'])
-    
-    # Detectar kicker correctamente (con span, no div)
-    has_span_kicker = ('class="kicker"' in html_lower or "class='kicker'" in html_lower) and '<span' in html_lower
-    
-    # Detectar callouts (varios formatos posibles)
-    has_bf_callout = any(x in html_lower for x in ['callout-bf', 'callout_bf', 'bf-callout', 'black-friday', 'cyber-monday'])
-    has_callout = 'class="callout"' in html_lower or "class='callout'" in html_lower
-    
-    # Detectar verdict-box (varios formatos)
-    has_verdict = any(x in html_lower for x in ['verdict-box', 'verdict_box', 'verdictbox', 'veredicto'])
-    
-    # Detectar TOC
-    has_toc = any(x in html_lower for x in ['class="toc"', "class='toc'", 'nav class="toc'])
-    
-    # Detectar Grid
-    has_grid = any(x in html_lower for x in ['grid-layout', 'grid_layout', 'display: grid', 'display:grid'])
-    
-    # Detectar tablas
-    has_table = '<table' in html_lower and '</table>' in html_lower
-    
-    return {
-        'has_article': '<article' in html_lower,
-        'kicker_uses_span': has_span_kicker,
-        'css_has_root': ':root' in html_content and '<style' in html_lower,
-        'has_bf_callout': has_bf_callout,
-        'no_markdown': not has_markdown,
-        'has_table': has_table,
-        'has_callout': has_callout or has_bf_callout,
-        'has_verdict_box': has_verdict,
-        'has_toc': has_toc,
-        'has_grid': has_grid,
-    }
+    return dict(analyze_html(html_content).flags)
 
 def validate_cms_structure(html_content: str) -> Tuple[bool, List[str], List[str]]:
     """Valida que el HTML cumpla con requisitos del CMS."""
-    errors = []
-    warnings = []
-    
     if not html_content:
-        return False, ["❌ El contenido HTML está vacío"], []
-    
-    html_lower = html_content.lower()
-    
-    article_count = html_lower.count('<article')
-    if article_count < 3:
-        errors.append(f"❌ Se encontraron {article_count} tags <article>, deben ser mínimo 3")
-    elif article_count > 3:
-        warnings.append(f"⚠️ Se encontraron {article_count} tags <article>, lo normal son 3")
-    
-    has_div_kicker = '<div class="kicker">' in html_lower
-    has_span_kicker = '<span class="kicker">' in html_lower
-    if has_div_kicker and not has_span_kicker:
-        errors.append("❌ El kicker usa <div> pero debe usar <span>")
-    
-    if '<h1' in html_lower:
-        errors.append("❌ Se encontró <h1> pero el CMS usa H2 como título principal")
-    if '<h2' not in html_lower:
-        warnings.append("⚠️ No se encontró ningún <h2> para el título principal")
-    
-    if 'contentgenerator__main' not in html_lower and 'content-generator' not in html_lower:
-        warnings.append("⚠️ No se encontró article principal")
-    if 'faq' not in html_lower:
-        warnings.append("⚠️ No se encontró sección de FAQs")
-    if 'verdict' not in html_lower:
-        warnings.append("⚠️ No se encontró sección de veredicto")
-    
-    word_count = count_words_in_html(html_content)
-    if word_count < 300:
-        errors.append(f"❌ Solo {word_count} palabras. Mínimo: 500")
-    elif word_count < 500:
-        warnings.append(f"⚠️ {word_count} palabras. Recomendado: 800+")
-    
-    if any(md in html_content for md in ['```', '**', '## ']):
-        warnings.append("⚠️ Se detectó posible Markdown residual")
-    
-    return len(errors) == 0, errors, warnings
+        return False, [EMPTY_HTML_ERROR], []
+    return analyze_html(html_content).cms_result()
 
 def validate_word_count_target(html_content: str, target: int, tolerance: float = 0.05) -> Dict:
     """Valida si el word count está dentro del rango objetivo."""
-    actual = count_words_in_html(html_content)
-    min_ok = int(target * (1 - tolerance))
-    max_ok = int(target * (1 + tolerance))
-    diff = actual - target
-    pct = (diff / target * 100) if target > 0 else 0
-    
-    return {
-        'actual': actual,
-        'target': target,
-        'min_acceptable': min_ok,
-        'max_acceptable': max_ok,
-        'within_range': min_ok <= actual <= max_ok,
-        'difference': diff,
-        'percentage_diff': round(pct, 2)
-    }
+    return analyze_html(html_content).word_target(target, tolerance)
 
 # ============================================================================
 # FUNCIONES DE ANÁLISIS DE ENLACES
@@ -391,68 +1187,14 @@ def analyze_links(html_content: str) -> Dict:
     Returns:
         Dict con conteos y listas de enlaces
     """
-    if not html_content:
-        return {
-            'total': 0,
-            'internal': [],
-            'external': [],
-            'pdp': [],
-            'blog': [],
-            'internal_links_count': 0,
-            'external_links_count': 0
-        }
-    
-    # Buscar todos los enlaces <a href="...">...</a>
-    matches = re.findall(r'<a[^>]+href=["\']([^"\']+)["\'][^>]*>(.*?)</a>', html_content, re.I | re.DOTALL)
-    
-    internal, external, pdp, blog = [], [], [], []
-    
-    for url, anchor in matches:
-        # Limpiar anchor de tags HTML
-        clean_anchor = strip_html_tags(anchor).strip()
-        info = {'url': url, 'anchor': clean_anchor}
-        
-        # Clasificar enlaces
-        url_lower = url.lower()
-        
-        if 'pccomponentes.com' in url_lower or url.startswith('/'):
-            internal.append(info)
-            
-            # Sub-clasificar
-            if '/blog/' in url_lower:
-                blog.append(info)
-            # PDPs tienen varios patrones
-            elif any(pattern in url_lower for pattern in [
-                '/producto/', '/p/', 'portatil-', 'monitor-', 'tarjeta-', 
-                'procesador-', 'movil-', 'tablet-', 'televisor-', 'auricular-',
-                'teclado-', 'raton-', 'silla-', 'ordenador-'
-            ]):
-                pdp.append(info)
-        elif url.startswith('http'):
-            external.append(info)
-    
-    return {
-        'total': len(matches),
-        'internal': internal,
-        'external': external,
-        'pdp': pdp,
-        'blog': blog,
-        # Aliases para compatibilidad con results.py
-        'internal_count': len(internal),
-        'external_count': len(external),
-        'internal_links_count': len(internal),
-        'external_links_count': len(external),
-    }
+    return analyze_html(html_content).link_summary()
 
 def get_heading_hierarchy(html_content: str) -> List[Dict[str, str]]:
     """Extrae jerarquía de encabezados."""
     if not html_content:
         return []
     
-    return [
-        {'level': level.lower(), 'text': strip_html_tags(text)}
-        for level, text in re.findall(r'<(h[1-6])[^>]*>(.*?)</\1>', html_content, re.I | re.DOTALL)
-    ]
+    return analyze_html(html_content).heading_list()
 
 # ============================================================================
 # EXPORTS
@@ -468,6 +1210,17 @@ __all__ = [
     'is_bs4_available',
     # Data classes
     'ExtractedContent',
+    # Análisis
+    'HTMLAnalysis',
+    'analyze_html',
+    'get_html_analysis_stats',
+    'clear_html_analysis_cache',
+    'HTML_ANALYSIS_CACHE_SIZE',
+    'PDP_URL_PATTERNS',
+    # Streaming
+    'StreamProgress',
+    'StreamingHTMLValidator',
+    'STREAM_FORBIDDEN_PATTERNS',
     # Conteo
     'count_words_in_html',
     'get_word_count',
@@ -481,6 +1234,11 @@ __all__ = [
     # Limpieza
     'sanitize_html',
     'clean_html',
+    # Compactación para prompts
+    'CompactHTML',
+    'compact_html',
+    'COMPACT_DROP_TAGS',
+    'COMPACT_KEEP_TAGS',
     # Validación
     'validate_html_structure',
     'validate_cms_structure',
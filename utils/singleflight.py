@@ -0,0 +1,262 @@
+"""
+Single-Flight - PcComponentes Content Generator
+Versión 4.3.0
+
+Deduplicación de llamadas concurrentes idénticas (patrón "single-flight")
+y refresco en segundo plano para cachés stale-while-revalidate.
+
+Cuando varios hilos (dos usuarios, o dos widgets en un mismo rerun de
+Streamlit) piden a la vez el mismo recurso, solo el primero ejecuta la
+llamada real; el resto espera y recibe el mismo resultado (o la misma
+excepción). Complementa a las cachés: cubre la ventana entre el miss
+y el momento en que el resultado se guarda.
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+__version__ = "4.3.0"
+
+T = TypeVar('T')
+
+
+# ============================================================================
+# LLAMADA EN VUELO
+# ============================================================================
+
+class _Call:
+    """Estado de una llamada en vuelo compartida por varios hilos."""
+
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+# ============================================================================
+# CLASE PRINCIPAL: SingleFlight
+# ============================================================================
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave en una sola ejecución.
+
+    Thread-safe. La clave identifica la petición (p.ej. la clave de caché
+    de SEMrush o la URL normalizada del scraper).
+
+    Example:
+        >>> flight = SingleFlight(name="semrush")
+        >>> data = flight.do(cache_key, fetch, endpoint, params)
+    """
+
+    def __init__(self, name: str = "default"):
+        """
+        Inicializa el grupo.
+
+        Args:
+            name: Nombre del grupo para logging y estadísticas
+        """
+        self._name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'executions': 0,
+            'shared': 0,
+        }
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., T],
+        *args,
+        **kwargs
+    ) -> T:
+        """
+        Ejecuta fn una sola vez por clave entre llamadas concurrentes.
+
+        Args:
+            key: Clave de deduplicación
+            fn: Función a ejecutar
+            *args, **kwargs: Argumentos para fn
+
+        Returns:
+            Resultado de fn (compartido con las llamadas duplicadas)
+
+        Raises:
+            La misma excepción que lance fn, en todos los hilos que esperan
+        """
+        with self._lock:
+            call = self._calls.get(key)
+
+            if call is not None:
+                call.waiters += 1
+                self._stats['shared'] += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                is_leader = True
+
+        if not is_leader:
+            logger.debug(f"SingleFlight '{self._name}': esperando llamada en vuelo")
+            call.event.wait()
+
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+
+        except BaseException as e:
+            call.error = e
+            raise
+
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """Retorna el número de llamadas actualmente en vuelo."""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de deduplicación."""
+        with self._lock:
+            return {
+                'name': self._name,
+                'in_flight': len(self._calls),
+                'executions': self._stats['executions'],
+                'shared': self._stats['shared'],
+            }
+
+
+# ============================================================================
+# REFRESCO EN SEGUNDO PLANO (STALE-WHILE-REVALIDATE)
+# ============================================================================
+
+class BackgroundRefresher:
+    """
+    Lanza refrescos de caché en segundo plano, uno por clave.
+
+    Mientras una clave tiene un refresco pendiente, los siguientes
+    submit() con esa clave se ignoran. La ejecución pasa por un
+    SingleFlight, de modo que un refresco y un miss en primer plano de la
+    misma clave comparten la llamada real.
+
+    Example:
+        >>> refresher = BackgroundRefresher(name="gsc")
+        >>> refresher.submit(cache_key, reload_and_store, cache_key)
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        flight: Optional[SingleFlight] = None,
+        max_workers: int = 2
+    ):
+        """
+        Inicializa el refrescador.
+
+        Args:
+            name: Nombre para logging y estadísticas
+            flight: SingleFlight compartido con las cargas en primer plano
+            max_workers: Refrescos simultáneos como máximo
+        """
+        self._name = name
+        self._flight = flight or SingleFlight(name=name)
+        self._max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            'scheduled': 0,
+            'skipped': 0,
+            'failed': 0,
+        }
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> bool:
+        """
+        Programa fn en segundo plano si la clave no tiene ya un refresco.
+
+        El contexto (contextvars) del llamante se propaga al hilo.
+
+        Returns:
+            True si se programó, False si ya había uno pendiente
+        """
+        with self._lock:
+            if key in self._pending:
+                self._stats['skipped'] += 1
+                return False
+
+            self._pending.add(key)
+            self._stats['scheduled'] += 1
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"{self._name}-refresh"
+                )
+
+            executor = self._executor
+
+        ctx = contextvars.copy_context()
+        executor.submit(ctx.run, self._run, key, fn, args, kwargs)
+        return True
+
+    def _run(self, key: Hashable, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        try:
+            self._flight.do(key, fn, *args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.warning(f"Refresco en segundo plano '{self._name}' falló: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def pending(self) -> int:
+        """Retorna el número de refrescos pendientes."""
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtiene estadísticas de refresco."""
+        with self._lock:
+            return {
+                'name': self._name,
+                'pending': len(self._pending),
+                **self._stats,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Detiene el pool de refresco."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# ============================================================================
+# EXPORTS
+# ============================================================================
+
+__all__ = [
+    '__version__',
+    'SingleFlight',
+    'BackgroundRefresher',
+]
@@ -0,0 +1,138 @@
+"""
+Spanish Text - PcComponentes Content Generator
+Versión 4.6.0
+
+Normalización de keywords en español para comparaciones aproximadas.
+
+Pipeline (normalize_keyword):
+1. Minúsculas y plegado de acentos ("portátil" -> "portatil"; la ñ se
+   conserva porque cambia la palabra: "año" / "ano")
+2. Tokens alfanuméricos (la puntuación separa)
+3. Sin stopwords ("monitor para gaming" -> "monitor gaming")
+4. Stemming ligero: plurales y vocal final de género
+   ("ratones" -> "raton", "baratas"/"barato" -> "barat")
+
+No es un stemmer completo (Snowball): solo lo justo para que variantes de
+una misma búsqueda coincidan sin unir palabras distintas.
+
+Autor: PcComponentes - Product Discovery & Content
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet, List
+
+# ============================================================================
+# VERSIÓN Y CONSTANTES
+# ============================================================================
+
+__version__ = "4.6.0"
+
+SPANISH_STOPWORDS: FrozenSet[str] = frozenset({
+    'a', 'al', 'ante', 'con', 'contra', 'de', 'del', 'desde', 'e', 'el',
+    'en', 'entre', 'es', 'esta', 'este', 'hacia', 'hasta', 'la', 'las',
+    'lo', 'los', 'mas', 'me', 'mi', 'mis', 'o', 'para', 'pero', 'por',
+    'que', 'se', 'segun', 'si', 'sin', 'sobre', 'su', 'sus', 'te', 'tu',
+    'tus', 'u', 'un', 'una', 'unas', 'unos', 'y', 'ya',
+})
+
+# Longitud mínima de palabra para aplicar stemming
+MIN_STEM_LENGTH = 4
+
+# Similitud de trigramas a partir de la cual dos keywords se consideran parecidas
+FUZZY_MIN_SIMILARITY = 0.5
+
+_TOKEN_RE = re.compile(r"[0-9a-zñ]+")
+_VOWELS = frozenset('aeiou')
+
+# Plegado directo de los acentos habituales (el resto pasa por NFKD)
+_ACCENT_TABLE = str.maketrans(
+    'áéíóúàèìòùâêîôûäëïöüç',
+    'aeiouaeiouaeiouaeiouc'
+)
+
+
+# ============================================================================
+# PASOS DEL PIPELINE
+# ============================================================================
+
+def fold_accents(text: str) -> str:
+    """Minúsculas y sin acentos ni diéresis (conserva la ñ)."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    text = text.translate(_ACCENT_TABLE)
+    if text.replace('ñ', '').isascii():
+        return text
+
+    text = text.replace('ñ', '\x00')
+    decomposed = unicodedata.normalize('NFKD', text)
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return folded.replace('\x00', 'ñ')
+
+
+@lru_cache(maxsize=65536)
+def stem_spanish(word: str) -> str:
+    """
+    Stemming ligero de una palabra ya plegada.
+
+    Quita el plural (-ces -> -z, -es tras consonante, -s tras vocal) y la
+    vocal final de género (-o/-a/-e) en palabras de MIN_STEM_LENGTH o más.
+    """
+    if len(word) < MIN_STEM_LENGTH or word.isdigit():
+        return word
+
+    if word.endswith('ces'):
+        word = word[:-3] + 'z'
+    elif word.endswith('es') and len(word) > MIN_STEM_LENGTH and word[-3] not in _VOWELS:
+        word = word[:-2]
+    elif word.endswith('s') and word[-2] in _VOWELS:
+        word = word[:-1]
+
+    if len(word) > MIN_STEM_LENGTH and word[-1] in 'oae':
+        word = word[:-1]
+
+    return word
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Tokens normalizados (plegado, sin stopwords, stemming)."""
+    tokens = _TOKEN_RE.findall(fold_accents(text))
+    content = [t for t in tokens if t not in SPANISH_STOPWORDS]
+    # Si todo son stopwords, mejor conservarlas que quedarse sin nada
+    return [stem_spanish(t) for t in (content or tokens)]
+
+
+@lru_cache(maxsize=4096)
+def normalize_keyword(text: str) -> str:
+    """Keyword normalizada como cadena (tokens separados por espacio)."""
+    return ' '.join(normalize_tokens(text))
+
+
+def char_trigrams(normalized: str) -> List[str]:
+    """Trigramas de caracteres de una cadena normalizada (con bordes)."""
+    padded = f"  {normalized} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def trigram_similarity(normalized_a: str, normalized_b: str) -> float:
+    """Coeficiente de Dice entre los trigramas de dos cadenas normalizadas."""
+    if not normalized_a or not normalized_b:
+        return 0.0
+    grams_a = set(char_trigrams(normalized_a))
+    grams_b = set(char_trigrams(normalized_b))
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+__all__ = [
+    '__version__',
+    'SPANISH_STOPWORDS',
+    'FUZZY_MIN_SIMILARITY',
+    'fold_accents',
+    'stem_spanish',
+    'normalize_tokens',
+    'normalize_keyword',
+    'char_trigrams',
+    'trigram_similarity',
+]
@@ -1,6 +1,6 @@
 """
 URL Validator - PcComponentes Content Generator
-Versión 4.2.0
+Versión 4.6.0
 
 Módulo de validación exhaustiva de URLs.
 Incluye sanitización, validación de seguridad, y normalización.
@@ -11,15 +11,21 @@ Este módulo proporciona:
 - Normalización y limpieza de URLs
 - Validación específica para dominios de PcComponentes
 - Sanitización contra inyección y ataques
+- Validación por lotes con patrones precompilados y caché LRU por URL
+- Resolución DNS por lotes (opcional) para detectar dominios que apuntan
+  a IPs privadas
 
 Autor: PcComponentes - Product Discovery & Content
 """
 
 import re
+import os
 import ipaddress
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Any, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 from urllib.parse import (
     urlparse,
@@ -34,11 +40,19 @@ from urllib.parse import (
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+try:
+    from utils.dns_resolver import DNSResolver, get_dns_resolver
+    _dns_resolver_available = True
+except ImportError:
+    DNSResolver = None
+    get_dns_resolver = None
+    _dns_resolver_available = False
+
 # ============================================================================
 # VERSIÓN Y CONSTANTES
 # ============================================================================
 
-__version__ = "4.2.0"
+__version__ = "4.6.0"
 
 # Dominios de PcComponentes
 PCCOMPONENTES_DOMAINS = [
@@ -126,6 +140,21 @@ IP_REGEX = re.compile(
     r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$'
 )
 
+# Patrones precompilados una vez para todos los validadores: cada uno por
+# separado (para saber cuál coincide) y todos en una sola alternativa (para
+# descartar en una pasada las URLs limpias, que son casi todas)
+_SUSPICIOUS_COMPILED = [re.compile(pattern, re.IGNORECASE) for pattern in SUSPICIOUS_PATTERNS]
+_SUSPICIOUS_ANY = re.compile('|'.join(f'(?:{pattern})' for pattern in SUSPICIOUS_PATTERNS), re.IGNORECASE)
+
+_DANGEROUS_PROTOCOL_SET = frozenset(DANGEROUS_PROTOCOLS)
+_DANGEROUS_EXTENSION_SET = frozenset(DANGEROUS_EXTENSIONS)
+
+# Resultados cacheados por validador (0 desactiva la caché)
+URL_VALIDATION_CACHE_SIZE = int(os.getenv('URL_VALIDATION_CACHE_SIZE', '4096'))
+
+# Resolver los dominios en las funciones batch del módulo por defecto
+URL_VALIDATION_RESOLVE_DNS = os.getenv('URL_VALIDATION_RESOLVE_DNS', 'false').lower() == 'true'
+
 
 # ============================================================================
 # EXCEPCIONES
@@ -195,6 +224,7 @@ class URLStatus(Enum):
     PRIVATE_IP = "private_ip"
     TOO_LONG = "too_long"
     SUSPICIOUS = "suspicious"
+    UNRESOLVED = "unresolved"
 
 
 class ThreatType(Enum):
@@ -289,6 +319,10 @@ class URLValidator:
         >>> result = validator.validate("https://example.com/page?q=test")
         >>> if result.is_valid:
         ...     print(result.normalized_url)
+    
+    Los resultados se cachean por URL (LRU de URL_VALIDATION_CACHE_SIZE
+    entradas): validar dos veces la misma URL devuelve el mismo
+    ValidationResult, que no debe modificarse.
     """
     
     def __init__(
@@ -298,7 +332,8 @@ class URLValidator:
         allow_private_ips: bool = False,
         allow_localhost: bool = False,
         strict_mode: bool = True,
-        max_url_length: int = MAX_URL_LENGTH
+        max_url_length: int = MAX_URL_LENGTH,
+        cache_size: Optional[int] = None
     ):
         """
         Inicializa el validador.
@@ -310,6 +345,7 @@ class URLValidator:
             allow_localhost: Permitir localhost
             strict_mode: Modo estricto (más validaciones)
             max_url_length: Longitud máxima de URL
+            cache_size: Resultados cacheados (None = URL_VALIDATION_CACHE_SIZE, 0 = sin caché)
         """
         self._allowed_domains: Optional[Set[str]] = set(allowed_domains) if allowed_domains else None
         self._blocked_domains: Set[str] = set(blocked_domains) if blocked_domains else set()
@@ -318,11 +354,15 @@ class URLValidator:
         self._strict_mode = strict_mode
         self._max_url_length = max_url_length
         
-        # Compilar patrones sospechosos
-        self._suspicious_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in SUSPICIOUS_PATTERNS
-        ]
+        # Patrones sospechosos (precompilados a nivel de módulo)
+        self._suspicious_patterns = _SUSPICIOUS_COMPILED
+        
+        # Caché LRU de resultados por URL
+        self._cache_size = URL_VALIDATION_CACHE_SIZE if cache_size is None else max(0, cache_size)
+        self._cache: 'OrderedDict[str, ValidationResult]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
         
         logger.debug(
             f"URLValidator inicializado: strict_mode={strict_mode}, "
@@ -339,6 +379,27 @@ class URLValidator:
         Returns:
             ValidationResult con el resultado de la validación
         """
+        if not self._cache_size or not url:
+            return self._validate(url)
+        
+        with self._cache_lock:
+            cached = self._cache.get(url)
+            if cached is not None:
+                self._cache.move_to_end(url)
+                self._cache_hits += 1
+                return cached
+            self._cache_misses += 1
+        
+        result = self._validate(url)
+        
+        with self._cache_lock:
+            self._cache[url] = result
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return result
+    
+    def _validate(self, url: str) -> ValidationResult:
+        """Validación completa de una URL (sin caché)."""
         warnings = []
         
         # Verificar que no sea None o vacía
@@ -380,15 +441,15 @@ class URLValidator:
             )
         
         # Verificar protocolo peligroso
-        for proto in DANGEROUS_PROTOCOLS:
-            if url.lower().startswith(f"{proto}:"):
-                return ValidationResult(
-                    is_valid=False,
-                    url=url,
-                    status=URLStatus.UNSAFE,
-                    threat_type=ThreatType.DANGEROUS_PROTOCOL,
-                    error=f"Protocolo peligroso: {proto}"
-                )
+        proto, has_scheme, _ = url.lower().partition(':')
+        if has_scheme and proto in _DANGEROUS_PROTOCOL_SET:
+            return ValidationResult(
+                is_valid=False,
+                url=url,
+                status=URLStatus.UNSAFE,
+                threat_type=ThreatType.DANGEROUS_PROTOCOL,
+                error=f"Protocolo peligroso: {proto}"
+            )
         
         # Añadir protocolo si falta
         if not url.startswith(('http://', 'https://')):
@@ -506,17 +567,120 @@ class URLValidator:
             }
         )
     
-    def validate_batch(self, urls: List[str]) -> List[ValidationResult]:
+    def validate_batch(
+        self,
+        urls: List[str],
+        resolve_dns: bool = False,
+        resolver: Optional['DNSResolver'] = None
+    ) -> List[ValidationResult]:
         """
         Valida múltiples URLs.
         
+        Cada URL distinta se valida una vez (y las ya vistas salen de la
+        caché); el resultado mantiene el orden y las repeticiones.
+        
+        Con resolve_dns, los dominios de las URLs válidas se resuelven todos
+        a la vez (con caché TTL) y se rechazan los que apuntan a IPs privadas
+        (PRIVATE_IP) o no resuelven (UNRESOLVED). Las válidas llevan las IPs
+        comprobadas en details['resolved_ips'].
+        
         Args:
             urls: Lista de URLs a validar
+            resolve_dns: Resolver y comprobar las IPs de los dominios
+            resolver: DNSResolver a usar (None = el global)
             
         Returns:
             Lista de ValidationResult
         """
-        return [self.validate(url) for url in urls]
+        results = {url: self.validate(url) for url in dict.fromkeys(urls)}
+        if resolve_dns:
+            results = self._check_resolved(results, resolver)
+        return [results[url] for url in urls]
+    
+    def _check_resolved(
+        self,
+        results: Dict[str, ValidationResult],
+        resolver: Optional['DNSResolver']
+    ) -> Dict[str, ValidationResult]:
+        """Comprueba las IPs a las que resuelven los dominios de las URLs válidas."""
+        domains = {
+            result.details['domain']
+            for result in results.values()
+            if result.is_valid and result.details and not result.details.get('is_ip')
+        }
+        if not domains:
+            return results
+        if resolver is None:
+            if not _dns_resolver_available:
+                logger.warning("utils.dns_resolver no disponible; no se resuelven dominios")
+                return results
+            resolver = get_dns_resolver()
+        
+        resolved = resolver.resolve_many(domains)
+        checked: Dict[str, ValidationResult] = {}
+        
+        for url, result in results.items():
+            domain = result.details.get('domain') if result.details else None
+            if domain not in domains:
+                checked[url] = result
+                continue
+            
+            # Los resultados cacheados se comparten: se crean otros
+            host = resolved[domain]
+            if not host.ok:
+                checked[url] = ValidationResult(
+                    is_valid=False,
+                    url=result.url,
+                    status=URLStatus.UNRESOLVED,
+                    error=host.error,
+                    details={'domain': domain}
+                )
+                continue
+            
+            blocked = [ip for ip in host.addresses if not self._address_allowed(ip)]
+            if blocked:
+                checked[url] = ValidationResult(
+                    is_valid=False,
+                    url=result.url,
+                    status=URLStatus.PRIVATE_IP,
+                    threat_type=ThreatType.SSRF,
+                    error=f"El dominio {domain} resuelve a una IP no permitida: {blocked[0]}",
+                    details={'domain': domain, 'resolved_ips': list(host.addresses)}
+                )
+                continue
+            
+            checked[url] = replace(
+                result, details={**result.details, 'resolved_ips': list(host.addresses)}
+            )
+        
+        return checked
+    
+    def _address_allowed(self, ip: str) -> bool:
+        """Si una IP resuelta es un destino permitido."""
+        if self._allow_localhost:
+            try:
+                if ipaddress.ip_address(ip).is_loopback:
+                    return True
+            except ValueError:
+                return False
+        return self._validate_ip(ip)[0]
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Estadísticas de la caché de resultados."""
+        with self._cache_lock:
+            return {
+                'size': len(self._cache),
+                'max_size': self._cache_size,
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+            }
+    
+    def clear_cache(self) -> None:
+        """Vacía la caché de resultados."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
     
     def is_valid(self, url: str) -> bool:
         """
@@ -624,6 +788,13 @@ class URLValidator:
     
     def _check_suspicious_patterns(self, url: str, decoded_url: str) -> ThreatType:
         """Verifica patrones sospechosos en la URL."""
+        # Una sola pasada para las URLs limpias; si algo coincide, se busca
+        # qué patrón (el primero de la lista) para clasificar la amenaza
+        if not _SUSPICIOUS_ANY.search(url) and (
+            decoded_url == url or not _SUSPICIOUS_ANY.search(decoded_url)
+        ):
+            return ThreatType.NONE
+        
         for pattern in self._suspicious_patterns:
             if pattern.search(url) or pattern.search(decoded_url):
                 # Determinar tipo de amenaza
@@ -642,11 +813,11 @@ class URLValidator:
     
     def _check_dangerous_extension(self, path: str) -> Optional[str]:
         """Verifica extensiones de archivo peligrosas."""
-        path_lower = path.lower()
-        for ext in DANGEROUS_EXTENSIONS:
-            if path_lower.endswith(ext):
-                return ext
-        return None
+        dot = path.rfind('.')
+        if dot < 0:
+            return None
+        ext = path[dot:].lower()
+        return ext if ext in _DANGEROUS_EXTENSION_SET else None
     
     def _normalize_url(self, parsed: ParsedURL) -> str:
         """Normaliza una URL."""
@@ -822,18 +993,24 @@ def extract_domain(url: str) -> Optional[str]:
     return None
 
 
-def validate_urls_batch(urls: List[str]) -> Dict[str, ValidationResult]:
+def validate_urls_batch(
+    urls: List[str],
+    resolve_dns: Optional[bool] = None
+) -> Dict[str, ValidationResult]:
     """
     Valida múltiples URLs y retorna resultados por URL.
     
     Args:
         urls: Lista de URLs
+        resolve_dns: Comprobar las IPs de los dominios (None = URL_VALIDATION_RESOLVE_DNS)
         
     Returns:
         Dict con URL como clave y ValidationResult como valor
     """
+    if resolve_dns is None:
+        resolve_dns = URL_VALIDATION_RESOLVE_DNS
     validator = get_validator()
-    return {url: validator.validate(url) for url in urls}
+    return dict(zip(urls, validator.validate_batch(urls, resolve_dns=resolve_dns)))
 
 
 def filter_valid_urls(urls: List[str]) -> List[str]:
@@ -847,24 +1024,26 @@ def filter_valid_urls(urls: List[str]) -> List[str]:
         Lista de URLs válidas
     """
     validator = get_validator()
-    return [url for url in urls if validator.is_valid(url)]
+    return [url for url, result in zip(urls, validator.validate_batch(urls)) if result.is_valid]
 
 
-def filter_safe_urls(urls: List[str]) -> List[str]:
+def filter_safe_urls(urls: List[str], resolve_dns: Optional[bool] = None) -> List[str]:
     """
     Filtra solo las URLs seguras (válidas y sin amenazas).
     
     Args:
         urls: Lista de URLs
+        resolve_dns: Comprobar las IPs de los dominios (None = URL_VALIDATION_RESOLVE_DNS)
         
     Returns:
         Lista de URLs seguras
     """
+    if resolve_dns is None:
+        resolve_dns = URL_VALIDATION_RESOLVE_DNS
     validator = get_validator()
     safe_urls = []
     
-    for url in urls:
-        result = validator.validate(url)
+    for url, result in zip(urls, validator.validate_batch(urls, resolve_dns=resolve_dns)):
         if result.is_valid and result.threat_type == ThreatType.NONE:
             safe_urls.append(result.normalized_url or url)
     
@@ -979,4 +1158,6 @@ __all__ = [
     'PCCOMPONENTES_DOMAINS',
     'ALLOWED_PROTOCOLS',
     'MAX_URL_LENGTH',
+    'URL_VALIDATION_CACHE_SIZE',
+    'URL_VALIDATION_RESOLVE_DNS',
 ]